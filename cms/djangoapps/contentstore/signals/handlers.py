@@ -27,6 +27,7 @@ from cms.djangoapps.contentstore.courseware_index import (
     CoursewareSearchIndexer,
     LibrarySearchIndexer,
 )
+from cms.djangoapps.contentstore.toggles import PRECOMPUTE_PROBLEM_SCRIPTS
 from common.djangoapps.track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
 from common.djangoapps.util.block_utils import yield_dynamic_block_descendants
 from lms.djangoapps.grades.api import task_compute_all_grades_for_course
@@ -125,6 +126,7 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     """
     # import here, because signal is registered at startup, but items in tasks are not yet able to be loaded
     from cms.djangoapps.contentstore.tasks import (
+        precompute_problem_scripts,
         update_outline_from_modulestore_task,
         update_search_index,
         update_special_exams_and_publish
@@ -145,6 +147,10 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
         # Push the course out to CourseGraph asynchronously.
         dump_course_to_neo4j.delay(course_key_str)
 
+    if PRECOMPUTE_PROBLEM_SCRIPTS.is_enabled(course_key):
+        # Run the problems' scripts for every seed, so that students find the results cached.
+        transaction.on_commit(lambda: precompute_problem_scripts.delay(course_key_str))
+
     # Finally, call into the course search subsystem
     # to kick off an indexing action
     if CoursewareSearchIndexer.indexing_is_enabled() and CourseAboutSearchIndexer.indexing_is_enabled():
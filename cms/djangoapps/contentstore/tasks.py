@@ -7,6 +7,8 @@ import json
 import os
 import shutil
 import tarfile
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from tempfile import NamedTemporaryFile, mkdtemp
 
@@ -17,11 +19,14 @@ from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import SuspiciousOperation
 from django.core.files import File
+from django.core.files.storage import FileSystemStorage
 from django.db.transaction import atomic
 from django.test import RequestFactory
 from django.utils.text import get_valid_filename
+from fs.memoryfs import MemoryFS
 from edx_django_utils.monitoring import (
     set_code_owner_attribute,
     set_code_owner_attribute_from_module,
@@ -56,10 +61,12 @@ from common.djangoapps.student.roles import CourseInstructorRole, CourseStaffRol
 from common.djangoapps.util.monitoring import monitor_import_failure
 from openedx.core.djangoapps.content.learning_sequences.api import key_supports_outlines
 from openedx.core.djangoapps.content_libraries import api as v2contentlib_api
+from openedx.core.djangoapps.contentserver.caching import del_asset_digests
 from openedx.core.djangoapps.course_apps.toggles import exams_ida_enabled
 from openedx.core.djangoapps.discussions.tasks import update_unit_discussion_state_from_discussion_blocks
 from openedx.core.djangoapps.embargo.models import CountryAccessRule, RestrictedCourse
 from openedx.core.lib.blockstore_api import get_collection
+from openedx.core.lib.cache_utils import CacheService
 from openedx.core.lib.extract_tar import safetar_extractall
 from xmodule.contentstore.django import contentstore  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.course_block import CourseFields  # lint-amnesty, pylint: disable=wrong-import-order
@@ -72,7 +79,7 @@ from xmodule.modulestore.xml_importer import CourseImportException, import_cours
 
 from .outlines import update_outline_from_modulestore
 from .outlines_regenerate import CourseOutlineRegenerate
-from .toggles import bypass_olx_failure_enabled
+from .toggles import STREAM_OLX_EXPORT, bypass_olx_failure_enabled
 from .utils import course_import_olx_validation_is_enabled
 
 
@@ -274,6 +281,44 @@ def update_special_exams_and_publish(course_key_str):
     on_course_publish(course_key)
 
 
+# How long precomputed script results are kept. They are keyed by the code and seed they were run
+# with, so they can't go stale, and should last until the problems are next published or longer.
+PRECOMPUTED_SCRIPT_RESULTS_TIMEOUT = 30 * 24 * 60 * 60
+
+
+class PrecomputedScriptResultsCache(CacheService):
+    """
+    A CacheService which keeps what is set in it for PRECOMPUTED_SCRIPT_RESULTS_TIMEOUT,
+    rather than the default timeout of the cache.
+    """
+    def set(self, key, value, *args, **kwargs):
+        if not args:
+            kwargs.setdefault('timeout', PRECOMPUTED_SCRIPT_RESULTS_TIMEOUT)
+        return super().set(key, value, *args, **kwargs)
+
+
+@shared_task
+@set_code_owner_attribute
+def precompute_problem_scripts(course_key_str):
+    """
+    Runs the scripts of the published problems of a course for each seed they can be given.
+
+    The results are stored in the default cache, where the LMS looks for them before
+    running a problem's scripts in the sandbox.
+    """
+    course_key = CourseKey.from_string(course_key_str)
+    cache_service = PrecomputedScriptResultsCache(cache)
+    store = modulestore()
+    seed_count = 0
+    with store.branch_setting(ModuleStoreEnum.Branch.published_only, course_key):
+        for problem in store.get_items(course_key, qualifiers={'category': 'problem'}):
+            try:
+                seed_count += problem.precompute_script_results(cache_service)
+            except Exception:  # pylint: disable=broad-except
+                LOGGER.exception('Failed to precompute the scripts of problem %s', problem.location)
+    LOGGER.info('Precomputed problem scripts for course %s with %d seeds', course_key_str, seed_count)
+
+
 class CourseExportTask(UserTask):  # pylint: disable=abstract-method
     """
     Base class for course and library export tasks.
@@ -334,9 +379,13 @@ def export_olx(self, user_id, course_key_string, language):
 
     try:
         self.status.set_state('Exporting')
-        tarball = create_export_tarball(courselike_block, courselike_key, {}, self.status)
         artifact = UserTaskArtifact(status=self.status, name='Output')
-        artifact.file.save(name=os.path.basename(tarball.name), content=File(tarball))
+        if STREAM_OLX_EXPORT.is_enabled():
+            with _open_new_artifact_file(artifact, f'{courselike_block.url_name}.tar.gz') as output_file:
+                write_export_tarball(courselike_block, courselike_key, output_file, {}, self.status)
+        else:
+            tarball = create_export_tarball(courselike_block, courselike_key, {}, self.status)
+            artifact.file.save(name=os.path.basename(tarball.name), content=File(tarball))
         artifact.save()
     # catch all exceptions so we can record useful error messages
     except Exception as exception:  # pylint: disable=broad-except
@@ -358,18 +407,104 @@ def create_export_tarball(course_block, course_key, context, status=None):
     root_dir = path(mkdtemp())
 
     try:
-        if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
-        else:
-            export_course_to_xml(modulestore(), contentstore(), course_block.id, root_dir, name)
+        with _handle_export_errors(course_key, context, status):
+            if isinstance(course_key, LibraryLocator):
+                export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+            else:
+                export_course_to_xml(modulestore(), contentstore(), course_block.id, root_dir, name)
+
+            if status:
+                status.set_state('Compressing')
+                status.increment_completed_steps()
+            LOGGER.debug('tar file being generated at %s', export_file.name)
+            with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
+                tar_file.add(root_dir / name, arcname=name)
+    finally:
+        if os.path.exists(root_dir / name):
+            shutil.rmtree(root_dir / name)
+
+    return export_file
+
+
+def write_export_tarball(course_block, course_key, output_file, context, status=None):
+    """
+    Writes the export tarball to the writable file object `output_file` as it is generated.
+
+    Unlike `create_export_tarball`, nothing is written to a temporary directory: the OLX is
+    exported in memory, and the static files are streamed from the contentstore straight
+    into the archive.
+
+    Updates the context with any error information if applicable.
+    """
+    name = course_block.url_name
+    if isinstance(course_key, LibraryLocator):
+        courselike_key = course_key
+        export_to_xml = export_library_to_xml
+    else:
+        courselike_key = course_block.id
+        export_to_xml = export_course_to_xml
+
+    with _handle_export_errors(course_key, context, status), MemoryFS() as olx_fs:
+        export_to_xml(modulestore(), contentstore(), courselike_key, olx_fs, name, export_static_files=False)
 
         if status:
             status.set_state('Compressing')
             status.increment_completed_steps()
-        LOGGER.debug('tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
+        with tarfile.open(fileobj=output_file, mode='w|gz') as tar_file:
+            mtime = int(time.time())
+            for dir_path in olx_fs.walk.dirs():
+                tarinfo = tarfile.TarInfo(dir_path.lstrip('/'))
+                tarinfo.type = tarfile.DIRTYPE
+                tarinfo.mode = 0o755
+                tarinfo.mtime = mtime
+                tar_file.addfile(tarinfo)
+            for file_path in olx_fs.walk.files():
+                tarinfo = tarfile.TarInfo(file_path.lstrip('/'))
+                tarinfo.size = olx_fs.getsize(file_path)
+                tarinfo.mtime = mtime
+                with olx_fs.openbin(file_path) as olx_file:
+                    tar_file.addfile(tarinfo, olx_file)
+
+            for export_path, content in contentstore().iter_export_for_course(courselike_key):
+                tarinfo = tarfile.TarInfo(f'{name}/static/{export_path}')
+                tarinfo.size = content.length
+                tarinfo.mtime = int(content.last_modified_at.timestamp()) if content.last_modified_at else mtime
+                tar_file.addfile(tarinfo, content)
+
+
+@contextmanager
+def _open_new_artifact_file(artifact, filename):
+    """
+    Opens a new file named after `filename` in the storage of the file of `artifact`, for writing,
+    and sets it as the file of `artifact`.
+
+    Storages that support it, such as S3, upload the file in parts as it is written.
+    The file is deleted if an exception is raised while it is written.
+    """
+    storage = artifact.file.storage
+    name = storage.get_available_name(
+        artifact.file.field.generate_filename(artifact, filename), max_length=artifact.file.field.max_length,
+    )
+    if isinstance(storage, FileSystemStorage):
+        os.makedirs(os.path.dirname(storage.path(name)), exist_ok=True)
+
+    output_file = storage.open(name, 'wb')
+    try:
+        with output_file:
+            yield output_file
+    except Exception:
+        storage.delete(name)
+        raise
+    artifact.file.name = name
+
 
+@contextmanager
+def _handle_export_errors(course_key, context, status):
+    """
+    Logs errors raised while exporting `course_key`, and records them in `context` and `status`.
+    """
+    try:
+        yield
     except SerializationError as exc:
         LOGGER.exception('There was an error exporting %s', course_key, exc_info=True)
         parent = None
@@ -401,11 +536,6 @@ def create_export_tarball(course_block, course_key, context, status=None):
         if status:
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg']}))
         raise
-    finally:
-        if os.path.exists(root_dir / name):
-            shutil.rmtree(root_dir / name)
-
-    return export_file
 
 
 class CourseImportTask(UserTask):  # pylint: disable=abstract-method
@@ -668,6 +798,9 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
             shutil.rmtree(course_dir)
             LOGGER.info(f'{log_prefix}: Temp data cleared')
 
+        # Even a failed import may have changed some of the course's assets.
+        del_asset_digests(courselike_key)
+
         if self.status.state == 'Updating' and is_course:
             # Reload the course so we have the latest state
             course = modulestore().get_course(courselike_key)
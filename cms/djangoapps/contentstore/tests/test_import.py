@@ -13,13 +13,14 @@ import ddt
 from django.conf import settings
 from django.test.client import Client
 from django.test.utils import override_settings
+from edx_toggles.toggles.testutils import override_waffle_switch
 
 from xmodule.contentstore.django import contentstore
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
-from xmodule.modulestore.xml_importer import import_course_from_xml
+from xmodule.modulestore.xml_importer import CONCURRENT_STATIC_CONTENT_IMPORT, import_course_from_xml
 
 TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
 TEST_DATA_CONTENTSTORE['DOC_STORE_CONFIG']['db'] = 'test_xcontent_%s' % uuid4().hex
@@ -156,6 +157,44 @@ class ContentStoreImportTest(ModuleStoreTestCase):
         self.assertEqual(len(all_assets), 0)
         self.assertEqual(count, 0)
 
+    def test_concurrent_static_import(self):
+        '''
+        Static files are imported the same way whether or not they are imported concurrently
+        '''
+        content_store = contentstore()
+        module_store = modulestore()
+        asset_counts = []
+        for active in (False, True):
+            course_id = module_store.make_course_key('edX', 'toy', f'concurrent_{active}')
+            with override_waffle_switch(CONCURRENT_STATIC_CONTENT_IMPORT, active=active):
+                import_course_from_xml(
+                    module_store, self.user.id, TEST_DATA_DIR, ['toy'],
+                    static_content_store=content_store, target_id=course_id, create_if_not_present=True,
+                )
+            asset_counts.append(content_store.get_all_content_for_course(course_id)[1])
+
+        self.assertGreater(asset_counts[0], 0)
+        self.assertEqual(asset_counts[0], asset_counts[1])
+
+    def test_concurrent_static_import_failure(self):
+        '''
+        A failed concurrent static import stops the import before any block is imported
+        '''
+        module_store = modulestore()
+        course_id = module_store.make_course_key('edX', 'toy', 'concurrent_failure')
+        with override_waffle_switch(CONCURRENT_STATIC_CONTENT_IMPORT, active=True), patch(
+            'xmodule.modulestore.xml_importer.StaticContentImporter.import_static_file',
+            side_effect=OSError('Unable to read the file'),
+        ), patch(
+            'xmodule.modulestore.xml_importer.CourseImportManager.import_children',
+        ) as mock_import_children:
+            with self.assertRaises(OSError):
+                import_course_from_xml(
+                    module_store, self.user.id, TEST_DATA_DIR, ['toy'],
+                    static_content_store=contentstore(), target_id=course_id, create_if_not_present=True,
+                )
+        mock_import_children.assert_not_called()
+
     def test_no_static_link_rewrites_on_import(self):
         module_store = modulestore()
         courses = import_course_from_xml(
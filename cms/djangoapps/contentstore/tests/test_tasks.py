@@ -5,27 +5,37 @@ Unit tests for course import and export Celery tasks
 
 import copy
 import json
+import tarfile
 from unittest import mock
 from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.test.utils import override_settings
-from edx_toggles.toggles.testutils import override_waffle_flag
+from edx_toggles.toggles.testutils import override_waffle_flag, override_waffle_switch
 from opaque_keys.edx.locator import CourseLocator
 from organizations.models import OrganizationCourse
 from organizations.tests.factories import OrganizationFactory
 from user_tasks.models import UserTaskArtifact, UserTaskStatus
 
-from cms.djangoapps.contentstore.tasks import export_olx, update_special_exams_and_publish, rerun_course
+from cms.djangoapps.contentstore.tasks import (
+    export_olx,
+    PRECOMPUTED_SCRIPT_RESULTS_TIMEOUT,
+    PrecomputedScriptResultsCache,
+    precompute_problem_scripts,
+    rerun_course,
+    update_special_exams_and_publish,
+)
 from cms.djangoapps.contentstore.tests.test_libraries import LibraryTestCase
 from cms.djangoapps.contentstore.tests.utils import CourseTestCase
+from cms.djangoapps.contentstore.toggles import STREAM_OLX_EXPORT
 from common.djangoapps.course_action_state.models import CourseRerunState
 from common.djangoapps.student.tests.factories import UserFactory
 from openedx.core.djangoapps.course_apps.toggles import EXAMS_IDA
 from openedx.core.djangoapps.embargo.models import Country, CountryAccessRule, RestrictedCourse
 from xmodule.modulestore.django import modulestore  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE
+from xmodule.modulestore.tests.factories import BlockFactory  # lint-amnesty, pylint: disable=wrong-import-order
 
 TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
 TEST_DATA_CONTENTSTORE['DOC_STORE_CONFIG']['db'] = 'test_xcontent_%s' % uuid4().hex
@@ -57,6 +67,24 @@ class ExportCourseTestCase(CourseTestCase):
         output = artifacts[0]
         self.assertEqual(output.name, 'Output')
 
+    def test_streamed_export(self):
+        """
+        Verify that a streamed course export produces the same files as a regular one
+        """
+        key = str(self.course.location.course_key)
+        exported_files = []
+        for stream in (False, True):
+            with override_waffle_switch(STREAM_OLX_EXPORT, active=stream):
+                result = export_olx.delay(self.user.id, key, 'en')
+            status = UserTaskStatus.objects.get(task_id=result.id)
+            self.assertEqual(status.state, UserTaskStatus.SUCCEEDED)
+            output = UserTaskArtifact.objects.get(status=status, name='Output')
+            with output.file.open('rb') as output_file, tarfile.open(fileobj=output_file) as tar_file:
+                exported_files.append({
+                    member.name: tar_file.extractfile(member).read() for member in tar_file if member.isfile()
+                })
+        self.assertEqual(exported_files[0], exported_files[1])
+
     @mock.patch('cms.djangoapps.contentstore.tasks.export_course_to_xml', side_effect=side_effect_exception)
     def test_exception(self, mock_export):  # pylint: disable=unused-argument
         """
@@ -199,3 +227,28 @@ class RegisterExamsTaskTestCase(CourseTestCase):  # pylint: disable=missing-clas
             _mock_register_exams_proctoring.side_effect = Exception('boom!')
             update_special_exams_and_publish(str(self.course.id))
             course_publish.assert_called()
+
+
+class PrecomputeProblemScriptsTaskTestCase(CourseTestCase):
+    """
+    Tests for the precompute_problem_scripts task.
+    """
+
+    @mock.patch('xmodule.capa_block.ProblemBlock.precompute_script_results', autospec=True)
+    def test_precompute_published_problems(self, mock_precompute):
+        mock_precompute.side_effect = [Exception('boom!'), 20]
+        vertical = BlockFactory.create(parent=self.course, category='vertical')
+        problems = [BlockFactory.create(parent=vertical, category='problem') for __ in range(2)]
+        BlockFactory.create(parent=vertical, category='problem', publish_item=False)
+
+        precompute_problem_scripts(str(self.course.id))
+
+        # A failure doesn't stop the other problems, and only published problems are run.
+        assert sorted(call.args[0].location for call in mock_precompute.call_args_list) == sorted(
+            problem.location for problem in problems
+        )
+
+    def test_precomputed_results_timeout(self):
+        mock_cache = mock.Mock()
+        PrecomputedScriptResultsCache(mock_cache).set('key', 'value')
+        mock_cache.set.assert_called_once_with('key', 'value', timeout=PRECOMPUTED_SCRIPT_RESULTS_TIMEOUT)
@@ -1,7 +1,7 @@
 """
 CMS feature toggles.
 """
-from edx_toggles.toggles import SettingDictToggle, WaffleFlag
+from edx_toggles.toggles import SettingDictToggle, WaffleFlag, WaffleSwitch
 from openedx.core.djangoapps.waffle_utils import CourseWaffleFlag
 
 # .. toggle_name: FEATURES['ENABLE_EXPORT_GIT']
@@ -50,6 +50,32 @@ BYPASS_OLX_FAILURE = WaffleFlag(
     CONTENTSTORE_LOG_PREFIX,
 )
 
+# .. toggle_name: contentstore.stream_olx_export
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, course and library exports are written as a .tar.gz archive straight to
+#   the export storage as they are generated. The OLX is exported in memory and static files are streamed from the
+#   contentstore into the archive, instead of writing everything to a temporary directory and compressing it.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+STREAM_OLX_EXPORT = WaffleSwitch(
+    f'{CONTENTSTORE_NAMESPACE}.stream_olx_export',
+    __name__,
+)
+
+# .. toggle_name: contentstore.precompute_problem_scripts
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled, publishing a course runs the scripts of its problems in the sandbox for every
+#   seed the problems can be given (problems that are never randomized, or randomized per student), and stores the
+#   results in the cache that the LMS reads them from. Students then don't wait for the sandbox on first load.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_warning: Studio and the LMS must share the default django cache for the results to be used.
+PRECOMPUTE_PROBLEM_SCRIPTS = CourseWaffleFlag(
+    f'{CONTENTSTORE_NAMESPACE}.precompute_problem_scripts', __name__
+)
+
 
 def split_library_view_on_dashboard():
     """
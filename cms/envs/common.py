@@ -1148,6 +1148,32 @@ CODE_JAIL_REST_SERVICE_CONNECT_TIMEOUT = 0.5  # time in seconds
 # .. setting_description: Set the number of seconds CMS will wait for a response from the
 #   codejail remote service endpoint.
 CODE_JAIL_REST_SERVICE_READ_TIMEOUT = 3.5  # time in seconds
+# .. setting_name: CODE_JAIL_LOCAL_CACHE_MAX_BYTES
+# .. setting_default: 20 * 1024 * 1024
+# .. setting_description: Size, in bytes of serialized results, of the process-local LRU cache of
+#   sandboxed code results that safe_exec keeps in front of the django cache it is given. Set to 0 to disable.
+CODE_JAIL_LOCAL_CACHE_MAX_BYTES = 20 * 1024 * 1024
+# .. setting_name: CODE_JAIL_WORKER_POOL_SIZE
+# .. setting_default: 0
+# .. setting_description: Number of warm sandbox worker processes that each process running safe_exec keeps,
+#   to skip starting a sandboxed Python and importing numpy and scipy for every execution. Each execution
+#   still runs in a child process of its own, forked by the worker, with the limits of CODE_JAIL. Set to 0
+#   to start a new codejail sandbox for every execution. Not used with the codejail REST service.
+# .. setting_warning: The workers and their children run as the sandbox user, so they count towards the
+#   NPROC limit of the executions.
+CODE_JAIL_WORKER_POOL_SIZE = 0
+# .. setting_name: CODE_JAIL_WORKER_MAX_EXECUTIONS
+# .. setting_default: 100
+# .. setting_description: Number of executions after which a sandbox worker of the CODE_JAIL_WORKER_POOL_SIZE
+#   pool is replaced by a new one. Set to 0 to keep workers until they fail.
+CODE_JAIL_WORKER_MAX_EXECUTIONS = 100
+
+# .. setting_name: CAPA_PROBLEM_TREE_CACHE_MAX_BYTES
+# .. setting_default: 10 * 1024 * 1024
+# .. setting_description: Size, in bytes of problem XML, of the process-local LRU cache of preprocessed capa
+#   problems, which lets problems skip the compatibility transforms and the assignment of IDs and a11y data
+#   every time they are loaded. Entries are stored as serialized XML. Set to 0 to disable.
+CAPA_PROBLEM_TREE_CACHE_MAX_BYTES = 10 * 1024 * 1024
 
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG in your environment settings files, not here
@@ -2271,6 +2297,35 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES
+# .. setting_default: 100 * 1024 * 1024
+# .. setting_description: Size, in bytes of pickled data, of the process-local LRU cache that split
+#   modulestore keeps in front of the 'course_structure_cache' django cache. Course structures are
+#   immutable per version, so recently used ones are kept pickled (uncompressed) in memory, and unpickled
+#   for each read. Set to 0 to disable.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+# .. setting_name: COURSE_ASSETS_DISK_CACHE_DIR
+# .. setting_default: None
+# .. setting_description: Directory on the local disk of each app server where the static content
+#   server caches course assets too large for the memcached 'course_assets_cache', keyed by their
+#   content digest. Set to None to disable the disk cache.
+COURSE_ASSETS_DISK_CACHE_DIR = None
+
+# .. setting_name: COURSE_ASSETS_DISK_CACHE_MAX_SIZE
+# .. setting_default: 10 * 1024 * 1024 * 1024
+# .. setting_description: Size, in bytes, that the files in COURSE_ASSETS_DISK_CACHE_DIR are allowed
+#   to take up. Least recently served files are evicted beyond this size.
+COURSE_ASSETS_DISK_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+# .. setting_name: COURSE_ASSETS_DISK_CACHE_ACCEL_REDIRECT_PREFIX
+# .. setting_default: None
+# .. setting_description: If set, full responses for assets in COURSE_ASSETS_DISK_CACHE_DIR are handed
+#   off to the web server with an X-Accel-Redirect header to this internal location prefix, which must
+#   be mapped to COURSE_ASSETS_DISK_CACHE_DIR (e.g. an nginx "internal" location). If None, the files
+#   are returned as file responses for the WSGI server to send.
+COURSE_ASSETS_DISK_CACHE_ACCEL_REDIRECT_PREFIX = None
+
 ############################ OAUTH2 Provider ###################################
 
 
@@ -2477,6 +2532,17 @@ ANALYTICS_DASHBOARD_NAME = 'Your Platform Name Here Insights'
 
 COMMENTS_SERVICE_URL = 'http://localhost:18080'
 COMMENTS_SERVICE_KEY = 'password'
+# .. setting_name: COMMENTS_SERVICE_CONNECTION_POOL_SIZE
+# .. setting_default: 10
+# .. setting_description: Number of connections to the comments service that each process keeps alive,
+#   to skip opening a new connection for every request. Set to 0 to open a new connection for every request.
+COMMENTS_SERVICE_CONNECTION_POOL_SIZE = 10
+# .. setting_name: COMMENTS_SERVICE_CONNECTION_RETRIES
+# .. setting_default: 2
+# .. setting_description: Number of times a request to the comments service is retried when the connection
+#   fails, with the pooled connections of COMMENTS_SERVICE_CONNECTION_POOL_SIZE. Only connection errors, and
+#   read errors of idempotent requests, are retried.
+COMMENTS_SERVICE_CONNECTION_RETRIES = 2
 
 EXAMS_SERVICE_URL = 'http://localhost:18740/api/v1'
 EXAMS_SERVICE_USERNAME = 'edx_exams_worker'
@@ -183,6 +183,18 @@ CACHES = {
     },
 }
 
+# Structures are cached in-process only by tests that explicitly enable it
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 0
+
+# Sandboxed code results are cached in-process only by tests that explicitly enable it
+CODE_JAIL_LOCAL_CACHE_MAX_BYTES = 0
+
+# Parsed problems are cached in-process only by tests that explicitly enable it
+CAPA_PROBLEM_TREE_CACHE_MAX_BYTES = 0
+
+# Tests mock requests to the comments service
+COMMENTS_SERVICE_CONNECTION_POOL_SIZE = 0
+
 ############################### BLOCKSTORE #####################################
 # Blockstore tests
 RUN_BLOCKSTORE_TESTS = os.environ.get('EDXAPP_RUN_BLOCKSTORE_TESTS', 'no').lower() in ('true', 'yes', '1')
@@ -2,12 +2,15 @@
 
 import logging
 import re
+from functools import lru_cache
 
 from django.conf import settings
 from django.contrib.staticfiles import finders
 from django.contrib.staticfiles.storage import staticfiles_storage
 from opaque_keys.edx.locator import AssetLocator
 
+from openedx.core.djangoapps.contentserver.caching import get_asset_digests
+from openedx.core.lib.cache_utils import get_cache
 from xmodule.contentstore.content import StaticContent
 
 log = logging.getLogger(__name__)
@@ -29,6 +32,37 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+@lru_cache(maxsize=None)
+def _compile_url_replace_regex(prefix):
+    """
+    Returns the compiled _url_replace_regex for the given prefix.
+    """
+    return re.compile(_url_replace_regex(prefix))
+
+
+def _static_url_prefix_regex(data_dir):
+    """
+    Match the prefix of static urls, unless they point into the course data directory.
+    """
+    return '(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
+def _is_xblock_resource_url(full_url):
+    """
+    Whether the url is an XBlock resource link, which must not be rewritten.
+
+    Probably wasn't a good idea that /static works for actual static assets and
+    for magical course asset URLs....
+    """
+    starts_with_static_url = full_url.startswith(str(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    return starts_with_prefix or (starts_with_static_url and contains_prefix)
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -70,7 +104,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):  # lint-amnes
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compile_url_replace_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -90,7 +124,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compile_url_replace_regex('/course/').sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -108,26 +142,13 @@ def process_static_urls(text, replacement_function, data_dir=None):
         quote = match.group('quote')
         rest = match.group('rest')
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
-
-        starts_with_static_url = full_url.startswith(str(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        # Don't rewrite XBlock resource links.
+        if _is_xblock_resource_url(prefix + rest):
             return original
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex('(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compile_url_replace_regex(_static_url_prefix_regex(data_dir)).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -172,7 +193,65 @@ def replace_static_urls(
     xblock: xblock where the static assets are stored
     lookup_url_func: Lookup function which returns the correct path of the asset
     """
+    replace_static_url = _static_url_replacer(
+        data_directory, course_id, static_asset_path, static_paths_out, xblock, lookup_asset_url
+    )
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+
+
+def replace_urls(
+    text,
+    course_id,
+    jump_to_id_base_url=None,
+    data_directory=None,
+    static_asset_path='',
+    static_paths_out=None
+):
+    """
+    Replace /static/, /course/ and, if jump_to_id_base_url is given, /jump_to_id/ urls in a single pass.
+
+    This gives the same result as running replace_static_urls, replace_course_urls and
+    replace_jump_to_id_urls one after the other, but scans the text only once.
+
+    text: The source text to do the substitution in
+    course_id: The course identifier
+    jump_to_id_base_url: (optional) Absolute path to the base of the handler that will perform the jump_to_id redirect
+    data_directory, static_asset_path, static_paths_out: as for replace_static_urls
+    """
+    data_dir = static_asset_path or data_directory
+    replace_static_url = _static_url_replacer(
+        data_directory, course_id, static_asset_path, static_paths_out, None, None
+    )
+    course_url_prefix = '/courses/{}/'.format(course_id)
+
+    prefixes = [f'(?P<static>{_static_url_prefix_regex(data_dir)})', '(?P<course>/course/)']
+    if jump_to_id_base_url:
+        prefixes.append('(?P<jump_to_id>/jump_to_id/)')
+
+    def replace_url(match):
+        """
+        Replace a single matched url of any of the three kinds.
+        """
+        original = match.group(0)
+        quote = match.group('quote')
+        rest = match.group('rest')
+        if match.group('static'):
+            prefix = match.group('prefix')
+            # Don't rewrite XBlock resource links.
+            if _is_xblock_resource_url(prefix + rest):
+                return original
+            return replace_static_url(original, prefix, quote, rest)
+        if match.group('course'):
+            return "".join([quote, course_url_prefix, rest, quote])
+        return "".join([quote, jump_to_id_base_url + rest, quote])
+
+    return _compile_url_replace_regex('|'.join(prefixes)).sub(replace_url, text)
+
 
+def _static_url_replacer(data_directory, course_id, static_asset_path, static_paths_out, xblock, lookup_asset_url):
+    """
+    Returns the replacement function used by replace_static_urls, for process_static_urls.
+    """
     if static_paths_out is None:
         static_paths_out = []
 
@@ -197,29 +276,7 @@ def replace_static_urls(
 
         # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
         elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
-
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:  # lint-amnesty, pylint: disable=broad-except
-                log.warning("staticfiles_storage couldn't find path {}: {}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
-
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
+            url = _course_asset_url(course_id, rest)
 
         # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
         else:
@@ -239,4 +296,52 @@ def replace_static_urls(
         static_paths_out.append((original_uri, url))
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return replace_static_url
+
+
+def _course_asset_url(course_id, path):
+    """
+    Returns the url of a /static/ path, for a course whose assets are in the contentstore.
+
+    The urls are memoized per course for the rest of the request, and are built from the
+    digests of all of the course's assets, which are looked up all at once (unless the course
+    has too many assets, see get_asset_digests).
+    """
+    # Import is placed here to avoid model import at project startup.
+    from common.djangoapps.static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+    base_url = AssetBaseUrlConfig.get_base_url()
+    excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+
+    # The memoized urls are dropped along with the asset digests they were built from.
+    asset_digests = get_asset_digests(course_id)
+    request_cache = get_cache('static_replace.course_asset_urls')
+    if str(course_id) not in request_cache or request_cache[str(course_id)][0] is not asset_digests:
+        request_cache[str(course_id)] = (asset_digests, {})
+    course_urls = request_cache[str(course_id)][1]
+    cache_key = (path, base_url, tuple(excluded_exts))
+    if cache_key in course_urls:
+        return course_urls[cache_key]
+
+    # first look in the static file pipeline and see if we are trying to reference
+    # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+    exists_in_staticfiles_storage = False
+    try:
+        exists_in_staticfiles_storage = staticfiles_storage.exists(path)
+    except Exception as err:  # lint-amnesty, pylint: disable=broad-except
+        log.warning("staticfiles_storage couldn't find path {}: {}".format(
+            path, str(err)))
+
+    if exists_in_staticfiles_storage:
+        url = staticfiles_storage.url(path)
+    else:
+        # if not, then assume it's courseware specific content and then look in the
+        # Mongo-backed database
+        url = StaticContent.get_canonicalized_asset_path(
+            course_id, path, base_url, excluded_exts, asset_digests=asset_digests
+        )
+
+        if AssetLocator.CANONICAL_NAMESPACE in url:
+            url = url.replace('block@', 'block/', 1)
+
+    course_urls[cache_key] = url
+    return url
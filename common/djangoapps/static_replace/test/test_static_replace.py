@@ -3,7 +3,7 @@ from functools import partial
 
 import re
 from io import BytesIO
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 from urllib.parse import parse_qsl, quote, urlparse, urlunparse, urlencode
 
 import ddt
@@ -20,6 +20,7 @@ from common.djangoapps.static_replace import (
     replace_course_urls,
     replace_static_urls,
     replace_jump_to_id_urls,
+    replace_urls,
 )
 from common.djangoapps.static_replace.services import ReplaceURLService
 from common.djangoapps.static_replace.wrapper import replace_urls_wrapper
@@ -131,7 +132,9 @@ def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_m
     assert '"' + mock_static_content.get_canonicalized_asset_path.return_value + '"' == \
         replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY, course_id=COURSE_KEY)
 
-    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(COURSE_KEY, 'file.png', '', ['foobar'])
+    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(
+        COURSE_KEY, 'file.png', '', ['foobar'], asset_digests=ANY
+    )
 
 
 @patch('common.djangoapps.static_replace.settings', autospec=True)
@@ -223,6 +226,38 @@ def test_regex():
         assert not re.match(regex, s)
 
 
+@pytest.mark.django_db
+@patch('common.djangoapps.static_replace.staticfiles_storage', autospec=True)
+@patch('xmodule.modulestore.django.modulestore', autospec=True)
+def test_replace_urls(mock_modulestore, mock_storage):
+    """
+    Make sure that the single pass replacement gives the same result as the separate ones.
+    """
+    mock_storage.exists.return_value = False
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+
+    xblock_url = '/static/xblock/resources/babys_first.lil_xblock/public/images/pacifier.png'
+    # xss-lint: disable=python-wrap-html
+    pre_text = (
+        '<img src="/static/file.png"/><a href=\'/course/info\'>info</a><a href="/jump_to_id/abc">'
+        f'<img src="{xblock_url}"/><img src="/static/file.png?raw"/><a href="/static/other.pdf">'
+    )
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+        COURSE_KEY, '/base_url/'
+    )
+    static_paths = []
+    assert replace_urls(pre_text, COURSE_KEY, '/base_url/', DATA_DIRECTORY, static_paths_out=static_paths) == expected
+    assert 'href="/base_url/abc"' in expected
+    assert f'href=\'/courses/{COURSE_KEY}/info\'' in expected
+    assert [original for original, __ in static_paths] == [
+        '/static/file.png', '/static/file.png?raw', '/static/other.pdf'
+    ]
+
+    # Without a base url, /jump_to_id/ urls are left alone.
+    assert 'href="/jump_to_id/abc"' in replace_urls(pre_text, COURSE_KEY, None, DATA_DIRECTORY)
+
+
 @patch('common.djangoapps.static_replace.staticfiles_storage', autospec=True)
 @patch('xmodule.modulestore.django.modulestore', autospec=True)
 def test_static_url_with_xblock_resource(mock_modulestore, mock_storage):
@@ -592,6 +627,35 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
             asset_path = StaticContent.get_canonicalized_asset_path(self.courses[prefix].id, start, base_url, exts)
             assert re.match(expected, asset_path) is not None
 
+    @ddt.data(
+        '/static/split_ünlöck.png',
+        '/static/split_lock.png',
+        '/static/special/weird split_ünlöck.png',
+        '/static/split_excluded.html',
+        '/static/split_not_excluded.htm?foo=/static/split_lock.png',
+        '/static/missing.png',
+        '/asset-v1:a+b+split+type@asset+block@split_ünlöck.png',
+        '/asset-v1:a+b+split+type@thumbnail+block@split_ünlöck-png-16x16.jpg',
+    )
+    def test_canonical_asset_path_with_asset_digests(self, path):
+        course_key = self.courses['split'].id
+        exts = ['.html', '.tm']
+        asset_digests = contentstore().get_asset_digests_for_course(course_key)
+        expected = StaticContent.get_canonicalized_asset_path(course_key, path, 'dev', exts)
+
+        # Thumbnails aren't in the asset digests, so they are still looked up.
+        with check_mongo_calls(1 if 'thumbnail' in path else 0):
+            asset_path = StaticContent.get_canonicalized_asset_path(
+                course_key, path, 'dev', exts, asset_digests=asset_digests
+            )
+        assert asset_path == expected
+
+    def test_asset_digests_of_course_with_too_many_assets(self):
+        course_key = self.courses['split'].id
+        asset_count = len(contentstore().get_asset_digests_for_course(course_key))
+        assert contentstore().get_asset_digests_for_course(course_key, max_assets=asset_count) is not None
+        assert contentstore().get_asset_digests_for_course(course_key, max_assets=asset_count - 1) is None
+
 
 class ReplaceURLServiceTest(SharedModuleStoreTestCase):
     """
@@ -607,11 +671,8 @@ class ReplaceURLServiceTest(SharedModuleStoreTestCase):
         self.mock_replace_static_urls = self.create_patch(
             'common.djangoapps.static_replace.services.replace_static_urls'
         )
-        self.mock_replace_course_urls = self.create_patch(
-            'common.djangoapps.static_replace.services.replace_course_urls'
-        )
-        self.mock_replace_jump_to_id_urls = self.create_patch(
-            'common.djangoapps.static_replace.services.replace_jump_to_id_urls'
+        self.mock_replace_urls = self.create_patch(
+            'common.djangoapps.static_replace.services.replace_urls'
         )
 
     def create_patch(self, name):
@@ -627,40 +688,34 @@ class ReplaceURLServiceTest(SharedModuleStoreTestCase):
         replace_url_service = ReplaceURLService(xblock=self.course)
         replace_url_service.replace_urls("text", static_replace_only=True)
         assert self.mock_replace_static_urls.called
-        assert not self.mock_replace_course_urls.called
-        assert not self.mock_replace_jump_to_id_urls.called
+        assert not self.mock_replace_urls.called
 
     def test_service_block_argument(self):
         """This service accepts either `block` or `xblock` keyword argument."""
         replace_url_service = ReplaceURLService(block=self.course)
         replace_url_service.replace_urls("text", static_replace_only=True)
         assert self.mock_replace_static_urls.called
-        assert not self.mock_replace_course_urls.called
-        assert not self.mock_replace_jump_to_id_urls.called
+        assert not self.mock_replace_urls.called
 
-    def test_replace_course_urls_called(self):
+    def test_replace_urls_called(self):
         """
-        Test replace_course_urls method called static_replace_only is passed as False.
+        Test all URLs are replaced in a single pass when static_replace_only is passed as False.
         """
         replace_url_service = ReplaceURLService(xblock=self.course)
         replace_url_service.replace_urls("text")
-        assert self.mock_replace_course_urls.called
+        assert not self.mock_replace_static_urls.called
+        self.mock_replace_urls.assert_called_once_with(
+            "text", self.course.id, jump_to_id_base_url=None, data_directory=ANY, static_asset_path=ANY,
+            static_paths_out=None,
+        )
 
     def test_replace_jump_to_id_urls_called(self):
         """
-        Test replace_jump_to_id_urls method called jump_to_id_base_url is provided.
+        Test jump_to_id_base_url is passed on when provided.
         """
         replace_url_service = ReplaceURLService(xblock=self.course, jump_to_id_base_url="/course/course_id")
         replace_url_service.replace_urls("text")
-        assert self.mock_replace_jump_to_id_urls.called
-
-    def test_replace_jump_to_id_urls_not_called(self):
-        """
-        Test replace_jump_to_id_urls method called jump_to_id_base_url is not provided.
-        """
-        replace_url_service = ReplaceURLService(xblock=self.course)
-        replace_url_service.replace_urls("text")
-        assert not self.mock_replace_jump_to_id_urls.called
+        assert self.mock_replace_urls.call_args.kwargs['jump_to_id_base_url'] == "/course/course_id"
 
 
 @ddt.ddt
@@ -181,6 +181,30 @@ def anonymous_id_for_user(user, course_id):
     return anonymous_user_id
 
 
+def prefetch_anonymous_ids_for_users(users, course_id):
+    """
+    Populates the per-user anonymous id cache used by `anonymous_id_for_user`
+    for the given users and course_id with a single query.
+
+    Users without a stored anonymous id are left untouched, so a later call
+    to `anonymous_id_for_user` still generates and saves one for them.
+    """
+    users_by_id = {user.id: user for user in users if not user.is_anonymous}
+    if not users_by_id:
+        return
+    # Ordered by id so that, as in anonymous_id_for_user, the most recently
+    # created row wins when there are several for a user/course pair.
+    anonymous_user_ids = AnonymousUserId.objects.filter(
+        user_id__in=list(users_by_id),
+        course_id=course_id,
+    ).order_by('id').values_list('user_id', 'anonymous_user_id')
+    for user_id, anonymous_user_id in anonymous_user_ids:
+        user = users_by_id[user_id]
+        if not hasattr(user, '_anonymous_id'):
+            user._anonymous_id = {}  # pylint: disable=protected-access
+        user._anonymous_id[course_id] = anonymous_user_id  # pylint: disable=protected-access
+
+
 def user_by_anonymous_id(uid):
     """
     Return user by anonymous_user_id using AnonymousUserId lookup table.
@@ -1453,6 +1477,19 @@ class EntranceExamConfiguration(models.Model):
                 can_skip = False
         return can_skip
 
+    @classmethod
+    def user_ids_that_can_skip_entrance_exam(cls, users, course_key):
+        """
+        Return the set of ids of the given users that can skip entrance exam for given course, with one query.
+        """
+        if not ENTRANCE_EXAMS.is_enabled():
+            return set()
+        return set(
+            cls.objects.filter(
+                user__in=users, course_id=course_key, skip_entrance_exam=True
+            ).values_list('user_id', flat=True)
+        )
+
 
 class LanguageField(models.CharField):
     """Represents a language from the ISO 639-1 language set."""
@@ -0,0 +1,293 @@
+"""
+Event tracker backend that hands events over to other backends in the background.
+
+Sending an event only puts a copy of it on a bounded, in-process queue.  A
+flusher thread takes the events off the queue and sends them, in batches, to
+each of the wrapped backends, so that the processors and transformers of those
+backends (see `track.shim` and `track.transformers`) run off the request thread.
+
+Queued events are sent when the process exits normally.  Celery worker processes
+don't (they end with `os._exit`), so the backends are also flushed once each task
+has run and closed when the worker process shuts down.  Processes forked from one
+that already sent events start with an empty queue, new locks, and no thread:
+the parent's queued events are left for the parent to send.
+
+It can wrap backends of both `track.tracker` and eventtracking, for instance::
+
+  EVENT_TRACKING_BACKENDS = {
+      'tracking_logs': {
+          'ENGINE': 'common.djangoapps.track.backends.asynchronous.AsyncBackend',
+          'OPTIONS': {
+              'backends': {
+                  'routing': {
+                      'ENGINE': 'eventtracking.backends.routing.RoutingBackend',
+                      'OPTIONS': {...},
+                  },
+              },
+              'flush_interval': 1,
+              'batch_size': 100,
+          }
+      }
+  }
+
+"""
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import threading
+import time
+import weakref
+
+from celery.signals import task_postrun, worker_process_shutdown
+from django.utils.module_loading import import_string
+from edx_django_utils.monitoring import accumulate
+
+from common.djangoapps.track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+# What to do with an event when the queue is full.
+DROP_NEWEST = 'drop_newest'
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+OVERFLOW_POLICIES = (DROP_NEWEST, DROP_OLDEST, BLOCK)
+
+# Put on the queue to wake the flusher thread up when the backend is closed.
+_STOP = object()
+
+# The AsyncBackends of this process.
+_backends = weakref.WeakSet()
+
+
+def _instantiate_backend(backend):
+    """
+    Return `backend`, instantiated first if it is a configuration dictionary (with ENGINE and OPTIONS).
+    """
+    if isinstance(backend, dict):
+        return import_string(backend['ENGINE'])(**backend.get('OPTIONS', {}))
+    return backend
+
+
+class AsyncBackend(BaseBackend):
+    """
+    Event tracker backend that queues events, and sends them to other backends from a background thread.
+
+    Backends with a `send_batch` method get each batch of events in one call,
+    the others get the events one at a time.  The counts of events queued,
+    dropped because the queue was full, flushed to the backends, and that
+    failed to be sent are kept in `stats`.
+    """
+
+    def __init__(
+        self,
+        backends=None,
+        max_queue_size=10000,
+        batch_size=100,
+        flush_interval=1.0,
+        overflow=DROP_NEWEST,
+        block_timeout=0.1,
+        **kwargs
+    ):
+        """
+        :Parameters:
+          - `backends`: the backends to send events to, by name, either
+            instantiated or as configuration dictionaries.
+          - `max_queue_size`: number of events that can wait to be sent.
+          - `batch_size`: maximum number of events sent to the backends at once.
+          - `flush_interval`: seconds that an event can wait for a batch to fill up.
+          - `overflow`: what to do with events when the queue is full: `drop_newest`
+            drops the new event, `drop_oldest` drops the oldest queued event instead,
+            and `block` waits up to `block_timeout` seconds for room, then drops the
+            new event.
+        """
+        super().__init__(**kwargs)
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f'Invalid overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}')
+
+        self.backends = {name: _instantiate_backend(backend) for name, backend in (backends or {}).items()}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.max_queue_size = max_queue_size
+        self._reset()
+        _backends.add(self)
+
+    def _reset(self):
+        """
+        Start with an empty queue, no flusher thread, no locks held, and no events counted.
+        """
+        self.stats = {'queued': 0, 'dropped': 0, 'flushed': 0, 'failed': 0}
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._stats_lock = threading.Lock()
+        # Serializes the sending of batches, between the flusher thread and `flush`.
+        self._send_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def _count(self, name, number=1):
+        with self._stats_lock:
+            self.stats[name] += number
+
+    def send(self, event):
+        """
+        Queue a copy of `event`: the caller may still change the original.
+        """
+        self._ensure_thread()
+        event = copy.deepcopy(event)
+        try:
+            if self.overflow == BLOCK:
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._put_nowait(event)
+        except queue.Full:
+            self._dropped()
+            return
+        self._count('queued')
+        accumulate('tracking.events_queued', 1)
+
+    def _put_nowait(self, event):
+        """
+        Queue `event` without waiting, applying the overflow policy if the queue is full.
+        """
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                if self.overflow != DROP_OLDEST:
+                    raise
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                continue
+            self._dropped()
+
+    def _dropped(self):
+        self._count('dropped')
+        accumulate('tracking.events_dropped', 1)
+
+    def _ensure_thread(self):
+        """
+        Start the flusher thread, unless it is already running.
+        """
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is not None:
+                return
+            thread = threading.Thread(target=self._run, name='track-async-backend', daemon=True)
+            thread.start()
+            self._thread = thread
+
+    def _run(self):
+        """
+        Send the queued events in batches, until the backend is closed.
+        """
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._send_batch(batch)
+
+    def _next_batch(self):
+        """
+        Wait for events, and return up to `batch_size` of them, within `flush_interval` of the first one.
+        """
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = self.flush_interval if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if event is _STOP:
+                break
+            batch.append(event)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _send_batch(self, batch):
+        """
+        Send `batch` to every backend.  Failures of one backend don't stop the others.
+        """
+        with self._send_lock:
+            for name, backend in self.backends.items():
+                try:
+                    send_batch = getattr(backend, 'send_batch', None)
+                    if send_batch:
+                        send_batch(batch)
+                    else:
+                        for event in batch:
+                            backend.send(event)
+                except Exception:  # pylint: disable=broad-except
+                    log.exception('Unable to send a batch of %d events to the %s tracking backend', len(batch), name)
+                    self._count('failed', len(batch))
+            self._count('flushed', len(batch))
+
+    def flush(self):
+        """
+        Send every queued event now, from the calling thread.
+        """
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is not _STOP:
+                    batch.append(event)
+            if not batch:
+                return
+            self._send_batch(batch)
+
+    def close(self):
+        """
+        Stop the flusher thread, and send the events that are still queued.
+        """
+        self._stopping.set()
+        if self._thread is not None:
+            try:
+                self._queue.put(_STOP, timeout=self.flush_interval)
+            except queue.Full:
+                pass
+            self._thread.join(self.flush_interval + 1)
+        self.flush()
+
+
+def _reset_backends_after_fork():
+    """
+    Reset the backends in a forked child, whose copy of the flusher thread is gone, and of its locks may be held.
+    """
+    for backend in list(_backends):
+        backend._reset()  # pylint: disable=protected-access
+
+
+@task_postrun.connect
+def _flush_backends(**kwargs):  # pylint: disable=unused-argument
+    """
+    Send the events queued by a Celery task once it has run.
+    """
+    for backend in list(_backends):
+        backend.flush()
+
+
+@worker_process_shutdown.connect
+def _close_backends(**kwargs):  # pylint: disable=unused-argument
+    """
+    Send the events still queued when the process exits, which Celery worker processes do without running `atexit`.
+    """
+    for backend in list(_backends):
+        backend.close()
+
+
+os.register_at_fork(after_in_child=_reset_backends_after_fork)
+atexit.register(_close_backends)
@@ -98,3 +98,12 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_batch(self, events):
+        """Insert the events in to the Mongo collection, at once"""
+        try:
+            self.collection.insert_many(events, ordered=False)
+        except (PyMongoError, BSONError):
+            # As for `send`, the events are lost.
+            msg = 'Error inserting a batch of events to MongoDB event tracker backend'
+            log.exception(msg)
@@ -0,0 +1,154 @@
+"""Tests for the asynchronous event tracker backend."""
+
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+from celery.signals import task_postrun, worker_process_shutdown
+
+from common.djangoapps.track.backends import BaseBackend
+from common.djangoapps.track.backends.asynchronous import AsyncBackend, _reset_backends_after_fork
+
+
+class RecordingBackend(BaseBackend):
+    """Backend that records the events and batches it gets."""
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.events = []
+        self.batches = []
+        self.received = threading.Event()
+
+    def send(self, event):
+        self.events.append(event)
+        self.received.set()
+
+    def send_batch(self, events):
+        self.batches.append(events)
+        super().send_batch(events)
+
+
+class FailingBackend(BaseBackend):
+    """Backend that can't send anything."""
+    def send(self, event):
+        raise ValueError('unavailable')
+
+
+class TestAsyncBackend(TestCase):
+    """Tests for AsyncBackend."""
+
+    def make_backend(self, **options):
+        """
+        Return an AsyncBackend around a RecordingBackend, and the RecordingBackend.
+        """
+        options.setdefault('backends', {
+            'recording': {'ENGINE': 'common.djangoapps.track.backends.tests.test_asynchronous.RecordingBackend'},
+        })
+        backend = AsyncBackend(**options)
+        self.addCleanup(backend.close)
+        return backend, backend.backends.get('recording')
+
+    def test_sends_in_background(self):
+        backend, recording = self.make_backend(flush_interval=0.05)
+        event = {'name': 'test', 'data': {'value': 1}}
+        backend.send(event)
+        event['data']['value'] = 2
+
+        assert recording.received.wait(5)
+        assert recording.events == [{'name': 'test', 'data': {'value': 1}}]
+        assert backend.stats['queued'] == 1
+        assert backend.stats['flushed'] == 1
+
+    def test_batches(self):
+        backend, recording = self.make_backend(batch_size=3)
+        with patch.object(backend, '_ensure_thread'):
+            for index in range(7):
+                backend.send({'index': index})
+            backend.flush()
+
+        assert [len(batch) for batch in recording.batches] == [3, 3, 1]
+        assert [event['index'] for event in recording.events] == list(range(7))
+
+    def test_drop_newest(self):
+        backend, recording = self.make_backend(max_queue_size=2)
+        with patch.object(backend, '_ensure_thread'):
+            for index in range(4):
+                backend.send({'index': index})
+            backend.flush()
+
+        assert [event['index'] for event in recording.events] == [0, 1]
+        assert backend.stats == {'queued': 2, 'dropped': 2, 'flushed': 2, 'failed': 0}
+
+    def test_drop_oldest(self):
+        backend, recording = self.make_backend(max_queue_size=2, overflow='drop_oldest')
+        with patch.object(backend, '_ensure_thread'):
+            for index in range(4):
+                backend.send({'index': index})
+            backend.flush()
+
+        assert [event['index'] for event in recording.events] == [2, 3]
+        assert backend.stats['dropped'] == 2
+
+    def test_block(self):
+        backend, recording = self.make_backend(max_queue_size=1, overflow='block', block_timeout=0.01)
+        with patch.object(backend, '_ensure_thread'):
+            backend.send({'index': 0})
+            backend.send({'index': 1})
+            backend.flush()
+
+        assert [event['index'] for event in recording.events] == [0]
+        assert backend.stats['dropped'] == 1
+
+    def test_failing_backend(self):
+        backend, recording = self.make_backend(backends={
+            'failing': FailingBackend(),
+            'recording': RecordingBackend(),
+        })
+        with patch.object(backend, '_ensure_thread'):
+            backend.send({'index': 0})
+            backend.flush()
+
+        assert len(backend.backends['recording'].events) == 1
+        assert backend.stats['failed'] == 1
+        assert recording is backend.backends['recording']
+
+    def test_close_flushes(self):
+        backend, recording = self.make_backend(flush_interval=10)
+        backend.send({'index': 0})
+        backend.close()
+
+        assert recording.events == [{'index': 0}]
+
+    def test_flushed_after_celery_task(self):
+        backend, recording = self.make_backend(flush_interval=10)
+        with patch.object(backend, '_ensure_thread'):
+            backend.send({'index': 0})
+            task_postrun.send(sender=None)
+
+        assert recording.events == [{'index': 0}]
+
+    def test_closed_on_worker_process_shutdown(self):
+        backend, recording = self.make_backend(flush_interval=10)
+        backend.send({'index': 0})
+        worker_process_shutdown.send(sender=None, pid=0, exitcode=0)
+
+        assert recording.events == [{'index': 0}]
+        assert not backend._thread.is_alive()  # pylint: disable=protected-access
+
+    def test_reset_after_fork(self):
+        backend, recording = self.make_backend()
+        with patch.object(backend, '_ensure_thread'):
+            backend.send({'index': 0})
+            # As if the flusher thread held the lock when the process was forked.
+            backend._send_lock.acquire()  # pylint: disable=protected-access
+            _reset_backends_after_fork()
+            assert backend.stats['queued'] == 0
+
+            backend.send({'index': 1})
+            backend.flush()
+        # The events queued before the fork are the parent's to send.
+        assert recording.events == [{'index': 1}]
+
+    def test_invalid_overflow(self):
+        with pytest.raises(ValueError):
+            AsyncBackend(overflow='wait')
@@ -1,5 +1,7 @@
 # lint-amnesty, pylint: disable=missing-module-docstring
 
+from unittest.mock import patch
+
 from django.conf import settings
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -99,6 +101,27 @@ class TestTrackerDjangoInstantiation(TestCase):
 
         assert len(backends) == 1
 
+    @override_settings(TRACKING_BACKENDS={
+        'async': {
+            'ENGINE': 'common.djangoapps.track.backends.asynchronous.AsyncBackend',
+            'OPTIONS': {
+                'backends': SIMPLE_SETTINGS.copy(),
+                'flush_interval': 60,
+            },
+        },
+    })
+    def test_django_async_settings(self):
+        """Test that events queued by an asynchronous backend are sent by flush."""
+        backend = self._reload_backends()['async']
+        self.addCleanup(backend.close)
+
+        with patch.object(backend, '_ensure_thread'):
+            tracker.send({})
+            assert backend.backends['default'].count == 0
+            tracker.flush()
+
+        assert backend.backends['default'].count == 1
+
     def _reload_backends(self):  # lint-amnesty, pylint: disable=missing-function-docstring
         # pylint: disable=protected-access
 
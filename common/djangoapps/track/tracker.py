@@ -17,6 +17,9 @@ below::
       }
   }
 
+Events can be sent from a background thread, in batches, by wrapping the
+backends in `common.djangoapps.track.backends.asynchronous.AsyncBackend`.
+
 """
 
 
@@ -29,7 +32,7 @@ from django.conf import settings
 
 from common.djangoapps.track.backends import BaseBackend
 
-__all__ = ['send']
+__all__ = ['send', 'flush']
 
 
 backends = {}
@@ -96,4 +99,15 @@ def send(event):
         backend.send(event)
 
 
+def flush():
+    """
+    Send the events that backends are holding on to, such as the queued events of
+    `track.backends.asynchronous.AsyncBackend`, before returning.
+
+    """
+    for backend in backends.values():
+        if hasattr(backend, 'flush'):
+            backend.flush()
+
+
 _initialize_backends_from_django_settings()
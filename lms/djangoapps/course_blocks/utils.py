@@ -6,6 +6,7 @@ Common utilities for use along with the course blocks.
 import json
 
 from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.courseware.user_state_client import flush_buffered_user_state_writes
 
 
 def get_student_module_as_dict(user, course_key, block_key):
@@ -23,6 +24,7 @@ def get_student_module_as_dict(user, course_key, block_key):
     if not user.is_authenticated:
         return {}
 
+    flush_buffered_user_state_writes(user.username)
     try:
         student_module = StudentModule.objects.get(
             student=user,
@@ -65,6 +65,7 @@ from lms.djangoapps.courseware.masquerade import (
 from lms.djangoapps.courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
 from lms.djangoapps.courseware.services import UserStateService
+from lms.djangoapps.courseware.user_state_client import buffer_user_state_writes
 from lms.djangoapps.grades.api import GradesUtilService
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.lms_xblock.runtime import UserTagsService, lms_wrappers_aside, lms_applicable_aside_types
@@ -722,6 +723,7 @@ def xqueue_callback(request, course_id, userid, mod_id, dispatch):
 @csrf_exempt
 @xframe_options_exempt
 @transaction.non_atomic_requests
+@buffer_user_state_writes
 def handle_xblock_callback_noauth(request, course_id, usage_id, handler, suffix=None):
     """
     Entry point for unauthenticated XBlock handlers.
@@ -737,6 +739,7 @@ def handle_xblock_callback_noauth(request, course_id, usage_id, handler, suffix=
 @csrf_exempt
 @xframe_options_exempt
 @transaction.non_atomic_requests
+@buffer_user_state_writes
 def handle_xblock_callback(request, course_id, usage_id, handler, suffix=None):
     """
     Generic view for extensions. This is where AJAX calls go.
@@ -22,6 +22,7 @@ from contextlib import contextmanager
 
 from django.conf import settings
 from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
+from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from xblock.field_data import FieldData
 
 from xmodule.modulestore.inheritance import InheritanceMixin
@@ -62,6 +63,17 @@ def _lineage(block):
         parent = parent.get_parent()
 
 
+def override_location(block):
+    """
+    Returns the usage key that overrides for `block` are stored against. Overrides
+    for an aside are stored against the block that it annotates.
+    """
+    usage_id = getattr(getattr(block, 'scope_ids', None), 'usage_id', None)
+    if isinstance(usage_id, (AsideUsageKeyV1, AsideUsageKeyV2)):
+        return usage_id.usage_key
+    return block.location
+
+
 class _OverridesDisabled(threading.local):
     """
     A thread local used to manage state of overrides being disabled or not.
@@ -106,6 +118,9 @@ class FieldOverrideProvider(metaclass=ABCMeta):
     the concrete override implementation being used.
     """
 
+    # Set to True by providers that implement `get_course_overrides`.
+    provides_course_overrides = False
+
     def __init__(self, user, fallback_field_data):
         self.user = user
         self.fallback_field_data = fallback_field_data
@@ -118,6 +133,22 @@ class FieldOverrideProvider(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    def get_course_overrides(self, course_key):
+        """
+        Bulk-load interface: return every override this provider has for
+        `course_key`, as a dict mapping the usage key returned by
+        `override_location` for each overridden block to a dict of field names
+        and their JSON values.
+
+        Providers whose overrides are stored data, rather than computed from the
+        block, should implement this and set `provides_course_overrides` so that
+        `OverrideFieldData` can resolve fields with dict lookups instead of
+        calling `get` for every field read. `OverrideFieldData` does not keep the
+        result, and calls this for every lookup, so the result should be cached
+        for the request and dropped when the underlying overrides change.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def enabled_for(self, course):  # pragma no cover
         """
@@ -200,6 +231,40 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):  # pylint: disable=super-init-not-called
         self.fallback = fallback
         self.providers = tuple(provider(user, fallback) for provider in providers)
+        # (provider index, location, field name) -> (override JSON value, deserialized value)
+        self._override_values = {}
+
+    def _get_course_overrides(self, provider, block):
+        """
+        Returns the bulk-loaded overrides of `provider` for the course of
+        `block`, or None if the provider only looks overrides up per block.
+
+        The overrides are not kept here: the provider caches them for the
+        request and drops them when they change.
+        """
+        if not provider.provides_course_overrides:
+            return None
+        return provider.get_course_overrides(block.scope_ids.usage_id.context_key)
+
+    def _lookup_override(self, index, course_overrides, block, name):
+        """
+        Returns the override for the field `name` of `block` from the
+        bulk-loaded `course_overrides`, or `NOTSET`.
+        """
+        location = override_location(block)
+        block_overrides = course_overrides.get(location)
+        if not block_overrides or name not in block_overrides:
+            return NOTSET
+
+        # The deserialized value is only reused while the provider returns the
+        # same JSON value, so a reloaded override is deserialized again.
+        json_value = block_overrides[name]
+        value_key = (index, location, name)
+        cached = self._override_values.get(value_key)
+        if cached is None or cached[0] is not json_value:
+            cached = (json_value, block.fields[name].from_json(json_value))
+            self._override_values[value_key] = cached
+        return cached[1]
 
     def get_override(self, block, name):
         """
@@ -207,8 +272,12 @@ class OverrideFieldData(FieldData):
         Returns the overridden value or `NOTSET` if no override is found.
         """
         if not overrides_disabled():
-            for provider in self.providers:
-                value = provider.get(block, name, NOTSET)
+            for index, provider in enumerate(self.providers):
+                course_overrides = self._get_course_overrides(provider, block)
+                if course_overrides is None:
+                    value = provider.get(block, name, NOTSET)
+                else:
+                    value = self._lookup_override(index, course_overrides, block, name)
                 if value is not NOTSET:
                     return value
         return NOTSET
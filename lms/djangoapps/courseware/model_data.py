@@ -25,9 +25,10 @@ DjangoOrmFieldCache: A base-class for single-row-per-field caches.
 import json
 import logging
 from abc import ABCMeta, abstractmethod
-from collections import defaultdict, namedtuple
+from collections import Counter, defaultdict, namedtuple
 
 from django.db import DatabaseError, IntegrityError, transaction
+from edx_django_utils import monitoring as monitoring_utils
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import LearningContextKey
@@ -156,19 +157,42 @@ class DjangoOrmFieldCache(metaclass=ABCMeta):
 
     def __init__(self):
         self._cache = {}
+        self._prefetched = set()
 
     def cache_fields(self, fields, xblocks, aside_types):
         """
         Load all fields specified by ``fields`` for the supplied ``xblocks``
         and ``aside_types`` into this cache.
 
+        If every requested field has already been loaded by an earlier call,
+        no query is made.
+
         Arguments:
             fields (list of str): Field names to cache.
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
+        requested = self._prefetch_keys(fields, xblocks, aside_types)
+        if requested <= self._prefetched:
+            return
+
         for field_object in self._read_objects(fields, xblocks, aside_types):
             self._cache[self._cache_key_for_field_object(field_object)] = field_object
+        self._prefetched.update(requested)
+
+    def is_prefetched(self, kvs_key):
+        """
+        Return whether the value for `kvs_key` is known without going back to
+        the database, either because it was prefetched or because it was written
+        through this cache.
+
+        Arguments:
+            kvs_key (`DjangoKeyValueStore.Key`): The key representing the cached field
+
+        Returns: bool
+        """
+        cache_key = self._cache_key_for_kvs_key(kvs_key)
+        return cache_key in self._prefetched or cache_key in self._cache
 
     def get(self, kvs_key):
         """
@@ -309,6 +333,20 @@ class DjangoOrmFieldCache(metaclass=ABCMeta):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def _prefetch_keys(self, fields, xblocks, aside_types):
+        """
+        Return the set of cache keys that :meth:`_read_objects` covers for the
+        same arguments, whether or not a stored object exists for each of them.
+
+        Arguments:
+            fields (list of str): Field names to return keys for
+            xblocks (list of :class:`~XBlock`): XBlocks to return keys for
+            aside_types (list of str): Asides to return keys for (which annotate the supplied
+                xblocks).
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def _cache_key_for_field_object(self, field_object):
         """
@@ -336,6 +374,8 @@ class UserStateCache:
     """
     def __init__(self, user, course_id):
         self._cache = defaultdict(dict)
+        self._prefetched = set()
+        self._last_modified = {}
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
@@ -345,17 +385,40 @@ class UserStateCache:
         Load all fields specified by ``fields`` for the supplied ``xblocks``
         and ``aside_types`` into this cache.
 
+        Only usages that have not already been loaded by an earlier call are
+        queried for.
+
         Arguments:
             fields (list of str): Field names to cache.
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
+        pending = _all_usage_keys(xblocks, aside_types) - self._prefetched
+        if not pending:
+            return
+
         block_field_state = self._client.get_many(
             self.user.username,
-            _all_usage_keys(xblocks, aside_types),
+            pending,
         )
         for user_state in block_field_state:
             self._cache[user_state.block_key] = user_state.state
+            self._last_modified[user_state.block_key] = user_state.updated
+        self._prefetched.update(pending)
+
+    def is_prefetched(self, kvs_key):
+        """
+        Return whether the value for `kvs_key` is known without going back to
+        the database, either because it was prefetched or because it was written
+        through this cache.
+
+        Arguments:
+            kvs_key (`DjangoKeyValueStore.Key`): The key representing the cached field
+
+        Returns: bool
+        """
+        cache_key = self._cache_key_for_kvs_key(kvs_key)
+        return cache_key in self._prefetched or cache_key in self._cache
 
     def set(self, kvs_key, value):
         """
@@ -376,6 +439,13 @@ class UserStateCache:
 
         Returns: datetime if there was a modified date, or None otherwise
         """
+        cache_key = self._cache_key_for_kvs_key(kvs_key)
+        if cache_key in self._last_modified:
+            return self._last_modified[cache_key]
+        if cache_key in self._prefetched and cache_key not in self._cache:
+            # The prefetch found no stored state for this usage.
+            return None
+
         try:
             return self._client.get(
                 self.user.username,
@@ -409,6 +479,8 @@ class UserStateCache:
             raise KeyValueMultiSaveError([])  # lint-amnesty, pylint: disable=raise-missing-from
         finally:
             self._cache.update(pending_updates)
+            for cache_key in pending_updates:
+                self._last_modified.pop(cache_key, None)
 
     def get(self, kvs_key):
         """
@@ -446,6 +518,7 @@ class UserStateCache:
 
         self._client.delete(self.user.username, cache_key, fields=[kvs_key.field_name])
         del field_state[kvs_key.field_name]
+        self._last_modified.pop(cache_key, None)
 
     def has(self, kvs_key):
         """
@@ -518,6 +591,23 @@ class UserStateSummaryCache(DjangoOrmFieldCache):
             field_name__in={field.name for field in fields},
         )
 
+    def _prefetch_keys(self, fields, xblocks, aside_types):
+        """
+        Return the set of cache keys that :meth:`_read_objects` covers for the
+        same arguments.
+
+        Arguments:
+            fields (list of :class:`~Field`): Fields to return keys for
+            xblocks (list of :class:`~XBlock`): XBlocks to return keys for
+            aside_types (list of str): Asides to return keys for (which annotate the supplied
+                xblocks).
+        """
+        return {
+            (usage_id, field.name)
+            for usage_id in _all_usage_keys(xblocks, aside_types)
+            for field in fields
+        }
+
     def _cache_key_for_field_object(self, field_object):
         """
         Return the key used in this DjangoOrmFieldCache to store the specified field_object.
@@ -581,6 +671,23 @@ class PreferencesCache(DjangoOrmFieldCache):
             field_name__in={field.name for field in fields},
         )
 
+    def _prefetch_keys(self, fields, xblocks, aside_types):
+        """
+        Return the set of cache keys that :meth:`_read_objects` covers for the
+        same arguments.
+
+        Arguments:
+            fields (list of str): Field names to return keys for
+            xblocks (list of :class:`~XBlock`): XBlocks to return keys for
+            aside_types (list of str): Asides to return keys for (which annotate the supplied
+                xblocks).
+        """
+        return {
+            (block_type, field.name)
+            for block_type in _all_block_types(xblocks, aside_types)
+            for field in fields
+        }
+
     def _cache_key_for_field_object(self, field_object):
         """
         Return the key used in this DjangoOrmFieldCache to store the specified field_object.
@@ -641,6 +748,19 @@ class UserInfoCache(DjangoOrmFieldCache):
             field_name__in={field.name for field in fields},
         )
 
+    def _prefetch_keys(self, fields, xblocks, aside_types):
+        """
+        Return the set of cache keys that :meth:`_read_objects` covers for the
+        same arguments.
+
+        Arguments:
+            fields (list of str): Field names to return keys for
+            xblocks (list of :class:`~XBlock`): XBlocks to return keys for
+            aside_types (list of str): Asides to return keys for (which annotate the supplied
+                xblocks).
+        """
+        return {field.name for field in fields}
+
     def _cache_key_for_field_object(self, field_object):
         """
         Return the key used in this DjangoOrmFieldCache to store the specified field_object.
@@ -705,6 +825,11 @@ class FieldDataCache:
             ),
         }
         self.scorable_locations = set()
+        # Number of reads, per scope name, for keys that were never prefetched.
+        # Such reads either fall back to the field default or, for
+        # ``last_modified``, go back to the database, so a non-zero count means
+        # the caller should widen what it prefetches.
+        self.prefetch_misses = Counter()
         self.add_blocks_to_cache(blocks)
 
     def add_blocks_to_cache(self, blocks):
@@ -713,11 +838,8 @@ class FieldDataCache:
         """
         if self.user.is_authenticated:
             self.scorable_locations.update(block.location for block in blocks if block.has_score)
-            for scope, fields in self._fields_to_cache(blocks).items():
-                if scope not in self.cache:
-                    continue
-
-                self.cache[scope].cache_fields(fields, blocks, self.asides)
+            for scope, (fields, scope_blocks) in self._plan_prefetch(blocks).items():
+                self.cache[scope].cache_fields(fields, scope_blocks, self.asides)
 
     def add_block_descendents(self, block, depth=None, block_filter=lambda block: True):
         """
@@ -776,15 +898,31 @@ class FieldDataCache:
         cache.add_block_descendents(block, depth, block_filter)
         return cache
 
-    def _fields_to_cache(self, blocks):
+    def _plan_prefetch(self, blocks):
         """
-        Returns a map of scopes to fields in that scope that should be cached
+        Returns a map of each cached scope to the fields in that scope that
+        should be cached and the blocks to cache them for.
+
+        A block is only planned for the scopes it declares fields in, so that
+        each scope is loaded with a single chunked query covering just the
+        blocks that can have data there. Aside data is keyed by the annotated
+        block, so every block is kept when asides are being loaded.
         """
-        scope_map = defaultdict(set)
+        scope_fields = defaultdict(set)
+        scope_blocks = defaultdict(list)
         for block in blocks:
+            block_scopes = set()
             for field in block.fields.values():
-                scope_map[field.scope].add(field)
-        return scope_map
+                if field.scope in self.cache:
+                    scope_fields[field.scope].add(field)
+                    block_scopes.add(field.scope)
+            for scope in block_scopes:
+                scope_blocks[scope].append(block)
+
+        return {
+            scope: (fields, blocks if self.asides else scope_blocks[scope])
+            for scope, fields in scope_fields.items()
+        }
 
     def get(self, key):
         """
@@ -805,6 +943,7 @@ class FieldDataCache:
         if key.scope not in self.cache:
             raise KeyError(key.field_name)
 
+        self._check_prefetched(key)
         return self.cache[key.scope].get(key)
 
     def set_many(self, kv_dict):
@@ -883,6 +1022,7 @@ class FieldDataCache:
         if key.scope not in self.cache:
             return False
 
+        self._check_prefetched(key)
         return self.cache[key.scope].has(key)
 
     def last_modified(self, key):
@@ -902,8 +1042,24 @@ class FieldDataCache:
         if key.scope not in self.cache:
             return None
 
+        self._check_prefetched(key)
         return self.cache[key.scope].last_modified(key)
 
+    def _check_prefetched(self, key):
+        """
+        Record a prefetch miss if the value for `key` was neither prefetched
+        nor written through this cache.
+
+        Misses are counted on :attr:`prefetch_misses` and reported as the
+        ``field_data_cache.prefetch_misses`` custom attributes.
+        """
+        if not self.user.is_authenticated or self.cache[key.scope].is_prefetched(key):
+            return
+
+        self.prefetch_misses[key.scope.name] += 1
+        monitoring_utils.accumulate('field_data_cache.prefetch_misses', 1)
+        monitoring_utils.accumulate(f'field_data_cache.prefetch_misses.{key.scope.name}', 1)
+
     def __len__(self):
         return sum(len(cache) for cache in self.cache.values())
 
@@ -966,6 +1122,33 @@ class ScoresClient:
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create pre-fetched ScoresClients for each of the given users, with
+        a single query for all of them.
+
+        Returns a dict of {user_id: ScoresClient}.
+        """
+        clients = {}
+        for user_id in user_ids:
+            client = cls(course_id, user_id)
+            client._has_fetched = True  # pylint: disable=protected-access
+            clients[user_id] = client
+
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+            'student_id', 'module_state_key', 'grade', 'max_grade', 'created',
+        ):
+            clients[user_id]._locations_to_scores[  # pylint: disable=protected-access
+                location.map_into_course(course_id)
+            ] = cls.Score(correct, total, created)
+        return clients
+
 
 def set_score(user_id, usage_key, score, max_score):
     """
@@ -275,6 +275,40 @@ class BaseStudentModuleHistory(models.Model):
             request_cache.setdefault(request_cache_key, {})
             request_cache.data[request_cache_key][student_module.id] = history_entry.id
 
+    @staticmethod
+    def bulk_save_history_entries(student_modules, history_model_cls, request_cache_key):
+        """
+        Save the history entries for StudentModule instances that were updated without sending
+        post_save (e.g. by ``bulk_update``), inserting the new entries with a single ``bulk_create``.
+
+        StudentModules that already have a history entry from this request cycle have that entry
+        updated in place, exactly as :meth:`save_history_entry` would.
+        """
+        request_cache = RequestCache('studentmodulehistory')
+        request_smh_cache = request_cache.get_cached_response(request_cache_key).get_value_or_default({})
+
+        new_entries = []
+        for student_module in student_modules:
+            if student_module.module_type not in history_model_cls.HISTORY_SAVING_TYPES:
+                continue
+
+            if student_module.id in request_smh_cache:
+                BaseStudentModuleHistory.save_history_entry(student_module, history_model_cls, request_cache_key)
+            else:
+                new_entries.append(history_model_cls(
+                    student_module=student_module,
+                    version=None,
+                    created=student_module.modified,
+                    state=student_module.state,
+                    grade=student_module.grade,
+                    max_grade=student_module.max_grade,
+                ))
+
+        # Not every database backend returns primary keys from bulk_create, so these entries
+        # are not added to the request cache map. A later save of the same StudentModule in
+        # this request cycle will create a second history entry rather than update this one.
+        history_model_cls.objects.bulk_create(new_entries)
+
 
 class StudentModuleHistory(BaseStudentModuleHistory):
     """Keeps a complete history of state changes for a given XModule for a given
@@ -302,6 +336,20 @@ class StudentModuleHistory(BaseStudentModuleHistory):
             "lms.djangoapps.courseware.models.student_module_history_map"
         )
 
+    @staticmethod
+    def bulk_save_history(student_modules):
+        """
+        Save StudentModuleHistory entries for StudentModules updated without post_save.
+        """
+        if settings.FEATURES.get('ENABLE_CSMH_EXTENDED'):
+            return
+
+        BaseStudentModuleHistory.bulk_save_history_entries(
+            student_modules,
+            StudentModuleHistory,
+            "lms.djangoapps.courseware.models.student_module_history_map"
+        )
+
     # When the extended studentmodulehistory table exists, don't save
     # duplicate history into courseware_studentmodulehistory, just retain
     # data for reading.
@@ -8,6 +8,7 @@ import json
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 
 from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.courseware.user_state_client import flush_buffered_user_state_writes
 from common.djangoapps.student.models import get_user_by_username_or_email
 
 
@@ -31,6 +32,7 @@ class UserStateService:
             user = get_user_by_username_or_email(username_or_email=username_or_email)
         except User.DoesNotExist:
             return {}
+        flush_buffered_user_state_writes(user.username)
         try:
             student_module = StudentModule.objects.get(
                 student=user,
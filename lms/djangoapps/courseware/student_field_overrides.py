@@ -6,10 +6,15 @@ by the individual due dates feature.
 
 import json
 
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
 from lms.djangoapps.courseware.models import StudentFieldOverride
-from openedx.core.lib.xblock_utils import is_xblock_aside
+from openedx.core.lib.cache_utils import get_cache
+
+from .field_overrides import FieldOverrideProvider, override_location
 
-from .field_overrides import FieldOverrideProvider
+OVERRIDES_CACHE_NAMESPACE = 'lms.djangoapps.courseware.student_field_overrides'
 
 
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
@@ -18,9 +23,14 @@ class IndividualStudentOverrideProvider(FieldOverrideProvider):
     :class:`~courseware.field_overrides.FieldOverrideProvider` which allows for
     overrides to be made on a per user basis.
     """
+    provides_course_overrides = True
+
     def get(self, block, name, default):
         return get_override_for_user(self.user, block, name, default)
 
+    def get_course_overrides(self, course_key):
+        return get_course_overrides_for_user(self.user, course_key)
+
     @classmethod
     def enabled_for(cls, course):  # pylint: disable=arguments-differ
         """This simple override provider is always enabled"""
@@ -33,40 +43,42 @@ def get_override_for_user(user, block, name, default=None):
     specify the block and the name of the field.  If the field is not
     overridden for the given user, returns `default`.
     """
-    if not hasattr(block, '_student_overrides'):
-        block._student_overrides = {}  # pylint: disable=protected-access
-    overrides = block._student_overrides.get(user.id)  # pylint: disable=protected-access
-    if overrides is None:
-        overrides = _get_overrides_for_user(user, block)
-        block._student_overrides[user.id] = overrides  # pylint: disable=protected-access
-    return overrides.get(name, default)
+    course_overrides = get_course_overrides_for_user(user, block.scope_ids.usage_id.context_key)
+    block_overrides = course_overrides.get(override_location(block), {})
+    if name not in block_overrides:
+        return default
+    return block.fields[name].from_json(block_overrides[name])
 
 
-def _get_overrides_for_user(user, block):
+def get_course_overrides_for_user(user, course_key):
     """
-    Gets all of the individual student overrides for given user and block.
-    Returns a dictionary of field override values keyed by field name.
+    Gets all of the individual student overrides for the given user in the
+    given course with a single query, cached for the rest of the request.
+    Returns a dictionary mapping block locations to dictionaries of field
+    override JSON values keyed by field name.
     """
-    if (
-        hasattr(block, "scope_ids") and
-        hasattr(block.scope_ids, "usage_id") and
-        is_xblock_aside(block.scope_ids.usage_id)
-    ):
-        location = block.scope_ids.usage_id.usage_key
-    else:
-        location = block.location
-
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.scope_ids.usage_id.context_key,
-        location=location,
-        student_id=user.id,
-    )
-    overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
-    return overrides
+    overrides_cache = get_cache(OVERRIDES_CACHE_NAMESPACE)
+    cache_key = (user.id, course_key)
+    if cache_key not in overrides_cache:
+        overrides = {}
+        query = StudentFieldOverride.objects.filter(
+            course_id=course_key,
+            student_id=user.id,
+        )
+        for override in query:
+            location = override.location.map_into_course(override.course_id)
+            overrides.setdefault(location, {})[override.field] = json.loads(override.value)
+        overrides_cache[cache_key] = overrides
+    return overrides_cache[cache_key]
+
+
+@receiver(post_save, sender=StudentFieldOverride)
+@receiver(post_delete, sender=StudentFieldOverride)
+def _clear_cached_course_overrides(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Drops the cached overrides of the student whose override changed.
+    """
+    get_cache(OVERRIDES_CACHE_NAMESPACE).pop((instance.student_id, instance.course_id), None)
 
 
 def override_field_for_user(user, block, name, value):
@@ -6,16 +6,23 @@ import pytest
 from django.test.utils import override_settings
 from xblock.field_data import DictFieldData
 
+from common.djangoapps.student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from ..field_overrides import (
+    NOTSET,
     FieldOverrideProvider,
     OverrideFieldData,
     OverrideModulestoreFieldData,
     disable_overrides,
     resolve_dotted
 )
+from ..student_field_overrides import (
+    IndividualStudentOverrideProvider,
+    clear_override_for_user,
+    override_field_for_user
+)
 from ..testutils import FieldOverrideTestMixin
 
 TESTUSER = "testuser"
@@ -43,6 +50,26 @@ class TestOverrideProvider(FieldOverrideProvider):
         return True
 
 
+class TestCourseOverridesProvider(FieldOverrideProvider):
+    """
+    A `FieldOverrideProvider` for testing which bulk-loads its overrides.
+    """
+    provides_course_overrides = True
+    overrides = {}
+    loaded_courses = []
+
+    def get(self, block, name, default):
+        raise AssertionError("get() should not be used when course overrides are provided")
+
+    def get_course_overrides(self, course_key):
+        self.loaded_courses.append(course_key)
+        return self.overrides
+
+    @classmethod
+    def enabled_for(cls, course):  # pylint: disable=arguments-differ
+        return True
+
+
 class OverrideFieldBase(SharedModuleStoreTestCase):
     """
     Base class for field data override tests.  Using override_settings and
@@ -129,6 +156,43 @@ class OverrideFieldDataTests(OverrideFieldBase):
         assert isinstance(data, DictFieldData)
 
 
+class CourseOverridesTests(OverrideFieldBase):
+    """
+    Tests for `OverrideFieldData` with providers that bulk-load their overrides.
+    """
+
+    def setUp(self):
+        super().setUp()
+        TestCourseOverridesProvider.overrides = {self.course.location: {'display_name': 'Overridden'}}
+        TestCourseOverridesProvider.loaded_courses = []
+
+    def test_get_from_course_overrides(self):
+        data = OverrideFieldData(TESTUSER, DictFieldData({'display_name': 'Original'}), [TestCourseOverridesProvider])
+        assert data.get(self.course, 'display_name') == 'Overridden'
+        assert data.get(self.course, 'display_name') == 'Overridden'
+        assert data.get_override(self.course, 'start') is NOTSET
+        assert set(TestCourseOverridesProvider.loaded_courses) == {self.course.id}
+        with disable_overrides():
+            assert data.get(self.course, 'display_name') == 'Original'
+
+    def test_changed_course_overrides(self):
+        data = OverrideFieldData(TESTUSER, DictFieldData({'display_name': 'Original'}), [TestCourseOverridesProvider])
+        assert data.get(self.course, 'display_name') == 'Overridden'
+        TestCourseOverridesProvider.overrides = {self.course.location: {'display_name': 'Changed'}}
+        assert data.get(self.course, 'display_name') == 'Changed'
+        TestCourseOverridesProvider.overrides = {}
+        assert data.get(self.course, 'display_name') == 'Original'
+
+    def test_changed_student_overrides(self):
+        user = UserFactory.create()
+        data = OverrideFieldData(user, DictFieldData({'display_name': 'Original'}), [IndividualStudentOverrideProvider])
+        assert data.get(self.course, 'display_name') == 'Original'
+        override_field_for_user(user, self.course, 'display_name', 'Overridden')
+        assert data.get(self.course, 'display_name') == 'Overridden'
+        clear_override_for_user(user, self.course, 'display_name')
+        assert data.get(self.course, 'display_name') == 'Original'
+
+
 @override_settings(
     MODULESTORE_FIELD_OVERRIDE_PROVIDERS=['lms.djangoapps.courseware.tests.test_field_overrides.TestOverrideProvider']
 )
@@ -200,6 +200,26 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         with self.assertNumQueries(0):
             assert not self.kvs.has(user_state_key('not_a_field'))
 
+    def test_last_modified_is_prefetched(self):
+        "Test that `last_modified` for a prefetched StudentModule doesn't query the database"
+        student_module = StudentModule.objects.get()
+        with self.assertNumQueries(0):
+            assert self.field_data_cache.last_modified(user_state_key('a_field')) == student_module.modified
+
+    def test_add_prefetched_block_again(self):
+        "Test that adding an already prefetched block to the cache doesn't query the database"
+        with self.assertNumQueries(0):
+            self.field_data_cache.add_blocks_to_cache([mock_block([mock_field(Scope.user_state, 'a_field')])])
+        assert not self.field_data_cache.prefetch_misses
+
+    def test_prefetch_miss(self):
+        "Test that reading state for a block that was never prefetched is counted as a miss"
+        missed_key = DjangoKeyValueStore.Key(Scope.user_state, 1, LOCATION('other_usage_id'), 'a_field')
+        with self.assertNumQueries(0):
+            assert not self.kvs.has(missed_key)
+            self.assertRaises(KeyError, self.kvs.get, missed_key)
+        assert self.field_data_cache.prefetch_misses == {'user_state': 2}
+
     def construct_kv_dict(self):
         """Construct a kv_dict that can be passed to set_many"""
         key1 = user_state_key('field_a')
@@ -3,6 +3,8 @@ Black-box tests of the DjangoUserStateClient against the semantics
 defined in edx_user_state_client.
 """
 
+import json
+
 import pytz
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from xblock.fields import Scope
@@ -10,12 +12,20 @@ from datetime import datetime
 from unittest import TestCase
 from collections import defaultdict
 from django.db import connections
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.test.client import RequestFactory
+from edx_toggles.toggles.testutils import override_waffle_switch
 
 from common.djangoapps.student.tests.factories import UserFactory
+from lms.djangoapps.courseware.models import StudentModule
+from lms.djangoapps.courseware.toggles import BUFFER_USER_STATE_WRITES
 from lms.djangoapps.courseware.user_state_client import (
     DjangoXBlockUserStateClient,
     XBlockUserStateClient,
-    XBlockUserState
+    XBlockUserState,
+    buffer_user_state_writes,
+    start_buffering_user_state_writes,
+    stop_buffering_user_state_writes
 )
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
 
@@ -757,3 +767,96 @@ class TestDjangoUserStateClient(UserStateClientTestBase, ModuleStoreTestCase):
             2. Update the test in the other repo to align with the new functionality
             3. Remove this override to re-enable the working test
         """
+
+
+class TestBufferedDjangoUserStateClient(TestDjangoUserStateClient):
+    """
+    Tests of the DjangoUserStateClient backend while writes are buffered for the request.
+    It reuses all tests from :class:`~UserStateClientTestBase`, which read their own writes.
+    """
+    __test__ = True
+
+    def setUp(self):
+        super().setUp()
+        start_buffering_user_state_writes()
+        self.addCleanup(stop_buffering_user_state_writes)
+
+    def test_writes_are_coalesced(self):
+        self.set(user=0, block=0, state={'a': 0})
+        self.set(user=0, block=0, state={'b': 1})
+        self.set_many(user=0, block_to_state={0: {'a': 2}, 1: {'c': 3}})
+        assert not StudentModule.objects.exists()
+
+        stop_buffering_user_state_writes()
+
+        assert StudentModule.objects.count() == 2
+        assert self.get(user=0, block=0).state == {'a': 2, 'b': 1}
+        assert [entry.state for entry in self.get_history(user=0, block=0)] == [{'a': 2, 'b': 1}]
+
+    def test_buffered_update_of_existing_state(self):
+        stop_buffering_user_state_writes()
+        self.set(user=0, block=0, state={'a': 0, 'b': 0})
+
+        start_buffering_user_state_writes()
+        self.set(user=0, block=0, state={'a': 1})
+        self.set(user=0, block=0, state={'a': 2})
+        assert self.get(user=0, block=0).state == {'a': 2, 'b': 0}
+
+        stop_buffering_user_state_writes()
+
+        assert json.loads(StudentModule.objects.get().state) == {'a': 2, 'b': 0}
+
+
+@override_waffle_switch(BUFFER_USER_STATE_WRITES, active=True)
+class TestBufferUserStateWritesDecorator(_UserStateClientTestUtils, ModuleStoreTestCase):
+    """
+    Tests of the buffer_user_state_writes view decorator.
+    """
+    __test__ = True
+
+    def _user(self, user_idx):  # lint-amnesty, pylint: disable=arguments-differ
+        return self.users[user_idx].username
+
+    def setUp(self):
+        super().setUp()
+        self.client = DjangoXBlockUserStateClient()
+        self.users = defaultdict(UserFactory.create)
+
+    def _call_view(self, response=None, exception=None):
+        """
+        Call a view, decorated with buffer_user_state_writes, that writes the state of a
+        block twice and then returns `response` or raises `exception`.
+        """
+        @buffer_user_state_writes
+        def view(_request):
+            self.set(user=0, block=0, state={'a': 1})
+            self.set(user=0, block=0, state={'b': 2})
+            StudentModule.objects.get_or_create(
+                student=self.users[1], course_id=self._block(1).course_key, module_state_key=self._block(1),
+            )
+            assert not StudentModule.objects.filter(student=self.users[0]).exists()
+            if exception:
+                raise exception
+            return response
+
+        return view(RequestFactory().get('/'))
+
+    def test_writes_flushed_on_success(self):
+        assert self._call_view(response=HttpResponse()).status_code == 200
+        assert json.loads(StudentModule.objects.get(student=self.users[0]).state) == {'a': 1, 'b': 2}
+
+    def test_writes_discarded_on_error_response(self):
+        assert self._call_view(response=HttpResponseBadRequest()).status_code == 400
+        assert not StudentModule.objects.filter(student=self.users[0]).exists()
+        # The error response does not roll back the view's other writes.
+        assert StudentModule.objects.filter(student=self.users[1]).exists()
+        # Later writes are not buffered.
+        self.set(user=0, block=0, state={'a': 1})
+        assert StudentModule.objects.filter(student=self.users[0]).exists()
+
+    def test_view_rolled_back_on_exception(self):
+        with self.assertRaises(ValueError):
+            self._call_view(exception=ValueError())
+        assert not StudentModule.objects.exists()
+        self.set(user=0, block=0, state={'a': 1})
+        assert StudentModule.objects.filter(student=self.users[0]).exists()
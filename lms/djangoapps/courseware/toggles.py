@@ -126,6 +126,22 @@ ENABLE_OPTIMIZELY_IN_COURSEWARE = WaffleSwitch(  # lint-amnesty, pylint: disable
     'RET.enable_optimizely_in_courseware', __name__
 )
 
+# .. toggle_name: courseware.buffer_user_state_writes
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, Scope.user_state writes made by the XBlock handler and render_xblock
+#   views are held in a request-scoped buffer, coalesced per block, and written to StudentModule (and its
+#   history table) in bulk when the view returns successfully. Reads through the user state client see the
+#   buffered writes. See lms.djangoapps.courseware.user_state_client.buffer_user_state_writes.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_warning: While enabled, these views run in a single transaction, and buffered writes are dropped
+#   when the view raises or returns an error response. Code that reads StudentModule.state directly from the
+#   database, rather than through the user state client, must call flush_buffered_user_state_writes() first.
+BUFFER_USER_STATE_WRITES = WaffleSwitch(
+    f'{WAFFLE_FLAG_NAMESPACE}.buffer_user_state_writes', __name__
+)
+
 
 def courseware_mfe_is_active() -> bool:
     """
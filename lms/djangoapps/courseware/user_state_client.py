@@ -10,17 +10,22 @@ from operator import attrgetter
 from time import time
 
 from abc import abstractmethod
-from collections import namedtuple
+from collections import defaultdict, namedtuple
+from functools import wraps
 
+from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
 from django.core.paginator import Paginator
 from django.db import transaction
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from edx_django_utils import monitoring as monitoring_utils
+from edx_django_utils.cache import RequestCache
 from xblock.fields import Scope
 
-from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule
+from lms.djangoapps.courseware.models import BaseStudentModuleHistory, StudentModule, StudentModuleHistory
+from lms.djangoapps.courseware.toggles import BUFFER_USER_STATE_WRITES
 
 try:
     import simplejson as json
@@ -30,6 +35,143 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+WRITE_BUFFER_NAMESPACE = 'lms.djangoapps.courseware.user_state_client.write_buffer'
+WRITE_BUFFER_KEY = 'write_buffer'
+
+
+class _UserStateWriteBuffer:
+    """
+    Scope.user_state writes held back until the end of a request.
+
+    Successive writes to the same block by the same user are coalesced into a
+    single state overlay, in the same way that :meth:`DjangoXBlockUserStateClient.set_many`
+    overlays state over what is already stored.
+    """
+
+    def __init__(self):
+        self.users = {}
+        # username -> {usage_key: (state overlay, time of the last write)}
+        self.pending = defaultdict(dict)
+
+    def add(self, user, block_keys_to_state):
+        """
+        Buffer `block_keys_to_state` for `user`.
+        """
+        self.users[user.username] = user
+        pending = self.pending[user.username]
+        now = timezone.now()
+        for usage_key, state in block_keys_to_state.items():
+            overlay, _ = pending.get(usage_key, ({}, None))
+            # Serialize now, as an unbuffered write would, so that later in-place changes
+            # to the caller's values are not picked up and unserializable state fails here.
+            overlay.update(json.loads(json.dumps(state)))
+            pending[usage_key] = (overlay, now)
+
+    def pop(self, username=None):
+        """
+        Remove and return the buffered writes, as a list of ``(user, {usage_key: state})``,
+        either for all users or just for `username`.
+        """
+        usernames = list(self.pending) if username is None else [username]
+        writes = []
+        for name in usernames:
+            pending = self.pending.pop(name, None)
+            if pending:
+                writes.append((
+                    self.users[name],
+                    {usage_key: overlay for usage_key, (overlay, _) in pending.items()},
+                ))
+        return writes
+
+
+def _get_write_buffer():
+    """
+    Return the write buffer for the current request, or None if writes are not being buffered.
+    """
+    cached_response = RequestCache(WRITE_BUFFER_NAMESPACE).get_cached_response(WRITE_BUFFER_KEY)
+    return cached_response.value if cached_response.is_found else None
+
+
+def start_buffering_user_state_writes():
+    """
+    Buffer Scope.user_state writes made through :class:`DjangoXBlockUserStateClient` for the
+    rest of the current request, until :func:`stop_buffering_user_state_writes` is called.
+    """
+    if _get_write_buffer() is None:
+        RequestCache(WRITE_BUFFER_NAMESPACE).set(WRITE_BUFFER_KEY, _UserStateWriteBuffer())
+
+
+def flush_buffered_user_state_writes(username=None):
+    """
+    Write out the Scope.user_state writes buffered so far in the current request, either for all
+    users or just for `username`. Writes made afterwards are still buffered.
+
+    Code that reads StudentModule.state straight from the database while writes may be buffered,
+    rather than through :class:`DjangoXBlockUserStateClient`, must call this first. This is done
+    by :meth:`~lms.djangoapps.courseware.services.UserStateService.get_state_as_dict` and
+    :func:`~lms.djangoapps.course_blocks.utils.get_student_module_as_dict`.
+    """
+    write_buffer = _get_write_buffer()
+    if write_buffer is None:
+        return
+
+    for user, block_keys_to_state in write_buffer.pop(username):
+        DjangoXBlockUserStateClient(user).write_buffered_state(user, block_keys_to_state)
+
+
+def discard_buffered_user_state_writes():
+    """
+    Drop any buffered Scope.user_state writes without writing them and stop buffering for the
+    current request.
+    """
+    RequestCache(WRITE_BUFFER_NAMESPACE).delete(WRITE_BUFFER_KEY)
+
+
+def stop_buffering_user_state_writes():
+    """
+    Write out all buffered Scope.user_state writes and stop buffering for the current request.
+    """
+    flush_buffered_user_state_writes()
+    discard_buffered_user_state_writes()
+
+
+def buffer_user_state_writes(view_func):
+    """
+    View decorator that buffers the Scope.user_state writes made by the view, when the
+    courseware.buffer_user_state_writes waffle switch is enabled.
+
+    The view runs in a transaction, and the buffered writes are written out in that same
+    transaction once the view returns, so that on_commit work queued by the view (such as
+    grading tasks) sees them. If the view raises or returns an error response, the buffered
+    writes are discarded.
+    """
+    @wraps(view_func)
+    def _wrapper(request, *args, **kwargs):
+        if not BUFFER_USER_STATE_WRITES.is_enabled() or _get_write_buffer() is not None:
+            return view_func(request, *args, **kwargs)
+
+        start_buffering_user_state_writes()
+        try:
+            with transaction.atomic():
+                response = view_func(request, *args, **kwargs)
+                if response.status_code < 400:
+                    flush_buffered_user_state_writes()
+        finally:
+            discard_buffered_user_state_writes()
+        return response
+    return _wrapper
+
+
+def _save_student_module_history(student_modules):
+    """
+    Save history entries for `student_modules` in each history table that the post_save
+    receivers for StudentModule would have written to.
+    """
+    StudentModuleHistory.bulk_save_history(student_modules)
+    if apps.is_installed('lms.djangoapps.coursewarehistoryextended'):
+        from lms.djangoapps.coursewarehistoryextended.models import StudentModuleHistoryExtended
+        StudentModuleHistoryExtended.bulk_save_history(student_modules)
+
 
 class XBlockUserState(namedtuple('_XBlockUserState', ['username', 'block_key', 'state', 'updated', 'scope'])):
     """
@@ -367,13 +509,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # keep track of blocks requested
         self._nr_stat_accumulate('get_many', 'blocks_requested', len(block_keys))
 
-        modules = self._get_student_modules(username, block_keys)
-        for module, usage_key in modules:
-            if module.state is None:
-                continue
-
-            state = json.loads(module.state)
-            state_length = len(module.state)
+        for usage_key, state, updated, state_length in self._iter_stored_and_buffered_state(username, block_keys):
 
             # If the state is the empty dict, then it has been deleted, and so
             # conformant UserStateClients should treat it as if it doesn't exist.
@@ -392,17 +528,43 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
                     for field in fields
                     if field in state
                 }
-            yield XBlockUserState(username, usage_key, state, module.modified, scope)
+            yield XBlockUserState(username, usage_key, state, updated, scope)
 
         # The rest of this method exists only to report custom attributes.
         finish_time = time()
         duration = (finish_time - evt_time) * 1000  # milliseconds
         self._nr_stat_accumulate('get_many', 'duration', duration)
 
+    def _iter_stored_and_buffered_state(self, username, block_keys):
+        """
+        Yield ``(usage_key, state, updated, serialized state length)`` for each of ``block_keys``
+        that has state, with any writes buffered earlier in this request laid over the stored state.
+        """
+        write_buffer = _get_write_buffer()
+        buffered = write_buffer.pending.get(username, {}) if write_buffer is not None else {}
+        unseen_buffered = {usage_key for usage_key in block_keys if usage_key in buffered}
+
+        for module, usage_key in self._get_student_modules(username, block_keys):
+            if usage_key in unseen_buffered:
+                unseen_buffered.discard(usage_key)
+                overlay, updated = buffered[usage_key]
+                serialized_state = json.dumps({**json.loads(module.state or '{}'), **overlay})
+                yield usage_key, json.loads(serialized_state), updated, len(serialized_state)
+            elif module.state is not None:
+                yield usage_key, json.loads(module.state), module.modified, len(module.state)
+
+        for usage_key in unseen_buffered:
+            overlay, updated = buffered[usage_key]
+            serialized_state = json.dumps(overlay)
+            yield usage_key, json.loads(serialized_state), updated, len(serialized_state)
+
     def set_many(self, username, block_keys_to_state, scope=Scope.user_state):
         """
         Set fields for a particular XBlock.
 
+        If Scope.user_state writes are being buffered for the current request, the
+        state is held in the request's write buffer and written at the end of the request.
+
         Arguments:
             username: The name of the user whose state should be retrieved
             block_keys_to_state (dict): A dict mapping UsageKeys to state dicts.
@@ -431,6 +593,18 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             # what we have.
             return
 
+        write_buffer = _get_write_buffer()
+        if write_buffer is not None:
+            write_buffer.add(user, block_keys_to_state)
+            self._nr_stat_increment('set_many', 'buffered')
+            return
+
+        self._write_state(user, block_keys_to_state)
+
+    def _write_state(self, user, block_keys_to_state):
+        """
+        Write ``block_keys_to_state`` for ``user`` to StudentModule, one block at a time.
+        """
         evt_time = time()
 
         for usage_key, state in block_keys_to_state.items():
@@ -501,6 +675,48 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         duration = (finish_time - evt_time) * 1000  # milliseconds
         self._nr_stat_accumulate('set_many', 'duration', duration)
 
+    def write_buffered_state(self, user, block_keys_to_state):
+        """
+        Write the coalesced, buffered ``block_keys_to_state`` for ``user``.
+
+        Existing StudentModules are read with one chunked query, overlaid, written back with
+        a single ``bulk_update`` and their history entries inserted with ``bulk_create``.
+        Blocks without a StudentModule yet are created as :meth:`set_many` would.
+        """
+        evt_time = time()
+        self._nr_stat_increment('write_buffered_state', 'calls')
+
+        student_modules = {
+            usage_key: student_module
+            for student_module, usage_key in self._get_student_modules(user.username, list(block_keys_to_state))
+        }
+
+        modified = timezone.now()
+        updated_modules = []
+        for usage_key, student_module in student_modules.items():
+            current_state = json.loads(student_module.state or '{}')
+            current_state.update(block_keys_to_state[usage_key])
+            student_module.state = json.dumps(current_state)
+            student_module.modified = modified
+            updated_modules.append(student_module)
+            self._nr_block_stat_increment('set_many', usage_key.block_type, 'blocks_updated')
+
+        if updated_modules:
+            with transaction.atomic():
+                StudentModule.objects.bulk_update(updated_modules, ['state', 'modified'])
+            _save_student_module_history(updated_modules)
+
+        new_block_keys_to_state = {
+            usage_key: state
+            for usage_key, state in block_keys_to_state.items()
+            if usage_key not in student_modules
+        }
+        if new_block_keys_to_state:
+            self._write_state(user, new_block_keys_to_state)
+
+        duration = (time() - evt_time) * 1000  # milliseconds
+        self._nr_stat_accumulate('write_buffered_state', 'duration', duration)
+
     def delete_many(self, username, block_keys, scope=Scope.user_state, fields=None):
         """
         Delete the stored XBlock state for a many xblock usages.
@@ -514,6 +730,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        flush_buffered_user_state_writes(username)
+
         evt_time = time()  # lint-amnesty, pylint: disable=unused-variable
         student_modules = self._get_student_modules(username, block_keys)
         for student_module, _ in student_modules:
@@ -552,6 +770,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
+
+        flush_buffered_user_state_writes(username)
         student_modules = list(
             student_module
             for student_module, usage_id
@@ -603,6 +823,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        flush_buffered_user_state_writes()
         results = StudentModule.objects.order_by('id').filter(module_state_key=block_key)
         p = Paginator(results, settings.USER_STATE_BATCH_SIZE)
 
@@ -635,6 +856,7 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        flush_buffered_user_state_writes()
         results = StudentModule.objects.order_by('id').filter(course_id=course_key)
         if block_type:
             results = results.filter(module_type=block_type)
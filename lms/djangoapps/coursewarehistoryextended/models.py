@@ -52,6 +52,17 @@ class StudentModuleHistoryExtended(BaseStudentModuleHistory):
             "lms.djangoapps.coursewarehistoryextended.models.student_module_history_extended_map"
         )
 
+    @staticmethod
+    def bulk_save_history(student_modules):
+        """
+        Save StudentModuleHistoryExtended entries for StudentModules updated without post_save.
+        """
+        BaseStudentModuleHistory.bulk_save_history_entries(
+            student_modules,
+            StudentModuleHistoryExtended,
+            "lms.djangoapps.coursewarehistoryextended.models.student_module_history_extended_map"
+        )
+
     @receiver(post_delete, sender=StudentModule)
     def delete_history(sender, instance, **kwargs):  # pylint: disable=no-self-argument, unused-argument
         """
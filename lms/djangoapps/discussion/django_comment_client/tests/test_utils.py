@@ -3,14 +3,16 @@
 
 import datetime
 import json
+import threading
 import unittest
 from unittest import mock
 from unittest.mock import Mock, patch
 
 import ddt
 import pytest
-from django.test import RequestFactory, TestCase
+from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from django.utils.translation import get_language, override
 from edx_django_utils.cache import RequestCache
 from opaque_keys.edx.keys import CourseKey
 from pytz import UTC
@@ -37,8 +39,12 @@ from openedx.core.djangoapps.discussions.utils import (
     get_group_names_by_id,
     has_required_keys,
 )
+from openedx.core.djangoapps.django_comment_common.comment_client.thread import Thread
+from openedx.core.djangoapps.django_comment_common.comment_client.user import User as CommentClientUser
 from openedx.core.djangoapps.django_comment_common.comment_client.utils import (
     CommentClientMaintenanceError,
+    PendingRequest,
+    get_session,
     perform_request,
 )
 from openedx.core.djangoapps.django_comment_common.models import (
@@ -49,6 +55,7 @@ from openedx.core.djangoapps.django_comment_common.models import (
 )
 from openedx.core.djangoapps.django_comment_common.utils import seed_permissions_roles
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE, ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, BlockFactory, ToyCourseFactory
@@ -1679,6 +1686,130 @@ class ClientConfigurationTestCase(TestCase):
         assert result == {}
 
 
+@override_settings(COMMENTS_SERVICE_CONNECTION_POOL_SIZE=2)
+class PooledSessionTestCase(TestCase):
+    """Tests for the pooled, keep-alive connections to the comments service."""
+
+    def setUp(self):
+        super().setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+
+    @patch('requests.Session.request')
+    def test_shared_session(self, mock_request):
+        response = Mock()
+        response.status_code = 200
+        response.json = lambda: {'id': 1}
+        mock_request.return_value = response
+
+        assert perform_request('get', 'http://localhost:4567/api/v1/threads/1', metric_action='model.retrieve') == {
+            'id': 1
+        }
+        assert perform_request('get', 'http://localhost:4567/api/v1/threads/2') == {'id': 1}
+        assert mock_request.call_count == 2
+        assert get_session() is get_session()
+        adapter = get_session().get_adapter('http://localhost:4567')
+        assert adapter.max_retries.total == 2
+
+    @override_settings(COMMENTS_SERVICE_CONNECTION_POOL_SIZE=0)
+    def test_no_session(self):
+        assert get_session() is None
+
+
+@override_settings(COMMENTS_SERVICE_READ_CACHE_TIMEOUT=60)
+@patch('requests.request')
+class ReadCacheTestCase(CacheIsolationTestCase):
+    """Tests for the cache of the threads and comments retrieved from the comments service."""
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super().setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+
+    def mock_response(self, mock_request, title='Thread'):
+        response = Mock()
+        response.status_code = 200
+        response.json = lambda: {'id': 'thread1', 'title': title, 'course_id': 'course-v1:edX+Cache+Run'}
+        mock_request.return_value = response
+
+    def retrieve(self, **kwargs):
+        kwargs.setdefault('mark_as_read', False)
+        return Thread(id='thread1').retrieve(**kwargs)
+
+    def test_cached(self, mock_request):
+        self.mock_response(mock_request)
+        assert self.retrieve().title == 'Thread'
+        assert self.retrieve().title == 'Thread'
+        assert mock_request.call_count == 1
+
+    def test_invalidated_by_writes(self, mock_request):
+        self.mock_response(mock_request)
+        thread = self.retrieve()
+        self.mock_response(mock_request, title='Updated thread')
+        thread.title = 'Updated thread'
+        thread.save()
+        assert self.retrieve().title == 'Updated thread'
+        assert mock_request.call_count == 3
+
+    def test_per_user(self, mock_request):
+        self.mock_response(mock_request)
+        thread = self.retrieve(user_id='1')
+        self.retrieve(user_id='2')
+        self.retrieve(user_id='1')
+        assert mock_request.call_count == 2
+
+        # Reading the thread only changes it for the user who read it.
+        CommentClientUser(id='1').read(thread)
+        self.retrieve(user_id='1')
+        self.retrieve(user_id='2')
+        assert mock_request.call_count == 4
+
+    def test_mark_as_read(self, mock_request):
+        self.mock_response(mock_request)
+        self.retrieve(user_id='1')
+        self.retrieve(user_id='1', mark_as_read=True)
+        self.retrieve(user_id='1')
+        assert mock_request.call_count == 3
+
+    @override_settings(COMMENTS_SERVICE_READ_CACHE_TIMEOUT=0)
+    def test_disabled(self, mock_request):
+        self.mock_response(mock_request)
+        self.retrieve()
+        self.retrieve()
+        assert mock_request.call_count == 2
+
+
+class PendingRequestTestCase(TestCase):
+    """Tests for the comments service calls made in the background."""
+
+    def call(self):
+        return threading.current_thread(), get_language()
+
+    @override_settings(COMMENTS_SERVICE_CONCURRENT_REQUESTS=0)
+    def test_lazy(self):
+        call = Mock(return_value=1)
+        pending_request = PendingRequest(call, 'argument')
+        call.assert_not_called()
+        assert pending_request.result() == 1
+        call.assert_called_once_with('argument')
+
+    @override_settings(COMMENTS_SERVICE_CONCURRENT_REQUESTS=2)
+    def test_concurrent(self):
+        with override('fr'):
+            thread, language = PendingRequest(self.call).result()
+        assert thread is not threading.current_thread()
+        assert language == 'fr'
+
+    @override_settings(COMMENTS_SERVICE_CONCURRENT_REQUESTS=2)
+    def test_exception(self):
+        pending_request = PendingRequest(Mock(side_effect=CommentClientMaintenanceError('down')))
+        with pytest.raises(CommentClientMaintenanceError):
+            pending_request.result()
+
+
 def set_discussion_division_settings(
     course_key, enable_cohorts=False, always_divide_inline_discussions=False,
     divided_discussions=[], division_scheme=CourseDiscussionSettings.COHORT
@@ -118,7 +118,8 @@ from .serializers import (
     ThreadSerializer,
     TopicOrdering,
     UserStatsSerializer,
-    get_context
+    get_context,
+    get_pending_cc_requester
 )
 from .utils import (
     AttributeDict,
@@ -215,10 +216,12 @@ def _get_thread_and_context(request, thread_id, retrieve_kwargs=None):
             retrieve_kwargs["with_responses"] = False
         if "mark_as_read" not in retrieve_kwargs:
             retrieve_kwargs["mark_as_read"] = False
+        # The requester doesn't depend on the thread: retrieve both at once.
+        pending_cc_requester = get_pending_cc_requester(request)
         cc_thread = Thread(id=thread_id).retrieve(**retrieve_kwargs)
         course_key = CourseKey.from_string(cc_thread["course_id"])
         course = _get_course(course_key, request.user)
-        context = get_context(course, request, cc_thread)
+        context = get_context(course, request, cc_thread, pending_cc_requester)
 
         if retrieve_kwargs.get("flagged_comments") and not context["has_moderation_privilege"]:
             raise ValidationError("Only privileged users can request flagged comments")
@@ -952,8 +955,10 @@ def get_thread_list(
             "order_direction": [f"Invalid value. '{order_direction}' must be 'desc'"]
         })
 
+    # The requester is retrieved from the comments service while the course is loaded.
+    pending_cc_requester = get_pending_cc_requester(request)
     course = _get_course(course_key, request.user)
-    context = get_context(course, request)
+    context = get_context(course, request, pending_cc_requester=pending_cc_requester)
 
     author_id = None
     if author:
@@ -1126,8 +1131,10 @@ def get_learner_active_thread_list(request, course_key, query_params):
 
     """
 
+    # The requester is retrieved from the comments service while the course is loaded.
+    pending_cc_requester = get_pending_cc_requester(request)
     course = _get_course(course_key, request.user)
-    context = get_context(course, request)
+    context = get_context(course, request, pending_cc_requester=pending_cc_requester)
 
     group_id = query_params.get('group_id', None)
     user_id = query_params.get('user_id', None)
@@ -1725,8 +1732,10 @@ def get_user_comments(
 
         A paginated result containing a list of comments.
     """
+    # The requester is retrieved from the comments service while the course is loaded.
+    pending_cc_requester = get_pending_cc_requester(request)
     course = _get_course(course_key, request.user)
-    context = get_context(course, request)
+    context = get_context(course, request, pending_cc_requester=pending_cc_requester)
 
     if flagged and not context["has_moderation_privilege"]:
         raise ValidationError("Only privileged users can filter comments by flagged status")
@@ -39,7 +39,10 @@ from openedx.core.djangoapps.discussions.utils import get_group_names_by_id
 from openedx.core.djangoapps.django_comment_common.comment_client.comment import Comment
 from openedx.core.djangoapps.django_comment_common.comment_client.thread import Thread
 from openedx.core.djangoapps.django_comment_common.comment_client.user import User as CommentClientUser
-from openedx.core.djangoapps.django_comment_common.comment_client.utils import CommentClientRequestError
+from openedx.core.djangoapps.django_comment_common.comment_client.utils import (
+    CommentClientRequestError,
+    PendingRequest
+)
 from openedx.core.djangoapps.django_comment_common.models import CourseDiscussionSettings
 from openedx.core.lib.api.serializers import CourseKeyField
 
@@ -58,16 +61,22 @@ class TopicOrdering(TextChoices):
     NAME = "name", "Name"
 
 
-def get_context(course, request, thread=None):
+def get_context(course, request, thread=None, pending_cc_requester=None):
     """
     Returns a context appropriate for use with ThreadSerializer or
     (if thread is provided) CommentSerializer.
+
+    The requester's comments service user is retrieved while the course roles
+    are looked up, unless the caller already started to retrieve it, in
+    pending_cc_requester (see get_pending_cc_requester).
     """
+    requester = request.user
+    if pending_cc_requester is None:
+        pending_cc_requester = get_pending_cc_requester(request)
     course_staff_user_ids = get_course_staff_users_list(course.id)
     moderator_user_ids = get_moderator_users_list(course.id)
     ta_user_ids = get_course_ta_users_list(course.id)
-    requester = request.user
-    cc_requester = CommentClientUser.from_django_user(requester).retrieve()
+    cc_requester = pending_cc_requester.result()
     cc_requester["course_id"] = course.id
     course_discussion_settings = CourseDiscussionSettings.get(course.id)
     is_global_staff = GlobalStaff().has_user(requester)
@@ -87,6 +96,13 @@ def get_context(course, request, thread=None):
     }
 
 
+def get_pending_cc_requester(request):
+    """
+    Start retrieving the requester's comments service user, and return the PendingRequest for it.
+    """
+    return PendingRequest(CommentClientUser.from_django_user(request.user).retrieve)
+
+
 def validate_not_blank(value):
     """
     Validate that a value is not an empty string or whitespace.
@@ -23,6 +23,16 @@ LOG_PREFIX = 'Grades: '
 # .. toggle_tickets: https://github.com/openedx/edx-platform/pull/15733
 DISABLE_REGRADE_ON_POLICY_CHANGE = WaffleSwitch(f'{WAFFLE_NAMESPACE}.disable_regrade_on_policy_change', __name__)
 
+# .. toggle_name: grades.bulk_score_prefetch
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, CourseGradeFactory.iter grades learners in batches, loading the StudentModule
+#   and Submissions API scores of each batch with a few queries instead of per learner.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+BULK_SCORE_PREFETCH = WaffleSwitch(f'{WAFFLE_NAMESPACE}.bulk_score_prefetch', __name__)
+
 # Course Flags
 
 # .. toggle_name: grades.rejected_exam_overrides_grade
@@ -2,6 +2,7 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 from openedx.core.djangoapps.signals.signals import (
@@ -9,10 +10,13 @@ from openedx.core.djangoapps.signals.signals import (
     COURSE_GRADE_NOW_FAILED,
     COURSE_GRADE_NOW_PASSED
 )
+from .config.waffle import BULK_SCORE_PREFETCH
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
 from .models import PersistentCourseGrade
 from .models_api import prefetch_grade_overrides_and_visible_blocks
+from .scores import possibly_scored
+from .subsection_grade_factory import clear_prefetched_scores, prefetch_scores
 
 log = getLogger(__name__)
 
@@ -23,6 +27,9 @@ class CourseGradeFactory:
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose scores are loaded together by iter.
+    BULK_BATCH_SIZE = 200
+
     def read(
             self,
             user,
@@ -75,6 +82,7 @@ class CourseGradeFactory:
             collected_block_structure=None,
             course_key=None,
             force_update=False,
+            prefetch_scores=False,
     ):
         """
         Given a course and an iterable of students (User), yield a GradeResult
@@ -84,6 +92,10 @@ class CourseGradeFactory:
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        When force_update or prefetch_scores is True and the
+        grades.bulk_score_prefetch switch is enabled, students are graded in
+        batches whose problem scores are loaded together up front.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -93,8 +105,34 @@ class CourseGradeFactory:
         course_data = CourseData(
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
-        for user in users:
-            yield self._iter_grade_result(user, course_data, force_update)
+        if (force_update or prefetch_scores) and BULK_SCORE_PREFETCH.is_enabled():
+            yield from self._iter_bulk(users, course_data, force_update)
+        else:
+            for user in users:
+                yield self._iter_grade_result(user, course_data, force_update)
+
+    def _iter_bulk(self, users, course_data, force_update):
+        """
+        Yields a GradeResult for each of the given users, prefetching the
+        scores of each batch of BULK_BATCH_SIZE users before grading it.
+
+        The scorable blocks of the collected structure are prefetched, since
+        they are a superset of those in any user's transformed structure.
+        """
+        scorable_locations = [
+            block_key for block_key in course_data.collected_structure if possibly_scored(block_key)
+        ]
+        users = iter(users)
+        while True:
+            batch = list(islice(users, self.BULK_BATCH_SIZE))
+            if not batch:
+                return
+            prefetch_scores(course_data.course_key, batch, scorable_locations)
+            try:
+                for user in batch:
+                    yield self._iter_grade_result(user, course_data, force_update)
+            finally:
+                clear_prefetched_scores(course_data.course_key)
 
     def _iter_grade_result(self, user, course_data, force_update):  # lint-amnesty, pylint: disable=missing-function-docstring
         try:
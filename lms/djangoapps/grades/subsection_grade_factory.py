@@ -9,12 +9,15 @@ from logging import getLogger
 from django.conf import settings
 from lazy import lazy
 from submissions import api as submissions_api
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
 
-from common.djangoapps.student.models import anonymous_id_for_user
+from common.djangoapps.student.models import anonymous_id_for_user, prefetch_anonymous_ids_for_users
 from lms.djangoapps.courseware.model_data import ScoresClient
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.djangoapps.signals.signals import COURSE_ASSESSMENT_GRADE_CHANGED
+from openedx.core.lib.cache_utils import get_cache
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
 
 from .course_data import CourseData
@@ -22,6 +25,66 @@ from .subsection_grade import CreateSubsectionGrade, ReadSubsectionGrade, ZeroSu
 
 log = getLogger(__name__)
 
+_SCORES_CACHE_NAMESPACE = 'grades.subsection_grade_factory.scores'
+
+
+def prefetch_scores(course_key, users, scorable_locations):
+    """
+    Prefetches the CSM and Submissions API scores of the given users in
+    the course into the RequestCache, so SubsectionGradeFactory instances
+    for those users don't query them one learner at a time.
+
+    scorable_locations should be a superset of the scorable blocks visible
+    to any of the users, e.g. those of the collected course structure.
+    """
+    users = list(users)
+    csm_scores = ScoresClient.create_for_users(course_key, [user.id for user in users], scorable_locations)
+    get_cache(_SCORES_CACHE_NAMESPACE)[str(course_key)] = {
+        'csm': csm_scores,
+        'submissions': _bulk_submissions_scores(course_key, users),
+    }
+
+
+def clear_prefetched_scores(course_key):
+    """
+    Clears prefetched scores for this course from the RequestCache.
+    """
+    get_cache(_SCORES_CACHE_NAMESPACE).pop(str(course_key), None)
+
+
+def _get_prefetched_scores(course_key, kind, user_id):
+    """
+    Returns the prefetched scores of the given kind ('csm' or 'submissions')
+    for the user, or None if they were not prefetched.
+    """
+    prefetched = get_cache(_SCORES_CACHE_NAMESPACE).get(str(course_key))
+    if prefetched is None:
+        return None
+    return prefetched[kind].get(user_id)
+
+
+def _bulk_submissions_scores(course_key, users):
+    """
+    Returns {user_id: scores} for the given users, where scores matches the
+    return value of submissions_api.get_scores for that user.
+
+    The Submissions API only reads the scores of one learner at a time, so this
+    reads the ScoreSummaries of all of the users with a single query, and
+    serializes them as submissions_api.get_scores does.
+    """
+    prefetch_anonymous_ids_for_users(users, course_key)
+    user_ids_by_anonymous_id = {anonymous_id_for_user(user, course_key): user.id for user in users}
+    scores = {user_id: {} for user_id in user_ids_by_anonymous_id.values()}
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=str(course_key),
+        student_item__student_id__in=list(user_ids_by_anonymous_id),
+    ).select_related('latest', 'latest__submission', 'student_item')
+    for summary in score_summaries:
+        if not summary.latest.is_hidden():
+            user_id = user_ids_by_anonymous_id[summary.student_item.student_id]
+            scores[user_id][summary.student_item.item_id] = UnannotatedScoreSerializer(summary.latest).data
+    return scores
+
 
 class SubsectionGradeFactory:
     """
@@ -121,6 +184,9 @@ class SubsectionGradeFactory:
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        prefetched = _get_prefetched_scores(self.course_data.course_key, 'csm', self.student.id)
+        if prefetched is not None:
+            return prefetched
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -130,6 +196,9 @@ class SubsectionGradeFactory:
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        prefetched = _get_prefetched_scores(self.course_data.course_key, 'submissions', self.student.id)
+        if prefetched is not None:
+            return prefetched
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
@@ -4,16 +4,22 @@ Tests for the CourseGradeFactory class.
 from unittest.mock import patch
 
 import ddt
+from edx_toggles.toggles.testutils import override_waffle_switch
+from submissions import api as submissions_api
 
+from common.djangoapps.student.models import CourseEnrollment, anonymous_id_for_user
 from common.djangoapps.student.tests.factories import UserFactory
 from lms.djangoapps.courseware.access import has_access
+from lms.djangoapps.courseware.model_data import set_score
 from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.tests.factories import CourseFactory  # lint-amnesty, pylint: disable=wrong-import-order
 
+from ..config.waffle import BULK_SCORE_PREFETCH
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
+from ..subsection_grade_factory import _bulk_submissions_scores
 from .base import GradeTestBase
 from .utils import mock_get_score
 
@@ -158,6 +164,58 @@ class TestCourseGradeFactory(GradeTestBase):
             ))
         assert mock_update.called == force_update
 
+    @ddt.data(1, 2, 5)
+    def test_iter_bulk_score_prefetch(self, batch_size):
+        users = [self.request.user, UserFactory.create(), UserFactory.create()]
+        for user in users[1:]:
+            CourseEnrollment.enroll(user, self.course.id)
+        set_score(users[0].id, self.problem.location, 1, 2)
+        set_score(users[1].id, self.problem.location, 2, 2)
+        set_score(users[1].id, self.problem2.location, 1, 4)
+
+        def _iter_percents():
+            return {
+                user: course_grade.percent
+                for user, course_grade, _ in CourseGradeFactory().iter(users, self.course, force_update=True)
+            }
+
+        expected_percents = _iter_percents()
+        with override_waffle_switch(BULK_SCORE_PREFETCH, active=True), patch.object(
+            CourseGradeFactory, 'BULK_BATCH_SIZE', batch_size,
+        ), patch(
+            'lms.djangoapps.grades.subsection_grade_factory.ScoresClient.create_for_locations',
+        ) as mock_create_for_locations:
+            assert _iter_percents() == expected_percents
+        assert not mock_create_for_locations.called
+        assert expected_percents[users[1]] > expected_percents[users[0]] > expected_percents[users[2]] == 0
+
+    def test_bulk_score_prefetch_reads_submissions_scores_at_once(self):
+        users = [self.request.user, UserFactory.create(), UserFactory.create()]
+        anonymous_ids = [anonymous_id_for_user(user, self.course.id) for user in users]
+        for anonymous_id, points_possible in zip(anonymous_ids[:2], [2, 0]):
+            submission = submissions_api.create_submission({
+                'student_id': anonymous_id,
+                'course_id': str(self.course.id),
+                'item_id': str(self.problem.location),
+                'item_type': 'problem',
+            }, 'answer')
+            submissions_api.set_score(submission['uuid'], 0, points_possible)
+        expected_scores = {
+            user.id: submissions_api.get_scores(str(self.course.id), anonymous_id)
+            for user, anonymous_id in zip(users, anonymous_ids)
+        }
+        assert expected_scores[users[0].id]
+        # The second user's score is hidden, and the third user has none.
+        assert not expected_scores[users[1].id]
+        assert not expected_scores[users[2].id]
+
+        with patch(
+            'lms.djangoapps.grades.subsection_grade_factory.submissions_api.get_scores',
+        ) as mock_get_scores, self.assertNumQueries(2):
+            scores = _bulk_submissions_scores(self.course.id, users)
+        assert scores == expected_scores
+        assert not mock_get_scores.called
+
     def test_course_grade_summary(self):
         with mock_get_score(1, 2):
             self.subsection_grade_factory.update(self.course_structure[self.sequence.location])
@@ -36,6 +36,30 @@ USE_ON_DISK_GRADE_REPORTING = CourseWaffleFlag(
     f'{WAFFLE_NAMESPACE}.use_on_disk_grade_reporting', __name__
 )
 
+# .. toggle_name: instructor_task.columnar_grade_reports
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled together with instructor_task.use_on_disk_grade_reporting, grade reports are
+#   also written in the Parquet columnar format and uploaded next to the CSV, for consumption by analytics tools.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_warning: Requires the optional pyarrow package; without it only the CSV report is generated.
+COLUMNAR_GRADE_REPORTS = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.columnar_grade_reports', __name__
+)
+
+# .. toggle_name: instructor_task.sharded_grade_reports
+# .. toggle_implementation: CourseWaffleFlag
+# .. toggle_default: False
+# .. toggle_description: When enabled together with instructor_task.use_on_disk_grade_reporting, course and problem
+#   grade reports are generated by parallel subtasks, each for a range of learners (see the
+#   GRADE_REPORT_LEARNERS_PER_SHARD setting), whose partial reports are then merged by a final subtask.
+# .. toggle_use_cases: opt_in
+# .. toggle_creation_date: 2026-10-18
+SHARDED_GRADE_REPORTS = CourseWaffleFlag(
+    f'{WAFFLE_NAMESPACE}.sharded_grade_reports', __name__
+)
+
 
 def optimize_get_learners_switch_enabled():
     """
@@ -69,3 +93,19 @@ def use_on_disk_grade_reporting(course_id):
     False otherwise.
     """
     return USE_ON_DISK_GRADE_REPORTING.is_enabled(course_id)
+
+
+def columnar_grade_reports_enabled(course_id):
+    """
+    Returns True if grade reports should also be written
+    in a columnar (Parquet) format, False otherwise.
+    """
+    return COLUMNAR_GRADE_REPORTS.is_enabled(course_id)
+
+
+def sharded_grade_reports_enabled(course_id):
+    """
+    Returns True if grade reports should be generated in
+    parallel shards of learners, False otherwise.
+    """
+    return SHARDED_GRADE_REPORTS.is_enabled(course_id)
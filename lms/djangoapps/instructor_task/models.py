@@ -23,7 +23,7 @@ from botocore.exceptions import ClientError
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import User  # lint-amnesty, pylint: disable=imported-auth-user
-from django.core.files.base import ContentFile
+from django.core.files.base import ContentFile, File
 from django.db import models, transaction
 
 from django.utils.translation import gettext as _
@@ -307,6 +307,16 @@ class DjangoStorageReportStore(ReportStore):
 
         self.storage.save(path, buff)
 
+    def store_file(self, course_id, filename, file, parent_dir=''):
+        """
+        Store the contents of the binary file-like object `file`, like `store`,
+        but without reading it into memory first, so that the storage backend
+        can copy or upload it in chunks. `file` must be positioned at the
+        beginning.
+        """
+        path = self.path_to(course_id, filename, parent_dir)
+        self.storage.save(path, File(file, name=filename))
+
     def store_rows(self, course_id, filename, rows, parent_dir=''):
         """
         Given a course_id, filename, and rows (each row is an iterable of
@@ -24,6 +24,8 @@ import logging
 from functools import partial
 
 from celery import shared_task
+from celery.states import FAILURE, RETRY, SUCCESS
+from django.conf import settings
 from django.utils.translation import gettext_noop
 from edx_django_utils.monitoring import set_code_owner_attribute
 
@@ -31,7 +33,14 @@ from lms.djangoapps.bulk_email.tasks import perform_delegate_email_batches
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import upload_may_enroll_csv, upload_students_csv
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, ProblemGradeReport, ProblemResponses
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, check_subtask_is_valid, update_subtask_status
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    CourseGradeReport,
+    ProblemGradeReport,
+    ProblemResponses,
+    write_grade_report_shard,
+    write_merged_grade_report
+)
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
@@ -215,6 +224,101 @@ def calculate_problem_grade_report(entry_id, xblock_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@shared_task(bind=True, max_retries=settings.GRADE_REPORT_SHARD_MAX_RETRIES, default_retry_delay=60)
+@set_code_owner_attribute
+def generate_grade_report_shard(
+    self,
+    entry_id,
+    report_type,
+    xblock_instance_args,
+    action_name,
+    shard_index,
+    user_id_range,
+    num_shards,
+    merge_subtask_status_dict,
+    subtask_status_dict,
+):
+    """
+    Generates the partial grade report of one shard of learners, for a grade
+    report that is generated in shards (see GradeReportBase._queue_shards).
+
+    A failed shard is retried on its own, up to GRADE_REPORT_SHARD_MAX_RETRIES
+    times. Once every shard has completed, the last one queues the subtask
+    that merges their partial reports.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    try:
+        succeeded, failed = write_grade_report_shard(
+            report_type, xblock_instance_args, entry_id, action_name, shard_index, user_id_range,
+        )
+    except Exception as exc:  # pylint: disable=broad-except
+        if self.request.retries < self.max_retries:
+            TASK_LOG.warning(
+                'Grade report shard %s of instructor task %s failed, retrying', shard_index, entry_id, exc_info=True
+            )
+            subtask_status.increment(retried_withmax=1, state=RETRY)
+            update_subtask_status(entry_id, current_task_id, subtask_status)
+            raise self.retry(
+                exc=exc, kwargs=dict(self.request.kwargs, subtask_status_dict=subtask_status.to_dict()),
+            )
+        TASK_LOG.exception('Grade report shard %s of instructor task %s failed', shard_index, entry_id)
+        subtask_status.increment(state=FAILURE)
+        num_remaining = update_subtask_status(
+            entry_id, current_task_id, subtask_status, fail_if_any_subtask_failed=True,
+        )
+    else:
+        subtask_status.increment(succeeded=succeeded, failed=failed, state=SUCCESS)
+        num_remaining = update_subtask_status(
+            entry_id, current_task_id, subtask_status, fail_if_any_subtask_failed=True,
+        )
+
+    # Only the merge subtask is left once all the shards have completed.
+    if num_remaining == 1:
+        merge_grade_report_shards.apply_async(
+            kwargs={
+                'entry_id': entry_id,
+                'report_type': report_type,
+                'xblock_instance_args': xblock_instance_args,
+                'action_name': action_name,
+                'num_shards': num_shards,
+                'subtask_status_dict': merge_subtask_status_dict,
+            },
+            task_id=merge_subtask_status_dict['task_id'],
+        )
+    return subtask_status.to_dict()
+
+
+@shared_task
+@set_code_owner_attribute
+def merge_grade_report_shards(
+    entry_id, report_type, xblock_instance_args, action_name, num_shards, subtask_status_dict,
+):
+    """
+    Merges the partial reports of all the shards of a grade report, in
+    order, and uploads the merged report. Fails if any shard failed.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    try:
+        write_merged_grade_report(report_type, xblock_instance_args, entry_id, action_name, num_shards)
+    except Exception:
+        TASK_LOG.exception('Merging the grade report shards of instructor task %s failed', entry_id)
+        subtask_status.increment(state=FAILURE)
+        update_subtask_status(
+            entry_id, current_task_id, subtask_status, fail_if_any_subtask_failed=True,
+        )
+        raise
+
+    subtask_status.increment(state=SUCCESS)
+    update_subtask_status(entry_id, current_task_id, subtask_status, fail_if_any_subtask_failed=True)
+    return subtask_status.to_dict()
+
+
 @shared_task(base=BaseInstructorTask)
 @set_code_owner_attribute
 def calculate_students_features_csv(entry_id, xblock_instance_args):
@@ -3,14 +3,20 @@ Functionality for generating grade reports.
 """
 
 import csv
+import io
+import json
 import logging
+import os
 import re
+import shutil
 from collections import OrderedDict, defaultdict
+from contextlib import ExitStack
 from datetime import datetime
 from itertools import chain
 from tempfile import TemporaryFile
 
 from time import time
+from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -19,9 +25,16 @@ from opaque_keys.edx.keys import UsageKey
 from pytz import UTC
 from six.moves import zip_longest
 
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
 from common.djangoapps.course_modes.models import CourseMode
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.roles import BulkRoleCache
+from common.djangoapps.util.db import outer_atomic
 from lms.djangoapps.certificates import api as certs_api
 from lms.djangoapps.certificates.models import GeneratedCertificate
 from lms.djangoapps.course_blocks.api import get_course_blocks
@@ -32,10 +45,14 @@ from lms.djangoapps.grades.api import prefetch_course_and_subsection_grades
 from lms.djangoapps.instructor_analytics.basic import list_problem_responses
 from lms.djangoapps.instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.instructor_task.config.waffle import (
+    columnar_grade_reports_enabled,
     course_grade_report_verified_only,
     problem_grade_report_verified_only,
+    sharded_grade_reports_enabled,
     use_on_disk_grade_reporting,
 )
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, initialize_subtask_info
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -48,7 +65,7 @@ from xmodule.partitions.partitions_service import PartitionService  # lint-amnes
 from xmodule.split_test_block import get_split_user_partitions  # lint-amnesty, pylint: disable=wrong-import-order
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store, upload_csv_file_to_report_store
+from .utils import upload_csv_file_to_report_store, upload_csv_to_report_store, upload_parquet_file_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -92,6 +109,7 @@ class _CourseGradeReportContext:
             course_id=course_id,
             task_input=_task_input,
         )
+        self.entry_id = _entry_id
         self.action_name = action_name
         self.course_id = course_id
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
@@ -337,6 +355,35 @@ class InMemoryReportMixin:
         return success_rows, error_rows
 
 
+class _ParquetRowWriter:
+    """
+    Writes report rows to a Parquet file, one row group per batch of rows,
+    so that memory use is bounded by the batch size rather than the report
+    size. Values are stored as strings, as in the CSV report.
+    """
+    def __init__(self, file, headers):
+        self._schema = pyarrow.schema([(str(header), pyarrow.string()) for header in headers])
+        self._writer = pyarrow.parquet.ParquetWriter(file, self._schema)
+
+    def writerows(self, rows):
+        """
+        Writes the given rows as a row group.
+        """
+        if not rows:
+            return
+        columns = [
+            pyarrow.array([None if value is None else str(value) for value in column], type=pyarrow.string())
+            for column in zip(*rows)
+        ]
+        self._writer.write_table(pyarrow.Table.from_arrays(columns, schema=self._schema))
+
+    def close(self):
+        """
+        Writes the file footer. The underlying file is left open.
+        """
+        self._writer.close()
+
+
 class TemporaryFileReportMixin:
     """
     Mixin for a file report that will write rows iteratively to a TempFile
@@ -348,36 +395,74 @@ class TemporaryFileReportMixin:
         self.context.update_status('TemporaryFileReportMixin - 1: Starting grade report')
         batched_rows = self._batched_rows()
 
-        with TemporaryFile('r+') as success_file, TemporaryFile('r+') as error_file:
+        with ExitStack() as stack:
+            success_file = stack.enter_context(TemporaryFile())
+            error_file = stack.enter_context(TemporaryFile())
+            columnar_file = stack.enter_context(TemporaryFile()) if self._write_columnar_report() else None
+
             self.context.update_status('TemporaryFileReportMixin - 2: Compiling grades into temp files')
-            has_errors = self.iter_and_write_batched_rows(batched_rows, success_file, error_file)
+            has_errors = self.iter_and_write_batched_rows(batched_rows, success_file, error_file, columnar_file)
 
             self.context.update_status('TemporaryFileReportMixin - 3: Uploading files')
-            self.upload_temp_files(success_file, error_file, has_errors)
+            self.upload_temp_files(success_file, error_file, has_errors, columnar_file)
 
         return self.context.update_status('TemporaryFileReportMixin - 4: Completed grades')
 
-    def iter_and_write_batched_rows(self, batched_rows, success_file, error_file):
+    def _write_columnar_report(self):
+        """
+        Returns whether a Parquet copy of the report should be written as well.
+        """
+        if not columnar_grade_reports_enabled(self.context.course_id):
+            return False
+        if pyarrow is None:
+            TASK_LOG.warning(
+                'Columnar grade reports are enabled for course %s, but pyarrow is not installed.',
+                self.context.course_id,
+            )
+            return False
+        return True
+
+    def iter_and_write_batched_rows(
+        self, batched_rows, success_file, error_file, columnar_file=None, write_headers=True,
+    ):
         """
         Iterate through batched rows, writing returned chunks to disk as we go.
         This should hopefully help us avoid out of memory errors.
+
+        success_file and error_file are binary files, to which the rows are
+        written as UTF-8 encoded CSV. If columnar_file is given, the success
+        rows are also written to it in the Parquet format. The CSV headers are
+        left out if write_headers is False, as for the shards of a report.
         """
-        success_writer = csv.writer(success_file)
-        error_writer = csv.writer(error_file)
+        success_text = io.TextIOWrapper(success_file, encoding='utf-8', newline='')
+        error_text = io.TextIOWrapper(error_file, encoding='utf-8', newline='')
+        success_writer = csv.writer(success_text)
+        error_writer = csv.writer(error_text)
 
         # Write headers
-        success_writer.writerow(self._success_headers())
-        error_writer.writerow(self._error_headers())
+        success_headers = self._success_headers()
+        if write_headers:
+            success_writer.writerow(success_headers)
+            error_writer.writerow(self._error_headers())
+        columnar_writer = _ParquetRowWriter(columnar_file, success_headers) if columnar_file else None
 
         succeeded, failed = 0, 0
         # Iterate through batched rows, writing to temp file
         for success_rows, error_rows in batched_rows:
             success_writer.writerows(success_rows)
+            if columnar_writer:
+                columnar_writer.writerows(success_rows)
             if len(error_rows) > 0:
                 error_writer.writerows(error_rows)
             succeeded += len(success_rows)
             failed += len(error_rows)
 
+        if columnar_writer:
+            columnar_writer.close()
+        # Flush the text layers and hand the binary files back for uploading.
+        success_text.detach()
+        error_text.detach()
+
         self.context.task_progress.succeeded = succeeded
         self.context.task_progress.failed = failed
         self.context.task_progress.attempted = succeeded + failed
@@ -385,12 +470,25 @@ class TemporaryFileReportMixin:
 
         return self.context.task_progress.failed > 0
 
-    def upload_temp_files(self, success_file, error_file, has_errors):
+    def upload_temp_files(self, success_file, error_file, has_errors, columnar_file=None):
         """
-        Uploads success and error csv files to report store
+        Uploads success and error csv files to report store, streaming them
+        from disk.
         """
         date = datetime.now(UTC)
 
+        # The columnar copy is uploaded first, so the CSV remains the most
+        # recent report in the listing.
+        if columnar_file:
+            columnar_file.seek(0)
+            upload_parquet_file_to_report_store(
+                columnar_file,
+                self.context.upload_filename,
+                self.context.course_id,
+                date,
+                parent_dir=self.context.upload_parent_dir
+            )
+
         success_file.seek(0)
         upload_csv_file_to_report_store(
             success_file,
@@ -410,13 +508,93 @@ class TemporaryFileReportMixin:
                 parent_dir=self.context.upload_parent_dir
             )
 
+    def _generate_shard(self, shard_index):
+        """
+        Writes the rows of the learners in this report's user_id_range to
+        partial CSV files in the report store, to be merged by _merge_shards.
+
+        Returns the (succeeded, failed) learner counts of the shard.
+        """
+        self.context.update_status(f'TemporaryFileReportMixin - shard {shard_index}: Starting grade report shard')
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        with TemporaryFile() as success_file, TemporaryFile() as error_file:
+            self.iter_and_write_batched_rows(self._batched_rows(), success_file, error_file, write_headers=False)
+            for shard_file, suffix in ((success_file, ''), (error_file, '_err')):
+                path = self._shard_path(report_store, shard_index, suffix)
+                # A retried shard replaces its earlier partial output.
+                if report_store.storage.exists(path):
+                    report_store.storage.delete(path)
+                shard_file.seek(0)
+                report_store.store_file(
+                    self.context.course_id,
+                    os.path.basename(path),
+                    shard_file,
+                    parent_dir=os.path.dirname(path),
+                )
+        self.context.update_status(f'TemporaryFileReportMixin - shard {shard_index}: Completed grade report shard')
+        return self.context.task_progress.succeeded, self.context.task_progress.failed
+
+    def _merge_shards(self, num_shards):
+        """
+        Stitches the partial files written by _generate_shard together, in
+        shard order, uploads the resulting report and deletes the partial files.
+        """
+        self.context.update_status('TemporaryFileReportMixin - merge: Merging grade report shards')
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        shard_paths = [
+            (self._shard_path(report_store, shard_index, ''), self._shard_path(report_store, shard_index, '_err'))
+            for shard_index in range(num_shards)
+        ]
+        missing_paths = [
+            path for paths in shard_paths for path in paths if not report_store.storage.exists(path)
+        ]
+        if missing_paths:
+            raise ValueError(f'Cannot merge grade report, missing shard files: {missing_paths}')
+
+        with TemporaryFile() as success_file, TemporaryFile() as error_file:
+            for merged_file, headers in ((success_file, self._success_headers()), (error_file, self._error_headers())):
+                merged_text = io.TextIOWrapper(merged_file, encoding='utf-8', newline='')
+                csv.writer(merged_text).writerow(headers)
+                merged_text.detach()
+            errors_start = error_file.tell()
+
+            for success_path, error_path in shard_paths:
+                for path, merged_file in ((success_path, success_file), (error_path, error_file)):
+                    with report_store.storage.open(path, 'rb') as shard_file:
+                        shutil.copyfileobj(shard_file, merged_file)
+
+            self.context.update_status('TemporaryFileReportMixin - merge: Uploading files')
+            self.upload_temp_files(success_file, error_file, error_file.tell() > errors_start)
+
+        for paths in shard_paths:
+            for path in paths:
+                report_store.storage.delete(path)
+        return self.context.update_status('TemporaryFileReportMixin - merge: Completed grades')
+
+    def _shard_path(self, report_store, shard_index, suffix):
+        """
+        Returns the report store path of a partial file of the given shard.
+        Partial files are kept in a subdirectory, so they are not listed as
+        reports for the course.
+        """
+        report_dir = report_store.path_to(self.context.course_id, parent_dir=self.context.upload_parent_dir)
+        filename = f'{self.context.upload_filename}_{shard_index}{suffix}.csv'
+        return os.path.join(report_dir, 'shards', str(self.context.entry_id), filename)
+
 
 class GradeReportBase:
     """
     Base class for grade reports (ProblemGradeReport and CourseGradeReport).
+
+    If user_id_range is given as a (first_user_id, last_user_id) tuple, the
+    report only includes the enrolled learners with ids in that range.
     """
-    def __init__(self, context):
+    # Name used to find the report class when generating it in shards.
+    REPORT_TYPE = None
+
+    def __init__(self, context, user_id_range=None):
         self.context = context
+        self.user_id_range = user_id_range
 
     def _get_enrolled_learner_count(self):
         """
@@ -451,20 +629,13 @@ class GradeReportBase:
             args = [iter(iterable)] * chunk_size
             return zip_longest(*args, fillvalue=fillvalue)
 
-        def get_enrolled_learners_for_course(course_id, verified_only=False):
+        def get_enrolled_learners_for_course():
             """
             Get all the enrolled users in a course chunk by chunk.
             This generator method fetches & loads the enrolled user objects on demand which in chunk
             size defined. This method is a workaround to avoid out-of-memory errors.
             """
-            filter_kwargs = {
-                'courseenrollment__course_id': course_id,
-            }
-            if verified_only:
-                filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
-
-            user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
-            user_chunks = grouper(user_ids_list)
+            user_chunks = grouper(self._enrolled_learner_ids())
             for user_ids in user_chunks:
                 user_ids = [user_id for user_id in user_ids if user_id is not None]
                 min_id = min(user_ids)
@@ -472,15 +643,99 @@ class GradeReportBase:
                 users = get_user_model().objects.filter(
                     id__gte=min_id,
                     id__lte=max_id,
-                    **filter_kwargs
+                    **self._enrolled_learner_filter_kwargs()
                 ).select_related('profile')
 
                 yield users
 
-        return get_enrolled_learners_for_course(
-            course_id=self.context.course_id,
-            verified_only=self.context.report_for_verified_only
-        )
+        return get_enrolled_learners_for_course()
+
+    def _enrolled_learner_filter_kwargs(self):
+        """
+        Returns the User queryset filter for the learners enrolled in the course.
+        """
+        filter_kwargs = {
+            'courseenrollment__course_id': self.context.course_id,
+        }
+        if self.context.report_for_verified_only:
+            filter_kwargs['courseenrollment__mode'] = CourseMode.VERIFIED
+        return filter_kwargs
+
+    def _enrolled_learner_ids(self):
+        """
+        Returns the ordered ids of the enrolled learners in this report.
+        """
+        user_ids = get_user_model().objects.filter(
+            **self._enrolled_learner_filter_kwargs()
+        ).values_list('id', flat=True).order_by('id')
+        if self.user_id_range:
+            first_user_id, last_user_id = self.user_id_range
+            user_ids = user_ids.filter(id__gte=first_user_id, id__lte=last_user_id)
+        return user_ids
+
+    def _shard_user_id_ranges(self, learners_per_shard):
+        """
+        Splits the enrolled learners into shards of at most learners_per_shard
+        learners with consecutive ids. Returns a list of
+        ((first_user_id, last_user_id), num_learners) tuples.
+        """
+        user_ids = list(self._enrolled_learner_ids())
+        return [
+            ((shard[0], shard[-1]), len(shard))
+            for shard in (
+                user_ids[start:start + learners_per_shard] for start in range(0, len(user_ids), learners_per_shard)
+            )
+        ]
+
+    def _queue_shards(self, xblock_instance_args):
+        """
+        Fans the report out to one subtask per shard of learners. The subtask
+        of the last shard to complete queues a final subtask to merge them.
+
+        The merge subtask is registered with the InstructorTask up front,
+        along with the shard subtasks, so the task is only marked as complete
+        once the merged report is uploaded.
+        """
+        # Imported here, since the tasks module imports this one.
+        from lms.djangoapps.instructor_task.tasks import generate_grade_report_shard
+
+        entry = InstructorTask.objects.get(pk=self.context.entry_id)
+        # If the parent task was requeued after queuing its subtasks, there's
+        # nothing left to do here.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning('%s, Grade report shards have already been queued', self.context.task_info_string)
+            return json.loads(entry.task_output)
+
+        shards = self._shard_user_id_ranges(settings.GRADE_REPORT_LEARNERS_PER_SHARD)
+        if not shards:
+            return self._generate()
+        shard_task_ids = [str(uuid4()) for _ in shards]
+        merge_task_id = str(uuid4())
+        with outer_atomic():
+            progress = initialize_subtask_info(
+                entry,
+                self.context.action_name,
+                sum(num_learners for _, num_learners in shards),
+                shard_task_ids + [merge_task_id],
+            )
+
+        self.log_task_info(f'Queuing {len(shards)} grade report shards')
+        for shard_index, ((user_id_range, _), shard_task_id) in enumerate(zip(shards, shard_task_ids)):
+            generate_grade_report_shard.apply_async(
+                kwargs={
+                    'entry_id': self.context.entry_id,
+                    'report_type': self.REPORT_TYPE,
+                    'xblock_instance_args': xblock_instance_args,
+                    'action_name': self.context.action_name,
+                    'shard_index': shard_index,
+                    'user_id_range': user_id_range,
+                    'num_shards': len(shards),
+                    'merge_subtask_status_dict': SubtaskStatus.create(merge_task_id).to_dict(),
+                    'subtask_status_dict': SubtaskStatus.create(shard_task_id).to_dict(),
+                },
+                task_id=shard_task_id,
+            )
+        return progress
 
     def log_additional_info_for_testing(self, message):
         """
@@ -509,6 +764,8 @@ class CourseGradeReport(GradeReportBase):
     """
     Class to encapsulate functionality related to generating user/row had header data for Corse Grade Reports.
     """
+    REPORT_TYPE = 'course_grade_report'
+
     # Batch size for chunking the list of enrollees in the course.
     USER_BATCH_SIZE = 100
 
@@ -520,7 +777,10 @@ class CourseGradeReport(GradeReportBase):
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xblock_instance_args, _entry_id, course_id, _task_input, action_name)
             if use_on_disk_grade_reporting(course_id):  # AU-926
-                return TempFileCourseGradeReport(context)._generate()  # pylint: disable=protected-access
+                report = TempFileCourseGradeReport(context)
+                if sharded_grade_reports_enabled(course_id):
+                    return report._queue_shards(_xblock_instance_args)  # pylint: disable=protected-access
+                return report._generate()  # pylint: disable=protected-access
             else:
                 return InMemoryCourseGradeReport(context)._generate()  # pylint: disable=protected-access
 
@@ -710,6 +970,7 @@ class ProblemGradeReport(GradeReportBase):
     """
     Class to encapsulate functionality related to generating user/row had header data for Problem Grade Reports.
     """
+    REPORT_TYPE = 'problem_grade_report'
 
     @classmethod
     def generate(cls, _xblock_instance_args, _entry_id, course_id, _task_input, action_name):
@@ -719,7 +980,10 @@ class ProblemGradeReport(GradeReportBase):
         with modulestore().bulk_operations(course_id):
             context = _ProblemGradeReportContext(_xblock_instance_args, _entry_id, course_id, _task_input, action_name)
             if use_on_disk_grade_reporting(course_id):  # AU-926
-                return TempFileProblemGradeReport(context)._generate()  # pylint: disable=protected-access
+                report = TempFileProblemGradeReport(context)
+                if sharded_grade_reports_enabled(course_id):
+                    return report._queue_shards(_xblock_instance_args)  # pylint: disable=protected-access
+                return report._generate()  # pylint: disable=protected-access
             else:
                 return InMemoryProblemGradeReport(context)._generate()  # pylint: disable=protected-access
 
@@ -755,6 +1019,7 @@ class ProblemGradeReport(GradeReportBase):
             course=self.context.course,
             collected_block_structure=self.context.course_structure,
             course_key=self.context.course_id,
+            prefetch_scores=True,
         ):
             if not course_grade:
                 err_msg = str(error)
@@ -801,6 +1066,50 @@ class TempFileProblemGradeReport(ProblemGradeReport, TemporaryFileReportMixin):
     """ Program Grade Report that writes file iteratively to a TempFile to then be uploaded """
 
 
+# Grade report classes that can be generated in shards, and their contexts, by REPORT_TYPE.
+_SHARDED_GRADE_REPORTS = {
+    TempFileCourseGradeReport.REPORT_TYPE: (TempFileCourseGradeReport, _CourseGradeReportContext),
+    TempFileProblemGradeReport.REPORT_TYPE: (TempFileProblemGradeReport, _ProblemGradeReportContext),
+}
+
+
+def _get_sharded_grade_report(report_type, xblock_instance_args, entry_id, action_name, user_id_range=None):
+    """
+    Returns the report of the given type for the InstructorTask, limited to
+    the learners in user_id_range if given.
+    """
+    report_class, context_class = _SHARDED_GRADE_REPORTS[report_type]
+    entry = InstructorTask.objects.get(pk=entry_id)
+    context = context_class(
+        xblock_instance_args, entry_id, entry.course_id, json.loads(entry.task_input), action_name,
+    )
+    return report_class(context, user_id_range=user_id_range)
+
+
+def write_grade_report_shard(report_type, xblock_instance_args, entry_id, action_name, shard_index, user_id_range):
+    """
+    Writes the partial report of a shard of learners of a sharded grade
+    report. Returns the (succeeded, failed) learner counts of the shard.
+    """
+    report = _get_sharded_grade_report(report_type, xblock_instance_args, entry_id, action_name, user_id_range)
+    with modulestore().bulk_operations(report.context.course_id):
+        return report._generate_shard(shard_index)  # pylint: disable=protected-access
+
+
+def write_merged_grade_report(report_type, xblock_instance_args, entry_id, action_name, num_shards):
+    """
+    Merges the partial reports of all the shards of a sharded grade report,
+    and uploads the result.
+    """
+    subtasks = json.loads(InstructorTask.objects.get(pk=entry_id).subtasks)
+    if subtasks['failed']:
+        raise ValueError(f"Cannot merge grade report, {subtasks['failed']} shards failed")
+
+    report = _get_sharded_grade_report(report_type, xblock_instance_args, entry_id, action_name)
+    with modulestore().bulk_operations(report.context.course_id):
+        return report._merge_shards(num_shards)  # pylint: disable=protected-access
+
+
 class ProblemResponses:
     """
     Class to encapsulate functionality related to generating Problem Responses Reports.
@@ -54,7 +54,7 @@ def upload_csv_file_to_report_store(file, csv_name, course_id, timestamp, config
     Upload data as a CSV using ReportStore.
 
     Arguments:
-        rows: CSV data in a file-like object
+        file: UTF-8 encoded CSV data in a binary file-like object
         csv_name: Name of the resulting CSV
         course_id: ID of the course
         parent_dor: Name of the directory where the CSV file will be stored
@@ -69,11 +69,38 @@ def upload_csv_file_to_report_store(file, csv_name, course_id, timestamp, config
         timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
     )
 
-    report_store.store(course_id, report_name, file, parent_dir)
+    report_store.store_file(course_id, report_name, file, parent_dir)
     tracker_emit(csv_name)
     return report_name
 
 
+def upload_parquet_file_to_report_store(
+    file, report_name, course_id, timestamp, config_name='GRADES_DOWNLOAD', parent_dir='',
+):
+    """
+    Upload data as a Parquet file using ReportStore.
+
+    Arguments:
+        file: Parquet data in a binary file-like object
+        report_name: Name of the resulting report
+        course_id: ID of the course
+        parent_dir: Name of the directory where the Parquet file will be stored
+
+    Returns:
+        report_name: string - Name of the generated report
+    """
+    report_store = ReportStore.from_config(config_name)
+    parquet_name = "{course_prefix}_{report_name}_{timestamp_str}.parquet".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        report_name=report_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+    report_store.store_file(course_id, parquet_name, file, parent_dir)
+    tracker_emit(report_name)
+    return parquet_name
+
+
 def upload_zip_to_report_store(file, zip_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'):
     """
     Upload given file buffer as a zip file using ReportStore.
@@ -5,7 +5,7 @@ Tests for instructor_task/models.py.
 
 import copy
 import time
-from io import StringIO
+from io import BytesIO, StringIO
 import pytest
 from django.conf import settings
 from django.test import SimpleTestCase, TestCase, override_settings
@@ -66,6 +66,16 @@ class ReportStoreTestMixin:
 
         assert [link[0] for link in report_store.links_for(self.course_id)] == ['new_file', 'middle_file', 'old_file']
 
+    def test_store_file(self):
+        """
+        Test that ReportStore.store_file() stores the contents of a binary file.
+        """
+        report_store = self.create_report_store()  # lint-amnesty, pylint: disable=assignment-from-no-return
+        report_store.store_file(self.course_id, 'binary_file', BytesIO('caf\u00e9,1\r\n'.encode('utf-8')))
+
+        with report_store.storage.open(report_store.path_to(self.course_id, 'binary_file')) as stored_file:
+            assert stored_file.read() == 'caf\u00e9,1\r\n'.encode('utf-8')
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
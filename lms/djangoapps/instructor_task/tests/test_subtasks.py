@@ -6,13 +6,22 @@ Unit tests for instructor_task subtasks.
 from unittest.mock import Mock, patch
 from uuid import uuid4
 
+import ddt
+from celery.states import FAILURE, SUCCESS
+
 from common.djangoapps.student.models import CourseEnrollment
 from lms.djangoapps.instructor_task.data import InstructorTaskTypes
-from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    initialize_subtask_info,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
 
 
+@ddt.ddt
 class TestSubtasks(InstructorTaskCourseTestCase):
     """Tests for subtasks."""
 
@@ -81,3 +90,21 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         assert len(mock_create_subtask_fcn_args[0][0][0]) == 3
         assert len(mock_create_subtask_fcn_args[1][0][0]) == 3
         assert len(mock_create_subtask_fcn_args[2][0][0]) == 5
+
+    @ddt.data((False, SUCCESS), (True, FAILURE))
+    @ddt.unpack
+    def test_update_subtask_status_with_failed_subtask(self, fail_if_any_subtask_failed, expected_state):
+        """Test the state of the parent task once all its subtasks completed, one of them unsuccessfully."""
+        instructor_task = InstructorTaskFactory.create(course_id=self.course.id, task_id=str(uuid4()))
+        subtask_ids = [str(uuid4()), str(uuid4())]
+        initialize_subtask_info(instructor_task, 'action_name', 2, subtask_ids)
+
+        for subtask_id, state in zip(subtask_ids, [FAILURE, SUCCESS]):
+            subtask_status = SubtaskStatus.create(subtask_id)
+            subtask_status.increment(state=state)
+            update_subtask_status(
+                instructor_task.id, subtask_id, subtask_status, fail_if_any_subtask_failed=fail_if_any_subtask_failed,
+            )
+
+        instructor_task.refresh_from_db()
+        assert instructor_task.task_state == expected_state
@@ -7,6 +7,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 """
 
 
+import json
 import os
 import shutil
 import tempfile
@@ -18,6 +19,7 @@ from unittest.mock import ANY, MagicMock, Mock, patch
 import ddt
 import pytest
 import unicodecsv
+from celery.states import SUCCESS
 from django.conf import settings
 from django.test.utils import override_settings
 from edx_django_utils.cache import RequestCache
@@ -54,6 +56,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_ora2_submission_files,
     upload_ora2_summary
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -154,6 +157,66 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         assert any(('grade_report_err' in item[0]) for item in report_store.links_for(self.course.id))
 
+    @override_settings(GRADE_REPORT_LEARNERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report(self, _mock_current_task):
+        """
+        Test that a report generated in shards of learners is merged in order and tracked per shard.
+        """
+        students = [self.create_student(f'student{index}', f'student{index}@example.com') for index in range(5)]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_input=json.dumps({}))
+
+        with patch(USE_ON_DISK_GRADE_REPORT, return_value=True), patch(
+            'lms.djangoapps.instructor_task.tasks_helper.grades.sharded_grade_reports_enabled', return_value=True,
+        ):
+            CourseGradeReport.generate(None, entry.id, self.course.id, {}, 'graded')
+
+        entry.refresh_from_db()
+        assert entry.task_state == SUCCESS
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, json.loads(entry.task_output),
+        )
+        subtasks = json.loads(entry.subtasks)
+        # Three shards, plus the merge.
+        assert (subtasks['total'], subtasks['succeeded'], subtasks['failed']) == (4, 4, 0)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        assert len(links) == 1
+        with report_store.storage.open(report_store.path_to(self.course.id, links[0][0])) as csv_file:
+            usernames = [row['Username'] for row in unicodecsv.DictReader(csv_file, encoding='utf-8-sig')]
+        assert usernames == [student.username for student in students]
+
+    @ddt.data(True, False)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_columnar_report(self, columnar_enabled, _mock_current_task):
+        """
+        Test that a Parquet copy of the on-disk report is uploaded next to the CSV when enabled.
+        """
+        pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+        self.create_student('student1', 'student1@example.com')
+        self.create_student('ni\xf1o', 'ni\xf1o@example.com')
+
+        with patch(USE_ON_DISK_GRADE_REPORT, return_value=True), patch(
+            'lms.djangoapps.instructor_task.tasks_helper.grades.columnar_grade_reports_enabled',
+            return_value=columnar_enabled,
+        ):
+            result = CourseGradeReport.generate(None, None, self.course.id, {}, 'graded')
+        self.assertDictContainsSubset({'attempted': 2, 'succeeded': 2, 'failed': 0}, result)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        assert links[0][0].endswith('.csv')
+        parquet_names = [name for name, _ in links if name.endswith('.parquet')]
+        if not columnar_enabled:
+            assert not parquet_names
+            return
+
+        with report_store.storage.open(report_store.path_to(self.course.id, parquet_names[0])) as parquet_file:
+            table = pyarrow_parquet.read_table(parquet_file)
+        assert table.column_names == self.get_csv_row_with_headers()
+        assert sorted(table.column('Username').to_pylist()) == ['ni\xf1o', 'student1']
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
@@ -1213,6 +1213,35 @@ CACHES = {
     },
 }
 
+# .. setting_name: COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES
+# .. setting_default: 100 * 1024 * 1024
+# .. setting_description: Size, in bytes of pickled data, of the process-local LRU cache that split
+#   modulestore keeps in front of the 'course_structure_cache' django cache. Course structures are
+#   immutable per version, so recently used ones are kept pickled (uncompressed) in memory, and unpickled
+#   for each read. Set to 0 to disable.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+# .. setting_name: COURSE_ASSETS_DISK_CACHE_DIR
+# .. setting_default: None
+# .. setting_description: Directory on the local disk of each app server where the static content
+#   server caches course assets too large for the memcached 'course_assets_cache', keyed by their
+#   content digest. Set to None to disable the disk cache.
+COURSE_ASSETS_DISK_CACHE_DIR = None
+
+# .. setting_name: COURSE_ASSETS_DISK_CACHE_MAX_SIZE
+# .. setting_default: 10 * 1024 * 1024 * 1024
+# .. setting_description: Size, in bytes, that the files in COURSE_ASSETS_DISK_CACHE_DIR are allowed
+#   to take up. Least recently served files are evicted beyond this size.
+COURSE_ASSETS_DISK_CACHE_MAX_SIZE = 10 * 1024 * 1024 * 1024
+
+# .. setting_name: COURSE_ASSETS_DISK_CACHE_ACCEL_REDIRECT_PREFIX
+# .. setting_default: None
+# .. setting_description: If set, full responses for assets in COURSE_ASSETS_DISK_CACHE_DIR are handed
+#   off to the web server with an X-Accel-Redirect header to this internal location prefix, which must
+#   be mapped to COURSE_ASSETS_DISK_CACHE_DIR (e.g. an nginx "internal" location). If None, the files
+#   are returned as file responses for the WSGI server to send.
+COURSE_ASSETS_DISK_CACHE_ACCEL_REDIRECT_PREFIX = None
+
 ############################ OAUTH2 Provider ###################################
 OAUTH_EXPIRE_CONFIDENTIAL_CLIENT_DAYS = 365
 OAUTH_EXPIRE_PUBLIC_CLIENT_DAYS = 30
@@ -1794,6 +1823,32 @@ CODE_JAIL_REST_SERVICE_CONNECT_TIMEOUT = 0.5  # time in seconds
 # .. setting_description: Set the number of seconds LMS will wait for a response from the
 #   codejail remote service endpoint.
 CODE_JAIL_REST_SERVICE_READ_TIMEOUT = 3.5  # time in seconds
+# .. setting_name: CODE_JAIL_LOCAL_CACHE_MAX_BYTES
+# .. setting_default: 20 * 1024 * 1024
+# .. setting_description: Size, in bytes of serialized results, of the process-local LRU cache of
+#   sandboxed code results that safe_exec keeps in front of the django cache it is given. Set to 0 to disable.
+CODE_JAIL_LOCAL_CACHE_MAX_BYTES = 20 * 1024 * 1024
+# .. setting_name: CODE_JAIL_WORKER_POOL_SIZE
+# .. setting_default: 0
+# .. setting_description: Number of warm sandbox worker processes that each process running safe_exec keeps,
+#   to skip starting a sandboxed Python and importing numpy and scipy for every execution. Each execution
+#   still runs in a child process of its own, forked by the worker, with the limits of CODE_JAIL. Set to 0
+#   to start a new codejail sandbox for every execution. Not used with the codejail REST service.
+# .. setting_warning: The workers and their children run as the sandbox user, so they count towards the
+#   NPROC limit of the executions.
+CODE_JAIL_WORKER_POOL_SIZE = 0
+# .. setting_name: CODE_JAIL_WORKER_MAX_EXECUTIONS
+# .. setting_default: 100
+# .. setting_description: Number of executions after which a sandbox worker of the CODE_JAIL_WORKER_POOL_SIZE
+#   pool is replaced by a new one. Set to 0 to keep workers until they fail.
+CODE_JAIL_WORKER_MAX_EXECUTIONS = 100
+
+# .. setting_name: CAPA_PROBLEM_TREE_CACHE_MAX_BYTES
+# .. setting_default: 10 * 1024 * 1024
+# .. setting_description: Size, in bytes of problem XML, of the process-local LRU cache of preprocessed capa
+#   problems, which lets problems skip the compatibility transforms and the assignment of IDs and a11y data
+#   every time they are loaded. Entries are stored as serialized XML. Set to 0 to disable.
+CAPA_PROBLEM_TREE_CACHE_MAX_BYTES = 10 * 1024 * 1024
 
 
 ############################### DJANGO BUILT-INS ###############################
@@ -3720,6 +3775,17 @@ BADGR_ENABLE_NOTIFICATIONS = False
 # the ones that contain information other than grades.
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
+# .. setting_name: GRADE_REPORT_LEARNERS_PER_SHARD
+# .. setting_default: 5000
+# .. setting_description: Number of learners covered by each subtask when a course or problem grade report is
+#   generated in shards, see the instructor_task.sharded_grade_reports course waffle flag.
+GRADE_REPORT_LEARNERS_PER_SHARD = 5000
+
+# .. setting_name: GRADE_REPORT_SHARD_MAX_RETRIES
+# .. setting_default: 3
+# .. setting_description: Number of times a failed grade report shard subtask is retried before the report fails.
+GRADE_REPORT_SHARD_MAX_RETRIES = 3
+
 POLICY_CHANGE_GRADES_ROUTING_KEY = 'edx.lms.core.default'
 
 SINGLE_LEARNER_COURSE_REGRADE_ROUTING_KEY = 'edx.lms.core.default'
@@ -4283,6 +4349,31 @@ CREDENTIALS_PUBLIC_SERVICE_URL = 'http://localhost:8005'
 
 COMMENTS_SERVICE_URL = 'http://localhost:18080'
 COMMENTS_SERVICE_KEY = 'password'
+# .. setting_name: COMMENTS_SERVICE_CONNECTION_POOL_SIZE
+# .. setting_default: 10
+# .. setting_description: Number of connections to the comments service that each process keeps alive,
+#   to skip opening a new connection for every request. Set to 0 to open a new connection for every request.
+COMMENTS_SERVICE_CONNECTION_POOL_SIZE = 10
+# .. setting_name: COMMENTS_SERVICE_CONNECTION_RETRIES
+# .. setting_default: 2
+# .. setting_description: Number of times a request to the comments service is retried when the connection
+#   fails, with the pooled connections of COMMENTS_SERVICE_CONNECTION_POOL_SIZE. Only connection errors, and
+#   read errors of idempotent requests, are retried.
+COMMENTS_SERVICE_CONNECTION_RETRIES = 2
+# .. setting_name: COMMENTS_SERVICE_CONCURRENT_REQUESTS
+# .. setting_default: 4
+# .. setting_description: Number of threads, per process, that make requests to the comments service in the
+#   background, while the discussion APIs do something else, like loading the course. Set to 0 to make the
+#   requests in the thread of the request.
+COMMENTS_SERVICE_CONCURRENT_REQUESTS = 4
+# .. setting_name: COMMENTS_SERVICE_READ_CACHE_TIMEOUT
+# .. setting_default: 60
+# .. setting_description: Seconds for which the threads and comments retrieved from the comments service are
+#   cached. Writes made through the LMS invalidate the cached threads and comments that they change. Set to 0
+#   to disable the cache.
+# .. setting_warning: Changes made to the comments service other than through the LMS, for instance by
+#   another service, can take this long to show up.
+COMMENTS_SERVICE_READ_CACHE_TIMEOUT = 60
 
 # Reverification checkpoint name pattern
 CHECKPOINT_PATTERN = r'(?P<checkpoint_name>[^/]+)'
@@ -5239,6 +5330,28 @@ CUSTOM_PAGES_HELP_URL = "https://edx.readthedocs.io/projects/open-edx-building-a
 COURSE_BULK_EMAIL_HELP_URL = "https://edx.readthedocs.io/projects/open-edx-building-and-running-a-course/en/latest/manage_live_course/bulk_email.html"
 ORA_SETTINGS_HELP_URL = "https://edx.readthedocs.io/projects/open-edx-building-and-running-a-course/en/latest/course_assets/pages.html#configuring-course-level-open-response-assessment-settings"
 
+################# Course outlines (learning_sequences) #################
+
+# .. setting_name: LEARNING_SEQUENCES_OUTLINE_PROCESSOR_THREADS
+# .. setting_default: 0
+# .. setting_description: Number of threads, per process, that load the data of the outline processors of
+#   learning_sequences concurrently, so that the time it takes is that of the slowest processor rather than
+#   that of all of them. Set to 0 to load it in the request's thread, one processor after the other.
+# .. setting_warning: Each thread uses database connections of its own, which are kept according to
+#   CONN_MAX_AGE: with CONN_MAX_AGE set to 0, every load of a processor's data opens a new connection. The
+#   threads can't see what the calling thread hasn't committed yet, so they aren't used inside of transactions,
+#   which includes every request unless the view is exempt from ATOMIC_REQUESTS.
+LEARNING_SEQUENCES_OUTLINE_PROCESSOR_THREADS = 0
+
+# .. setting_name: LEARNING_SEQUENCES_USER_OUTLINE_CACHE_TIMEOUT
+# .. setting_default: 0
+# .. setting_description: Seconds for which the result of the outline processors of learning_sequences is
+#   cached, for each user, course and published version of the course. The result is only reused between the
+#   same release and due dates of the course, and isn't cached for masquerading staff. Set to 0 to disable.
+# .. setting_warning: Changes to a user's enrollment, cohort, schedule or exams, and content released in the
+#   meantime, can take this long to show in their outline.
+LEARNING_SEQUENCES_USER_OUTLINE_CACHE_TIMEOUT = 0
+
 ################# Bulk Course Email Settings #################
 # If set, recipients of bulk course email messages will be filtered based on the last_login date of their User account.
 # The expected value is an Integer representing the cutoff point (in months) for inclusion to the message. Example:
@@ -5381,6 +5494,12 @@ SUBSCRIPTIONS_SERVICE_WORKER_USERNAME = 'subscriptions_worker'
 NOTIFICATIONS_EXPIRY = 60
 EXPIRED_NOTIFICATIONS_DELETE_BATCH_SIZE = 10000
 NOTIFICATION_CREATION_BATCH_SIZE = 99
+# .. setting_name: NOTIFICATION_FANOUT_SUBTASK_SIZE
+# .. setting_default: 10000
+# .. setting_description: The send_notifications task splits audiences of more users than this into
+#   send_notifications_to_users subtasks of this many users each, so that the notifications of large courses
+#   are created by several workers in parallel. Set to 0 to always create them in the send_notifications task.
+NOTIFICATION_FANOUT_SUBTASK_SIZE = 10000
 
 #### django-simple-history##
 # disable indexing on date field its coming from django-simple-history.
@@ -224,6 +224,20 @@ CACHES = {
     },
 }
 
+# Structures are cached in-process only by tests that explicitly enable it
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 0
+
+# Sandboxed code results are cached in-process only by tests that explicitly enable it
+CODE_JAIL_LOCAL_CACHE_MAX_BYTES = 0
+
+# Parsed problems are cached in-process only by tests that explicitly enable it
+CAPA_PROBLEM_TREE_CACHE_MAX_BYTES = 0
+
+# Tests mock the requests to the comments service, and expect all of them to be made, in order
+COMMENTS_SERVICE_CONNECTION_POOL_SIZE = 0
+COMMENTS_SERVICE_CONCURRENT_REQUESTS = 0
+COMMENTS_SERVICE_READ_CACHE_TIMEOUT = 0
+
 ############################# SECURITY SETTINGS ################################
 # Default to advanced security in common.py, so tests can reset here to use
 # a simpler security model
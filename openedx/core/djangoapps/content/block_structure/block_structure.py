@@ -7,9 +7,11 @@ Module with family of classes for block structures.
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
     _BlockData - Data structure for a single block's data.
+    _BlockIndex - Integer-indexed snapshot of a structure's relations.
 """
 
 
+from array import array
 from copy import deepcopy
 from functools import partial
 from logging import getLogger
@@ -43,6 +45,120 @@ class _BlockRelations:
         self.children = []
 
 
+class _BlockIndex:
+    """
+    Read-only, integer-indexed snapshot of a block structure's relations.
+
+    Each block's usage key is interned to an integer index, and the
+    children and parents of all blocks are held in flat CSR-style arrays
+    (an array of per-block offsets into an array of related block indices).
+    Traversals over this snapshot track their state in bytearrays indexed by
+    block rather than in sets and dicts keyed by usage key, so they neither
+    hash usage keys repeatedly nor allocate per-block objects.
+    """
+    def __init__(self, block_relations):
+
+        # The relations map this snapshot was built from.
+        # dict {UsageKey: _BlockRelations}
+        self.block_relations = block_relations
+
+        # Usage keys in index order, and the reverse mapping.
+        # list [UsageKey], dict {UsageKey: int}
+        self.keys = list(block_relations)
+        self.index = {usage_key: block_index for block_index, usage_key in enumerate(self.keys)}
+
+        # CSR arrays of children and parents.
+        self._child_offsets, self._children = self._build_csr(block_relations, 'children')
+        self._parent_offsets, self._parents = self._build_csr(block_relations, 'parents')
+
+    def _build_csr(self, block_relations, relation_name):
+        """
+        Returns the (offsets, targets) arrays for the given relation.
+        """
+        offsets, targets = array('i', [0]), array('i')
+        for relations in block_relations.values():
+            targets.extend(self.index[usage_key] for usage_key in getattr(relations, relation_name))
+            offsets.append(len(targets))
+        return offsets, targets
+
+    def children_of(self, block_index):
+        """
+        Returns the indices of the children of the given block.
+        """
+        return self._children[self._child_offsets[block_index]:self._child_offsets[block_index + 1]]
+
+    def parents_of(self, block_index):
+        """
+        Returns the indices of the parents of the given block.
+        """
+        return self._parents[self._parent_offsets[block_index]:self._parent_offsets[block_index + 1]]
+
+    def post_order(self, start_index):
+        """
+        Returns the indices of the blocks reachable from the given block,
+        in the order of openedx.core.lib.graph_traversals.traverse_post_order.
+        """
+        visited = bytearray(len(self.keys))
+        order = []
+        stack = [(start_index, iter(self.children_of(start_index)))]
+        while stack:
+            block_index, children = stack[-1]
+            if visited[block_index]:
+                stack.pop()
+                continue
+            for child_index in children:
+                stack.append((child_index, iter(self.children_of(child_index))))
+                break
+            else:
+                order.append(block_index)
+                visited[block_index] = 1
+                stack.pop()
+        return order
+
+    def find_removals(self, start_index, removal_condition, keep_descendants):
+        """
+        Traverses the blocks topologically from the given block, as
+        openedx.core.lib.graph_traversals.traverse_topologically does, and
+        returns the usage keys of the blocks satisfying removal_condition,
+        in the order they were encountered.
+
+        The traversal behaves as though each block were removed (see
+        BlockStructureBlockData.remove_block) as soon as it was found: a
+        removed block hides its descendants unless keep_descendants is
+        True, in which case it is transparent to them instead.
+        """
+        visited = bytearray(len(self.keys))
+        yielded = bytearray(len(self.keys))
+        removals = []
+        stack = [start_index]
+        while stack:
+            block_index = stack.pop()
+
+            if block_index != start_index:
+                parents = self.parents_of(block_index)
+                if not all(visited[parent] for parent in parents):
+                    continue
+                if not any(yielded[parent] for parent in parents):
+                    continue
+
+            if visited[block_index]:
+                continue
+
+            children = self.children_of(block_index)
+            children.reverse()
+            stack.extend(children)
+
+            visited[block_index] = 1
+            usage_key = self.keys[block_index]
+            if removal_condition(usage_key):
+                removals.append(usage_key)
+                if keep_descendants:
+                    yielded[block_index] = any(yielded[parent] for parent in self.parents_of(block_index))
+            else:
+                yielded[block_index] = 1
+        return removals
+
+
 class BlockStructure:
     """
     Base class for a block structure.  BlockStructures are constructed
@@ -65,6 +181,11 @@ class BlockStructure:
         # dict {UsageKey: _BlockRelations}
         self._block_relations = {}
 
+        # Integer-indexed snapshot of _block_relations, built on demand and
+        # discarded whenever the relations change.
+        # _BlockIndex
+        self._block_index = None
+
         # Add the root block.
         self._add_block(self._block_relations, root_block_usage_key)
 
@@ -124,6 +245,7 @@ class BlockStructure:
         """
         self.root_block_usage_key = usage_key
         self._block_relations[usage_key].parents = []
+        self._block_index = None
 
     def __contains__(self, usage_key):
         """
@@ -212,26 +334,37 @@ class BlockStructure:
         # Create a new block relations map to store only those blocks
         # that are still linked
         pruned_block_relations = {}
-        old_block_relations = self._block_relations
+        block_index = self._get_block_index()
+        root_index = block_index.index.get(self.root_block_usage_key)
 
         # Build the structure from the leaves up by doing a post-order
         # traversal of the old structure, thereby encountering only
         # reachable blocks.
-        for block_key in self.post_order_traversal():
-            # If the block is in the old structure,
-            if block_key in old_block_relations:
+        if root_index is not None:
+            added = bytearray(len(block_index.keys))
+            for index in block_index.post_order(root_index):
                 # Add it to the new pruned structure
+                block_key = block_index.keys[index]
                 self._add_block(pruned_block_relations, block_key)
+                added[index] = 1
 
                 # Add a relationship to only those old children that
                 # were also added to the new pruned structure.
-                for child in old_block_relations[block_key].children:
-                    if child in pruned_block_relations:
-                        self._add_to_relations(pruned_block_relations, block_key, child)
+                for child_index in block_index.children_of(index):
+                    if added[child_index]:
+                        self._add_to_relations(pruned_block_relations, block_key, block_index.keys[child_index])
 
         # Replace this structure's relations with the newly pruned one.
         self._block_relations = pruned_block_relations
 
+    def _get_block_index(self):
+        """
+        Returns the _BlockIndex for this structure's current relations.
+        """
+        if self._block_index is None or self._block_index.block_relations is not self._block_relations:
+            self._block_index = _BlockIndex(self._block_relations)
+        return self._block_index
+
     def _add_relation(self, parent_key, child_key):
         """
         Adds a parent to child relationship in this block structure.
@@ -241,6 +374,7 @@ class BlockStructure:
             child_key (UsageKey) - Usage key of the child block.
         """
         self._add_to_relations(self._block_relations, parent_key, child_key)
+        self._block_index = None
 
     @staticmethod
     def _add_to_relations(block_relations, parent_key, child_key):
@@ -634,6 +768,7 @@ class BlockStructureBlockData(BlockStructure):
         # Remove block.
         self._block_relations.pop(usage_key, None)
         self._block_data_map.pop(usage_key, None)
+        self._block_index = None
 
         # Recreate the graph connections if descendants are to be kept.
         if keep_descendants:
@@ -700,12 +835,20 @@ class BlockStructureBlockData(BlockStructure):
 
             keep_descendants (bool) - See the description in
                 remove_block.
+
+        Note: The blocks to remove are all found, using the structure's
+        integer-indexed _BlockIndex, before any of them are removed. So
+        removal_condition should depend only on the given block and its
+        collected data, not on the relations of the structure.
         """
-        self.filter_topological_traversal(
-            filter_func=self.create_removal_filter(
-                removal_condition, keep_descendants
-            )
-        )
+        if self.root_block_usage_key not in self._block_relations:
+            return
+
+        block_index = self._get_block_index()
+        for usage_key in block_index.find_removals(
+            block_index.index[self.root_block_usage_key], removal_condition, keep_descendants,
+        ):
+            self.remove_block(usage_key, keep_descendants)
 
     def filter_topological_traversal(self, filter_func, **kwargs):
         """
@@ -817,6 +960,29 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
+    def _create_partial(self, usage_keys):
+        """
+        Returns a new BlockStructureModulestoreData with only the given
+        blocks and the relations amongst them.  The new structure shares
+        this structure's xBlocks and requested xBlock fields, so fields
+        requested while collecting the partial structure are collected for
+        this one.
+
+        Arguments:
+            usage_keys (set(UsageKey)) - Usage keys of the blocks to
+                include.  Must include the root block.
+        """
+        partial = BlockStructureModulestoreData(self.root_block_usage_key)
+        for usage_key, relations in self._block_relations.items():
+            if usage_key in usage_keys:
+                partial._add_block(partial._block_relations, usage_key)
+                for child_key in relations.children:
+                    if child_key in usage_keys:
+                        partial._add_relation(usage_key, child_key)
+        partial._xblock_map = self._xblock_map
+        partial._requested_xblock_fields = self._requested_xblock_fields
+        return partial
+
     def _add_xblock(self, usage_key, xblock):
         """
         Associates the given xBlock object with the given usage_key.
@@ -31,6 +31,34 @@ STORAGE_BACKING_FOR_CACHE = WaffleSwitch(
     "block_structure.storage_backing_for_cache", __name__
 )
 
+# .. toggle_name: block_structure.columnar_serialization
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, block structures are written to the cache and storage in the
+#   compact columnar format of block_structure/serialization.py rather than as a single zpickle'd
+#   tuple. Both formats are always readable, so this can be turned on (or off) at any time; it
+#   should only be enabled once all servers are running code that can read the columnar format.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+COLUMNAR_SERIALIZATION = WaffleSwitch(
+    "block_structure.columnar_serialization", __name__
+)
+
+# .. toggle_name: block_structure.incremental_collect
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, re-collecting a block structure (for example after a course
+#   publish) reuses the previously collected data for blocks that have not changed since, for
+#   transformers that declare SUPPORTS_PARTIAL_COLLECT. Only blocks whose edit time or children
+#   changed, together with their descendants and ancestors, are collected again by those transformers.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+INCREMENTAL_COLLECT = WaffleSwitch(
+    "block_structure.incremental_collect", __name__
+)
+
 
 def enable_storage_backing_for_cache_in_request():
     """
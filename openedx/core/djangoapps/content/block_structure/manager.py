@@ -6,6 +6,7 @@ BlockStructures.
 
 from contextlib import contextmanager
 
+from . import config
 from .exceptions import BlockStructureNotFound, TransformerDataIncompatible, UsageKeyNotInBlockStructure
 from .factory import BlockStructureFactory
 from .store import BlockStructureStore
@@ -122,10 +123,24 @@ class BlockStructureManager:
                 self.root_block_usage_key,
                 self.modulestore,
             )
-            BlockStructureTransformers.collect(block_structure)
+            BlockStructureTransformers.collect(block_structure, self._get_previous_collected())
             self.store.add(block_structure)
             return block_structure
 
+    def _get_previous_collected(self):
+        """
+        Returns the block structure currently in the store, regardless of
+        whether it's up-to-date with the modulestore, to collect
+        incrementally on top of.  Returns None if incremental collection is
+        disabled or there is no usable previous block structure.
+        """
+        if not config.INCREMENTAL_COLLECT.is_enabled():
+            return None
+        try:
+            return BlockStructureFactory.create_from_store(self.root_block_usage_key, self.store)
+        except BlockStructureNotFound:
+            return None
+
     def clear(self):
         """
         Removes data for the block structure associated with the given
@@ -0,0 +1,449 @@
+"""
+Compact, versioned serialization format for BlockStructure data.
+
+Rather than pickling the structure's internal objects wholesale, the data is
+laid out in columns:
+
+    * an interned table of the structure's usage keys, stored relative to the
+      root block's course key (block type table + block ids),
+    * integer-indexed parent and child adjacency arrays (CSR style),
+    * a column of collected xBlock field values, and
+    * one column per transformer holding that transformer's block data.
+
+Only the leaf field values within a column are pickled, since transformers
+may collect any picklable value.  None of this module's or the block
+structure's classes are pickled, so the format does not depend on their
+import paths or attributes.
+
+Transformer columns are decoded lazily: a transformer's column is only
+unpickled the first time that transformer's data is read from any block.
+
+Data that isn't in this format is assumed to be a legacy zpickle'd tuple,
+so previously stored structures remain readable.
+"""
+import pickle
+import struct
+import sys
+import zlib
+from array import array
+
+from opaque_keys.edx.keys import UsageKey
+
+from openedx.core.lib.cache_utils import zunpickle
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+
+# Leading bytes that identify this format.  zlib streams (and therefore
+# zpickle'd data) always begin with 0x78, so there is no ambiguity.
+MAGIC = b'BSC'
+FORMAT_VERSION = 1
+
+# Block type index used for usage keys that can't be rebuilt from the
+# root block's course key and are stored as full strings instead.
+_FULL_KEY = -1
+
+# Protocol used for pickled field values; kept constant so that the data
+# remains readable across python upgrades.
+_PICKLE_PROTOCOL = 4
+
+_UINT = struct.Struct('<I')
+_INT = struct.Struct('<i')
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given data was written by `serialize`.
+    """
+    return serialized_data[:len(MAGIC)] == MAGIC
+
+
+def serialize(root_block_usage_key, block_relations, transformer_data, block_data_map):
+    """
+    Returns the columnar serialization of the given block structure data.
+
+    Arguments:
+        root_block_usage_key (UsageKey) - The root of the block structure.
+        block_relations (dict {UsageKey: _BlockRelations})
+        transformer_data (TransformerDataMap)
+        block_data_map (dict {UsageKey: BlockData})
+    """
+    writer = _Writer()
+
+    # Key table: all blocks with relations come first so their index is
+    # also their position in the adjacency arrays.
+    key_index = {}
+    for usage_key in block_relations:
+        key_index[usage_key] = len(key_index)
+    for usage_key in block_data_map:
+        if usage_key not in key_index:
+            key_index[usage_key] = len(key_index)
+    _write_key_table(writer, root_block_usage_key.course_key, key_index)
+    writer.write_uint(len(block_relations))
+
+    # Adjacency arrays.
+    for attr in ('children', 'parents'):
+        offsets, targets = array('i', [0]), array('i')
+        for relations in block_relations.values():
+            targets.extend(key_index[related_key] for related_key in getattr(relations, attr))
+            offsets.append(len(targets))
+        writer.write_array(offsets)
+        writer.write_array(targets)
+
+    # Block data, in the order of the original map.
+    block_data_positions = array('i', (key_index[usage_key] for usage_key in block_data_map))
+    writer.write_array(block_data_positions)
+    block_datas = list(block_data_map.values())
+    writer.write_blob(_encode_column(
+        range(len(block_datas)),
+        [block_data.fields for block_data in block_datas],
+    ))
+
+    # Non-block-specific transformer data.
+    writer.write_blob(pickle.dumps(
+        [(name, data.fields) for name, data in transformer_data.items()],
+        _PICKLE_PROTOCOL,
+    ))
+
+    # Per-transformer block data columns.
+    columns = {}
+    for position, block_data in enumerate(block_datas):
+        for name, data in block_data.transformer_data.items():
+            positions, fields_list = columns.setdefault(name, ([], []))
+            positions.append(position)
+            fields_list.append(data.fields)
+    writer.write_uint(len(columns))
+    for name, (positions, fields_list) in columns.items():
+        writer.write_str(name)
+        writer.write_blob(_encode_column(positions, fields_list))
+
+    return MAGIC + bytes([FORMAT_VERSION]) + zlib.compress(writer.getvalue())
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Returns a (block_relations, transformer_data, block_data_map) tuple for
+    the given serialized data, in either the columnar or legacy pickled
+    format.
+
+    Arguments:
+        serialized_data (bytes) - Data returned by `serialize`, or a
+            zpickle'd tuple of the same three items.
+        root_block_usage_key (UsageKey) - The root of the block structure.
+    """
+    if not is_columnar(serialized_data):
+        return zunpickle(serialized_data)
+
+    version = serialized_data[len(MAGIC)]
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported block structure serialization version: {version}')
+
+    reader = _Reader(zlib.decompress(serialized_data[len(MAGIC) + 1:]))
+
+    usage_keys = _read_key_table(reader, root_block_usage_key.course_key)
+    num_related_blocks = reader.read_uint()
+
+    block_relations = {usage_key: _BlockRelations() for usage_key in usage_keys[:num_related_blocks]}
+    related_keys = list(block_relations.values())
+    for attr in ('children', 'parents'):
+        offsets = reader.read_array()
+        targets = reader.read_array()
+        for index, relations in enumerate(related_keys):
+            setattr(relations, attr, [usage_keys[target] for target in targets[offsets[index]:offsets[index + 1]]])
+
+    block_data_positions = reader.read_array()
+    lazy_loader = _LazyColumnLoader()
+    block_datas = []
+    for position in block_data_positions:
+        block_data = BlockData(usage_keys[position])
+        block_data.transformer_data = _LazyTransformerDataMap(lazy_loader)
+        block_datas.append(block_data)
+    for position, field_name, value in _decode_column(reader.read_blob()):
+        block_datas[position].fields[field_name] = value
+    block_data_map = {block_data.location: block_data for block_data in block_datas}
+
+    transformer_data = TransformerDataMap()
+    for name, fields in pickle.loads(reader.read_blob()):
+        transformer_data[name] = data = TransformerData()
+        data.fields = fields
+
+    for _ in range(reader.read_uint()):
+        name = reader.read_str()
+        lazy_loader.add_column(name, reader.read_blob())
+    lazy_loader.block_datas = block_datas
+
+    return block_relations, transformer_data, block_data_map
+
+
+def _write_key_table(writer, course_key, key_index):
+    """
+    Writes the interned table of usage keys.  Keys are stored as a block type
+    index and block id whenever the course key can rebuild them exactly.
+    """
+    block_types = {}
+    entries = []
+    for usage_key in key_index:
+        block_type, block_id = usage_key.block_type, usage_key.block_id
+        if course_key.make_usage_key(block_type, block_id) == usage_key:
+            type_index = block_types.setdefault(block_type, len(block_types))
+            entries.append((type_index, block_id))
+        else:
+            entries.append((_FULL_KEY, str(usage_key)))
+
+    writer.write_uint(len(block_types))
+    for block_type in block_types:
+        writer.write_str(block_type)
+    writer.write_uint(len(entries))
+    for type_index, value in entries:
+        writer.write_int(type_index)
+        writer.write_str(value)
+
+
+def _read_key_table(reader, course_key):
+    """
+    Reads the table written by `_write_key_table`, returning a list of usage keys.
+    """
+    block_types = [reader.read_str() for _ in range(reader.read_uint())]
+    usage_keys = []
+    for _ in range(reader.read_uint()):
+        type_index = reader.read_int()
+        value = reader.read_str()
+        if type_index == _FULL_KEY:
+            usage_keys.append(UsageKey.from_string(value))
+        else:
+            usage_keys.append(course_key.make_usage_key(block_types[type_index], value))
+    return usage_keys
+
+
+def _encode_column(positions, fields_list):
+    """
+    Encodes a column of field dicts for the blocks at the given positions.
+
+    The column is stored as the positions of the blocks that have an entry at
+    all, followed by, for each field name, the positions of the blocks that
+    have the field and the list of their values.
+    """
+    present = array('i', positions)
+    by_field = {}
+    for position, fields in zip(present, fields_list):
+        for field_name, value in fields.items():
+            field_positions, values = by_field.setdefault(field_name, (array('i'), []))
+            field_positions.append(position)
+            values.append(value)
+    return pickle.dumps(
+        (
+            _array_to_bytes(present),
+            [(field_name, _array_to_bytes(field_positions), values)
+             for field_name, (field_positions, values) in by_field.items()],
+        ),
+        _PICKLE_PROTOCOL,
+    )
+
+
+def _decode_column_positions(column):
+    """
+    Returns the positions of the blocks that have an entry in the column, and
+    the unpickled (field_name, positions, values) entries.
+    """
+    present, fields = pickle.loads(column)
+    return _array_from_bytes(present), fields
+
+
+def _decode_column(column):
+    """
+    Yields a (position, field_name, value) tuple for every value in the column.
+    """
+    _, fields = _decode_column_positions(column)
+    for field_name, positions, values in fields:
+        yield from ((position, field_name, value) for position, value in zip(_array_from_bytes(positions), values))
+
+
+class _LazyColumnLoader:
+    """
+    Holds the still-encoded transformer columns of a deserialized block
+    structure, and decodes each one into the blocks' TransformerDataMaps on
+    first use.
+    """
+    def __init__(self):
+        self.block_datas = []
+        self._pending = {}
+
+    def add_column(self, name, column):
+        """
+        Records the encoded column for the transformer with the given name.
+        """
+        self._pending[name] = column
+
+    def load(self, name):
+        """
+        Decodes the column for the transformer with the given name, if it
+        hasn't already been decoded.
+        """
+        column = self._pending.pop(name, None)
+        if column is None:
+            return
+
+        present, fields = _decode_column_positions(column)
+        transformer_datas = {}
+        for position in present:
+            transformer_datas[position] = data = TransformerData()
+            dict.__setitem__(self.block_datas[position].transformer_data, name, data)
+        for field_name, positions, values in fields:
+            for position, value in zip(_array_from_bytes(positions), values):
+                transformer_datas[position].fields[field_name] = value
+
+    def load_all(self):
+        """
+        Decodes all remaining columns.
+        """
+        for name in list(self._pending):
+            self.load(name)
+
+
+class _LazyTransformerDataMap(TransformerDataMap):
+    """
+    A TransformerDataMap whose entries are decoded from their transformer's
+    column on first access.
+
+    Looking up a single transformer only decodes that transformer's column;
+    any operation over the whole map decodes all of them.  Copies and
+    pickles of this map are plain TransformerDataMaps.
+    """
+    def __init__(self, loader):
+        super().__init__()
+        self._loader = loader
+
+    def __getitem__(self, key):
+        self._loader.load(self._translate_key(key))
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self._loader.load(self._translate_key(key))
+        return dict.__contains__(self, self._translate_key(key))
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        self._loader.load_all()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._loader.load_all()
+        return dict.__len__(self)
+
+    def __eq__(self, other):
+        self._loader.load_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        self._loader.load_all()
+        return dict.__repr__(self)
+
+    def keys(self):
+        self._loader.load_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._loader.load_all()
+        return dict.values(self)
+
+    def items(self):
+        self._loader.load_all()
+        return dict.items(self)
+
+    def pop(self, key, *args):
+        self._loader.load(self._translate_key(key))
+        return dict.pop(self, self._translate_key(key), *args)
+
+    def copy(self):
+        return TransformerDataMap(self.items())
+
+    def __reduce_ex__(self, protocol):
+        return (TransformerDataMap, (), None, None, iter(self.items()))
+
+
+def _array_to_bytes(values):
+    """
+    Returns the little-endian bytes of the given array of ints.
+    """
+    if sys.byteorder == 'big':
+        values = array('i', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _array_from_bytes(data):
+    """
+    Returns an array of ints from bytes written by `_array_to_bytes`.
+    """
+    values = array('i')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+class _Writer:
+    """
+    Minimal length-prefixed binary writer.
+    """
+    def __init__(self):
+        self._parts = []
+
+    def write_uint(self, value):
+        self._parts.append(_UINT.pack(value))
+
+    def write_int(self, value):
+        self._parts.append(_INT.pack(value))
+
+    def write_blob(self, value):
+        self.write_uint(len(value))
+        self._parts.append(value)
+
+    def write_str(self, value):
+        self.write_blob(value.encode('utf-8'))
+
+    def write_array(self, values):
+        self.write_blob(_array_to_bytes(values))
+
+    def getvalue(self):
+        return b''.join(self._parts)
+
+
+class _Reader:
+    """
+    Reader for data written by `_Writer`.
+    """
+    def __init__(self, data):
+        self._data = memoryview(data)
+        self._offset = 0
+
+    def read_uint(self):
+        (value,) = _UINT.unpack_from(self._data, self._offset)
+        self._offset += _UINT.size
+        return value
+
+    def read_int(self):
+        (value,) = _INT.unpack_from(self._data, self._offset)
+        self._offset += _INT.size
+        return value
+
+    def read_blob(self):
+        length = self.read_uint()
+        value = bytes(self._data[self._offset:self._offset + length])
+        self._offset += length
+        return value
+
+    def read_str(self):
+        return self.read_blob().decode('utf-8')
+
+    def read_array(self):
+        return _array_from_bytes(self.read_blob())
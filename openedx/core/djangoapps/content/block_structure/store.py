@@ -7,9 +7,9 @@ Module for the Storage of BlockStructure objects.
 from logging import getLogger
 
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.cache_utils import zpickle
 
-from . import config
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -200,15 +200,21 @@ class BlockStructureStore:
             block_structure.transformer_data,
             block_structure._block_data_map,
         )
+        if config.COLUMNAR_SERIALIZATION.is_enabled():
+            return serialization.serialize(block_structure.root_block_usage_key, *data_to_cache)
         return zpickle(data_to_cache)
 
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Data in either the columnar or the legacy pickled format is accepted.
         """
 
         try:
-            block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
+            block_relations, transformer_data, block_data_map = serialization.deserialize(
+                serialized_data, root_block_usage_key,
+            )
         except Exception:
             # Somehow failed to de-serialized the data, assume it's corrupt.
             bs_model = self._get_model(root_block_usage_key)
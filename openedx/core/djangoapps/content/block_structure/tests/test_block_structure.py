@@ -248,6 +248,48 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         block_structure.remove_block_traversal(lambda block: block == 2)
         self.assert_block_structure(block_structure, [[1], [], [], []], missing_blocks=[2])
 
+    @ddt.data(
+        *itertools.product(
+            [True, False],
+            [
+                ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+                ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+                ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+            ],
+            [{1}, {2}, {3}, {1, 3}, {2, 5}],
+        )
+    )
+    @ddt.unpack
+    def test_remove_block_traversal_matches_filter(self, keep_descendants, children_map, blocks_to_remove):
+        removal_condition = lambda block: block in blocks_to_remove  # pylint: disable=unnecessary-lambda-assignment
+
+        expected_structure = self.create_block_structure(children_map)
+        expected_structure.filter_topological_traversal(
+            filter_func=expected_structure.create_removal_filter(removal_condition, keep_descendants),
+        )
+
+        block_structure = self.create_block_structure(children_map)
+        block_structure.remove_block_traversal(removal_condition, keep_descendants)
+
+        for block_key in range(len(children_map)):
+            assert (block_key in block_structure) == (block_key in expected_structure)
+            assert block_structure.get_children(block_key) == expected_structure.get_children(block_key)
+            assert block_structure.get_parents(block_key) == expected_structure.get_parents(block_key)
+
+    def test_block_index_invalidation(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP)
+        block_index = block_structure._get_block_index()
+        assert block_structure._get_block_index() is block_index
+        assert list(block_index.children_of(block_index.index[1])) == [block_index.index[3], block_index.index[4]]
+        assert list(block_index.parents_of(block_index.index[3])) == [block_index.index[1]]
+
+        block_structure._add_relation(2, 5)
+        assert block_structure._get_block_index() is not block_index
+        assert 5 in block_structure._get_block_index().index
+
+        block_structure.remove_block(5, keep_descendants=False)
+        assert 5 not in block_structure._get_block_index().index
+
     def test_copy(self):
         def _set_value(structure, value):
             """
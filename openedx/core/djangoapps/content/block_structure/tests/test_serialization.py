@@ -0,0 +1,119 @@
+"""
+Tests for serialization.py
+"""
+# pylint: disable=protected-access
+
+from datetime import datetime
+from unittest import TestCase
+
+import ddt
+from opaque_keys.edx.locator import BlockUsageLocator
+from pytz import UTC
+
+from openedx.core.lib.cache_utils import zpickle
+
+from ..block_structure import TransformerDataMap
+from ..factory import BlockStructureFactory
+from ..serialization import deserialize, is_columnar, serialize
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+@ddt.ddt
+class TestColumnarSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar block structure serialization format.
+    """
+    def _create_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with xBlock
+        fields and transformer data set on its blocks.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_structure.override_xblock_field(block_key, 'display_name', f'Block {block_id}')
+            if block_id % 2:
+                block_structure.set_transformer_block_field(block_key, MockTransformer, 'odd', [block_id])
+        block_structure.override_xblock_field(
+            self.block_key_factory(0), 'start', datetime(2020, 1, 1, tzinfo=UTC),
+        )
+        return block_structure
+
+    def _round_trip(self, block_structure, serialized_data=None):
+        """
+        Serializes and deserializes the given block structure.
+        """
+        if serialized_data is None:
+            serialized_data = serialize(
+                block_structure.root_block_usage_key,
+                block_structure._block_relations,
+                block_structure.transformer_data,
+                block_structure._block_data_map,
+            )
+        return BlockStructureFactory.create_new(
+            block_structure.root_block_usage_key,
+            *deserialize(serialized_data, block_structure.root_block_usage_key)
+        )
+
+    def _assert_equal_data(self, block_structure, deserialized):
+        """
+        Verifies the collected data of the two block structures is the same.
+        """
+        assert list(deserialized) == list(block_structure)
+        assert deserialized._get_transformer_data_version(MockTransformer) == MockTransformer.WRITE_VERSION
+        for block_key, block_data in block_structure.iteritems():
+            assert deserialized[block_key].fields == block_data.fields
+            assert deserialized.get_transformer_block_field(block_key, MockTransformer, 'odd') ==\
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'odd')
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self._create_block_structure(children_map)
+        deserialized = self._round_trip(block_structure)
+        self.assert_block_structure(deserialized, children_map)
+        self._assert_equal_data(block_structure, deserialized)
+
+    def test_legacy_pickle_format(self):
+        block_structure = self._create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = zpickle((
+            block_structure._block_relations,
+            block_structure.transformer_data,
+            block_structure._block_data_map,
+        ))
+        assert not is_columnar(serialized_data)
+        deserialized = self._round_trip(block_structure, serialized_data)
+        self.assert_block_structure(deserialized, self.SIMPLE_CHILDREN_MAP)
+        self._assert_equal_data(block_structure, deserialized)
+
+    def test_foreign_usage_keys(self):
+        block_structure = self._create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        foreign_key = BlockUsageLocator(
+            self.course_key.replace(run='other_run'), block_type='html', block_id='foreign',
+        )
+        block_structure._add_relation(self.block_key_factory(1), foreign_key)
+        deserialized = self._round_trip(block_structure)
+        assert foreign_key in deserialized.get_children(self.block_key_factory(1))
+        assert deserialized.get_parents(foreign_key) == [self.block_key_factory(1)]
+
+    def test_lazy_transformer_columns(self):
+        block_structure = self._create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = self._round_trip(block_structure)
+        block_key = self.block_key_factory(1)
+        transformer_data = deserialized[block_key].transformer_data
+
+        # Nothing has been decoded until the transformer's data is read.
+        assert dict.__len__(transformer_data) == 0
+        assert deserialized.get_transformer_block_field(block_key, MockTransformer, 'odd') == [1]
+        assert dict.__len__(transformer_data) == 1
+
+    def test_copy_is_plain_transformer_data_map(self):
+        block_structure = self._create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        copied = self._round_trip(block_structure).copy()
+        block_key = self.block_key_factory(3)
+        assert type(copied[block_key].transformer_data) is TransformerDataMap  # pylint: disable=unidiomatic-typecheck
+        assert copied.get_transformer_block_field(block_key, MockTransformer, 'odd') == [3]
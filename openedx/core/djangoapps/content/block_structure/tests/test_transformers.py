@@ -9,7 +9,29 @@ import pytest
 from ..block_structure import BlockStructureModulestoreData
 from ..exceptions import TransformerDataIncompatible, TransformerException
 from ..transformers import BlockStructureTransformers
-from .helpers import ChildrenMapTestMixin, MockFilteringTransformer, MockTransformer, mock_registered_transformers
+from .helpers import (
+    ChildrenMapTestMixin,
+    MockFilteringTransformer,
+    MockTransformer,
+    MockXBlock,
+    mock_registered_transformers
+)
+
+
+class MockPartialTransformer(MockTransformer):
+    """
+    A mock transformer that supports partial collection, collecting each
+    block's 'value' xBlock field and recording which blocks it collected.
+    """
+    SUPPORTS_PARTIAL_COLLECT = True
+    collected_blocks = []
+
+    @classmethod
+    def collect(cls, block_structure):
+        for block_key in block_structure.topological_traversal():
+            cls.collected_blocks.append(block_key)
+            value = block_structure.get_xblock(block_key).value
+            block_structure.set_transformer_block_field(block_key, cls, 'value', value)
 
 
 class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
@@ -75,3 +97,51 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             assert self.transformers.verify_versions(block_structure)
+
+    def _create_collected_structure(self, values, edited_on, previous_block_structure=None):
+        """
+        Returns a block structure for SIMPLE_CHILDREN_MAP, collected by
+        MockPartialTransformer, whose blocks have the given values and edit times.
+        """
+        block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureModulestoreData)
+        for block_key in block_structure:
+            block_structure._add_xblock(  # pylint: disable=protected-access
+                block_key,
+                MockXBlock(block_key, field_map={'value': values[block_key], 'edited_on': edited_on[block_key]}),
+            )
+
+        MockPartialTransformer.collected_blocks = []
+        with mock_registered_transformers([MockPartialTransformer]):
+            BlockStructureTransformers.collect(block_structure, previous_block_structure)
+        return block_structure
+
+    def test_collect_partially(self):
+        previous_block_structure = self._create_collected_structure(
+            values=['a', 'b', 'c', 'd', 'e'], edited_on=[1, 1, 1, 1, 1],
+        )
+        assert set(MockPartialTransformer.collected_blocks) == {0, 1, 2, 3, 4}
+
+        # Block 3 has a new edit time, so it is re-collected, along with its
+        # ancestors 0 and 1. Block 4 keeps its old edit time, so its changed
+        # value isn't re-collected.
+        block_structure = self._create_collected_structure(
+            values=['a', 'b', 'c', 'new d', 'new e'], edited_on=[1, 1, 1, 2, 1],
+            previous_block_structure=previous_block_structure,
+        )
+        assert set(MockPartialTransformer.collected_blocks) == {0, 1, 3}
+        assert [
+            block_structure.get_transformer_block_field(block_key, MockPartialTransformer, 'value')
+            for block_key in range(5)
+        ] == ['a', 'b', 'c', 'new d', 'e']
+
+    def test_collect_partially_outdated_version(self):
+        previous_block_structure = self._create_collected_structure(
+            values=['a', 'b', 'c', 'd', 'e'], edited_on=[1, 1, 1, 1, 1],
+        )
+        previous_block_structure.set_transformer_data(MockPartialTransformer, '_version', 0)
+
+        self._create_collected_structure(
+            values=['a', 'b', 'c', 'd', 'e'], edited_on=[1, 1, 1, 1, 1],
+            previous_block_structure=previous_block_structure,
+        )
+        assert set(MockPartialTransformer.collected_blocks) == {0, 1, 2, 3, 4}
@@ -58,6 +58,21 @@ class BlockStructureTransformer:
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Whether the transformer's collect method can be run on only part of a
+    # block structure, when the structure is re-collected after a publish
+    # (see BlockStructureTransformers.collect).
+    #
+    # A transformer may set this to True only if the data it collects for
+    # any block depends on nothing but that block and its ancestors, and
+    # any non-block-specific data depends only on the root block.  The
+    # partial structure then contains each block that changed, all of its
+    # descendants, and all of their ancestors; data collected for the
+    # remaining blocks during the previous collect is reused as is.
+    #
+    # Transformers that aggregate data from descendants (counts, for
+    # example), or from the structure as a whole, must leave this False.
+    SUPPORTS_PARTIAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
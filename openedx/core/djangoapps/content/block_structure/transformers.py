@@ -9,6 +9,9 @@ from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# The xBlock field used to determine which blocks changed between collects.
+EDITED_ON_FIELD = 'edited_on'
+
 
 class BlockStructureTransformers:
     """
@@ -69,17 +72,88 @@ class BlockStructureTransformers:
         return self
 
     @classmethod
-    def collect(cls, block_structure):
+    def collect(cls, block_structure, previous_block_structure=None):
         """
         Collects data for each registered transformer.
+
+        Arguments:
+            block_structure (BlockStructureModulestoreData) - The block
+                structure to collect data for.
+
+            previous_block_structure (BlockStructureBlockData) - Optionally,
+                the previously collected block structure for the same root.
+                If given, transformers that support partial collection, and
+                whose data in it is of their current version, only collect
+                data for the blocks that changed since (along with their
+                descendants and ancestors), and reuse its data for the rest.
         """
+        # Edit times are collected for every block so later collects can
+        # tell which blocks changed.
+        block_structure.request_xblock_fields(EDITED_ON_FIELD)
+
+        partial_transformers = []
         for transformer in TransformerRegistry.get_registered_transformers():
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
-            transformer.collect(block_structure)
+            if previous_block_structure is not None and cls._can_collect_partially(
+                transformer, previous_block_structure,
+            ):
+                partial_transformers.append(transformer)
+            else:
+                transformer.collect(block_structure)
+
+        if partial_transformers:
+            cls._collect_partially(block_structure, previous_block_structure, partial_transformers)
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @classmethod
+    def _can_collect_partially(cls, transformer, previous_block_structure):
+        """
+        Returns whether the given transformer's data can be partially
+        re-collected on top of the previous block structure.
+        """
+        return (
+            transformer.SUPPORTS_PARTIAL_COLLECT and
+            previous_block_structure._get_transformer_data_version(  # pylint: disable=protected-access
+                transformer
+            ) == transformer.WRITE_VERSION
+        )
+
+    @classmethod
+    def _collect_partially(cls, block_structure, previous_block_structure, transformers):
+        """
+        Collects data for the given transformers on only the blocks of
+        block_structure that changed since previous_block_structure, their
+        descendants, and their ancestors, copying the transformers'
+        previously collected data for all other blocks.
+        """
+        blocks_to_collect = _get_blocks_to_recollect(block_structure, previous_block_structure)
+        logger.info(
+            "BlockStructure: Partially collecting %d of %d blocks for %s.",
+            len(blocks_to_collect),
+            len(block_structure),
+            block_structure.root_block_usage_key,
+        )
+
+        partial_block_structure = block_structure._create_partial(blocks_to_collect)  # pylint: disable=protected-access
+        for transformer in transformers:
+            partial_block_structure._add_transformer(transformer)  # pylint: disable=protected-access
+            transformer.collect(partial_block_structure)
+
+        for transformer in transformers:
+            for key, value in partial_block_structure.transformer_data[transformer].fields.items():
+                block_structure.set_transformer_data(transformer, key, value)
+
+            for block_key in block_structure:
+                source = partial_block_structure if block_key in blocks_to_collect else previous_block_structure
+                try:
+                    transformer_block_data = source.get_transformer_block_data(block_key, transformer)
+                except KeyError:
+                    continue
+                for key, value in transformer_block_data.fields.items():
+                    block_structure.set_transformer_block_field(block_key, transformer, key, value)
+
     @classmethod
     def verify_versions(cls, block_structure):
         """
@@ -138,3 +212,42 @@ class BlockStructureTransformers:
         """
         for transformer in self._transformers['no_filter']:
             transformer.transform(self.usage_info, block_structure)
+
+
+def _get_blocks_to_recollect(block_structure, previous_block_structure):
+    """
+    Returns the set of usage keys of the blocks in block_structure that
+    changed since previous_block_structure was collected, along with all of
+    their descendants and all of the ancestors of those.  The root block is
+    always included.
+
+    A block is considered changed if it's new, its edit time differs from
+    the one previously collected, or its children differ.
+    """
+    changed_blocks = [
+        block_key for block_key in block_structure
+        if (
+            block_key not in previous_block_structure or
+            block_structure.get_children(block_key) != previous_block_structure.get_children(block_key) or
+            previous_block_structure.get_xblock_field(block_key, EDITED_ON_FIELD) is None or
+            previous_block_structure.get_xblock_field(block_key, EDITED_ON_FIELD) !=
+            getattr(block_structure.get_xblock(block_key), EDITED_ON_FIELD, None)
+        )
+    ]
+
+    descendants = set()
+    for block_key in changed_blocks:
+        descendants.update(block_structure.post_order_traversal(
+            filter_func=lambda key: key not in descendants,
+            start_node=block_key,
+        ))
+
+    blocks_to_recollect = set(descendants)
+    blocks_to_recollect.add(block_structure.root_block_usage_key)
+    stack = list(descendants)
+    while stack:
+        for parent_key in block_structure.get_parents(stack.pop()):
+            if parent_key not in blocks_to_recollect:
+                blocks_to_recollect.add(parent_key)
+                stack.append(parent_key)
+    return blocks_to_recollect
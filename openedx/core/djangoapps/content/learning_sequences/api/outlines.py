@@ -4,19 +4,31 @@ directly. Use openedx.core.djangoapps.content.learning_sequences.api -- that
 __init__.py imports from here, and is a more stable place to import from.
 """
 import logging
+import os
+import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, FrozenSet, List, Optional, Union
+from functools import partial
+from itertools import islice
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Union
 
-from django.db import transaction
+import crum
+from django.conf import settings
+from django.db import close_old_connections, transaction
 from django.db.models.query import QuerySet
-from edx_django_utils.cache import TieredCache
+from edx_django_utils.cache import RequestCache, TieredCache
 from edx_django_utils.monitoring import function_trace, set_custom_attribute
 from opaque_keys import OpaqueKey
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import LibraryLocator
 from openedx.core import types
 
+from common.djangoapps.student.models import CourseEnrollment
+from common.djangoapps.student.roles import BulkRoleCache, RoleCache
+from lms.djangoapps.courseware.masquerade import is_masquerading
+
 from ..data import (
     ContentErrorData,
     CourseLearningSequenceData,
@@ -40,6 +52,7 @@ from ..models import (
     UserPartitionGroup
 )
 from .permissions import can_see_all_content
+from .processors.base import SharedOutlineData
 from .processors.cohort_partition_groups import CohortPartitionGroupsOutlineProcessor
 from .processors.content_gating import ContentGatingOutlineProcessor
 from .processors.enrollment import EnrollmentOutlineProcessor
@@ -58,6 +71,7 @@ __all__ = [
     'get_course_outline',
     'get_user_course_outline',
     'get_user_course_outline_details',
+    'get_user_course_outlines',
     'key_supports_outlines',
     'replace_course_outline',
 ]
@@ -265,9 +279,117 @@ def get_user_course_outline(course_key: CourseKey,
 
     See the definition of UserCourseOutlineData for details about the data
     returned.
+
+    What the outline processors decided for the user can be cached for a short
+    while, see LEARNING_SEQUENCES_USER_OUTLINE_CACHE_TIMEOUT. The cached result
+    is only used for times in the same period of the course's schedule (between
+    the same release and due dates), and never while masquerading, since staff
+    see the outline of the role they masquerade as under their own user id.
     """
-    user_course_outline, _ = _get_user_course_outline_and_processors(course_key, user, at_time)
-    return user_course_outline
+    set_custom_attribute('learning_sequences.api.user_id', user.id)
+    full_course_outline = get_course_outline(course_key)
+
+    cache_timeout = getattr(settings, 'LEARNING_SEQUENCES_USER_OUTLINE_CACHE_TIMEOUT', 0)
+    if cache_timeout and is_masquerading(user, course_key):
+        cache_timeout = 0
+    if cache_timeout:
+        cache_key = "learning_sequences.api.get_user_course_outline.v2.{}.{}.{}".format(
+            course_key, full_course_outline.published_version, user.id
+        )
+        cached_result = TieredCache.get_cached_response(cache_key)
+        if cached_result.is_found:
+            usage_keys_to_remove, inaccessible_sequences, unchanged_from, unchanged_until = cached_result.value
+            if (
+                (unchanged_from is None or unchanged_from <= at_time) and
+                (unchanged_until is None or at_time < unchanged_until)
+            ):
+                set_custom_attribute('learning_sequences.api.user_outline_cached', True)
+                return _make_user_course_outline(
+                    full_course_outline, user, at_time, usage_keys_to_remove, inaccessible_sequences
+                )
+
+    processors, usage_keys_to_remove, inaccessible_sequences = _run_outline_processors(
+        full_course_outline, user, at_time
+    )
+    if cache_timeout:
+        unchanged_from, unchanged_until = processors['schedule'].unchanged_between(full_course_outline)
+        TieredCache.set_all_tiers(
+            cache_key,
+            (usage_keys_to_remove, inaccessible_sequences, unchanged_from, unchanged_until),
+            cache_timeout,
+        )
+
+    return _make_user_course_outline(full_course_outline, user, at_time, usage_keys_to_remove, inaccessible_sequences)
+
+
+def get_user_course_outlines(course_key: CourseKey,
+                             users: Iterable[types.User],
+                             at_time: datetime,
+                             batch_size: int = 100) -> Iterator[UserCourseOutlineData]:
+    """
+    Get the outlines of many users for the same course, at a particular time.
+
+    The outlines are the same as get_user_course_outline would return for each
+    of the `users`, but the outline processors load the data of `batch_size`
+    users at once, with a few queries per batch rather than per user (see
+    OutlineProcessor.bulk_load_data).
+
+    This is a generator: the outlines are computed lazily, in the order of
+    `users`, and only the data of one batch of users is kept at a time.
+    """
+    full_course_outline = get_course_outline(course_key)
+    users = iter(users)
+    while True:
+        batch = list(islice(users, batch_size))
+        if not batch:
+            return
+        with function_trace('learning_sequences.api.get_user_course_outlines.batch'):
+            yield from _get_user_course_outlines_batch(full_course_outline, batch, at_time)
+
+
+def _get_user_course_outlines_batch(full_course_outline: CourseOutlineData,
+                                    users: List[types.User],
+                                    at_time: datetime) -> Iterator[UserCourseOutlineData]:
+    """
+    Run the outline processors for a batch of users, and generate their outlines.
+    """
+    course_key = full_course_outline.course_key
+    authenticated_users = [user for user in users if not user.is_anonymous]
+
+    # Drop the enrollments of the previous batch, to keep memory usage low.
+    RequestCache(CourseEnrollment.MODE_CACHE_NAMESPACE).clear()
+    shared_data = SharedOutlineData(course_key, users)
+    shared_data.load()
+
+    # The course roles tell staff and beta testers apart. They are kept on the
+    # user objects, where the threads that load processor data find them too.
+    BulkRoleCache.prefetch(authenticated_users)
+    for user in authenticated_users:
+        user._roles = RoleCache(user)  # pylint: disable=protected-access
+
+    processors_by_user = [
+        {name: processor_cls(course_key, user, at_time) for name, processor_cls in OUTLINE_PROCESSOR_CLASSES}
+        for user in users
+    ]
+    _run_data_loaders(
+        {
+            name: partial(
+                processor_cls.bulk_load_data,
+                [processors[name] for processors in processors_by_user],
+                full_course_outline,
+            )
+            for name, processor_cls in OUTLINE_PROCESSOR_CLASSES
+        },
+        shared_data,
+    )
+
+    for user, processors in zip(users, processors_by_user):
+        usage_keys_to_remove, inaccessible_sequences = _apply_outline_processors(
+            processors, full_course_outline, can_see_all_content(user, course_key)
+        )
+        yield _make_user_course_outline(
+            full_course_outline, user, at_time, usage_keys_to_remove, inaccessible_sequences
+        )
 
 
 @function_trace('learning_sequences.api.get_user_course_outline_details')
@@ -298,6 +420,22 @@ def get_user_course_outline_details(course_key: CourseKey,
     )
 
 
+# These are processors that alter which sequences are visible to students.
+# For instance, certain sequences that are intentionally hidden or not yet
+# released. These do not need to be run for staff users. This is where we
+# would add in pluggability for OutlineProcessors down the road.
+OUTLINE_PROCESSOR_CLASSES = [
+    ('content_gating', ContentGatingOutlineProcessor),
+    ('milestones', MilestonesOutlineProcessor),
+    ('schedule', ScheduleOutlineProcessor),
+    ('special_exams', SpecialExamsOutlineProcessor),
+    ('visibility', VisibilityOutlineProcessor),
+    ('enrollment', EnrollmentOutlineProcessor),
+    ('enrollment_track_partitions', EnrollmentTrackPartitionGroupsOutlineProcessor),
+    ('cohorts_partitions', CohortPartitionGroupsOutlineProcessor),
+]
+
+
 def _get_user_course_outline_and_processors(course_key: CourseKey,  # lint-amnesty, pylint: disable=missing-function-docstring
                                             user: types.User,
                                             at_time: datetime):
@@ -315,35 +453,51 @@ def _get_user_course_outline_and_processors(course_key: CourseKey,  # lint-amnes
     set_custom_attribute('learning_sequences.api.user_id', user.id)
 
     full_course_outline = get_course_outline(course_key)
+    processors, usage_keys_to_remove, inaccessible_sequences = _run_outline_processors(
+        full_course_outline, user, at_time
+    )
+    user_course_outline = _make_user_course_outline(
+        full_course_outline, user, at_time, usage_keys_to_remove, inaccessible_sequences
+    )
+    return user_course_outline, processors
+
+
+def _run_outline_processors(full_course_outline: CourseOutlineData, user: types.User, at_time: datetime):
+    """
+    Run the outline processors for `user`.
+
+    Returns the processors, which have loaded their data, and the sets of
+    usage keys they remove and of sequences they make inaccessible.
+    """
+    course_key = full_course_outline.course_key
     user_can_see_all_content = can_see_all_content(user, course_key)
 
-    # These are processors that alter which sequences are visible to students.
-    # For instance, certain sequences that are intentionally hidden or not yet
-    # released. These do not need to be run for staff users. This is where we
-    # would add in pluggability for OutlineProcessors down the road.
-    processor_classes = [
-        ('content_gating', ContentGatingOutlineProcessor),
-        ('milestones', MilestonesOutlineProcessor),
-        ('schedule', ScheduleOutlineProcessor),
-        ('special_exams', SpecialExamsOutlineProcessor),
-        ('visibility', VisibilityOutlineProcessor),
-        ('enrollment', EnrollmentOutlineProcessor),
-        ('enrollment_track_partitions', EnrollmentTrackPartitionGroupsOutlineProcessor),
-        ('cohorts_partitions', CohortPartitionGroupsOutlineProcessor),
-    ]
+    processors = {
+        name: processor_cls(course_key, user, at_time)
+        for name, processor_cls in OUTLINE_PROCESSOR_CLASSES
+    }
+    shared_data = SharedOutlineData(course_key, [user])
+    shared_data.load()
+    _load_processors_data(processors, full_course_outline, shared_data)
+
+    usage_keys_to_remove, inaccessible_sequences = _apply_outline_processors(
+        processors, full_course_outline, user_can_see_all_content
+    )
+    return processors, usage_keys_to_remove, inaccessible_sequences
+
 
+def _apply_outline_processors(processors, full_course_outline: CourseOutlineData, user_can_see_all_content: bool):
+    """
+    Run the `processors`, which have loaded their data, for a user.
+
+    Returns the usage keys they remove, and the sequences they make inaccessible.
+    """
     # Run each OutlineProcessor in order to figure out what items we have to
     # remove from the CourseOutline.
-    processors = {}
     usage_keys_to_remove = set()
     inaccessible_sequences = set()
-    for name, processor_cls in processor_classes:
-        # Future optimization: This should be parallelizable (don't rely on a
-        # particular ordering).
-        processor = processor_cls(course_key, user, at_time)
-        processors[name] = processor
-        processor.load_data(full_course_outline)
-        if not user_can_see_all_content:
+    if not user_can_see_all_content:
+        for name, processor in processors.items():
             # function_trace lets us see how expensive each processor is being.
             with function_trace(f'learning_sequences.api.outline_processors.{name}'):
                 processor_usage_keys_removed = processor.usage_keys_to_remove(full_course_outline)
@@ -351,11 +505,22 @@ def _get_user_course_outline_and_processors(course_key: CourseKey,  # lint-amnes
                 usage_keys_to_remove |= processor_usage_keys_removed
                 inaccessible_sequences |= processor_inaccessible_sequences
 
+    return frozenset(usage_keys_to_remove), frozenset(inaccessible_sequences)
+
+
+def _make_user_course_outline(full_course_outline: CourseOutlineData,
+                              user: types.User,
+                              at_time: datetime,
+                              usage_keys_to_remove: FrozenSet,
+                              inaccessible_sequences: FrozenSet) -> UserCourseOutlineData:
+    """
+    Return the outline of `full_course_outline` for `user`, once the processors have run.
+    """
     # Open question: Does it make sense to remove a Section if it has no Sequences in it?
     trimmed_course_outline = full_course_outline.remove(usage_keys_to_remove)
     accessible_sequences = frozenset(set(trimmed_course_outline.sequences) - inaccessible_sequences)
 
-    user_course_outline = UserCourseOutlineData(
+    return UserCourseOutlineData(
         base_outline=full_course_outline,
         user=user,
         at_time=at_time,
@@ -376,7 +541,100 @@ def _get_user_course_outline_and_processors(course_key: CourseKey,  # lint-amnes
         }
     )
 
-    return user_course_outline, processors
+
+_PROCESSOR_EXECUTOR = None
+_PROCESSOR_EXECUTOR_PID = None
+_PROCESSOR_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_processor_executor():
+    """
+    Return the thread pool that loads outline processor data, or None to load it in the calling thread.
+
+    The pool is sized by the LEARNING_SEQUENCES_OUTLINE_PROCESSOR_THREADS
+    setting, and is re-created in forked processes.
+    """
+    global _PROCESSOR_EXECUTOR, _PROCESSOR_EXECUTOR_PID  # pylint: disable=global-statement
+    max_workers = getattr(settings, 'LEARNING_SEQUENCES_OUTLINE_PROCESSOR_THREADS', 0)
+    if not max_workers:
+        return None
+    with _PROCESSOR_EXECUTOR_LOCK:
+        if (
+            _PROCESSOR_EXECUTOR is None or
+            _PROCESSOR_EXECUTOR_PID != os.getpid() or
+            _PROCESSOR_EXECUTOR._max_workers != max_workers  # pylint: disable=protected-access
+        ):
+            _PROCESSOR_EXECUTOR = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='learning-sequences-outline'
+            )
+            _PROCESSOR_EXECUTOR_PID = os.getpid()
+        return _PROCESSOR_EXECUTOR
+
+
+def _run_data_loader(name, load, shared_data, request=None, in_thread=False):
+    """
+    Run `load`, which loads the data of the `name` processor(s), and return how long it took, in milliseconds.
+
+    In a thread of the pool, the request cache starts out with only the shared
+    data in it, and is emptied again afterwards, since the thread goes on to
+    serve other requests.
+    """
+    if in_thread:
+        RequestCache.clear_all_namespaces()
+        shared_data.prime_request_cache()
+        crum.set_current_request(request)
+        close_old_connections()
+    try:
+        start = time.perf_counter()
+        with function_trace(f'learning_sequences.api.outline_processors.{name}.load_data'):
+            load()
+        return (time.perf_counter() - start) * 1000
+    finally:
+        if in_thread:
+            crum.set_current_request(None)
+            RequestCache.clear_all_namespaces()
+            close_old_connections()
+
+
+def _load_processors_data(processors, full_course_outline, shared_data):
+    """
+    Run the `load_data` of all of the `processors`, concurrently if there is a thread pool for it.
+    """
+    _run_data_loaders(
+        {name: partial(processor.load_data, full_course_outline) for name, processor in processors.items()},
+        shared_data,
+    )
+
+
+def _run_data_loaders(loaders, shared_data):
+    """
+    Run the `loaders`, by processor name, concurrently if there is a thread pool for it.
+
+    The time each of them took is recorded as a custom attribute.
+
+    The threads of the pool use database connections of their own, which can't
+    see what the transaction of the calling thread hasn't committed yet, so the
+    data is loaded in the calling thread inside of transactions (including the
+    requests of databases with ATOMIC_REQUESTS).
+    """
+    executor = _get_processor_executor()
+    if executor is None or transaction.get_connection().in_atomic_block:
+        shared_data.prime_request_cache()
+        durations = {
+            name: _run_data_loader(name, load, shared_data)
+            for name, load in loaders.items()
+        }
+    else:
+        request = crum.get_current_request()
+        futures = {
+            name: executor.submit(_run_data_loader, name, load, shared_data, request, True)
+            for name, load in loaders.items()
+        }
+        # Exceptions are raised here, in the calling thread.
+        durations = {name: future.result() for name, future in futures.items()}
+
+    for name, duration in durations.items():
+        set_custom_attribute(f'learning_sequences.api.outline_processors.{name}.load_data_ms', round(duration, 1))
 
 
 @function_trace('learning_sequences.api.replace_course_outline')
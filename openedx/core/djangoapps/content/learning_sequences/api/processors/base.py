@@ -8,6 +8,9 @@ from datetime import datetime
 from opaque_keys.edx.keys import CourseKey  # lint-amnesty, pylint: disable=unused-import
 from openedx.core import types
 
+from common.djangoapps.student.models import CourseEnrollment
+from common.djangoapps.student.models.course_enrollment import CourseEnrollmentState
+
 from ...data import CourseOutlineData
 
 log = logging.getLogger(__name__)
@@ -20,15 +23,17 @@ class OutlineProcessor:
     You can inherit from this class and extend any of its four main methods:
     __init__, load_data, inaccessible_sequences, usage_keys_to_remove.
 
-    An OutlineProcessor is invoked synchronously during a request for the
-    CourseOutline. The steps are:
+    An OutlineProcessor is invoked during a request for the CourseOutline.
+    The steps are:
         * __init__
-        * load_data
+        * load_data (or bulk_load_data, for the outlines of many users)
         * inaccessible_sequences, usage_keys_to_remove (no ordering guarantee)
 
     Also note that you should not assume any ordering relative to any other
-    OutlineProcessor. Once async support works its way fully into Django, we'll
-    likely even want to run these in parallel.
+    OutlineProcessor. The load_data of each OutlineProcessor may run in a
+    thread of its own, concurrently with the others (see
+    LEARNING_SEQUENCES_OUTLINE_PROCESSOR_THREADS). That thread has a request
+    cache of its own, primed with the SharedOutlineData.
 
     Some outline processors (like ScheduleOutlineProcessor) may choose to have
     additional methods to return specific metadata to feed into
@@ -61,6 +66,18 @@ class OutlineProcessor:
         """
         pass  # lint-amnesty, pylint: disable=unnecessary-pass
 
+    @classmethod
+    def bulk_load_data(cls, processors, full_course_outline: CourseOutlineData):
+        """
+        Run load_data for many processors of this class at once, each for a different user.
+
+        This is used for the outlines of many users (see get_user_course_outlines).
+        The default runs the load_data of each processor in turn. Override it to
+        fetch the data of all of the users with a few queries instead.
+        """
+        for processor in processors:
+            processor.load_data(full_course_outline)
+
     def inaccessible_sequences(self, full_course_outline: CourseOutlineData):  # pylint: disable=unused-argument
         """
         Return a set/frozenset of Sequence UsageKeys that are not accessible.
@@ -78,3 +95,57 @@ class OutlineProcessor:
         there is no need to check for staff access here.
         """
         return frozenset()
+
+
+class SharedOutlineData:
+    """
+    Data that several OutlineProcessors need, fetched once for all of them.
+
+    The OutlineProcessors of an outline would otherwise each fetch it, in their
+    own thread when they load their data concurrently, since threads don't
+    share a request cache. The data is fetched for many users at once, for
+    bulk outlines, and put in the request cache of the threads that need it by
+    `prime_request_cache`, where the usual helpers (like
+    CourseEnrollment.is_enrolled) find it.
+    """
+
+    def __init__(self, course_key: CourseKey, users):
+        self.course_key = course_key
+        self.users = [user for user in users if not user.is_anonymous]
+        # user id -> CourseEnrollmentState
+        self.enrollment_states = {}
+
+    def load(self):
+        """
+        Fetch the enrollments of all of the users, with one query.
+
+        Enrollments already in the current thread's request cache aren't fetched again.
+        """
+        missing_user_ids = []
+        for user in self.users:
+            enrollment_state = CourseEnrollment._get_enrollment_in_request_cache(  # pylint: disable=protected-access
+                user, self.course_key
+            )
+            if enrollment_state is None:
+                missing_user_ids.append(user.id)
+                enrollment_state = CourseEnrollmentState(None, None)
+            self.enrollment_states[user.id] = enrollment_state
+        if not missing_user_ids:
+            return
+
+        enrollments = CourseEnrollment.objects.filter(
+            course_id=self.course_key, user_id__in=missing_user_ids
+        ).values_list('user_id', 'mode', 'is_active')
+        for user_id, mode, is_active in enrollments:
+            self.enrollment_states[user_id] = CourseEnrollmentState(mode, is_active)
+
+    def prime_request_cache(self):
+        """
+        Put the shared data in the request cache of the current thread.
+        """
+        for user in self.users:
+            enrollment_state = self.enrollment_states.get(user.id)
+            if enrollment_state is not None:
+                CourseEnrollment._update_enrollment_in_request_cache(  # pylint: disable=protected-access
+                    user, self.course_key, enrollment_state
+                )
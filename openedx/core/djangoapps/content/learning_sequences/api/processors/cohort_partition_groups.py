@@ -7,9 +7,11 @@ from opaque_keys.edx.keys import CourseKey
 
 from openedx.core import types
 from openedx.core.djangoapps.course_groups.cohorts import (
+    bulk_cache_cohorts,
     get_cohort,
     get_cohorted_user_partition_id,
     get_group_info_for_cohort,
+    is_course_cohorted,
 )
 
 from .base import OutlineProcessor
@@ -43,6 +45,31 @@ class CohortPartitionGroupsOutlineProcessor(OutlineProcessor):
             if user_cohort:
                 self.user_cohort_group_id, _ = get_group_info_for_cohort(user_cohort)
 
+    @classmethod
+    def bulk_load_data(cls, processors, full_course_outline) -> None:
+        """
+        Load the cohorted partition id once, and the users' cohorts with one query.
+        """
+        if not processors:
+            return
+        course_key = processors[0].course_key
+        cohorted_partition_id = get_cohorted_user_partition_id(course_key)
+        for processor in processors:
+            processor.cohorted_partition_id = cohorted_partition_id
+        if not cohorted_partition_id:
+            return
+
+        bulk_cache_cohorts(course_key, [processor.user for processor in processors if not processor.user.is_anonymous])
+        course_is_cohorted = is_course_cohorted(course_key)
+        for processor in processors:
+            user_cohort = get_cohort(processor.user, course_key, use_cached=True)
+            if user_cohort is None and course_is_cohorted:
+                # Users without a cohort get one assigned, like in load_data.
+                user_cohort = get_cohort(processor.user, course_key)
+            if user_cohort:
+                # The group of each cohort is only fetched once.
+                processor.user_cohort_group_id, _ = get_group_info_for_cohort(user_cohort, use_cached=True)
+
     def _is_user_excluded_by_partition_group(self, user_partition_groups) -> bool:
         """
         Is the user part of the group to which the block is restricting content?
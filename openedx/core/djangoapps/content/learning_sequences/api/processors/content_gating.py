@@ -39,6 +39,22 @@ class ContentGatingOutlineProcessor(OutlineProcessor):
                 self.user, self.course_key
             )
 
+    @classmethod
+    def bulk_load_data(cls, processors, full_course_outline):
+        """
+        Find which of the users can skip the entrance exam with one query.
+        """
+        if not processors:
+            return
+        course_key = processors[0].course_key
+        users = [processor.user for processor in processors if processor.user.is_authenticated]
+        user_ids_that_can_skip = (
+            EntranceExamConfiguration.user_ids_that_can_skip_entrance_exam(users, course_key) if users else set()
+        )
+        for processor in processors:
+            processor.required_content = milestones_helpers.get_required_content(course_key, processor.user)
+            processor.can_skip_entrance_exam = processor.user.id in user_ids_that_can_skip
+
     def inaccessible_sequences(self, full_course_outline):
         """
         Mark any section that is gated by required content as inaccessible
@@ -113,6 +113,33 @@ class ScheduleOutlineProcessor(OutlineProcessor):
 
         return inaccessible
 
+    def unchanged_between(self, full_course_outline):
+        """
+        Return the (start, end) of the period around `at_time` over which
+        `inaccessible_sequences` doesn't change.
+
+        These are the closest times, at or before `at_time` and after it, at
+        which some content is released or closes. Either is None if there is
+        no such time.
+        """
+        if self._is_beta_tester and full_course_outline.days_early_for_beta is not None:
+            start_offset = timedelta(days=full_course_outline.days_early_for_beta)
+        else:
+            start_offset = timedelta(days=0)
+
+        changes = []
+        for fields in self.keys_to_schedule_fields.values():
+            for field_name, date in fields.items():
+                if field_name == 'start':
+                    # Content is accessible from its start on...
+                    changes.append(date - start_offset)
+                else:
+                    # ...and can be inaccessible once it is past due.
+                    changes.append(date + timedelta(microseconds=1))
+        start = max((change for change in changes if change <= self.at_time), default=None)
+        end = min((change for change in changes if change > self.at_time), default=None)
+        return start, end
+
     def schedule_data(self, pruned_course_outline: UserCourseOutlineData) -> ScheduleData:
         """
         Return supplementary scheduling information for this outline.
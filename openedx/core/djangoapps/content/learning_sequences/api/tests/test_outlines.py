@@ -2,13 +2,17 @@
 Top level API tests. Tests API public contracts only. Do not import/create/mock
 models for this app.
 """
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
+import threading
 import unittest
 
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
 from django.db.models import signals
+from django.test import override_settings
+from edx_django_utils.cache import RequestCache
 from edx_proctoring.exceptions import ProctoredExamNotFoundException
 from edx_toggles.toggles.testutils import override_waffle_flag
 from edx_when.api import set_dates_for_course
@@ -26,8 +30,11 @@ from openedx.features.course_experience import COURSE_ENABLE_UNENROLLED_ACCESS_F
 from common.djangoapps.course_modes.models import CourseMode
 from common.djangoapps.course_modes.signals import update_masters_access_course
 from common.djangoapps.student.auth import user_has_role
+from common.djangoapps.student.models import CourseEnrollment
+from common.djangoapps.student.models.course_enrollment import CourseEnrollmentState
 from common.djangoapps.student.roles import CourseBetaTesterRole
 from common.djangoapps.student.tests.factories import BetaTesterFactory, UserFactory
+from lms.djangoapps.courseware.masquerade import CourseMasquerade
 from xmodule.partitions.partitions import (  # lint-amnesty, pylint: disable=wrong-import-order
     ENROLLMENT_TRACK_PARTITION_ID,
 )
@@ -47,9 +54,12 @@ from ..outlines import (
     get_course_outline,
     get_user_course_outline,
     get_user_course_outline_details,
+    get_user_course_outlines,
     key_supports_outlines,
     replace_course_outline,
 )
+from ..outlines import _load_processors_data  # pylint: disable=protected-access
+from ..processors.base import OutlineProcessor, SharedOutlineData
 from ..processors.enrollment_track_partition_groups import EnrollmentTrackPartitionGroupsOutlineProcessor
 from .test_data import generate_sections
 
@@ -1318,6 +1328,199 @@ class SequentialVisibilityTestCase(CacheIsolationTestCase):
                         'Sequences should be accessible to enrolled, staff users for a public_outline course'
 
 
+class UserCourseOutlineCacheTestCase(CacheIsolationTestCase):
+    """
+    Tests for the short-lived cache of what the outline processors decided for a user.
+    """
+    ENABLED_CACHES = ['default']
+
+    @classmethod
+    def setUpTestData(cls):  # lint-amnesty, pylint: disable=super-method-not-called
+        cls.student = UserFactory.create(username='student', email='student@example.com', is_staff=False)
+        cls.course_key = CourseKey.from_string("course-v1:OpenEdX+Outline+Cache")
+        cls.at_time = datetime(2020, 5, 21, tzinfo=timezone.utc)
+        set_dates_for_course(
+            cls.course_key, [(cls.course_key.make_usage_key('course', 'course'), {'start': cls.at_time})]
+        )
+        cls.course_outline = CourseOutlineData(
+            course_key=cls.course_key,
+            title="User Outline Cache Test Course!",
+            published_at=datetime(2020, 5, 20, tzinfo=timezone.utc),
+            published_version="5ebece4b69dd593d82fe2020",
+            entrance_exam_id=None,
+            days_early_for_beta=None,
+            sections=generate_sections(cls.course_key, [2, 1]),
+            self_paced=False,
+            course_visibility=CourseVisibility.PRIVATE
+        )
+        replace_course_outline(cls.course_outline)
+        cls.student.courseenrollment_set.create(course_id=cls.course_key, is_active=True, mode="audit")
+
+    def unenroll_student(self):
+        CourseEnrollment.objects.filter(user=self.student, course_id=self.course_key).delete()
+        RequestCache.clear_all_namespaces()
+
+    @override_settings(LEARNING_SEQUENCES_USER_OUTLINE_CACHE_TIMEOUT=60)
+    def test_cached(self):
+        outline = get_user_course_outline(self.course_key, self.student, self.at_time)
+        assert len(outline.sequences) == 3
+        self.unenroll_student()
+
+        # The student still sees what they saw while the result is cached...
+        cached_outline = get_user_course_outline(self.course_key, self.student, self.at_time)
+        assert cached_outline == outline
+
+        # ... but not once the course is published again.
+        replace_course_outline(attr.evolve(self.course_outline, published_version="6ebece4b69dd593d82fe2020"))
+        assert len(get_user_course_outline(self.course_key, self.student, self.at_time).sequences) == 0
+
+    def test_not_cached(self):
+        assert len(get_user_course_outline(self.course_key, self.student, self.at_time).sequences) == 3
+        self.unenroll_student()
+        assert len(get_user_course_outline(self.course_key, self.student, self.at_time).sequences) == 0
+
+    @override_settings(LEARNING_SEQUENCES_USER_OUTLINE_CACHE_TIMEOUT=60)
+    def test_cached_within_schedule_period(self):
+        outline = get_user_course_outline(self.course_key, self.student, self.at_time)
+        assert len(outline.accessible_sequences) == 3
+        self.unenroll_student()
+
+        # Nothing is released or closes after the course starts, so the result is the same later on...
+        later = self.at_time + timedelta(days=30)
+        later_outline = get_user_course_outline(self.course_key, self.student, later)
+        assert later_outline.at_time == later
+        assert len(later_outline.sequences) == 3
+
+        # ... but not before the course starts.
+        earlier = self.at_time - timedelta(days=1)
+        assert len(get_user_course_outline(self.course_key, self.student, earlier).sequences) == 0
+
+    @override_settings(LEARNING_SEQUENCES_USER_OUTLINE_CACHE_TIMEOUT=60)
+    def test_not_cached_while_masquerading(self):
+        self.student.masquerade_settings = {self.course_key: CourseMasquerade(self.course_key, role='student')}
+        self.addCleanup(delattr, self.student, 'masquerade_settings')
+        assert len(get_user_course_outline(self.course_key, self.student, self.at_time).sequences) == 3
+        self.unenroll_student()
+        assert len(get_user_course_outline(self.course_key, self.student, self.at_time).sequences) == 0
+
+
+class UserCourseOutlinesTestCase(CacheIsolationTestCase):
+    """
+    Tests for the outlines of many users at once.
+    """
+    @classmethod
+    def setUpTestData(cls):  # lint-amnesty, pylint: disable=super-method-not-called
+        cls.course_key = CourseKey.from_string("course-v1:OpenEdX+Outline+Bulk")
+        cls.at_time = datetime(2020, 5, 21, tzinfo=timezone.utc)
+        # The course starts tomorrow, so only beta testers can get to it today.
+        set_dates_for_course(
+            cls.course_key,
+            [(cls.course_key.make_usage_key('course', 'course'), {'start': datetime(2020, 5, 22, tzinfo=timezone.utc)})]
+        )
+        cls.course_outline = CourseOutlineData(
+            course_key=cls.course_key,
+            title="Bulk User Outlines Test Course!",
+            published_at=datetime(2020, 5, 20, tzinfo=timezone.utc),
+            published_version="5ebece4b69dd593d82fe2021",
+            entrance_exam_id=None,
+            days_early_for_beta=2,
+            sections=generate_sections(cls.course_key, [2, 1]),
+            self_paced=False,
+            course_visibility=CourseVisibility.PRIVATE
+        )
+        replace_course_outline(cls.course_outline)
+
+        cls.students = [
+            UserFactory.create(username=f'student{index}', email=f'student{index}@example.com')
+            for index in range(3)
+        ]
+        for student in cls.students[:2]:
+            student.courseenrollment_set.create(course_id=cls.course_key, is_active=True, mode="audit")
+        cls.beta_tester = BetaTesterFactory(course_key=cls.course_key)
+        cls.beta_tester.courseenrollment_set.create(course_id=cls.course_key, is_active=True, mode="audit")
+        cls.global_staff = UserFactory.create(
+            username='global_staff', email='gstaff@example.com', is_staff=True
+        )
+        cls.users = cls.students + [cls.beta_tester, cls.global_staff, AnonymousUser()]
+
+    def test_same_as_single_outlines(self):
+        expected_outlines = [
+            get_user_course_outline(self.course_key, user, self.at_time) for user in self.users
+        ]
+        RequestCache.clear_all_namespaces()
+
+        outlines = list(get_user_course_outlines(self.course_key, self.users, self.at_time, batch_size=4))
+        assert outlines == expected_outlines
+        assert [outline.user for outline in outlines] == self.users
+
+        # Enrolled students see the course, which they can't get to yet, unlike
+        # beta testers and staff.
+        assert len(outlines[0].sequences) == 3
+        assert len(outlines[0].accessible_sequences) == 0
+        assert len(outlines[2].sequences) == 0
+        assert len(outlines[3].accessible_sequences) == 3
+        assert len(outlines[4].accessible_sequences) == 3
+
+    def test_lazy(self):
+        users = iter(self.users)
+        outlines = get_user_course_outlines(self.course_key, users, self.at_time, batch_size=2)
+        assert next(outlines).user == self.users[0]
+        # Only the first batch of users was taken.
+        assert next(users) == self.users[2]
+
+    def test_no_users(self):
+        assert not list(get_user_course_outlines(self.course_key, [], self.at_time))
+
+
+class ConcurrentLoadDataTestCase(unittest.TestCase):
+    """
+    Tests for loading the data of outline processors from a thread pool.
+    """
+    class RecordingProcessor(OutlineProcessor):
+        """
+        Processor that records which thread loaded its data, and the user's enrollment that it saw.
+        """
+        def load_data(self, full_course_outline):
+            self.thread = threading.current_thread()
+            self.enrollment_state = CourseEnrollment.enrollment_mode_for_user(self.user, self.course_key)
+
+    def setUp(self):
+        super().setUp()
+        self.course_key = CourseKey.from_string("course-v1:OpenEdX+Outline+Threads")
+        self.user = UserFactory.build(id=1000)
+        self.shared_data = SharedOutlineData(self.course_key, [self.user])
+        self.shared_data.enrollment_states[self.user.id] = CourseEnrollmentState('verified', True)
+        self.addCleanup(RequestCache.clear_all_namespaces)
+
+    def load(self):
+        processors = {
+            name: self.RecordingProcessor(self.course_key, self.user, datetime.now(timezone.utc))
+            for name in ('first', 'second')
+        }
+        _load_processors_data(processors, None, self.shared_data)
+        return processors
+
+    @override_settings(LEARNING_SEQUENCES_OUTLINE_PROCESSOR_THREADS=2)
+    def test_threads(self):
+        processors = self.load()
+        for processor in processors.values():
+            assert processor.thread is not threading.current_thread()
+            assert processor.enrollment_state == ('verified', True)
+
+    def test_no_threads(self):
+        processors = self.load()
+        for processor in processors.values():
+            assert processor.thread is threading.current_thread()
+            assert processor.enrollment_state == ('verified', True)
+
+    @override_settings(LEARNING_SEQUENCES_OUTLINE_PROCESSOR_THREADS=2)
+    def test_no_threads_in_transaction(self):
+        with patch.object(transaction.get_connection(), 'in_atomic_block', True):
+            processors = self.load()
+        for processor in processors.values():
+            assert processor.thread is threading.current_thread()
+
+
 @ddt.ddt
 class EnrollmentTrackPartitionGroupsTestCase(OutlineProcessorTestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
     """Tests for enrollment track partitions outline processor that affect outlines"""
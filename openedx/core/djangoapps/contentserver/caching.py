@@ -1,11 +1,28 @@
 """
 Helper functions for caching course assets.
+
+Small assets are cached whole in the "course_assets" django cache. Larger assets
+can additionally be cached on the local disk of each app server, see
+:class:`DiskContentCache`. The same cache also holds, per course, the lock state
+and digest of every asset, used to build versioned asset URLs without a lookup
+per asset (see :func:`get_asset_digests`).
 """
+import logging
+import mmap
+import os
+import tempfile
+import threading
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from openedx.core.lib.cache_utils import get_cache
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContent, StaticContentStream
+from xmodule.contentstore.django import contentstore
+
+log = logging.getLogger(__name__)
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -48,3 +65,284 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    del_asset_digests(location.course_key)
+
+
+# How long the per-course asset digests are cached for. They are deleted whenever an asset
+# changes through Studio or a course import, so this only bounds the staleness of changes
+# made some other way (e.g. by management commands).
+ASSET_DIGESTS_CACHE_TIMEOUT = 60 * 60
+
+# The digests of courses with more assets than this are not looked up all at once: they would not
+# fit in a single cache item (memcached's limit is 1MB), so they would be read from the contentstore
+# on every request.
+ASSET_DIGESTS_MAX_ASSETS = 3000
+
+
+def _asset_digests_cache_key(course_key):
+    return f'asset_digests.{course_key}'.encode('utf-8')
+
+
+def get_asset_digests(course_key):
+    """
+    Returns a dict mapping the name of each of the course's assets to a ``(locked, content_digest)`` tuple,
+    or None if the course has more than ASSET_DIGESTS_MAX_ASSETS assets, in which case each asset has to
+    be looked up on its own.
+
+    The dict is read from the contentstore with a single query, and kept both in the
+    content cache and for the rest of the request.
+    """
+    request_cache = get_cache('contentserver.asset_digests')
+    key = str(course_key)
+    if key not in request_cache:
+        digests = CONTENT_CACHE.get(_asset_digests_cache_key(course_key), version=STATIC_CONTENT_VERSION)
+        if digests is None:
+            digests = contentstore().get_asset_digests_for_course(course_key, max_assets=ASSET_DIGESTS_MAX_ASSETS)
+            # Courses with too many assets are cached as False, so they aren't scanned again.
+            CONTENT_CACHE.set(
+                _asset_digests_cache_key(course_key), False if digests is None else digests,
+                ASSET_DIGESTS_CACHE_TIMEOUT, version=STATIC_CONTENT_VERSION,
+            )
+        request_cache[key] = None if digests is False else digests
+    return request_cache[key]
+
+
+def del_asset_digests(course_key):
+    """
+    Deletes the cached asset digests of the given course, after any of its assets changed.
+    """
+    CONTENT_CACHE.delete(_asset_digests_cache_key(course_key), version=STATIC_CONTENT_VERSION)
+    get_cache('contentserver.asset_digests').pop(str(course_key), None)
+
+
+# Chunk size used to copy assets to the disk cache and to stream them back out.
+DISK_CACHE_CHUNK_SIZE = 64 * 1024
+
+
+class DiskCachedContent(StaticContentStream):
+    """
+    An asset whose data is served from a file in the :class:`DiskContentCache`.
+
+    The file is memory-mapped on first use, so streaming it, or any byte range
+    of it, reads straight from the page cache.
+    """
+    def __init__(self, content, path, relative_path):
+        super().__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+        self.path = path
+        self.relative_path = relative_path
+        self._mmap = None
+
+    def _get_mmap(self):
+        """
+        Map the cached file into memory, the first time it is needed.
+        """
+        if self._mmap is None:
+            with open(self.path, 'rb') as cached_file:
+                self._mmap = mmap.mmap(cached_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def stream_data(self):
+        if self.length:
+            yield from self.stream_data_in_range(0, self.length - 1)
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        data = self._get_mmap()
+        for position in range(first_byte, last_byte + 1, DISK_CACHE_CHUNK_SIZE):
+            yield data[position:min(position + DISK_CACHE_CHUNK_SIZE, last_byte + 1)]
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def copy_to_in_mem(self):
+        with open(self.path, 'rb') as cached_file:
+            data = cached_file.read()
+        return StaticContent(
+            self.location, self.name, self.content_type, data,
+            last_modified_at=self.last_modified_at, thumbnail_location=self.thumbnail_location,
+            import_path=self.import_path, length=self.length, locked=self.locked,
+            content_digest=self.content_digest,
+        )
+
+
+class DiskContentCache:
+    """
+    A size-bounded cache of asset data on the local disk, addressed by the
+    content digest of each asset so that the same file is shared by every
+    course and location that uses it.
+
+    Files are written to a temporary file and atomically renamed into place,
+    so a reader never sees a partial file, and several processes can share the
+    same directory. Use refreshes a file's modification time, and when the
+    cache grows past ``max_size`` the least recently used files are removed,
+    down to ``EVICTION_TARGET`` of ``max_size`` so the next few sets don't
+    have to evict again.
+
+    The size of the cache is tracked as files are added, so the directory is
+    only scanned to evict files when the cache looks full. Since other
+    processes add files too, it is also scanned after every
+    ``RESCAN_INTERVAL`` files this process adds, to catch up with them.
+    """
+    EVICTION_TARGET = 0.9
+    RESCAN_INTERVAL = 100
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        # The size of the cache as of the last scan, plus the files added by this process since then.
+        self._estimated_size = None
+        self._sets_since_scan = 0
+        self._lock = threading.Lock()
+
+    def relative_path(self, content_digest):
+        """
+        Return the path, relative to the cache directory, of the file for `content_digest`.
+        """
+        return os.path.join(content_digest[:2], content_digest)
+
+    def is_cacheable(self, content):
+        """
+        Return whether `content` can be kept in this cache.
+        """
+        content_digest = getattr(content, 'content_digest', None)
+        return (
+            bool(content_digest) and
+            content_digest.isalnum() and
+            content.length is not None and
+            content.length <= self.max_size // 4
+        )
+
+    def get(self, content):
+        """
+        Return a :class:`DiskCachedContent` for `content` if its data is cached, or None.
+        """
+        if not self.is_cacheable(content):
+            return None
+
+        relative_path = self.relative_path(content.content_digest)
+        path = os.path.join(self.directory, relative_path)
+        try:
+            if os.path.getsize(path) != content.length:
+                return None
+            # Mark the file as recently used.
+            os.utime(path)
+        except OSError:
+            return None
+        return DiskCachedContent(content, path, relative_path)
+
+    def set(self, content):
+        """
+        Copy the data of the streamed `content` into the cache.
+
+        Returns a :class:`DiskCachedContent` for it, or None if it could not be cached,
+        in which case `content` may have been partially read.
+        """
+        if not self.is_cacheable(content):
+            return None
+
+        relative_path = self.relative_path(content.content_digest)
+        path = os.path.join(self.directory, relative_path)
+        try:
+            try:
+                replaced_size = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced_size = 0
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    for chunk in content.stream_data():
+                        temp_file.write(chunk)
+                if os.path.getsize(temp_path) != content.length:
+                    raise OSError(f"Incomplete copy of {content.location} to the disk cache")
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            log.exception("Unable to add %s to the asset disk cache", content.location)
+            return None
+
+        self._record_added(content.length - replaced_size)
+        return DiskCachedContent(content, path, relative_path)
+
+    def _record_added(self, size):
+        """
+        Account for `size` bytes added to the cache, evicting files if it may now be too large.
+        """
+        with self._lock:
+            self._sets_since_scan += 1
+            if self._estimated_size is not None:
+                self._estimated_size += size
+            if (
+                self._estimated_size is None or
+                self._estimated_size > self.max_size or
+                self._sets_since_scan >= self.RESCAN_INTERVAL
+            ):
+                self._estimated_size = self.evict()
+                self._sets_since_scan = 0
+
+    def evict(self):
+        """
+        Scan the cache and, if it is larger than ``max_size``, remove the least recently used
+        files until it is no larger than ``EVICTION_TARGET`` of ``max_size``.
+
+        Returns the size of the cache once done.
+        """
+        entries = []
+        total_size = 0
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith('.tmp-'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return total_size
+
+        target_size = int(self.max_size * self.EVICTION_TARGET)
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total_size -= size
+            if total_size <= target_size:
+                break
+        return total_size
+
+
+_DISK_CONTENT_CACHE = None
+
+
+def get_disk_content_cache():
+    """
+    Return the :class:`DiskContentCache` configured by the ``COURSE_ASSETS_DISK_CACHE_DIR``
+    setting, or None if the disk cache is not enabled.
+    """
+    global _DISK_CONTENT_CACHE  # pylint: disable=global-statement
+    directory = getattr(settings, 'COURSE_ASSETS_DISK_CACHE_DIR', None)
+    if not directory:
+        return None
+
+    max_size = getattr(settings, 'COURSE_ASSETS_DISK_CACHE_MAX_SIZE', 10 * 1024 * 1024 * 1024)
+    cache = _DISK_CONTENT_CACHE
+    if cache is None or cache.directory != directory or cache.max_size != max_size:
+        cache = _DISK_CONTENT_CACHE = DiskContentCache(directory, max_size)
+    return cache
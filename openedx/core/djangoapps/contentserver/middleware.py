@@ -5,8 +5,11 @@ Middleware to serve assets.
 
 import datetime
 import logging
+from uuid import uuid4
 
+from django.conf import settings
 from django.http import (
+    FileResponse,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
@@ -26,7 +29,7 @@ from xmodule.exceptions import NotFoundError  # lint-amnesty, pylint: disable=wr
 from xmodule.modulestore import InvalidLocationError  # lint-amnesty, pylint: disable=wrong-import-order
 from xmodule.modulestore.exceptions import ItemNotFoundError  # lint-amnesty, pylint: disable=wrong-import-order
 
-from .caching import get_cached_content, set_cached_content
+from .caching import DiskCachedContent, get_cached_content, get_disk_content_cache, set_cached_content
 from .models import CdnUserAgentsConfig, CourseAssetCacheTtlConfig
 
 log = logging.getLogger(__name__)
@@ -133,7 +136,8 @@ class StaticContentServer(MiddlewareMixin):
             response = None
             if request.META.get('HTTP_RANGE'):
                 # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
+                # Disk cached content is served from its memory-mapped file instead.
+                if isinstance(content, StaticContent) and not isinstance(content, DiskCachedContent):
                     content = AssetManager.find(loc, as_stream=True)
 
                 header_value = request.META['HTTP_RANGE']
@@ -149,38 +153,43 @@ class StaticContentServer(MiddlewareMixin):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning("Unknown unit in Range header: %s for content: %s", header_value, str(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
-                        log.warning(
-                            "More than 1 ranges in Range header: %s for content: %s", header_value, str(loc)
-                        )
                     else:
-                        first, last = ranges[0]
+                        ranges = coalesce_ranges(
+                            (first, last) for first, last in ranges if 0 <= first <= last < content.length
+                        )
+                        if not ranges:
+                            log.warning(
+                                "Cannot satisfy ranges in Range header: %s for content: %s",
+                                header_value, str(loc)
+                            )
+                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
-                        if 0 <= first <= last < content.length:
+                        if len(ranges) == 1:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            first, last = ranges[0]
+                            response = HttpResponse(closing_stream(content, content.stream_data_in_range(first, last)))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            if newrelic:
-                                newrelic.agent.add_custom_parameter('contentserver.ranged', True)
                         else:
-                            log.warning(
-                                "Cannot satisfy ranges in Range header: %s for content: %s",
-                                header_value, str(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            # According to Http/1.1 spec content for multiple ranges should be sent as a
+                            # multipart message.
+                            # https://www.rfc-editor.org/rfc/rfc7233#section-4.1
+                            response = multipart_byteranges_response(content, ranges)
+                        response.status_code = 206  # Partial Content
+
+                        if newrelic:
+                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
+                            newrelic.agent.add_custom_parameter('contentserver.range_count', len(ranges))
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
-                response['Content-Length'] = content.length
+                if isinstance(content, DiskCachedContent):
+                    response = self.disk_cached_response(content)
+                else:
+                    response = HttpResponse(content.stream_data())
+                    response['Content-Length'] = content.length
 
             if newrelic:
                 newrelic.agent.add_custom_parameter('contentserver.content_len', content.length)
@@ -188,7 +197,9 @@ class StaticContentServer(MiddlewareMixin):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
+            # Multipart responses name the content type of the asset in each part instead.
+            if not response['Content-Type'].startswith('multipart/byteranges'):
+                response['Content-Type'] = content.content_type
             response['X-Frame-Options'] = 'ALLOW'
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
@@ -199,6 +210,30 @@ class StaticContentServer(MiddlewareMixin):
 
             return response
 
+    @staticmethod
+    def disk_cached_response(content):
+        """
+        Returns a response with the full data of the disk cached `content`.
+
+        If COURSE_ASSETS_DISK_CACHE_ACCEL_REDIRECT_PREFIX is set, the file is handed off to
+        the web server with X-Accel-Redirect. Otherwise it is returned as a file response,
+        which WSGI servers that support wsgi.file_wrapper send with sendfile.
+        """
+        accel_redirect_prefix = getattr(settings, 'COURSE_ASSETS_DISK_CACHE_ACCEL_REDIRECT_PREFIX', None)
+        if accel_redirect_prefix:
+            response = HttpResponse()
+            response['X-Accel-Redirect'] = '{prefix}/{path}'.format(
+                prefix=accel_redirect_prefix.rstrip('/'), path=content.relative_path,
+            )
+            return response
+
+        response = FileResponse(open(content.path, 'rb'))  # pylint: disable=consider-using-with
+        # FileResponse names the file after the digest it is stored under; don't expose that.
+        if 'Content-Disposition' in response:
+            del response['Content-Disposition']
+        response['Content-Length'] = content.length
+        return response
+
     def set_caching_headers(self, content, response):
         """
         Sets caching headers based on whether or not the asset is locked.
@@ -299,9 +334,97 @@ class StaticContentServer(MiddlewareMixin):
             if content.length is not None and content.length < 1048576:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            else:
+                content = self.load_asset_from_disk_cache(location, content)
 
         return content
 
+    def load_asset_from_disk_cache(self, location, content):
+        """
+        Returns `content` served from the local disk cache, if it is enabled, copying
+        the data of `content` into the disk cache first if it isn't there yet.
+        """
+        disk_cache = get_disk_content_cache()
+        if disk_cache is None or not disk_cache.is_cacheable(content):
+            return content
+
+        cached_content = disk_cache.get(content)
+        if cached_content is None:
+            cached_content = disk_cache.set(content)
+            if newrelic:
+                newrelic.agent.add_custom_parameter('contentserver.disk_cache_hit', False)
+        elif newrelic:
+            newrelic.agent.add_custom_parameter('contentserver.disk_cache_hit', True)
+
+        content.close()
+        if cached_content is None:
+            # Copying to the disk cache failed part way through the stream, so start over.
+            return AssetManager.find(location, as_stream=True)
+        return cached_content
+
+
+def coalesce_ranges(ranges):
+    """
+    Returns the given (first, last) byte ranges sorted, with overlapping and adjacent ranges merged.
+
+    Serving the ranges in this order reads the content once, from start to end, and the spec
+    allows servers to reorder and coalesce the requested ranges.
+    See https://www.rfc-editor.org/rfc/rfc7233#section-4.1
+    """
+    coalesced = []
+    for first, last in sorted(ranges):
+        if coalesced and first <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(coalesced[-1][1], last))
+        else:
+            coalesced.append((first, last))
+    return coalesced
+
+
+def closing_stream(content, chunks):
+    """
+    Yields the `chunks` of data read from `content`, and closes `content` once they
+    have all been read or the response they are streamed into is closed.
+    """
+    try:
+        yield from chunks
+    finally:
+        content.close()
+
+
+def multipart_byteranges_response(content, ranges):
+    """
+    Returns a multipart/byteranges response with a part for each of the sorted,
+    non-overlapping (first, last) byte `ranges` of `content`.
+    """
+    boundary = uuid4().hex
+    part_headers = [
+        (
+            '{separator}--{boundary}\r\n'
+            'Content-Type: {content_type}\r\n'
+            'Content-Range: bytes {first}-{last}/{length}\r\n'
+            '\r\n'
+        ).format(
+            separator='\r\n' if index else '', boundary=boundary, content_type=content.content_type,
+            first=first, last=last, length=content.length,
+        ).encode('utf-8')
+        for index, (first, last) in enumerate(ranges)
+    ]
+    closing_boundary = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+    def stream_parts():
+        for part_header, (first, last) in zip(part_headers, ranges):
+            yield part_header
+            yield from content.stream_data_in_range(first, last)
+        yield closing_boundary
+
+    response = HttpResponse(closing_stream(content, stream_parts()), content_type=f'multipart/byteranges; boundary={boundary}')
+    response['Content-Length'] = str(
+        sum(len(part_header) for part_header in part_headers) +
+        sum(last - first + 1 for first, last in ranges) +
+        len(closing_boundary)
+    )
+    return response
+
 
 def parse_range_header(header_value, content_length):
     """
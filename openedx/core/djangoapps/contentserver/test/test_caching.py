@@ -0,0 +1,129 @@
+"""
+Tests for the course asset disk cache.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+from django.http import HttpResponse
+from opaque_keys.edx.locator import CourseLocator
+from xmodule.contentstore.content import StaticContent, StaticContentStream
+
+from ..caching import DiskCachedContent, DiskContentCache
+from ..middleware import closing_stream, multipart_byteranges_response
+
+
+def make_content(data, name='asset.bin'):
+    """
+    Returns a StaticContentStream over `data`.
+    """
+    location = StaticContent.compute_location(CourseLocator('org', 'course', 'run'), name)
+    return StaticContentStream(
+        location, name, 'application/octet-stream', BytesIO(data),
+        length=len(data), content_digest=hashlib.md5(data).hexdigest(),
+    )
+
+
+class DiskContentCacheTest(unittest.TestCase):
+    """
+    Tests for DiskContentCache and DiskCachedContent.
+    """
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = DiskContentCache(self.directory, max_size=4000)
+
+    def test_miss_then_hit(self):
+        data = os.urandom(1000)
+        content = make_content(data)
+        assert self.cache.get(content) is None
+
+        cached = self.cache.set(content)
+        assert isinstance(cached, DiskCachedContent)
+        assert b''.join(cached.stream_data()) == data
+
+        cached = self.cache.get(make_content(data))
+        assert cached.location == content.location
+        assert cached.length == len(data)
+        assert b''.join(cached.stream_data()) == data
+        assert b''.join(cached.stream_data_in_range(10, 100)) == data[10:101]
+        cached.close()
+
+    def test_copy_to_in_mem(self):
+        data = os.urandom(1000)
+        content = self.cache.set(make_content(data)).copy_to_in_mem()
+        assert isinstance(content, StaticContent)
+        assert not isinstance(content, DiskCachedContent)
+        assert content.data == data
+        assert content.content_digest == hashlib.md5(data).hexdigest()
+
+    def test_closed_after_range_responses(self):
+        data = os.urandom(1000)
+        self.cache.set(make_content(data))
+        cached = self.cache.get(make_content(data))
+        response = HttpResponse(closing_stream(cached, cached.stream_data_in_range(10, 100)))
+        assert response.content == data[10:101]
+        assert cached._mmap is None  # pylint: disable=protected-access
+
+        cached = self.cache.get(make_content(data))
+        response = multipart_byteranges_response(cached, [(0, 9), (500, 599)])
+        assert data[500:600] in response.content
+        assert cached._mmap is None  # pylint: disable=protected-access
+
+    def test_shared_by_digest(self):
+        data = os.urandom(500)
+        self.cache.set(make_content(data, name='first.bin'))
+        cached = self.cache.get(make_content(data, name='second.bin'))
+        assert cached.name == 'second.bin'
+        assert b''.join(cached.stream_data()) == data
+
+    def test_not_cacheable(self):
+        # Too large a share of the cache.
+        assert self.cache.set(make_content(os.urandom(1001))) is None
+        # No usable digest.
+        content = make_content(b'data')
+        content.content_digest = '../data'
+        assert self.cache.set(content) is None
+        assert os.listdir(self.directory) == []
+
+    def test_incomplete_copy(self):
+        content = make_content(os.urandom(100))
+        content.length = 200
+        content.content_digest = 'a' * 32
+        self.cache.max_size = 1000
+        assert self.cache.set(content) is None
+        assert os.listdir(os.path.join(self.directory, 'aa')) == []
+
+    def test_evict_least_recently_used(self):
+        contents = [make_content(os.urandom(1000), name=f'{index}.bin') for index in range(4)]
+        for index, content in enumerate(contents):
+            self.cache.set(content)
+            os.utime(os.path.join(self.directory, self.cache.relative_path(content.content_digest)), (index, index))
+
+        # Use the oldest file, so that the second and third ones are evicted next.
+        self.cache.get(contents[0])
+        self.cache.set(make_content(os.urandom(1000), name='4.bin'))
+
+        # The cache is brought back down to 90% of its maximum size.
+        assert self.cache.get(contents[0]) is not None
+        assert self.cache.get(contents[1]) is None
+        assert self.cache.get(contents[2]) is None
+        assert self.cache.get(contents[3]) is not None
+
+    def test_scans_only_when_full(self):
+        self.cache.set(make_content(os.urandom(1000), name='0.bin'))
+        with patch('os.walk', wraps=os.walk) as mock_walk:
+            self.cache.set(make_content(os.urandom(1000), name='1.bin'))
+            self.cache.set(make_content(os.urandom(1000), name='2.bin'))
+            assert not mock_walk.called
+
+            # Once past max_size, the cache is scanned to evict files.
+            self.cache.set(make_content(os.urandom(1000), name='3.bin'))
+            self.cache.set(make_content(os.urandom(1000), name='4.bin'))
+            assert mock_walk.call_count == 1
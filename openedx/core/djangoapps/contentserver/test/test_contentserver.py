@@ -28,7 +28,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from common.djangoapps.student.models import CourseEnrollment
 from common.djangoapps.student.tests.factories import UserFactory, AdminFactory
 
-from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
+from ..middleware import coalesce_ranges, parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
 
@@ -243,17 +243,42 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges message
+        with a part for each range, in ascending order.
         """
-        first_byte = self.length_unlocked / 4
-        last_byte = self.length_unlocked / 2
-        # lint-amnesty, pylint: disable=bad-option-value, unicode-format-string
-        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
+        first_byte = self.length_unlocked // 4
+        last_byte = self.length_unlocked // 2
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=-100, {first}-{last}'.format(
             first=first_byte, last=last_byte))
 
-        assert resp.status_code == 200
+        assert resp.status_code == 206
         assert 'Content-Range' not in resp
-        assert resp['Content-Length'] == str(self.length_unlocked)
+        assert resp['Content-Type'].startswith('multipart/byteranges; boundary=')
+        boundary = resp['Content-Type'].split('boundary=')[1].encode('utf-8')
+
+        full_content = self.client.get(self.url_unlocked).content
+        body = resp.content
+        assert resp['Content-Length'] == str(len(body))
+        parts = body.split(b'--' + boundary)
+        assert parts[-1] == b'--\r\n'
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]
+        assert parts[0] == b''
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, data = part.split(b'\r\n\r\n', 1)
+            assert 'Content-Range: bytes {first}-{last}/{length}'.format(
+                first=first, last=last, length=self.length_unlocked
+            ).encode('utf-8') in headers
+            assert data == full_content[first:last + 1] + b'\r\n'
+
+    def test_range_request_overlapping_ranges(self):
+        """
+        Test that overlapping ranges are coalesced into a single range.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=10-20, 0-15')
+
+        assert resp.status_code == 206
+        assert resp['Content-Range'] == 'bytes 0-20/{length}'.format(length=self.length_unlocked)
+        assert resp['Content-Length'] == '21'
 
     @ddt.data(
         'bytes 0-',
@@ -433,6 +458,16 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         assert len(ranges) == excepted_ranges_length
         assert ranges == expected_ranges
 
+    @ddt.data(
+        ([(100, 199)], [(100, 199)]),
+        ([(200, 299), (100, 199)], [(100, 299)]),
+        ([(100, 199), (150, 249), (400, 499)], [(100, 249), (400, 499)]),
+        ([(400, 499), (100, 199), (120, 130)], [(100, 199), (400, 499)]),
+    )
+    @ddt.unpack
+    def test_coalesce_ranges(self, ranges, expected_ranges):
+        assert coalesce_ranges(ranges) == expected_ranges
+
     @ddt.data(
         ('bytes=one-20', ValueError, 'invalid literal for int()'),
         ('bytes=-one', ValueError, 'invalid literal for int()'),
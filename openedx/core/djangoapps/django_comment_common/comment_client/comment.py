@@ -1,7 +1,7 @@
 # pylint: disable=missing-docstring,protected-access
 
 
-from openedx.core.djangoapps.django_comment_common.comment_client import models, settings
+from openedx.core.djangoapps.django_comment_common.comment_client import models, read_cache, settings
 
 from .thread import Thread, _url_for_flag_abuse_thread, _url_for_unflag_abuse_thread
 from .utils import CommentClientRequestError, perform_request
@@ -61,6 +61,25 @@ class Comment(models.Model):
         else:
             return super().url(action, params)
 
+    def _retrieve(self, *args, **kwargs):
+        url = self.url(action='get', params=self.attributes)
+        response = read_cache.get_or_fetch(
+            self.id,
+            self.default_retrieve_params,
+            lambda: perform_request(
+                'get',
+                url,
+                self.default_retrieve_params,
+                metric_tags=self._metric_tags,
+                metric_action='model.retrieve'
+            ),
+        )
+        self._update_from_response(response)
+
+    def _invalidate_cached_reads(self):
+        # Threads and parent comments include their children.
+        read_cache.invalidate(self.id, self.attributes.get('parent_id'), self.attributes.get('thread_id'))
+
     def flagAbuse(self, user, voteable):
         if voteable.type == 'thread':
             url = _url_for_flag_abuse_thread(voteable.id)
@@ -77,6 +96,7 @@ class Comment(models.Model):
             metric_action='comment.abuse.flagged'
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cached_reads()
 
     def unFlagAbuse(self, user, voteable, removeAll):
         if voteable.type == 'thread':
@@ -98,6 +118,7 @@ class Comment(models.Model):
             metric_action='comment.abuse.unflagged'
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cached_reads()
 
 
 def _url_for_thread_comments(thread_id):
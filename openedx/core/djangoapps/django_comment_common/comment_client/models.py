@@ -3,6 +3,7 @@
 
 import logging
 
+from . import read_cache
 from .utils import CommentClientRequestError, extract, perform_request
 
 log = logging.getLogger(__name__)
@@ -131,6 +132,12 @@ class Model:
                     )
                 )
 
+    def _invalidate_cached_reads(self):
+        """
+        Called after a write that changed this object, to stop using its cached reads (see read_cache).
+        """
+        pass  # lint-amnesty, pylint: disable=unnecessary-pass
+
     def updatable_attributes(self):
         return extract(self.attributes, self.updatable_fields)
 
@@ -173,6 +180,7 @@ class Model:
             )
         self.retrieved = True
         self._update_from_response(response)
+        self._invalidate_cached_reads()
         self.after_save(self)
 
     def delete(self):
@@ -180,6 +188,7 @@ class Model:
         response = perform_request('delete', url, metric_tags=self._metric_tags, metric_action='model.delete')
         self.retrieved = True
         self._update_from_response(response)
+        self._invalidate_cached_reads()
 
     @classmethod
     def url_with_id(cls, params=None):
@@ -0,0 +1,94 @@
+"""
+Read-through cache of the threads and comments retrieved from the comments service.
+
+Cached responses are keyed by the id of the thread or comment, its version,
+and the parameters of the request. Writes made through the comment client bump
+the version of the threads and comments that they change (see
+Model._invalidate_cached_reads), so the responses cached before them are not
+used anymore. Changes made to the comments service in other ways are picked up
+when the responses expire, after COMMENTS_SERVICE_READ_CACHE_TIMEOUT seconds.
+
+Responses to the requests made for a user (with a user_id) include whether the
+user read the thread, so the user's version of the thread is part of their key
+too: it is bumped when the user reads the thread. Responses to the requests
+made without a user are shared by all users.
+"""
+import hashlib
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from edx_django_utils.monitoring import accumulate
+
+
+def _get_timeout():
+    return getattr(settings, 'COMMENTS_SERVICE_READ_CACHE_TIMEOUT', 0)
+
+
+def _version_key(content_id, user_id=None):
+    if user_id is None:
+        return f'comment_client.read_cache.version.{content_id}'
+    return f'comment_client.read_cache.version.{content_id}.{user_id}'
+
+
+def _get_versions(version_keys, timeout):
+    """
+    Return the current versions for `version_keys`, starting new versions for the ones that have none yet.
+    """
+    versions = cache.get_many(version_keys)
+    for version_key in version_keys:
+        if version_key not in versions:
+            version = uuid4().hex
+            # Another process may have started the version in the meantime.
+            if not cache.add(version_key, version, timeout):
+                version = cache.get(version_key, version)
+            versions[version_key] = version
+    return [versions[version_key] for version_key in version_keys]
+
+
+def get_or_fetch(content_id, params, fetch):
+    """
+    Return the cached response to the request for the thread or comment `content_id` with `params`.
+
+    On a miss, the response is fetched with `fetch()`, and cached.
+    """
+    timeout = _get_timeout()
+    if not timeout or not content_id:
+        return fetch()
+
+    version_keys = [_version_key(content_id)]
+    if params.get('user_id'):
+        version_keys.append(_version_key(content_id, params['user_id']))
+    params_hash = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    key = 'comment_client.read_cache.{}.{}.{}'.format(
+        content_id, '.'.join(_get_versions(version_keys, timeout)), params_hash
+    )
+
+    response = cache.get(key)
+    if response is not None:
+        accumulate('comment_client.read_cache.hits', 1)
+        return response
+    accumulate('comment_client.read_cache.misses', 1)
+    response = fetch()
+    cache.set(key, response, timeout)
+    return response
+
+
+def invalidate(*content_ids):
+    """
+    Stop using the cached responses for the threads and comments `content_ids`, which have changed.
+    """
+    timeout = _get_timeout()
+    content_ids = [content_id for content_id in content_ids if content_id]
+    if timeout and content_ids:
+        cache.set_many({_version_key(content_id): uuid4().hex for content_id in content_ids}, timeout)
+
+
+def invalidate_for_user(content_id, user_id):
+    """
+    Stop using the cached responses to the requests made for `user_id` about the thread `content_id`.
+    """
+    timeout = _get_timeout()
+    if timeout and content_id:
+        cache.set(_version_key(content_id, user_id), uuid4().hex, timeout)
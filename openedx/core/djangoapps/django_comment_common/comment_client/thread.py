@@ -5,7 +5,7 @@ import logging
 
 from eventtracking import tracker
 
-from . import models, settings, utils
+from . import models, read_cache, settings, utils
 
 log = logging.getLogger(__name__)
 
@@ -155,15 +155,26 @@ class Thread(models.Model):
         }
         request_params = utils.strip_none(request_params)
 
-        response = utils.perform_request(
-            'get',
-            url,
-            request_params,
-            metric_action='model.retrieve',
-            metric_tags=self._metric_tags
-        )
+        def fetch():
+            return utils.perform_request(
+                'get',
+                url,
+                request_params,
+                metric_action='model.retrieve',
+                metric_tags=self._metric_tags
+            )
+
+        if request_params.get('mark_as_read'):
+            # This marks the thread as read for the user, so it can't come from the cache.
+            response = fetch()
+            read_cache.invalidate_for_user(self.id, request_params.get('user_id'))
+        else:
+            response = read_cache.get_or_fetch(self.id, request_params, fetch)
         self._update_from_response(response)
 
+    def _invalidate_cached_reads(self):
+        read_cache.invalidate(self.id)
+
     def flagAbuse(self, user, voteable):
         if voteable.type == 'thread':
             url = _url_for_flag_abuse_thread(voteable.id)
@@ -178,6 +189,7 @@ class Thread(models.Model):
             metric_tags=self._metric_tags
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cached_reads()
 
     def unFlagAbuse(self, user, voteable, removeAll):
         if voteable.type == 'thread':
@@ -197,6 +209,7 @@ class Thread(models.Model):
             metric_action='thread.abuse.unflagged'
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cached_reads()
 
     def pin(self, user, thread_id):
         url = _url_for_pin_thread(thread_id)
@@ -209,6 +222,7 @@ class Thread(models.Model):
             metric_action='thread.pin'
         )
         self._update_from_response(response)
+        read_cache.invalidate(thread_id)
 
     def un_pin(self, user, thread_id):
         url = _url_for_un_pin_thread(thread_id)
@@ -221,6 +235,7 @@ class Thread(models.Model):
             metric_action='thread.unpin'
         )
         self._update_from_response(response)
+        read_cache.invalidate(thread_id)
 
 
 def _url_for_flag_abuse_thread(thread_id):
@@ -2,7 +2,7 @@
 """ User model wrapper for comment service"""
 
 
-from . import models, settings, utils
+from . import models, read_cache, settings, utils
 
 
 class User(models.Model):
@@ -42,6 +42,7 @@ class User(models.Model):
             metric_action='user.read',
             metric_tags=self._metric_tags + [f'target.type:{source.type}'],
         )
+        read_cache.invalidate_for_user(source.id, self.id)
 
     def follow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
@@ -79,6 +80,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + [f'target.type:{voteable.type}'],
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cached_reads()
 
     def unvote(self, voteable):
         if voteable.type == 'thread':
@@ -96,6 +98,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + [f'target.type:{voteable.type}'],
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cached_reads()
 
     def active_threads(self, query_params=None):
         if query_params is None:
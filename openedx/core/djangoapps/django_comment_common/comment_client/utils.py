@@ -3,10 +3,21 @@
 
 
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from uuid import uuid4
 
+import crum
 import requests
-from django.utils.translation import get_language
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.translation import get_language, override
+from edx_django_utils.monitoring import accumulate
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from .settings import SERVICE_HOST as COMMENTS_SERVICE
 
@@ -30,6 +41,44 @@ def extract(dic, keys):
         return strip_none({k: dic.get(k) for k in keys})
 
 
+_SESSION = None
+_SESSION_PID = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session():
+    """
+    Return the requests Session shared by the process to talk to the comments service, or None.
+
+    The session keeps up to COMMENTS_SERVICE_CONNECTION_POOL_SIZE connections
+    alive, and retries failed connections up to COMMENTS_SERVICE_CONNECTION_RETRIES
+    times. It is None when the pool size is 0: each request then opens a new
+    connection. Forked processes get a session of their own.
+    """
+    global _SESSION, _SESSION_PID  # pylint: disable=global-statement
+    pool_size = getattr(settings, 'COMMENTS_SERVICE_CONNECTION_POOL_SIZE', 0)
+    if not pool_size:
+        return None
+    with _SESSION_LOCK:
+        if _SESSION is None or _SESSION_PID != os.getpid():
+            # Only connection errors, and read errors of idempotent requests, are retried.
+            retries = Retry(total=getattr(settings, 'COMMENTS_SERVICE_CONNECTION_RETRIES', 0), backoff_factor=0.1)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retries)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _SESSION = session
+            _SESSION_PID = os.getpid()
+        return _SESSION
+
+
+def _connection_count(session, url):
+    """
+    Return how many connections the pool of `session` for `url` has opened so far.
+    """
+    return session.get_adapter(url).poolmanager.connection_from_url(url).num_connections
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
     # To avoid dependency conflict
@@ -62,14 +111,32 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = data_or_params.copy()
         params.update(request_id_dict)
-    response = requests.request(
-        method,
-        url,
-        data=data,
-        params=params,
-        headers=headers,
-        timeout=config.connection_timeout
-    )
+    session = get_session()
+    metric_name = f'comment_client.{metric_action or method}'
+    start = time.perf_counter()
+    if session is None:
+        response = requests.request(
+            method,
+            url,
+            data=data,
+            params=params,
+            headers=headers,
+            timeout=config.connection_timeout
+        )
+    else:
+        connection_count = _connection_count(session, url)
+        response = session.request(
+            method,
+            url,
+            data=data,
+            params=params,
+            headers=headers,
+            timeout=config.connection_timeout
+        )
+        # Approximate when requests are made concurrently.
+        accumulate(f'{metric_name}.new_connections', _connection_count(session, url) - connection_count)
+    accumulate(f'{metric_name}.requests', 1)
+    accumulate(f'{metric_name}.duration_ms', round((time.perf_counter() - start) * 1000, 1))
 
     metric_tags.append(f'status_code:{response.status_code}')
     status_code = int(response.status_code)
@@ -102,6 +169,73 @@ def perform_request(method, url, data_or_params=None, raw=False,
             return data
 
 
+_EXECUTOR = None
+_EXECUTOR_PID = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor():
+    """
+    Return the thread pool that makes concurrent requests to the comments service, or None.
+
+    The pool is sized by the COMMENTS_SERVICE_CONCURRENT_REQUESTS setting, and
+    is re-created in forked processes.
+    """
+    global _EXECUTOR, _EXECUTOR_PID  # pylint: disable=global-statement
+    max_workers = getattr(settings, 'COMMENTS_SERVICE_CONCURRENT_REQUESTS', 0)
+    if not max_workers:
+        return None
+    with _EXECUTOR_LOCK:
+        if (
+            _EXECUTOR is None or
+            _EXECUTOR_PID != os.getpid() or
+            _EXECUTOR._max_workers != max_workers  # pylint: disable=protected-access
+        ):
+            _EXECUTOR = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='comment-client')
+            _EXECUTOR_PID = os.getpid()
+        return _EXECUTOR
+
+
+def _call_in_thread(call, language, request):
+    """
+    Make `call` in a thread of the pool, with the language and current request of the thread that submitted it.
+    """
+    crum.set_current_request(request)
+    try:
+        with override(language):
+            return call()
+    finally:
+        crum.set_current_request(None)
+        # The thread goes on to serve other requests.
+        close_old_connections()
+
+
+class PendingRequest:
+    """
+    A call to the comments service started in the background, so that the
+    caller can do something else in the meantime.
+
+    `result` waits for the call to finish, and returns its result (or raises
+    its exception). When there is no thread pool for it (see
+    COMMENTS_SERVICE_CONCURRENT_REQUESTS), the call is only made by `result`,
+    exactly as if it had not been started earlier.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        self._call = partial(func, *args, **kwargs)
+        executor = _get_executor()
+        self._future = None
+        if executor is not None:
+            self._future = executor.submit(
+                _call_in_thread, self._call, get_language(), crum.get_current_request()
+            )
+
+    def result(self):
+        if self._future is None:
+            return self._call()
+        return self._future.result()
+
+
 class CommentClientError(Exception):
     pass
 
@@ -6,6 +6,7 @@ from typing import Dict
 
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 from model_utils.models import TimeStampedModel
 from opaque_keys.edx.django.models import CourseKeyField
 
@@ -152,6 +153,38 @@ class CourseNotificationPreference(TimeStampedModel):
                 log.error(f'Unable to update notification preference to new config. {e}')
         return preferences
 
+    @staticmethod
+    def bulk_upgrade_preferences(preferences, batch_size=None):
+        """
+        Update the preferences that have an older config version to the current one, with one query.
+
+        The preferences are updated in place. Returns how many of them were updated.
+        """
+        current_config_version = get_course_notification_preference_config_version()
+        upgraded_preferences = []
+        for preference in preferences:
+            if preference.config_version == current_config_version:
+                continue
+            try:
+                new_prefs = NotificationPreferenceSyncManager.update_preferences(
+                    preference.notification_preference_config
+                )
+                # pylint: disable-next=broad-except
+            except Exception as e:
+                log.error(f'Unable to update notification preference to new config. {e}')
+                continue
+            preference.config_version = current_config_version
+            preference.notification_preference_config = new_prefs
+            preference.modified = timezone.now()
+            upgraded_preferences.append(preference)
+        if upgraded_preferences:
+            CourseNotificationPreference.objects.bulk_update(
+                upgraded_preferences,
+                ['config_version', 'notification_preference_config', 'modified'],
+                batch_size=batch_size,
+            )
+        return len(upgraded_preferences)
+
     @staticmethod
     def get_updated_user_course_preferences(user, course_id):
         return CourseNotificationPreference.get_user_course_preference(user.id, course_id)
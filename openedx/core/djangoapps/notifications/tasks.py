@@ -1,6 +1,8 @@
 """
 This file contains celery tasks for notifications.
 """
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import List
 
@@ -8,7 +10,7 @@ from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from django.db import transaction
-from edx_django_utils.monitoring import set_code_owner_attribute
+from edx_django_utils.monitoring import accumulate, set_code_owner_attribute
 from opaque_keys.edx.keys import CourseKey
 from pytz import UTC
 
@@ -16,11 +18,7 @@ from common.djangoapps.student.models import CourseEnrollment
 from openedx.core.djangoapps.notifications.base_notification import get_default_values_of_preference
 from openedx.core.djangoapps.notifications.config.waffle import ENABLE_NOTIFICATIONS
 from openedx.core.djangoapps.notifications.events import notification_generated_event
-from openedx.core.djangoapps.notifications.models import (
-    CourseNotificationPreference,
-    Notification,
-    get_course_notification_preference_config_version
-)
+from openedx.core.djangoapps.notifications.models import CourseNotificationPreference, Notification
 from openedx.core.djangoapps.notifications.utils import get_list_in_batches
 
 logger = get_task_logger(__name__)
@@ -87,67 +85,139 @@ def delete_expired_notifications():
 def send_notifications(user_ids, course_key: str, app_name, notification_type, context, content_url):
     """
     Send notifications to the users.
+
+    Audiences of more than NOTIFICATION_FANOUT_SUBTASK_SIZE users are split
+    into send_notifications_to_users subtasks, which run in parallel. Each
+    subtask emits a notification_generated event of its own, for its users.
     """
     course_key = CourseKey.from_string(course_key)
     if not ENABLE_NOTIFICATIONS.is_enabled(course_key):
         return
     user_ids = list(set(user_ids))
+
+    subtask_size = getattr(settings, 'NOTIFICATION_FANOUT_SUBTASK_SIZE', 0)
+    if subtask_size and len(user_ids) > subtask_size:
+        subtasks_count = 0
+        for subtask_user_ids in get_list_in_batches(user_ids, subtask_size):
+            send_notifications_to_users.delay(
+                subtask_user_ids, str(course_key), app_name, notification_type, context, content_url
+            )
+            subtasks_count += 1
+        logger.info(
+            f'Sending {notification_type} notifications to {len(user_ids)} users of {course_key} '
+            f'in {subtasks_count} subtasks.'
+        )
+        return
+
+    _send_notifications_to_users(user_ids, course_key, app_name, notification_type, context, content_url)
+
+
+@shared_task
+@set_code_owner_attribute
+def send_notifications_to_users(user_ids, course_key: str, app_name, notification_type, context, content_url):
+    """
+    Send notifications to a part of the users of a send_notifications task.
+    """
+    _send_notifications_to_users(
+        user_ids, CourseKey.from_string(course_key), app_name, notification_type, context, content_url
+    )
+
+
+@contextmanager
+def _timed_stage(stage, durations):
+    """
+    Add the time spent in the block to durations[stage], in seconds.
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        durations[stage] = durations.get(stage, 0) + time.perf_counter() - start_time
+
+
+def _send_notifications_to_users(user_ids, course_key: CourseKey, app_name, notification_type, context, content_url):
+    """
+    Create the notifications of the users who want them, NOTIFICATION_CREATION_BATCH_SIZE users at a time.
+
+    Each batch takes one query to get the preferences of its users, one to
+    upgrade the ones of an older config version, and one to create the
+    notifications. The time spent in each of these stages, and the counts of
+    users, upgraded preferences and notifications, are recorded as custom
+    attributes.
+    """
     batch_size = settings.NOTIFICATION_CREATION_BATCH_SIZE
 
     audience = []
     notifications_generated = False
     notification_content = ''
+    upgraded_count = 0
+    durations = {}
     default_web_config = get_default_values_of_preference(app_name, notification_type).get('web', True)
     for batch_user_ids in get_list_in_batches(user_ids, batch_size):
         # check if what is preferences of user and make decision to send notification or not
-        preferences = CourseNotificationPreference.objects.filter(
-            user_id__in=batch_user_ids,
-            course_id=course_key,
-        )
-        preferences = list(preferences)
-
-        if default_web_config:
-            preferences = create_notification_pref_if_not_exists(batch_user_ids, preferences, course_key)
-
-        notifications = []
-        for preference in preferences:
-            preference = update_user_preference(preference, preference.user_id, course_key)
-            if (
-                preference and
-                preference.get_web_config(app_name, notification_type) and
-                preference.get_app_config(app_name).get('enabled', False)
-            ):
-                notifications.append(
-                    Notification(
-                        user_id=preference.user_id,
-                        app_name=app_name,
-                        notification_type=notification_type,
-                        content_context=context,
-                        content_url=content_url,
-                        course_id=course_key,
-                    )
-                )
-                audience.append(preference.user_id)
+        with _timed_stage('preferences', durations):
+            preferences = CourseNotificationPreference.objects.filter(
+                user_id__in=batch_user_ids,
+                course_id=course_key,
+            )
+            preferences = list(preferences)
+
+            if default_web_config:
+                preferences = create_notification_pref_if_not_exists(batch_user_ids, preferences, course_key)
+
+        with _timed_stage('upgrade', durations):
+            upgraded_count += CourseNotificationPreference.bulk_upgrade_preferences(preferences)
+
+        recipient_ids = get_web_notification_recipient_ids(preferences, app_name, notification_type)
+        notifications = [
+            Notification(
+                user_id=user_id,
+                app_name=app_name,
+                notification_type=notification_type,
+                content_context=context,
+                content_url=content_url,
+                course_id=course_key,
+            )
+            for user_id in recipient_ids
+        ]
+        audience.extend(recipient_ids)
         # send notification to users but use bulk_create
-        notification_objects = Notification.objects.bulk_create(notifications)
+        with _timed_stage('create', durations):
+            notification_objects = Notification.objects.bulk_create(notifications)
         if notification_objects and not notifications_generated:
             notifications_generated = True
             notification_content = notification_objects[0].content
 
+    accumulate('notifications.send.users', len(user_ids))
+    accumulate('notifications.send.preferences_upgraded', upgraded_count)
+    accumulate('notifications.send.created', len(audience))
+    for stage, duration in durations.items():
+        accumulate(f'notifications.send.{stage}_ms', round(duration * 1000, 1))
+    total_duration = sum(durations.values())
+    if total_duration:
+        logger.info(
+            f'Created {len(audience)} {notification_type} notifications for {len(user_ids)} users of {course_key} '
+            f'in {total_duration:.2f} seconds ({len(user_ids) / total_duration:.0f} users per second).'
+        )
+
     if notifications_generated:
         notification_generated_event(
             audience, app_name, notification_type, course_key, content_url, notification_content,
         )
 
 
-def update_user_preference(preference: CourseNotificationPreference, user_id, course_id):
+def get_web_notification_recipient_ids(preferences: List, app_name, notification_type) -> List:
     """
-    Update user preference if config version is changed.
+    Return the ids of the users whose preferences enable web notifications of notification_type of app_name.
     """
-    current_version = get_course_notification_preference_config_version()
-    if preference.config_version != current_version:
-        return preference.get_user_course_preference(user_id, course_id)
-    return preference
+    return [
+        preference.user_id
+        for preference in preferences
+        if (
+            preference.get_web_config(app_name, notification_type) and
+            preference.get_app_config(app_name).get('enabled', False)
+        )
+    ]
 
 
 def create_notification_pref_if_not_exists(user_ids: List, preferences: List, course_id: CourseKey):
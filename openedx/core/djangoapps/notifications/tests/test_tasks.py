@@ -6,6 +6,7 @@ from unittest.mock import patch
 
 import ddt
 from django.conf import settings
+from django.test.utils import override_settings
 from edx_toggles.toggles.testutils import override_waffle_flag
 
 from common.djangoapps.student.models import CourseEnrollment
@@ -14,8 +15,12 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from ..config.waffle import ENABLE_NOTIFICATIONS
-from ..models import CourseNotificationPreference, Notification
-from ..tasks import create_notification_pref_if_not_exists, send_notifications, update_user_preference
+from ..models import CourseNotificationPreference, Notification, get_course_notification_preference_config_version
+from ..tasks import (
+    create_notification_pref_if_not_exists,
+    send_notifications,
+    send_notifications_to_users,
+)
 
 
 @patch('openedx.core.djangoapps.notifications.models.COURSE_NOTIFICATION_CONFIG_VERSION', 1)
@@ -54,18 +59,6 @@ class TestNotificationsTasks(ModuleStoreTestCase):
             config_version=1,
         )
 
-    def test_update_user_preference(self):
-        """
-        Test whether update_user_preference updates the preference with the latest config version.
-        """
-        # Test whether update_user_preference updates the preference with a different config version
-        updated_preference = update_user_preference(self.preference_v1, self.user, self.course_1.id)
-        self.assertEqual(updated_preference.config_version, 1)
-
-        # Test whether update_user_preference does not update the preference if the config version is the same
-        updated_preference = update_user_preference(self.preference_v2, self.user, self.course_2.id)
-        self.assertEqual(updated_preference.config_version, 1)
-
     @override_waffle_flag(ENABLE_NOTIFICATIONS, active=True)
     def test_create_notification_pref_if_not_exists(self):
         """
@@ -267,3 +260,52 @@ class SendBatchNotificationsTest(ModuleStoreTestCase):
             with self.assertNumQueries(3):
                 send_notifications(user_ids, str(self.course.id), notification_app, notification_type,
                                    context, "http://test.url")
+
+    @override_waffle_flag(ENABLE_NOTIFICATIONS, active=True)
+    def test_outdated_preferences_upgraded_in_bulk(self):
+        """
+        Tests that preferences of an older config version are upgraded with one query
+        """
+        users = self._create_users(20)
+        user_ids = [user.id for user in users]
+        for user in users:
+            CourseNotificationPreference.objects.create(user=user, course_id=self.course.id, config_version=0)
+        context = {
+            "post_title": "Test Post",
+            "author_name": "Test Author",
+            "replier_name": "Replier Name"
+        }
+        with self.assertNumQueries(3):
+            send_notifications(user_ids, str(self.course.id), "discussion", "new_comment",
+                               context, "http://test.url")
+
+        self.assertEqual(
+            CourseNotificationPreference.objects.filter(
+                course_id=self.course.id, config_version=get_course_notification_preference_config_version()
+            ).count(),
+            20
+        )
+        self.assertEqual(Notification.objects.filter(user_id__in=user_ids).count(), 20)
+
+    @override_waffle_flag(ENABLE_NOTIFICATIONS, active=True)
+    @override_settings(NOTIFICATION_FANOUT_SUBTASK_SIZE=5)
+    def test_notifications_sent_in_subtasks(self):
+        """
+        Tests that large audiences are split into subtasks, which notify all of the users
+        """
+        users = self._create_users(12)
+        user_ids = [user.id for user in users]
+        context = {
+            "post_title": "Test Post",
+            "author_name": "Test Author",
+            "replier_name": "Replier Name"
+        }
+        with patch('openedx.core.djangoapps.notifications.tasks.send_notifications_to_users.delay') as mock_delay:
+            send_notifications(user_ids, str(self.course.id), "discussion", "new_comment",
+                               context, "http://test.url")
+        self.assertEqual(mock_delay.call_count, 3)
+        self.assertEqual(sorted(user_id for call in mock_delay.call_args_list for user_id in call[0][0]), user_ids)
+
+        for call in mock_delay.call_args_list:
+            send_notifications_to_users(*call[0])
+        self.assertEqual(Notification.objects.filter(user_id__in=user_ids).count(), 12)
@@ -0,0 +1,76 @@
+# lint-amnesty, pylint: disable=django-not-configured
+"""
+Compare the time it takes to load the capa test fixtures as LoncapaProblem,
+with and without the cache of parsed problems (CAPA_PROBLEM_TREE_CACHE_MAX_BYTES).
+
+Run it from the root of edx-platform:
+
+    python scripts/benchmark_capa_problem.py --loads 200 --repeats 5
+"""
+
+import argparse
+import glob
+import os
+import time
+
+import django
+
+
+def time_loads(xml, loads, repeats):
+    """
+    Return the seconds it takes to load `xml` as a problem `loads` times, with a different seed each time.
+
+    The problems share a capa system, which isn't part of what's timed, and the best of `repeats` runs is kept.
+    """
+    from xmodule.capa.capa_problem import LoncapaProblem, get_problem_tree_cache
+    from xmodule.capa.tests.helpers import mock_capa_block, test_capa_system
+
+    capa_system = test_capa_system()
+    capa_block = mock_capa_block()
+    times = []
+    for __ in range(repeats):
+        tree_cache = get_problem_tree_cache()
+        if tree_cache:
+            tree_cache.clear()
+        start = time.perf_counter()
+        for seed in range(loads):
+            LoncapaProblem(xml, id='1', seed=seed, capa_system=capa_system, capa_block=capa_block)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loads", type=int, default=100, help="Number of loads of each fixture")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of runs of the loads, of which the best is kept")
+    parser.add_argument("--settings", default="lms.envs.test", help="Django settings module")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", args.settings)
+    django.setup()
+    from django.test import override_settings
+
+    from xmodule.capa.tests.helpers import TEST_DIR, load_fixture
+
+    totals = {"uncached": 0, "cached": 0}
+    for path in sorted(glob.glob(os.path.join(TEST_DIR, "test_files", "*.xml"))):
+        xml = load_fixture(os.path.basename(path))
+        try:
+            with override_settings(CAPA_PROBLEM_TREE_CACHE_MAX_BYTES=0):
+                uncached = time_loads(xml, args.loads, args.repeats)
+            with override_settings(CAPA_PROBLEM_TREE_CACHE_MAX_BYTES=10 * 1024 * 1024):
+                cached = time_loads(xml, args.loads, args.repeats)
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"{os.path.basename(path):>50}: skipped, {exc!r}")
+            continue
+        totals["uncached"] += uncached
+        totals["cached"] += cached
+        print(
+            f"{os.path.basename(path):>50}: {1000 * uncached / args.loads:.2f}ms uncached, "
+            f"{1000 * cached / args.loads:.2f}ms cached per load"
+        )
+    print(f"{'total':>50}: {totals['uncached']:.2f}s uncached, {totals['cached']:.2f}s cached")
+
+
+if __name__ == "__main__":
+    main()
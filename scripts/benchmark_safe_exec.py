@@ -0,0 +1,95 @@
+# lint-amnesty, pylint: disable=django-not-configured
+"""
+Compare the throughput of problem code run in new codejail sandboxes with the
+pool of warm sandbox workers (CODE_JAIL_WORKER_POOL_SIZE).
+
+Run it from the root of edx-platform, with codejail installed and, for real
+numbers, the sandbox configured as in production:
+
+    python scripts/benchmark_safe_exec.py --python /edx/app/edxapp/venvs/edxapp-sandbox/bin/python --user sandbox
+
+Without --user, the code runs without sudo, as the current user.
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from codejail import jail_code
+from codejail.safe_exec import safe_exec as codejail_safe_exec
+
+from xmodule.capa.safe_exec.safe_exec import ASSUMED_IMPORTS, CODE_PROLOG, LAZY_IMPORTS
+from xmodule.capa.safe_exec.worker_pool import WorkerPool
+
+# A typical problem script: it uses numpy and random, and sets a few globals.
+PROBLEM_CODE = """
+values = numpy.array([random.randint(1, 100) for _ in range(10)])
+mean = float(values.mean())
+answer = round(math.sqrt(mean), 3)
+"""
+
+
+def run_cold(seed):
+    """
+    Run the problem code in a new codejail sandbox.
+    """
+    globals_dict = {}
+    codejail_safe_exec(CODE_PROLOG % seed + LAZY_IMPORTS + PROBLEM_CODE, globals_dict)
+    return globals_dict
+
+
+def run_pooled(pool, seed):
+    """
+    Run the problem code on a warm worker of `pool`.
+    """
+    limits = jail_code.get_effective_limits()
+    return pool.execute(CODE_PROLOG % seed + LAZY_IMPORTS + PROBLEM_CODE, {}, limits)["globals"]
+
+
+def measure(label, function, runs, concurrency):
+    """
+    Call `function` with seeds 0 to `runs`, from `concurrency` threads, and print the throughput.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(function, range(runs)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:>8}: {runs} executions in {elapsed:.2f}s, {runs / elapsed:.1f}/s, {1000 * elapsed / runs:.1f}ms each")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--python", required=True, help="The sandbox's python")
+    parser.add_argument("--user", default=None, help="The user to run the sandbox as")
+    parser.add_argument("--runs", type=int, default=100, help="Number of executions to time")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of concurrent executions")
+    parser.add_argument("--max-executions", type=int, default=100, help="Executions before a worker is replaced")
+    args = parser.parse_args()
+
+    jail_code.configure("python", args.python, user=args.user)
+    command = jail_code.COMMANDS["python"]
+    cmdline = (["sudo", "-u", args.user] if args.user else []) + command["cmdline_start"]
+    pool = WorkerPool(
+        cmdline,
+        args.concurrency,
+        max_executions=args.max_executions,
+        preload_modules=["random2", "six"] + [modname for __, modname in ASSUMED_IMPORTS],
+        env={"OPENBLAS_NUM_THREADS": "1"},
+    )
+    # Start the workers before timing, as a long-running process would have.
+    pool.warm(wait=True)
+
+    try:
+        cold = measure("cold", run_cold, args.runs, args.concurrency)
+        pooled = measure("pooled", lambda seed: run_pooled(pool, seed), args.runs, args.concurrency)
+    finally:
+        pool.close()
+
+    mismatches = sum(1 for a, b in zip(cold, pooled) if a.get("answer") != b.get("answer"))
+    if mismatches:
+        print(f"{mismatches} executions had different results!")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,11 @@ This is used by capa_block.
 """
 
 
+import hashlib
 import logging
 import os.path
 import re
+import threading
 from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
@@ -76,6 +78,80 @@ html_problem_semantics = [
 
 log = logging.getLogger(__name__)
 
+
+class ProblemTreeCache:
+    """
+    A thread-safe, size-bounded, least-recently-used cache of preprocessed problem XML.
+
+    Problems are parsed, made compatible (see `LoncapaProblem.make_xml_compatible`),
+    and given their IDs and a11y data (see `LoncapaProblem._annotate_problem_tree`)
+    once per version of their XML rather than every time a student loads them.
+    None of that depends on the seed or the student's state.  Entries are stored as
+    serialized XML, which each LoncapaProblem parses into a tree of its own and then
+    specializes; the size is counted in bytes of serialized XML.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the value stored for `key`, or None if it isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, size):
+        """
+        Store `value` under `key`, accounting for it as `size` bytes.  Values must not be modified once stored.
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                __, (__, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def clear(self):
+        """
+        Remove everything from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+_PROBLEM_TREE_CACHE = None
+_PROBLEM_TREE_CACHE_LOCK = threading.Lock()
+
+
+def get_problem_tree_cache():
+    """
+    Return the process-wide :class:`ProblemTreeCache`, or None if it is disabled.
+
+    The cache is sized by the ``CAPA_PROBLEM_TREE_CACHE_MAX_BYTES`` setting and is
+    re-created if that setting changes (which only really happens in tests).
+    """
+    global _PROBLEM_TREE_CACHE  # pylint: disable=global-statement
+    max_bytes = getattr(settings, 'CAPA_PROBLEM_TREE_CACHE_MAX_BYTES', 0) or 0
+    if max_bytes <= 0:
+        return None
+    with _PROBLEM_TREE_CACHE_LOCK:
+        if _PROBLEM_TREE_CACHE is None or _PROBLEM_TREE_CACHE.max_bytes != max_bytes:
+            _PROBLEM_TREE_CACHE = ProblemTreeCache(max_bytes)
+        return _PROBLEM_TREE_CACHE
+
 #-----------------------------------------------------------------------------
 # main class for this module
 
@@ -180,26 +256,9 @@ class LoncapaProblem(object):
         problem_text = re.sub(r"endouttext\s*/", "/text", problem_text)
         self.problem_text = problem_text
 
-        # parse problem XML file into an element tree
-        if isinstance(problem_text, str):
-            # etree chokes on Unicode XML with an encoding declaration
-            problem_text = problem_text.encode('utf-8')
-        self.tree = XML(problem_text)
-
-        try:
-            self.make_xml_compatible(self.tree)
-        except Exception:
-            capa_block = self.capa_block
-            log.exception(
-                "CAPAProblemError: %s, id:%s, data: %s",
-                capa_block.display_name,
-                self.problem_id,
-                capa_block.data
-            )
-            raise
-
-        # handle any <include file="foo"> tags
-        self._process_includes()
+        # Parse the XML tree, handle any <include file="foo"> tags, and add ID's and
+        # a11y data to it (see _load_problem_tree).
+        self.tree, self.problem_data, responses = self._load_problem_tree(problem_text)
 
         # construct script processor context (eg for customresponse problems)
         if minimal_init:
@@ -207,11 +266,9 @@ class LoncapaProblem(object):
         else:
             self.context = self._extract_context(self.tree)
 
-        # Pre-parse the XML tree: modifies it to add ID's and perform some in-place
-        # transformations.  This also creates the dict (self.responders) of Response
-        # instances for each question in the problem. The dict has keys = xml subtree of
-        # Response, values = Response instance
-        self.problem_data = self._preprocess_problem(self.tree, minimal_init)
+        # Create the dict (self.responders) of Response instances for each question in the
+        # problem. The dict has keys = xml subtree of Response, values = Response instance
+        self._preprocess_problem(self.tree, responses, minimal_init)
 
         if not minimal_init:
             if not self.student_answers:  # True when student_answers is an empty dict
@@ -232,6 +289,67 @@ class LoncapaProblem(object):
             if extract_tree:
                 self.extracted_tree = self._extract_html(self.tree)
 
+    def _load_problem_tree(self, problem_text):
+        """
+        Parse `problem_text` and prepare its element tree for the responsetypes to be created.
+
+        The tree is made compatible (see `make_xml_compatible`), its <include> tags are
+        replaced by the files they include, and it is annotated (see `_annotate_problem_tree`).
+        None of this depends on the seed, so the result is shared, through the problem tree
+        cache, by all of the problems with the same XML and id, unless they include files.
+
+        Returns:
+            a tuple of the tree, its a11y data, and the (response, inputfields) pairs of its responses.
+        """
+        # etree chokes on Unicode XML with an encoding declaration
+        problem_text = problem_text.encode('utf-8') if isinstance(problem_text, str) else problem_text
+        tree_cache = get_problem_tree_cache()
+        if tree_cache:
+            key = (hashlib.md5(problem_text).hexdigest(), self.problem_id)
+            cached = tree_cache.get(key)
+            if cached is not None:
+                # Parsing the preprocessed XML is much cheaper than preprocessing it again,
+                # and the responses are found by their position rather than by searching the tree.
+                xml, problem_data, response_positions = cached
+                tree = XML(xml)
+                elements = list(tree.iter(etree.Element))
+                responses = [
+                    (elements[response], [elements[inputfield] for inputfield in inputfields])
+                    for response, inputfields in response_positions
+                ]
+                return tree, deepcopy(problem_data), responses
+
+        # parse problem XML file into an element tree
+        tree = XML(problem_text)
+        try:
+            self.make_xml_compatible(tree)
+        except Exception:
+            capa_block = self.capa_block
+            log.exception(
+                "CAPAProblemError: %s, id:%s, data: %s",
+                capa_block.display_name,
+                self.problem_id,
+                capa_block.data
+            )
+            raise
+
+        # handle any <include file="foo"> tags; included files belong to the course and can
+        # change, so the problems which use them aren't cached
+        cacheable = tree_cache and tree.find('.//include') is None
+        self._process_includes(tree)
+
+        problem_data, responses = self._annotate_problem_tree(tree)
+
+        if cacheable:
+            xml = etree.tostring(tree)
+            positions = {element: position for position, element in enumerate(tree.iter(etree.Element))}
+            response_positions = [
+                (positions[response], [positions[inputfield] for inputfield in inputfields])
+                for response, inputfields in responses
+            ]
+            tree_cache.set(key, (xml, deepcopy(problem_data), response_positions), len(xml))
+        return tree, problem_data, responses
+
     def make_xml_compatible(self, tree):
         """
         Adjust tree xml in-place for compatibility before creating
@@ -801,12 +919,12 @@ class LoncapaProblem(object):
 
     # ======= Private Methods Below ========
 
-    def _process_includes(self):
+    def _process_includes(self, tree):
         """
         Handle any <include file="foo"> tags by reading in the specified file and inserting it
-        into our XML tree.  Fail gracefully if debugging.
+        into `tree`.  Fail gracefully if debugging.
         """
-        includes = self.tree.findall('.//include')
+        includes = tree.findall('.//include')
         for inc in includes:
             filename = inc.get('file')
             if filename is not None:
@@ -1067,20 +1185,18 @@ class LoncapaProblem(object):
 
         return tree
 
-    def _preprocess_problem(self, tree, minimal_init):  # private
+    def _annotate_problem_tree(self, tree):  # private
         """
         Assign IDs to all the responses
         Assign sub-IDs to all entries (textline, schematic, etc.)
-        Annoted correctness and value
+        Extract the a11y data (see `response_a11y_data`)
         In-place transformation
 
-        Also create capa Response instances for each responsetype and save as self.responders
-
-        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        Returns the a11y data, and a list of (response, inputfields) for every response
         """
         response_id = 1
         problem_data = {}
-        self.responders = {}
+        responses = []
         for response in tree.xpath('//' + "|//".join(responsetypes.registry.registered_tags())):
             responsetype_id = self.problem_id + "_" + str(response_id)
             # create and save ID for this response
@@ -1102,7 +1218,19 @@ class LoncapaProblem(object):
                 answer_id = answer_id + 1
 
             self.response_a11y_data(response, inputfields, responsetype_id, problem_data)
+            responses.append((response, inputfields))
+
+        return problem_data, responses
+
+    def _preprocess_problem(self, tree, responses, minimal_init):  # private
+        """
+        Create capa Response instances for each responsetype (see `_annotate_problem_tree`)
+        and save as self.responders
 
+        Obtain all responder answers and save as self.responder_answers dict (key = response)
+        """
+        self.responders = {}
+        for response, inputfields in responses:
             # instantiate capa Response
             responsetype_cls = responsetypes.registry.get_class_for_tag(response.tag)
             responder = responsetype_cls(
@@ -1131,8 +1259,6 @@ class LoncapaProblem(object):
                 solution.attrib['id'] = "%s_solution_%i" % (self.problem_id, solution_id)
                 solution_id += 1
 
-        return problem_data
-
     def response_a11y_data(self, response, inputfields, responsetype_id, problem_data):
         """
         Construct data to be used for a11y.
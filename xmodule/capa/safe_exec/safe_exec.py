@@ -1,13 +1,25 @@
 """Capa's specialized use of codejail.safe_exec."""
+import ast
+import functools
 import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
 
+from codejail import jail_code
 from codejail.safe_exec import SafeExecException, json_safe
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import safe_exec as codejail_safe_exec
-from edx_django_utils.monitoring import function_trace
+from django.conf import settings
+from edx_django_utils.monitoring import accumulate, function_trace
 
 from . import lazymod
 from .remote_exec import is_codejail_rest_service_enabled, get_remote_exec
+from .worker_pool import WorkerError, WorkerPool
+
+log = logging.getLogger(__name__)
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -78,6 +90,234 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj).encode())
 
 
+# Builtins which can read global variables without mentioning them by name.
+DYNAMIC_ACCESS_BUILTINS = frozenset([
+    'globals', 'locals', 'vars', 'dir', 'eval', 'exec', 'compile', 'getattr', '__import__', 'breakpoint',
+])
+
+# Modules which problem code can import without being able to read global variables through them.
+# Others, like sys, inspect, gc or the modules in a course's python_lib.zip, can reach __main__.
+STATIC_ACCESS_MODULES = frozenset(
+    [modname.split('.')[0] for __, modname in ASSUMED_IMPORTS] + [
+        'cmath', 'collections', 'copy', 'datetime', 'decimal', 'fractions', 'functools', 'itertools',
+        'json', 'numbers', 'operator', 'random', 'random2', 're', 'statistics', 'string',
+    ]
+)
+
+
+def _referenced_names(code):
+    """
+    Return the names of the global variables that `code` may read, or None if it may read any of them.
+
+    The names are found in the syntax tree of `code`.  Anything that could read global variables
+    without mentioning them by name makes this fail closed: the builtins in DYNAMIC_ACCESS_BUILTINS,
+    names and attributes starting with an underscore (like __dict__, __globals__ or sys._getframe),
+    imports of modules other than STATIC_ACCESS_MODULES, and code that can't be parsed.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id in DYNAMIC_ACCESS_BUILTINS or node.id.startswith('_'):
+                return None
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            if node.attr.startswith('_'):
+                return None
+        elif isinstance(node, ast.Import):
+            if any(alias.name.split('.')[0] not in STATIC_ACCESS_MODULES for alias in node.names):
+                return None
+        elif isinstance(node, ast.ImportFrom):
+            if node.level or (node.module or '').split('.')[0] not in STATIC_ACCESS_MODULES:
+                return None
+    return names
+
+
+def unreferenced_globals(code, globals_dict):
+    """
+    Return the names in `globals_dict` that `code` never reads.
+
+    The values of these globals can't change the result of running `code`, so
+    they are left out of its cache key. For instance, problem scripts get the
+    anonymous student id as a global, but most of them never use it, and their
+    results can be shared by all of the students with the same seed.
+
+    Unless `code` is known not to read them (see `_referenced_names`), none of
+    the globals are left out.
+    """
+    names = _referenced_names(code)
+    if names is None:
+        return set()
+    return set(globals_dict) - names
+
+
+def safe_exec_cache_key(code, globals_dict, random_seed, extra_files=None, ignored_globals=()):
+    """
+    Return the cache key for running `code` with the given globals, seed and extra files.
+
+    `ignored_globals` are names to leave out of the key, see `unreferenced_globals`.
+    """
+    md5er = hashlib.md5()
+    md5er.update(repr(code).encode('utf-8'))
+    for filename, contents in extra_files or ():
+        md5er.update(filename.encode('utf-8'))
+        md5er.update(contents if isinstance(contents, bytes) else contents.encode('utf-8'))
+    update_hash(md5er, {name: value for name, value in globals_dict.items() if name not in ignored_globals})
+    return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+
+class LocalResultCache:
+    """
+    A thread-safe, size-bounded, least-recently-used cache of safe_exec results.
+
+    It is kept in process, in front of the (shared) cache passed to safe_exec,
+    to skip the round trip for problems rendered over and over again. Results
+    are stored serialized, so that callers can't alter the cached copies.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the result stored for `key`, or None if it isn't cached.
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                return None
+            self._entries.move_to_end(key)
+        return json.loads(data)
+
+    def set(self, key, result):
+        """
+        Store `result` under `key`. Results larger than the whole cache are not stored.
+        """
+        data = json.dumps(result)
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = data
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                __, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def clear(self):
+        """
+        Remove everything from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+_LOCAL_RESULT_CACHE = None
+_LOCAL_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def get_local_result_cache():
+    """
+    Return the process-wide :class:`LocalResultCache`, or None if it is disabled.
+
+    The cache is sized by the ``CODE_JAIL_LOCAL_CACHE_MAX_BYTES`` setting and is
+    re-created if that setting changes (which only really happens in tests).
+    """
+    global _LOCAL_RESULT_CACHE  # pylint: disable=global-statement
+    max_bytes = getattr(settings, 'CODE_JAIL_LOCAL_CACHE_MAX_BYTES', 0) or 0
+    if max_bytes <= 0:
+        return None
+    with _LOCAL_RESULT_CACHE_LOCK:
+        if _LOCAL_RESULT_CACHE is None or _LOCAL_RESULT_CACHE.max_bytes != max_bytes:
+            _LOCAL_RESULT_CACHE = LocalResultCache(max_bytes)
+        return _LOCAL_RESULT_CACHE
+
+
+_WORKER_POOL = None
+_WORKER_POOL_LOCK = threading.Lock()
+
+
+def get_worker_pool():
+    """
+    Return the process-wide :class:`WorkerPool` of sandbox workers, or None if it is disabled.
+
+    The pool needs codejail to be configured for python, and is sized by the
+    ``CODE_JAIL_WORKER_POOL_SIZE`` setting.  It is re-created in forked
+    processes, which can't share the workers of their parent.
+    """
+    global _WORKER_POOL  # pylint: disable=global-statement
+    size = getattr(settings, 'CODE_JAIL_WORKER_POOL_SIZE', 0) or 0
+    if size <= 0 or not jail_code.is_configured('python'):
+        return None
+    with _WORKER_POOL_LOCK:
+        if _WORKER_POOL is None or _WORKER_POOL.size != size or _WORKER_POOL.pid != os.getpid():
+            command = jail_code.COMMANDS['python']
+            cmdline = list(command['cmdline_start'])
+            if command.get('user'):
+                cmdline = ['sudo', '-u', command['user']] + cmdline
+            _WORKER_POOL = WorkerPool(
+                cmdline,
+                size,
+                max_executions=getattr(settings, 'CODE_JAIL_WORKER_MAX_EXECUTIONS', 0) or 0,
+                preload_modules=['random2', 'six'] + [modname for __, modname in ASSUMED_IMPORTS],
+                env={'OPENBLAS_NUM_THREADS': '1'},
+            )
+            _WORKER_POOL.warm()
+        return _WORKER_POOL
+
+
+def pooled_safe_exec(
+    pool,
+    code,
+    globals_dict,
+    python_path=None,
+    extra_files=None,
+    limit_overrides_context=None,
+    slug=None,
+):
+    """
+    Execute python code on a warm sandbox worker from `pool`.
+
+    This is a stand-in for codejail's safe_exec, with the same arguments,
+    limits and errors.  Code that needs the jail's process proxy is still run
+    by codejail.
+    """
+    limits = jail_code.get_effective_limits(limit_overrides_context)
+    if limits.get('PROXY'):
+        codejail_safe_exec(
+            code,
+            globals_dict,
+            python_path=python_path,
+            extra_files=extra_files,
+            limit_overrides_context=limit_overrides_context,
+            slug=slug,
+        )
+        return
+
+    log.debug("Executing jailed code %s on a sandbox worker", slug)
+    accumulate('safe_exec.pooled_executions', 1)
+    try:
+        response = pool.execute(code, json_safe(globals_dict), limits, python_path, extra_files)
+    except WorkerError as exc:
+        response = {'error': str(exc), 'status': -1}
+    if 'globals' not in response:
+        raise SafeExecException(
+            "Couldn't execute jailed code: stdout: {!r}, stderr: {!r} with status code: {}".format(
+                b'', response['error'].encode('utf-8'), response['status'],
+            )
+        )
+    globals_dict.update(response['globals'])
+
+
 @function_trace('safe_exec')
 def safe_exec(
     code,
@@ -107,8 +347,9 @@ def safe_exec(
     created in the sandbox.
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
-    to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    to cache the execution, taking into account the code, the extra files, the values
+    of the globals that the code mentions, and the random seed.  Results are also
+    kept in a process-local cache in front of it, see `get_local_result_cache`.
 
     `limit_overrides_context` is an optional string to be used as a key on
     the `settings.CODE_JAIL['limit_overrides']` dictionary in order to apply
@@ -120,20 +361,33 @@ def safe_exec(
     caller, that will be used in log messages.
 
     If `unsafely` is true, then the code will actually be executed without sandboxing.
+    Otherwise it runs on a warm sandbox worker if there is a pool of them, see
+    `get_worker_pool`, and in a new codejail sandbox if there isn't.
     """
-    # Check the cache for a previous result.
+    # Check the caches for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code).encode('utf-8'))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
+        local_cache = get_local_result_cache()
+        ignored_globals = unreferenced_globals(code, globals_dict)
+        key = safe_exec_cache_key(code, json_safe(globals_dict), random_seed, extra_files, ignored_globals)
+        cached = local_cache.get(key) if local_cache else None
+        if cached is not None:
+            accumulate('safe_exec.local_cache_hits', 1)
+        else:
+            cached = cache.get(key)
+            if cached is not None:
+                accumulate('safe_exec.shared_cache_hits', 1)
+                if local_cache:
+                    local_cache.set(key, cached)
+            else:
+                accumulate('safe_exec.cache_misses', 1)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
             # message, if any, else None; and the resulting globals dictionary.
+            # The ignored globals weren't used, so they keep their current values.
             emsg, cleaned_results = cached
-            globals_dict.update(cleaned_results)
+            globals_dict.update(
+                (name, value) for name, value in cleaned_results.items() if name not in ignored_globals
+            )
             if emsg:
                 raise SafeExecException(emsg)
             return
@@ -156,8 +410,11 @@ def safe_exec(
 
     else:
         # Decide which code executor to use.
+        pool = None if unsafely else get_worker_pool()
         if unsafely:
             exec_fn = codejail_not_safe_exec
+        elif pool:
+            exec_fn = functools.partial(pooled_safe_exec, pool)
         else:
             exec_fn = codejail_safe_exec
 
@@ -183,6 +440,8 @@ def safe_exec(
     if cache:
         cleaned_results = json_safe(globals_dict)
         cache.set(key, (emsg, cleaned_results))
+        if local_cache:
+            local_cache.set(key, (emsg, cleaned_results))
 
     # If an exception happened, raise it now.
     if emsg:
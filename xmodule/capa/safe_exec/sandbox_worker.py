@@ -0,0 +1,223 @@
+"""
+The program run, inside the sandbox, by each process of the safe_exec worker pool.
+
+This file is not imported: worker_pool.py reads it and runs it with the sandbox's
+Python, just as safe_exec.py does with lazymod.py.  It only uses the standard library.
+
+The worker imports the modules that problems commonly use (its command line
+arguments), and then serves requests, one JSON line each on stdin.  The worker
+itself never reads a request: it is a template that stays as it was once the
+modules were imported, and forks a handler process for every request.  The
+handler reads the request, forks a child of its own to run the code, sends the
+response back, and exits.  The child runs in a process group of its own, with
+the jail's resource limits, and the whole group is killed once it is done or
+goes past the REALTIME limit.  So every execution starts from the same pristine
+process, and no request, code, globals or result outlives its handler.
+
+Each response is one JSON line on stdout: either {"globals": {...}}, or
+{"error": "...", "status": <exit status>}.  The worker exits when stdin is
+closed, and if a handler dies without answering.
+"""
+import json
+import os
+import resource
+import select
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+OK_TYPES = (type(None), int, float, bytes, str, list, tuple, dict)
+BAD_KEYS = ("__builtins__",)
+
+# The exit status of a handler which found stdin closed.
+STDIN_CLOSED = 3
+
+
+def jsonable(value):
+    """
+    Whether `value` can be sent back as JSON, as codejail checks it.
+    """
+    if not isinstance(value, OK_TYPES):
+        return False
+    try:
+        json.dumps(value)
+    except Exception:  # pylint: disable=broad-except
+        return False
+    return True
+
+
+def set_limits(limits):
+    """
+    Apply the jail's resource limits to this process, as codejail does for a new sandbox.
+    """
+    rlimits = [(resource.RLIMIT_NPROC, (limits["NPROC"], limits["NPROC"]))]
+    if limits["CPU"]:
+        # Soft limit sends SIGXCPU, the hard limit a second later SIGKILL.
+        rlimits.append((resource.RLIMIT_CPU, (limits["CPU"], limits["CPU"] + 1)))
+    if limits["VMEM"]:
+        rlimits.append((resource.RLIMIT_AS, (limits["VMEM"], limits["VMEM"])))
+    # Files can't be written, unless FSIZE allows it.
+    rlimits.append((resource.RLIMIT_FSIZE, (limits["FSIZE"], limits["FSIZE"])))
+    for rlimit, value in rlimits:
+        resource.setrlimit(rlimit, value)
+
+
+def run_child(request, result_fd):
+    """
+    Run the requested code in this (forked) process, write the result to `result_fd`, and exit.
+    """
+    status = 1
+    try:
+        # Put the code, and anything it starts, in a process group that can be killed as a whole.
+        os.setpgid(0, 0)
+        home = request["home"]
+        os.chdir(home)
+        os.environ["TMPDIR"] = os.path.join(home, "tmp")
+        tempfile.tempdir = None
+        sys.path[0:0] = request["python_path"]
+        devnull = os.open(os.devnull, os.O_RDWR)
+        os.dup2(devnull, 0)
+        os.dup2(devnull, 1)
+
+        # Don't let all of the children share the random state inherited from the worker.
+        if "numpy" in sys.modules:
+            sys.modules["numpy"].random.seed()
+
+        set_limits(request["limits"])
+
+        globals_dict = request["globals"]
+        try:
+            exec(compile(request["code"], "jailed_code", "exec"), globals_dict)  # pylint: disable=exec-used
+        except BaseException:  # pylint: disable=broad-except
+            result = {"error": traceback.format_exc()}
+        else:
+            status = 0
+            result = {"globals": {
+                name: value for name, value in globals_dict.items() if jsonable(value) and name not in BAD_KEYS
+            }}
+        data = json.dumps(result).encode("utf-8")
+        while data:
+            data = data[os.write(result_fd, data):]
+    finally:
+        os._exit(status)  # pylint: disable=protected-access
+
+
+def kill_process_group(pgid):
+    """
+    Kill every process left in the process group `pgid`.
+    """
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_request(request):
+    """
+    Run one request in a forked child, and return the response to send back.
+    """
+    result_read, result_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(result_read)
+        run_child(request, result_write)
+    os.close(result_write)
+    try:
+        # Also done by the child, so that the group exists whichever of them runs first.
+        os.setpgid(pid, pid)
+    except OSError:
+        pass
+
+    deadline = time.time() + request["limits"]["REALTIME"] if request["limits"]["REALTIME"] else None
+    chunks = []
+    timed_out = False
+    while True:
+        timeout = None if deadline is None else max(deadline - time.time(), 0)
+        readable, __, __ = select.select([result_read], [], [], timeout)
+        if not readable:
+            timed_out = True
+            break
+        chunk = os.read(result_read, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    os.close(result_read)
+    # Kill the child if it timed out, and whatever processes it started in any case.
+    kill_process_group(pid)
+    __, status = os.waitpid(pid, 0)
+    shutil.rmtree(os.path.join(request["home"], "tmp"), ignore_errors=True)
+
+    status = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    try:
+        result = json.loads(b"".join(chunks).decode("utf-8"))
+    except ValueError:
+        result = {}
+    if timed_out:
+        result = {"error": "Realtime limit exceeded"}
+    if "globals" not in result:
+        result.setdefault("error", "")
+        result["status"] = status
+    return result
+
+
+def read_line(fd):
+    """
+    Read one line from `fd`, without reading past it.  Returns b"" at the end of the file.
+
+    The pool only sends a request once it has the response to the previous one,
+    so there is never anything past the line to read.
+    """
+    chunks = []
+    while True:
+        chunk = os.read(fd, 65536)
+        chunks.append(chunk)
+        if not chunk or chunk.endswith(b"\n"):
+            return b"".join(chunks)
+
+
+def handle_request():
+    """
+    Read a request from stdin, run it, write the response to stdout, and exit.
+    """
+    status = 1
+    try:
+        line = read_line(0)
+        if not line.strip():
+            status = STDIN_CLOSED
+        else:
+            data = (json.dumps(run_request(json.loads(line))) + "\n").encode("utf-8")
+            while data:
+                data = data[os.write(1, data):]
+            status = 0
+    finally:
+        os._exit(status)  # pylint: disable=protected-access
+
+
+def main():
+    """
+    Import the modules to share with the children, then serve requests until stdin is closed.
+    """
+    for module_name in sys.argv[1:]:
+        try:
+            __import__(module_name)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    # Handlers are reaped here, and their children by the handlers.
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    while True:
+        pid = os.fork()
+        if pid == 0:
+            handle_request()
+        __, status = os.waitpid(pid, 0)
+        if os.WIFEXITED(status) and os.WEXITSTATUS(status) == STDIN_CLOSED:
+            break
+        if not os.WIFEXITED(status) or os.WEXITSTATUS(status) != 0:
+            # The handler died without answering: let the pool replace this worker.
+            sys.exit(1)
+
+
+main()
@@ -7,6 +7,7 @@ import os.path
 import textwrap
 import unittest
 
+import ddt
 import pytest
 import random2 as random
 from codejail import jail_code
@@ -20,6 +21,7 @@ from six.moves import range
 
 from xmodule.capa.safe_exec import safe_exec, update_hash
 from xmodule.capa.safe_exec.remote_exec import is_codejail_rest_service_enabled
+from xmodule.capa.safe_exec.safe_exec import get_local_result_cache, unreferenced_globals
 
 
 class TestSafeExec(unittest.TestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
@@ -203,6 +205,7 @@ class DictCache(object):
         self.cache[key] = value
 
 
+@ddt.ddt
 class TestSafeExecCaching(unittest.TestCase):
     """Test that caching works on safe_exec."""
 
@@ -272,6 +275,81 @@ class TestSafeExecCaching(unittest.TestCase):
             except UnicodeEncodeError:
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
+    def test_unreferenced_globals_share_results(self):
+        cache = {}
+        g = {'seed': 1, 'anonymous_student_id': 'student1'}
+        safe_exec("a = seed + 1", g, random_seed=1, cache=DictCache(cache))
+        assert g['a'] == 2
+
+        # Another student gets the cached result, but keeps their own id.
+        cache[list(cache.keys())[0]] = (None, {'a': 17, 'seed': 1, 'anonymous_student_id': 'student1'})
+        g = {'seed': 1, 'anonymous_student_id': 'student2'}
+        safe_exec("a = seed + 1", g, random_seed=1, cache=DictCache(cache))
+        assert g == {'a': 17, 'seed': 1, 'anonymous_student_id': 'student2'}
+        assert len(cache) == 1
+
+        # Code that uses the id gets a result per student.
+        for student in ('student1', 'student2'):
+            g = {'seed': 1, 'anonymous_student_id': student}
+            safe_exec("a = anonymous_student_id", g, random_seed=1, cache=DictCache(cache))
+            assert g['a'] == student
+        assert len(cache) == 3
+
+    @ddt.data(
+        "a = dir()",
+        "import sys\na = sys._getframe().f_globals",
+        "import inspect\na = inspect.currentframe()",
+        "import sys\na = getattr(sys.modules['__main__'], 'anonymous_' + 'student_id')",
+        "import mylib\na = mylib.student()",
+        "a = ''.__class__",
+        "print 'not python 3'",
+    )
+    def test_dynamic_globals_access_keeps_all_globals(self, code):
+        assert unreferenced_globals(code, {'seed': 1, 'anonymous_student_id': 'student1'}) == set()
+
+    def test_unreferenced_globals(self):
+        g = {'seed': 1, 'anonymous_student_id': 'student1'}
+        assert unreferenced_globals("import math\na = math.sqrt(seed)", g) == {'anonymous_student_id'}
+        assert unreferenced_globals("def f():\n    return anonymous_student_id\na = f()", g) == {'seed'}
+
+    def test_extra_files_in_key(self):
+        cache = {}
+        for contents in (b"one", b"two"):
+            g = {}
+            safe_exec(
+                "a = open('data.txt').read()", g, extra_files=[("data.txt", contents)], cache=DictCache(cache),
+            )
+            assert g['a'] == contents.decode()
+        assert len(cache) == 2
+
+    @override_settings(CODE_JAIL_LOCAL_CACHE_MAX_BYTES=1024)
+    def test_local_cache(self):
+        get_local_result_cache().clear()
+        cache = {}
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
+        assert g['a'] == 3
+
+        # The result is still found once the shared cache has lost it.
+        cache.clear()
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
+        assert g['a'] == 3
+        assert not cache
+
+        # The local cache is checked before the shared one.
+        safe_exec("a = 'x' * 1000", {}, cache=DictCache(cache))
+        cache[list(cache.keys())[0]] = (None, {'a': 17})
+        g = {}
+        safe_exec("a = 'x' * 1000", g, cache=DictCache(cache))
+        assert g['a'] == 'x' * 1000
+
+        # The first result was evicted to make room for the second one, so it is run again.
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
+        assert g['a'] == 3
+        assert len(cache) == 2
+
 
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
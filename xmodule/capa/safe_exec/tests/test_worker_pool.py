@@ -0,0 +1,120 @@
+"""Test worker_pool.py"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import pytest
+
+from xmodule.capa.safe_exec.worker_pool import WorkerError, WorkerPool
+
+LIMITS = {"CPU": 1, "VMEM": 0, "REALTIME": 3, "FSIZE": 0, "NPROC": 0}
+
+
+def is_running(pid):
+    """
+    Whether the process `pid` is running (rather than gone, or a zombie waiting to be reaped).
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def wait_until_gone(pid, timeout=5):
+    """
+    Wait for up to `timeout` seconds for the process `pid` to be gone, and return whether it is.
+    """
+    deadline = time.time() + timeout
+    while is_running(pid):
+        if time.time() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+class TestWorkerPool(unittest.TestCase):
+    """
+    Tests for WorkerPool, with workers run by this Python, without a jail.
+    """
+    def setUp(self):
+        super().setUp()
+        if not hasattr(os, "fork"):
+            pytest.skip(reason="Sandbox workers need os.fork")
+        self.pool = WorkerPool([sys.executable, "-E", "-B"], size=2, max_executions=3, preload_modules=["json"])
+        self.addCleanup(self.pool.close)
+
+    def test_execute(self):
+        response = self.pool.execute("b = a * 2\nimport json\nm = json", {"a": 21}, LIMITS)
+        assert response == {"globals": {"a": 21, "b": 42}}
+
+    def test_error(self):
+        response = self.pool.execute("raise ValueError('no')", {}, LIMITS)
+        assert "ValueError: no" in response["error"]
+        assert response["status"] == 1
+
+    def test_isolation(self):
+        self.pool.execute("import sys\nsys.leaked = 1", {}, LIMITS)
+        response = self.pool.execute("import sys\nleaked = getattr(sys, 'leaked', 0)", {}, LIMITS)
+        assert response["globals"]["leaked"] == 0
+
+    def test_limits(self):
+        response = self.pool.execute("with open('file.txt', 'w') as f:\n    f.write('x' * 10)", {}, LIMITS)
+        assert "File too large" in response["error"]
+        response = self.pool.execute("while True: pass", {}, dict(LIMITS, REALTIME=1))
+        assert response["error"] == "Realtime limit exceeded"
+
+    def test_extra_files_and_python_path(self):
+        library = tempfile.mkdtemp()
+        with open(os.path.join(library, "helper.py"), "w") as helper:
+            helper.write("VALUE = 'copied'\n")
+        response = self.pool.execute(
+            "import helper, extra\nvalue = helper.VALUE + extra.VALUE",
+            {},
+            LIMITS,
+            python_path=[os.path.join(library, "helper.py"), "extra.py"],
+            extra_files=[("extra.py", "VALUE = ' and extra'\n")],
+        )
+        assert response["globals"]["value"] == "copied and extra"
+
+    def test_recycle(self):
+        worker = self.pool._checkout()  # pylint: disable=protected-access
+        self.pool._idle.put(worker)  # pylint: disable=protected-access
+        for __ in range(3):
+            self.pool.execute("a = 1", {}, LIMITS)
+        assert worker.process.poll() is not None
+
+    def test_worker_failure(self):
+        worker = self.pool._checkout()  # pylint: disable=protected-access
+        self.pool._idle.put(worker)  # pylint: disable=protected-access
+        with pytest.raises(WorkerError):
+            self.pool.run({"unused": "request"}, timeout=1)
+        assert worker.process.poll() is not None
+        assert self.pool.execute("a = 1", {}, LIMITS)["globals"] == {"a": 1}
+
+    @pytest.mark.skipif(not os.path.exists("/proc"), reason="Needs /proc to find processes")
+    def test_timeout_kills_started_processes(self):
+        pid_file = os.path.join(tempfile.mkdtemp(), "pid")
+        code = (
+            "import subprocess, time\n"
+            "sleeper = subprocess.Popen(['sleep', '60'])\n"
+            "with open({!r}, 'w') as f:\n"
+            "    f.write(str(sleeper.pid))\n"
+            "time.sleep(60)\n"
+        ).format(pid_file)
+        response = self.pool.execute(code, {}, dict(LIMITS, REALTIME=1, FSIZE=100))
+        assert response["error"] == "Realtime limit exceeded"
+        with open(pid_file) as f:
+            assert wait_until_gone(int(f.read()))
+
+    @pytest.mark.skipif(not os.path.exists("/proc"), reason="Needs /proc to find processes")
+    def test_close_stops_sandboxed_processes(self):
+        worker = self.pool._checkout()  # pylint: disable=protected-access
+        session_pids = subprocess.check_output(["pgrep", "-s", str(worker.process.pid)]).split()
+        assert session_pids
+        worker.close()
+        assert all(wait_until_gone(int(pid)) for pid in session_pids)
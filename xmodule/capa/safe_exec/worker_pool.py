@@ -0,0 +1,299 @@
+"""
+A pool of warm sandbox worker processes for safe_exec.
+
+Starting a sandboxed Python and importing numpy and scipy again for every
+execution is most of the cost of running a problem's code.  Each worker of
+the pool is a sandboxed Python, started with the same command line as
+codejail's, which imports those modules once and then forks a fresh child for
+every execution (see sandbox_worker.py) from a template process that never
+sees any request.  The children get the jail's resource limits, a temporary
+home directory of their own, and exit when they are done, so executions are
+still isolated from each other.
+
+Workers are replaced after a number of executions, and whenever one of them
+doesn't answer in time.  Each worker runs in a session of its own, which is
+killed as a whole when the worker doesn't exit by itself, like codejail kills
+the process group of a sandbox that goes past its time limit.
+"""
+import json
+import logging
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+
+log = logging.getLogger(__name__)
+
+# Seconds to wait for a worker on top of the REALTIME limit, which the worker enforces itself.
+WORKER_TIMEOUT_GRACE = 5
+
+# Seconds to wait for a worker to exit once its stdin is closed, before killing it.
+WORKER_EXIT_TIMEOUT = 5
+
+sandbox_worker_py_file = os.path.join(os.path.dirname(__file__), "sandbox_worker.py")
+with open(sandbox_worker_py_file) as f:
+    sandbox_worker_py = f.read()
+
+
+class WorkerError(Exception):
+    """
+    A sandbox worker died, or didn't answer in time.
+    """
+
+
+class SandboxWorker:
+    """
+    One warm sandbox worker process.
+
+    `cmdline` is the command that starts the sandboxed Python, and
+    `preload_modules` the names of the modules it imports before serving requests.
+    """
+    def __init__(self, cmdline, preload_modules=(), env=None):
+        self.executions = 0
+        self.use_sudo = bool(cmdline) and cmdline[0] == "sudo"
+        self._closed = False
+        self._close_lock = threading.Lock()
+        # In a session of its own, so that the sandboxed processes can be killed along with the
+        # sudo wrapper, which is the only one of them that we know the pid of.
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            list(cmdline) + ["-c", sandbox_worker_py] + list(preload_modules),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            start_new_session=True,
+        )
+
+    def run(self, request, timeout=None):
+        """
+        Send `request` to the worker and return its response.
+
+        Raises WorkerError, and kills the worker, if it doesn't answer within `timeout` seconds.
+        """
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout, self.close, kwargs={"graceful": False})
+            timer.daemon = True
+            timer.start()
+        try:
+            self.process.stdin.write(json.dumps(request).encode("utf-8") + b"\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (OSError, ValueError):
+            line = b""
+        finally:
+            if timer:
+                timer.cancel()
+        self.executions += 1
+        if not line.endswith(b"\n"):
+            self.close(graceful=False)
+            raise WorkerError("The sandbox worker exited, or didn't answer in time")
+        return json.loads(line.decode("utf-8"))
+
+    def close(self, graceful=True):
+        """
+        Stop the worker and all of its processes.
+
+        If `graceful`, the worker is first given WORKER_EXIT_TIMEOUT seconds to exit
+        by itself once its stdin is closed, which it does between executions.
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=WORKER_EXIT_TIMEOUT if graceful else 0)
+        except subprocess.TimeoutExpired:
+            self._kill_session()
+            self.process.wait()
+        try:
+            self.process.stdout.close()
+        except OSError:
+            pass
+
+    def _kill_session(self):
+        """
+        Kill every process in the session of the worker, as root if the worker runs through sudo.
+        """
+        session_id = str(self.process.pid)
+        pkill = ["pkill", "-9", "-s", session_id]
+        try:
+            subprocess.call(["sudo"] + pkill if self.use_sudo else pkill)
+        except OSError:
+            log.exception("Couldn't kill sandbox worker session %s", session_id)
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+
+class WorkerPool:
+    """
+    A bounded pool of :class:`SandboxWorker`.
+
+    At most `size` workers are running at once; callers wait for an idle one
+    when they are all busy.  A worker is replaced after `max_executions`
+    executions (0 for never), and after any failure.  Replacements are started
+    in the background, so that requests don't wait for the imports.
+    """
+    def __init__(self, cmdline, size, max_executions=0, preload_modules=(), env=None):
+        self.cmdline = list(cmdline)
+        self.size = size
+        self.max_executions = max_executions
+        self.preload_modules = list(preload_modules)
+        self.env = env
+        # The process that owns the workers: a forked copy of the pool can't use them.
+        self.pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def warm(self, wait=False):
+        """
+        Start workers until the pool is full: in the background, unless `wait` is true.
+        """
+        if wait:
+            self._fill()
+        else:
+            threading.Thread(target=self._fill, daemon=True).start()
+
+    def _fill(self):
+        """
+        Start workers until the pool is full.
+        """
+        while self._reserve():
+            try:
+                self._idle.put(self._spawn())
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Couldn't start a sandbox worker")
+                self._release()
+                return
+
+    def _reserve(self):
+        """
+        Count one more worker, if the pool isn't full.  Returns whether it wasn't.
+        """
+        with self._lock:
+            if self._count >= self.size:
+                return False
+            self._count += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._count -= 1
+
+    def _spawn(self):
+        return SandboxWorker(self.cmdline, self.preload_modules, self.env)
+
+    def _checkout(self):
+        """
+        Return an idle worker, starting one if there are none and the pool isn't full.
+        """
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if self._reserve():
+                try:
+                    return self._spawn()
+                except Exception:
+                    self._release()
+                    raise
+            # Check again for room in the pool now and then, in case starting a replacement failed.
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                pass
+
+    def _retire(self, worker):
+        """
+        Stop `worker` and start its replacement.
+        """
+        worker.close()
+        self._release()
+        self.warm()
+
+    def run(self, request, timeout=None):
+        """
+        Run `request` on an idle worker and return the worker's response.
+        """
+        worker = self._checkout()
+        try:
+            response = worker.run(request, timeout)
+        except WorkerError:
+            self._retire(worker)
+            raise
+        if self.max_executions and worker.executions >= self.max_executions:
+            self._retire(worker)
+        else:
+            self._idle.put(worker)
+        return response
+
+    def execute(self, code, globals_dict, limits, python_path=None, extra_files=None):
+        """
+        Run `code` with `globals_dict`, under `limits`, as codejail's safe_exec would.
+
+        `limits` are the jail's effective limits (CPU, VMEM, REALTIME, FSIZE and
+        NPROC).  `python_path` and `extra_files` are as for safe_exec: they are
+        put in a temporary home directory for the execution.
+
+        Returns the worker's response: either {"globals": ...} with the
+        resulting JSON-safe globals, or {"error": ..., "status": ...}.
+        """
+        home = tempfile.mkdtemp(prefix="codejail-")
+        try:
+            # The worker runs as the sandbox user, which needs to read the home
+            # directory and write to its tmp directory, like codejail's.
+            os.chmod(home, 0o775)
+            tmp_dir = os.path.join(home, "tmp")
+            os.mkdir(tmp_dir)
+            os.chmod(tmp_dir, 0o777)
+
+            extra_names = set()
+            for filename, contents in extra_files or ():
+                extra_names.add(filename)
+                with open(os.path.join(home, filename), "wb") as extra_file:
+                    extra_file.write(contents if isinstance(contents, bytes) else contents.encode("utf-8"))
+
+            sandbox_path = []
+            for path in python_path or ():
+                destination = os.path.join(home, os.path.basename(path))
+                if path not in extra_names:
+                    if os.path.isdir(path):
+                        shutil.copytree(path, destination)
+                    else:
+                        shutil.copy(path, destination)
+                sandbox_path.append(destination)
+
+            request = {
+                "code": code,
+                "globals": globals_dict,
+                "home": home,
+                "python_path": sandbox_path,
+                "limits": {name: limits.get(name) or 0 for name in ("CPU", "VMEM", "REALTIME", "FSIZE", "NPROC")},
+            }
+            timeout = request["limits"]["REALTIME"] + WORKER_TIMEOUT_GRACE if request["limits"]["REALTIME"] else None
+            return self.run(request, timeout)
+        finally:
+            shutil.rmtree(home, ignore_errors=True)
+
+    def close(self):
+        """
+        Stop the idle workers.
+        """
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            worker.close()
+            self._release()
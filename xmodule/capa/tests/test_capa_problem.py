@@ -7,9 +7,11 @@ import unittest
 import pytest
 import ddt
 from lxml import etree
+from django.test import override_settings
 from markupsafe import Markup
 from mock import patch
 
+from xmodule.capa.capa_problem import LoncapaProblem, get_problem_tree_cache
 from xmodule.capa.responsetypes import LoncapaProblemError
 from xmodule.capa.tests.helpers import new_loncapa_problem
 from openedx.core.djangolib.markup import HTML
@@ -732,3 +734,58 @@ class CAPAProblemReportHelpersTest(unittest.TestCase):
         # Ensure that the answer is a string so that the dict returned from this
         # function can eventualy be serialized to json without issues.
         assert isinstance(problem.get_question_answers()['1_solution_1'], str)
+
+
+class CAPAProblemTreeCacheTest(unittest.TestCase):
+    """
+    Tests for the cache of parsed problem XML.
+    """
+    xml = textwrap.dedent("""
+        <problem>
+            <script type="loncapa/python">
+        answer = str(random.randint(0, 1000))
+            </script>
+            <stringresponse answer="$answer">
+                <additional_answer>other</additional_answer>
+                <textline size="40"/>
+            </stringresponse>
+        </problem>
+    """)
+
+    def setUp(self):
+        super().setUp()
+        cache_settings = override_settings(CAPA_PROBLEM_TREE_CACHE_MAX_BYTES=1024 * 1024)
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+        get_problem_tree_cache().clear()
+
+    def test_preprocessed_once(self):
+        with patch.object(
+            LoncapaProblem, 'make_xml_compatible', autospec=True, side_effect=LoncapaProblem.make_xml_compatible,
+        ) as make_xml_compatible, patch.object(
+            LoncapaProblem, '_annotate_problem_tree', autospec=True, side_effect=LoncapaProblem._annotate_problem_tree,
+        ) as annotate_problem_tree:
+            new_loncapa_problem(self.xml, seed=1)
+            new_loncapa_problem(self.xml, seed=2)
+        assert make_xml_compatible.call_count == 1
+        assert annotate_problem_tree.call_count == 1
+
+    def test_specialized_per_problem(self):
+        first = new_loncapa_problem(self.xml, problem_id='first', seed=1)
+        new_loncapa_problem(self.xml, problem_id='second', seed=1)
+        second = new_loncapa_problem(self.xml, problem_id='second', seed=2)
+        with override_settings(CAPA_PROBLEM_TREE_CACHE_MAX_BYTES=0):
+            uncached = new_loncapa_problem(self.xml, problem_id='second', seed=2)
+        assert first.tree is not second.tree
+        assert first.tree.find('.//textline').get('id') == 'first_2_1'
+        assert second.tree.find('.//textline').get('id') == 'second_2_1'
+        assert second.tree.find('.//additional_answer').get('answer') == 'other'
+        assert list(second.responders.values())[0].answer_id == 'second_2_1'
+        assert second.problem_data == uncached.problem_data
+        assert second.get_question_answers() == uncached.get_question_answers()
+        assert second.get_html() == uncached.get_html()
+
+    def test_includes_not_cached(self):
+        xml = '<problem><include file="test_include.xml"/></problem>'
+        new_loncapa_problem(xml, seed=1)
+        assert get_problem_tree_cache().current_bytes == 0
@@ -785,6 +785,58 @@ class ProblemBlock(
             # number of possibilities, cap the number of different random seeds.
             self.seed %= MAX_RANDOMIZATION_BINS
 
+    def get_possible_seeds(self):
+        """
+        Return every seed that choose_new_seed can pick for this problem, or None if there are too many.
+        """
+        if self.rerandomize == RANDOMIZATION.NEVER:
+            return [1]
+        elif self.rerandomize == RANDOMIZATION.PER_STUDENT:
+            return list(range(NUM_RANDOMIZATION_BINS))
+        return None
+
+    def precompute_script_results(self, cache):
+        """
+        Run the problem's scripts with every seed the problem can be given, storing the results in `cache`.
+
+        This lets the scripts run ahead of time (e.g. when the course is published) rather than when
+        students load the problem. Problems that can be given too many seeds, or whose scripts use the
+        student's anonymous id, are skipped.
+
+        Returns the number of seeds the scripts were run with.
+        """
+        seeds = self.get_possible_seeds()
+        if not seeds or '<script' not in self.data or 'anonymous_student_id' in self.data:
+            return 0
+
+        sandbox_service = SandboxService(contentstore, self.scope_ids.usage_id.context_key)
+        python_lib_zip = sandbox_service.get_python_lib_zip()
+        capa_system = LoncapaSystem(
+            ajax_url=None,
+            anonymous_student_id=None,
+            cache=cache,
+            can_execute_unsafe_code=sandbox_service.can_execute_unsafe_code,
+            get_python_lib_zip=lambda: python_lib_zip,
+            DEBUG=None,
+            i18n=self.runtime.service(self, "i18n"),
+            render_template=None,
+            resources_fs=self.runtime.resources_fs,
+            seed=None,
+            xqueue=None,
+            matlab_api_key=None,
+        )
+        for seed in seeds:
+            LoncapaProblem(
+                problem_text=self.data,
+                id=self.location.html_id(),
+                capa_system=capa_system,
+                capa_block=self,
+                state={},
+                seed=seed,
+                extract_tree=False,
+            )
+        return len(seeds)
+
     def new_lcp(self, state, text=None):
         """
         Generate a new Loncapa Problem
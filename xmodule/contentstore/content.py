@@ -222,7 +222,7 @@ class StaticContent:  # lint-amnesty, pylint: disable=missing-class-docstring
         return any(path.lower().endswith(excluded_ext.lower()) for excluded_ext in excluded_exts)
 
     @staticmethod
-    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True):
+    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True, asset_digests=None):
         """
         Returns a fully-qualified path to a piece of static content.
 
@@ -232,6 +232,9 @@ class StaticContent:  # lint-amnesty, pylint: disable=missing-class-docstring
         Args:
             course_key: key to the course which owns this asset
             path: the path to said content
+            asset_digests: (optional) dict mapping the name of each of the course's assets to a
+                ``(locked, content_digest)`` tuple, as returned by ``get_asset_digests_for_course``.
+                When given, it is used instead of looking up that course's assets in the contentstore.
 
         Returns:
             string: fully-qualified path to asset
@@ -246,13 +249,18 @@ class StaticContent:  # lint-amnesty, pylint: disable=missing-class-docstring
         # Check the status of the asset to see if this can be served via CDN aka publicly.
         serve_from_cdn = False
         content_digest = None
-        try:
-            content = AssetManager.find(asset_key, as_stream=True)
-            serve_from_cdn = not getattr(content, "locked", True)
-            content_digest = getattr(content, "content_digest", None)
-        except (ItemNotFoundError, NotFoundError):
+        if asset_digests is not None and asset_key.block_type == 'asset' and asset_key.course_key == course_key:
             # If we can't find the item, just treat it as if it's locked.
-            serve_from_cdn = False
+            locked, content_digest = asset_digests.get(asset_key.block_id, (True, None))
+            serve_from_cdn = not locked
+        else:
+            try:
+                content = AssetManager.find(asset_key, as_stream=True)
+                serve_from_cdn = not getattr(content, "locked", True)
+                content_digest = getattr(content, "content_digest", None)
+            except (ItemNotFoundError, NotFoundError):
+                # If we can't find the item, just treat it as if it's locked.
+                serve_from_cdn = False
 
         # Do a generic check to see if anything about this asset disqualifies it from being CDN'd.
         is_excluded = False
@@ -268,7 +276,7 @@ class StaticContent:  # lint-amnesty, pylint: disable=missing-class-docstring
         for query_name, query_val in query_params:
             if query_val.startswith("/static/"):
                 new_val = StaticContent.get_canonicalized_asset_path(
-                    course_key, query_val, base_url, excluded_exts, encode=False)
+                    course_key, query_val, base_url, excluded_exts, encode=False, asset_digests=asset_digests)
                 updated_query_params.append((query_name, new_val.encode('utf-8')))
             else:
                 # Make sure we're encoding Unicode strings down to their byte string
@@ -321,21 +329,50 @@ class StaticContentStream(StaticContent):  # lint-amnesty, pylint: disable=missi
                 break
             yield chunk
 
+    def _get_chunk_size(self):
+        """
+        The size of the chunks the stream is stored in, e.g. the chunks of a GridFS file.
+        """
+        return getattr(self._stream, 'chunk_size', None) or STREAM_DATA_CHUNK_SIZE
+
+    def _move_to(self, position):
+        """
+        Move the stream to `position`.
+
+        Seeking drops the chunk the stream has buffered, so when `position` is later in
+        that same chunk, the bytes before it are read past instead of fetching it again.
+        """
+        current = self._stream.tell()
+        chunk_size = self._get_chunk_size()
+        if current <= position < (current // chunk_size + 1) * chunk_size:
+            self._stream.read(position - current)
+        else:
+            self._stream.seek(position)
+
     def stream_data_in_range(self, first_byte, last_byte):
         """
         Stream the data between first_byte and last_byte (included)
+
+        The data is read in pieces aligned to the chunks of the stream, so only the chunks
+        overlapping the range are fetched, each of them once. Streaming several ranges in
+        ascending order continues from where the previous range stopped.
         """
-        self._stream.seek(first_byte)
+        self._move_to(first_byte)
+        chunk_size = self._get_chunk_size()
         position = first_byte
-        while True:
-            if last_byte < position + STREAM_DATA_CHUNK_SIZE - 1:
-                chunk = self._stream.read(last_byte - position + 1)
-                yield chunk
+        while position <= last_byte:
+            chunk = self._stream.read(min(last_byte + 1, (position // chunk_size + 1) * chunk_size) - position)
+            if len(chunk) == 0:
                 break
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
-            position += STREAM_DATA_CHUNK_SIZE
+            position += len(chunk)
             yield chunk
 
+    def read(self, size=-1):
+        """
+        Read up to `size` bytes of the data, or all the remaining data if `size` is negative.
+        """
+        return self._stream.read(size)
+
     def close(self):
         self._stream.close()
 
@@ -373,6 +410,13 @@ class ContentStore:
         '''
         raise NotImplementedError
 
+    def get_asset_digests_for_course(self, course_key, max_assets=None):
+        """
+        Returns a dict mapping the name of each of the course's assets to a ``(locked, content_digest)`` tuple,
+        or None if the course has more than `max_assets` assets.
+        """
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
@@ -3,8 +3,10 @@ MongoDB/GridFS-level code for the contentstore.
 """
 
 
+import hashlib
 import json
 import os
+from datetime import datetime
 
 import gridfs
 import pymongo
@@ -26,16 +28,30 @@ from .content import ContentStore, StaticContent, StaticContentStream
 class MongoContentStore(ContentStore):
     """
     MongoDB-backed ContentStore.
+
+    Each asset is a GridFS file in the `bucket` bucket, whose _id is derived from its location.
+    If `deduplicate_assets` is set, the data of new assets is instead stored once per content
+    digest, as a "blob" in a separate GridFS bucket, and the asset's file document only
+    refers to its blob by `blob_id`. Copying such an asset only copies its file document.
+
+    The file document of each blob keeps a `refcount` of the assets which refer to it, which is
+    only ever changed atomically: it is incremented before an asset referring to the blob is
+    inserted, and decremented once such an asset is deleted. The blob is deleted when its count
+    reaches 0, and a blob whose count is 0 is never referred to again, so an asset can't be left
+    referring to a deleted blob by concurrent saves and deletes. Assets of either kind can be
+    read whether or not `deduplicate_assets` is set.
     """
     # lint-amnesty, pylint: disable=unused-argument
     def __init__(
         self, host, db,
-        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, **kwargs
+        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None,
+        deduplicate_assets=False, **kwargs
     ):
         """
         Establish the connection with the mongo backend and connect to the collections
 
         :param collection: ignores but provided for consistency w/ other doc_store_config patterns
+        :param deduplicate_assets: whether to store the data of new assets in shared, content-addressed blobs
         """
         # GridFS will throw an exception if the Database is wrapped in a MongoProxy. So don't wrap it.
         # The appropriate methods below are marked as autoretry_read - those methods will handle
@@ -51,6 +67,11 @@ class MongoContentStore(ContentStore):
         self.fs_files = mongo_db[bucket + ".files"]  # the underlying collection GridFS uses
         self.chunks = mongo_db[bucket + ".chunks"]
 
+        self.deduplicate_assets = deduplicate_assets
+        self.blob_root = mongo_db[bucket + ".blobs"]
+        self.blobs = gridfs.GridFS(mongo_db, bucket + ".blobs")
+        self.blob_files = self.blob_root.files
+
     def close_connections(self):
         """
         Closes any open connections to the underlying databases
@@ -76,9 +97,13 @@ class MongoContentStore(ContentStore):
         elif collections:
             self.fs_files.drop()
             self.chunks.drop()
+            self.blob_files.drop()
+            self.blob_root.chunks.drop()
         else:
             self.fs_files.remove({})
             self.chunks.remove({})
+            self.blob_files.remove({})
+            self.blob_root.chunks.remove({})
 
         if connections:
             self.close_connections()
@@ -86,35 +111,158 @@ class MongoContentStore(ContentStore):
     def save(self, content):
         content_id, content_son = self.asset_db_key(content.location)
 
+        thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None  # lint-amnesty, pylint: disable=line-too-long
+        if self.deduplicate_assets:
+            blob = self._acquire_blob_for_data(content.data)
+            # Replace the asset only once its data is stored, and keep the blob the asset already
+            # referred to until the new file document refers to its new blob.
+            previous_blob_ids = self._delete_assets([content_id], release_blobs=False)
+            self.fs_files.insert_one({
+                '_id': content_id, 'filename': str(content.location), 'contentType': content.content_type,
+                'displayname': content.name, 'content_son': content_son,
+                'thumbnail_location': thumbnail_location,
+                'import_path': content.import_path,
+                # getattr b/c caching may mean some pickled instances don't have attr
+                'locked': getattr(content, 'locked', False),
+                'length': blob['length'], 'chunkSize': blob['chunkSize'], 'md5': blob['md5'],
+                'uploadDate': datetime.utcnow(), 'blob_id': blob['_id'],
+            })
+            self._release_blobs(previous_blob_ids)
+            return content
+
         # The way to version files in gridFS is to not use the file id as the _id but just as the filename.
         # Then you can upload as many versions as you like and access by date or version. Because we use
         # the location as the _id, we must delete before adding (there's no replace method in gridFS)
         self.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
 
-        thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None  # lint-amnesty, pylint: disable=line-too-long
         with self.fs.new_file(_id=content_id, filename=str(content.location), content_type=content.content_type,  # lint-amnesty, pylint: disable=line-too-long
                               displayname=content.name, content_son=content_son,
                               thumbnail_location=thumbnail_location,
                               import_path=content.import_path,
                               # getattr b/c caching may mean some pickled instances don't have attr
                               locked=getattr(content, 'locked', False)) as fp:
+            self._write_data(fp, content.data)
+
+        return content
 
-            # It seems that this code thought that only some specific object would have the `__iter__` attribute
-            # but many more objects have this in python3 and shouldn't be using the chunking logic. For string and
-            # byte streams we write them directly to gridfs and convert them to byetarrys if necessary.
-            if hasattr(content.data, '__iter__') and not isinstance(content.data, (bytes, (str,))):
-                for chunk in content.data:
-                    fp.write(chunk)
+    @staticmethod
+    def _write_data(fp, data):
+        """
+        Write `data`, which may be bytes, a string or an iterable of chunks of bytes, to the GridFS file `fp`.
+        """
+        # It seems that this code thought that only some specific object would have the `__iter__` attribute
+        # but many more objects have this in python3 and shouldn't be using the chunking logic. For string and
+        # byte streams we write them directly to gridfs and convert them to byetarrys if necessary.
+        if hasattr(data, '__iter__') and not isinstance(data, (bytes, (str,))):
+            for chunk in data:
+                fp.write(chunk)
+        else:
+            # Ideally we could just ensure that we don't get strings in here and only byte streams
+            # but being confident of that wolud be a lot more work than we have time for so we just
+            # handle both cases here.
+            if isinstance(data, str):
+                fp.write(data.encode('utf-8'))
             else:
-                # Ideally we could just ensure that we don't get strings in here and only byte streams
-                # but being confident of that wolud be a lot more work than we have time for so we just
-                # handle both cases here.
-                if isinstance(content.data, str):
-                    fp.write(content.data.encode('utf-8'))
-                else:
-                    fp.write(content.data)
+                fp.write(data)
 
-        return content
+    def _acquire_blob(self, query, sort=None):
+        """
+        Add a reference to the live blob matching `query`, if there is one.
+
+        Returns the file document of the blob, or None.
+        """
+        query = dict(query, refcount={'$gt': 0})
+        return self.blob_files.find_one_and_update(
+            query, {'$inc': {'refcount': 1}}, sort=sort, return_document=pymongo.ReturnDocument.AFTER,
+        )
+
+    def _acquire_blob_for_data(self, data):
+        """
+        Add a reference to the blob of `data`, storing `data` as a new blob if there's no
+        blob with the same content digest yet.
+
+        Returns the file document of the blob.
+        """
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if isinstance(data, bytes):
+            blob = self._acquire_blob({'md5': hashlib.md5(data).hexdigest()})
+            if blob is not None:
+                return blob
+
+        with self.blobs.new_file(refcount=1) as fp:
+            self._write_data(fp, data)
+
+        # The digest of streamed data is only known once it is written, so drop the new
+        # blob if there was one already, keeping the oldest in case of concurrent saves.
+        blob = self._acquire_blob(
+            {'md5': fp.md5, '_id': {'$ne': fp._id}},  # pylint: disable=protected-access
+            sort=[('uploadDate', pymongo.ASCENDING)],
+        )
+        if blob is None:
+            return self.blob_files.find_one({'_id': fp._id})  # pylint: disable=protected-access
+        # Nothing else can refer to the new blob yet.
+        self.blobs.delete(fp._id)  # pylint: disable=protected-access
+        return blob
+
+    def _delete_assets(self, asset_ids, release_blobs=True):
+        """
+        Delete the assets with the given file _ids.
+
+        Returns the list of the _ids of the blobs they referred to, with one entry per deleted asset
+        referring to a blob. Those blobs are released, and deleted if no other asset refers to them,
+        unless `release_blobs` is False, in which case the caller must release them with
+        `_release_blobs`.
+        """
+        blob_ids = [
+            asset['blob_id']
+            for asset in self.fs_files.find({'_id': {'$in': asset_ids}, 'blob_id': {'$exists': True}}, {'blob_id': 1})
+        ]
+        for asset_id in asset_ids:
+            # Deletes of non-existent files are considered successful
+            self.fs.delete(asset_id)
+        if release_blobs:
+            self._release_blobs(blob_ids)
+        return blob_ids
+
+    def _release_blobs(self, blob_ids):
+        """
+        Remove one reference to the blob of each of the given _ids, deleting the blobs which no
+        asset refers to anymore.
+        """
+        for blob_id in blob_ids:
+            blob = self.blob_files.find_one_and_update(
+                {'_id': blob_id}, {'$inc': {'refcount': -1}}, projection={'refcount': 1},
+                return_document=pymongo.ReturnDocument.AFTER,
+            )
+            if blob is None or blob['refcount'] > 0:
+                continue
+            # Once its file document is gone, the blob can't be acquired anymore, so its chunks
+            # can be deleted. Only one of several concurrent releases gets to delete it.
+            if self.blob_files.delete_one({'_id': blob_id, 'refcount': {'$lte': 0}}).deleted_count:
+                self.blob_root.chunks.delete_many({'files_id': blob_id})
+
+    def _open(self, content_id):
+        """
+        Returns a GridOut of the asset with the file _id `content_id`, which reads its data
+        from its blob if it has one.
+
+        Raises NoFile if there's no such asset.
+        """
+        fp = self.fs.get(content_id)
+        # Need to replace dict IDs with SON for chunk lookup to work under Python 3
+        # because field order can be different and mongo cares about the order
+        if isinstance(fp._id, dict):  # lint-amnesty, pylint: disable=protected-access
+            fp._file['_id'] = content_id  # lint-amnesty, pylint: disable=protected-access
+        blob_id = getattr(fp, 'blob_id', None)
+        if blob_id is not None:
+            # The layout of the data comes from the blob itself, and the rest from the asset.
+            blob = self.blob_files.find_one({'_id': blob_id}, {'length': 1, 'chunkSize': 1, 'md5': 1})
+            if blob is None:
+                raise NoFile(f"Blob {blob_id} of asset {content_id} not found")
+            file_document = dict(fp._file, **blob)  # lint-amnesty, pylint: disable=protected-access
+            fp = gridfs.GridOut(self.blob_root, file_document=file_document)
+        return fp
 
     def delete(self, location_or_id):
         """
@@ -122,8 +270,7 @@ class MongoContentStore(ContentStore):
         """
         if isinstance(location_or_id, AssetKey):
             location_or_id, _ = self.asset_db_key(location_or_id)
-        # Deletes of non-existent files are considered successful
-        self.fs.delete(location_or_id)
+        self._delete_assets([location_or_id])
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):  # lint-amnesty, pylint: disable=arguments-differ
@@ -131,11 +278,7 @@ class MongoContentStore(ContentStore):
 
         try:
             if as_stream:
-                fp = self.fs.get(content_id)
-                # Need to replace dict IDs with SON for chunk lookup to work under Python 3
-                # because field order can be different and mongo cares about the order
-                if isinstance(fp._id, dict):  # lint-amnesty, pylint: disable=protected-access
-                    fp._file['_id'] = content_id  # lint-amnesty, pylint: disable=protected-access
+                fp = self._open(content_id)
                 thumbnail_location = getattr(fp, 'thumbnail_location', None)
                 if thumbnail_location:
                     thumbnail_location = location.course_key.make_asset_key(
@@ -150,11 +293,7 @@ class MongoContentStore(ContentStore):
                     content_digest=getattr(fp, 'md5', None),
                 )
             else:
-                with self.fs.get(content_id) as fp:
-                    # Need to replace dict IDs with SON for chunk lookup to work under Python 3
-                    # because field order can be different and mongo cares about the order
-                    if isinstance(fp._id, dict):  # lint-amnesty, pylint: disable=protected-access
-                        fp._file['_id'] = content_id  # lint-amnesty, pylint: disable=protected-access
+                with self._open(content_id) as fp:
                     thumbnail_location = getattr(fp, 'thumbnail_location', None)
                     if thumbnail_location:
                         thumbnail_location = location.course_key.make_asset_key(
@@ -174,22 +313,30 @@ class MongoContentStore(ContentStore):
             else:
                 return None
 
+    @staticmethod
+    def get_export_path(content):
+        """
+        Returns the path of the file that `content` is exported to, relative to the
+        exported static directory.
+        """
+        # Escape invalid char from filename.
+        export_name = escape_invalid_characters(name=content.name, invalid_char_list=['/', '\\'])
+        if content.import_path is not None:
+            return os.path.join(os.path.dirname(content.import_path), export_name)
+        return export_name
+
     def export(self, location, output_directory):  # lint-amnesty, pylint: disable=missing-function-docstring
         content = self.find(location)
 
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
+        export_path = self.get_export_path(content)
+        output_directory = output_directory + '/' + os.path.dirname(export_path)
 
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
-
         disk_fs = OSFS(output_directory)
 
-        with disk_fs.open(export_name, 'wb') as asset_file:
+        with disk_fs.open(os.path.basename(export_path), 'wb') as asset_file:
             asset_file.write(content.data)
 
     def export_all_for_course(self, course_key, output_directory, assets_policy_file):
@@ -203,7 +350,6 @@ class MongoContentStore(ContentStore):
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
         """
-        policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
         for asset in assets:
@@ -216,12 +362,34 @@ class MongoContentStore(ContentStore):
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
             self.export(asset['asset_key'], output_directory)
+
+        with open(assets_policy_file, 'w') as f:
+            json.dump(self.get_export_policy(assets), f, sort_keys=True, indent=4)
+
+    @staticmethod
+    def get_export_policy(assets):
+        """
+        Returns the attributes of the given `assets` of a course, as exported to the policies/assets.json file.
+        """
+        policy = {}
+        for asset in assets:
             for attr, value in asset.items():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key', 'blob_id']:
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
+        return policy
 
-        with open(assets_policy_file, 'w') as f:
-            json.dump(policy, f, sort_keys=True, indent=4)
+    def iter_export_for_course(self, course_key):
+        """
+        Yields the export path (see `get_export_path`) and a `StaticContentStream` of each
+        of the assets of the course, without reading their data into memory.
+        """
+        assets, __ = self.get_all_content_for_course(course_key)
+        for asset in assets:
+            content = self.find(asset['asset_key'], as_stream=True)
+            try:
+                yield self.get_export_path(content), content
+            finally:
+                content.close()
 
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
@@ -231,6 +399,28 @@ class MongoContentStore(ContentStore):
             course_key, start=start, maxresults=maxresults, get_thumbnails=False, sort=sort, filter_params=filter_params
         )
 
+    @autoretry_read()
+    def get_asset_digests_for_course(self, course_key, max_assets=None):
+        """
+        Returns a dict mapping the name of each of the course's assets to a ``(locked, content_digest)`` tuple,
+        or None if the course has more than `max_assets` assets.
+
+        Unlike get_all_content_for_course, only the fields needed to build asset URLs are read.
+        """
+        items = self.fs_files.find(
+            query_for_course(course_key, 'asset'),
+            projection=['content_son', 'locked', 'md5'],
+        )
+        if max_assets is not None:
+            items = list(items.limit(max_assets + 1))
+            if len(items) > max_assets:
+                return None
+        digests = {}
+        for asset in items:
+            asset_id = asset.get('content_son', asset['_id'])
+            digests[asset_id['name']] = (asset.get('locked', False), asset.get('md5'))
+        return digests
+
     def remove_redundant_content_for_courses(self):
         """
         Finds and removes all redundant files (Mac OS metadata files with filename ".DS_Store"
@@ -244,11 +434,13 @@ class MongoContentStore(ContentStore):
                 (f'{prefix}.name', {'$regex': ASSET_IGNORE_REGEX}),
             ])
             items = self.fs_files.find(query)
+            blob_ids = []
             for asset in items:
-                self.fs.delete(asset[prefix])
+                blob_ids += self._delete_assets([asset[prefix]], release_blobs=False)
                 assets_to_delete += 1
 
             self.fs_files.remove(query)
+            self._release_blobs(blob_ids)
         return assets_to_delete
 
     @autoretry_read()
@@ -375,7 +567,7 @@ class MongoContentStore(ContentStore):
         :param location:  a c4x asset location
         """
         for attr in attr_dict.keys():
-            if attr in ['_id', 'md5', 'uploadDate', 'length']:
+            if attr in ['_id', 'md5', 'uploadDate', 'length', 'blob_id']:
                 raise AttributeError(f"{attr} is a protected attribute.")
         asset_db_key, __ = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
@@ -404,21 +596,20 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        Assets stored in blobs are copied by only copying their file documents. Otherwise, this
+        implementation fairly expensively copies all of the data, unless `deduplicate_assets`
+        is set, in which case the copies are stored in blobs.
         """
         source_query = query_for_course(source_course_key)
         # it'd be great to figure out how to do all of this on the db server and not pull the bits over
         for asset in self.fs_files.find(source_query):
             asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
+            source_id = asset_key
             if isinstance(asset_key, str):
                 asset_key = AssetKey.from_string(asset_key)
                 __, asset_key = self.asset_db_key(asset_key)
-            # Need to replace dict IDs with SON for chunk lookup to work under Python 3
-            # because field order can be different and mongo cares about the order
-            if isinstance(source_content._id, dict):  # lint-amnesty, pylint: disable=protected-access
-                source_content._file['_id'] = asset_key.copy()  # lint-amnesty, pylint: disable=protected-access
+            else:
+                asset_key = asset_key.copy()
             asset_key['org'] = dest_course_key.org
             asset_key['course'] = dest_course_key.course
             if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
@@ -430,12 +621,48 @@ class MongoContentStore(ContentStore):
                 asset_id = str(
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
+            if 'blob_id' in asset or self.deduplicate_assets:
+                self.create_asset_reference(source_id, asset_id, asset, asset_key)
+                continue
+
+            # don't convert from string until fs access
+            source_content = self._open(source_id)
             try:
                 self.create_asset(source_content, asset_id, asset, asset_key)
             except FileExists:
                 self.fs.delete(file_id=asset_id)
                 self.create_asset(source_content, asset_id, asset, asset_key)
 
+    def create_asset_reference(self, source_id, asset_id, asset, asset_key):
+        """
+        Creates a new asset which refers to the blob of an existing asset, storing the data of
+        the existing asset in a blob first if it isn't in one.
+
+        :param source_id: the file _id of the existing asset
+        :param asset_id: the file _id of the new asset
+        :param asset: the file document of the existing asset
+        :param asset_key: the content_son of the new asset
+        """
+        blob = None
+        if asset.get('blob_id') is not None:
+            blob = self._acquire_blob({'_id': asset['blob_id']})
+        elif asset.get('md5'):
+            blob = self._acquire_blob({'md5': asset['md5']})
+        if blob is None:
+            with self._open(source_id) as source_content:
+                blob = self._acquire_blob_for_data(source_content)
+
+        previous_blob_ids = self._delete_assets([asset_id], release_blobs=False)
+        file_document = dict(
+            asset, _id=asset_id, content_son=asset_key, blob_id=blob['_id'], uploadDate=datetime.utcnow(),
+            # The blob may have been written with another chunk size than the existing asset.
+            length=blob['length'], chunkSize=blob['chunkSize'], md5=blob['md5'],
+        )
+        file_document.pop('asset_key', None)
+        file_document.pop('refcount', None)
+        self.fs_files.insert_one(file_document)
+        self._release_blobs(previous_blob_ids)
+
     def create_asset(self, source_content, asset_id, asset, asset_key):
         """
         Creates a new asset
@@ -460,14 +687,18 @@ class MongoContentStore(ContentStore):
     def delete_all_course_assets(self, course_key):
         """
         Delete all assets identified via this course_key. Dangerous operation which may remove assets
-        referenced by other runs or other courses.
+        referenced by other runs or other courses. The data of assets stored in blobs is only deleted
+        once no other asset refers to it.
         :param course_key:
         """
         course_query = query_for_course(course_key)
         matching_assets = self.fs_files.find(course_query)
+        blob_ids = []
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+            blob_ids += self._delete_assets([asset_key], release_blobs=False)
+        # Blobs shared with other courses are kept.
+        self._release_blobs(blob_ids)
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -600,6 +831,18 @@ class MongoContentStore(ContentStore):
             sparse=True,
             background=True
         )
+        # Indexes needed to find the blob with a given digest, and the assets which refer to a blob.
+        create_collection_index(
+            self.blob_files,
+            [('md5', pymongo.ASCENDING)],
+            background=True
+        )
+        create_collection_index(
+            self.fs_files,
+            [('blob_id', pymongo.ASCENDING)],
+            sparse=True,
+            background=True
+        )
 
 
 def query_for_course(course_key, category=None):
@@ -8,11 +8,14 @@ import logging
 import math
 import pickle
 import re
+import threading
 import zlib
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
 from ccx_keys.locator import CCXLocator
+from django.conf import settings
 from django.core.cache import caches, InvalidCacheBackendError
 from django.db.transaction import TransactionManagementError
 import pymongo
@@ -190,11 +193,125 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class LocalStructureCache:
+    """
+    A bounded, process-local LRU cache of pickled course structures.
+
+    Structures are immutable once written for a given version guid, so they can
+    be kept in memory without going back through the shared django cache (and
+    paying to fetch and decompress them) each time. They are kept pickled rather
+    than deserialized: split mutates the structures it loads in place, so each
+    caller has to get a copy of its own, and unpickling is the cheapest way to
+    make one. The cache is bounded by the size of the pickled structures it
+    holds rather than by the number of entries, since a single large course can
+    be several orders of magnitude bigger than a small one.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """
+        Return whether this cache will store anything at all.
+        """
+        return self.max_bytes > 0
+
+    def get(self, key):
+        """
+        Return the pickled structure stored for `key`, or None if it isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, structure, size):
+        """
+        Store the pickled `structure` under `key`, accounting for it as `size` bytes.
+
+        Returns the number of entries that were evicted to make room for it.
+        Structures larger than the whole cache are not stored.
+        """
+        if size > self.max_bytes:
+            return 0
+
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (structure, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                __, (__, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                evicted += 1
+            self.evictions += evicted
+        return evicted
+
+    def delete(self, key):
+        """
+        Remove `key` from the cache, if present.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.current_bytes -= entry[1]
+
+    def clear(self):
+        """
+        Remove everything from the cache and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_LOCAL_STRUCTURE_CACHE = None
+_LOCAL_STRUCTURE_CACHE_LOCK = threading.Lock()
+
+
+def get_local_structure_cache():
+    """
+    Return the process-wide :class:`LocalStructureCache`.
+
+    The cache is sized by the ``COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES`` setting
+    and is re-created if that setting changes (which only really happens in tests).
+    """
+    global _LOCAL_STRUCTURE_CACHE  # pylint: disable=global-statement
+    max_bytes = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES', 0) or 0
+    with _LOCAL_STRUCTURE_CACHE_LOCK:
+        if _LOCAL_STRUCTURE_CACHE is None or _LOCAL_STRUCTURE_CACHE.max_bytes != max_bytes:
+            _LOCAL_STRUCTURE_CACHE = LocalStructureCache(max_bytes)
+        return _LOCAL_STRUCTURE_CACHE
+
+
 class CourseStructureCache:
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    Structures are also kept, pickled but not compressed, in a bounded
+    process-local LRU (see :class:`LocalStructureCache`) in front of the django
+    cache. Every get returns a freshly unpickled structure, which the caller is
+    free to modify.
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
@@ -204,6 +321,7 @@ class CourseStructureCache:
             self.cache = get_cache('course_structure_cache')
         except InvalidCacheBackendError:
             pass
+        self.local_cache = get_local_structure_cache()
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
@@ -211,6 +329,12 @@ class CourseStructureCache:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            if self.local_cache.enabled:
+                pickled_data = self.local_cache.get(key)
+                tagger.tag(from_local_cache=str(pickled_data is not None).lower())
+                if pickled_data is not None:
+                    return pickle.loads(pickled_data, encoding='latin-1')
+
             try:
                 compressed_pickled_data = self.cache.get(key)
                 tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
@@ -225,13 +349,16 @@ class CourseStructureCache:
                 pickled_data = zlib.decompress(compressed_pickled_data)
                 tagger.measure('uncompressed_size', len(pickled_data))
 
-                return pickle.loads(pickled_data, encoding='latin-1')
+                structure = pickle.loads(pickled_data, encoding='latin-1')
             except Exception:  # lint-amnesty, pylint: disable=broad-except
                 # The cached data is corrupt in some way, get rid of it.
                 log.warning("CourseStructureCache: Bad data in cache for %s", course_context)
                 self.cache.delete(key)
                 return None
 
+            self._set_local(key, pickled_data, tagger)
+            return structure
+
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
         if self.cache is None:
@@ -240,6 +367,7 @@ class CourseStructureCache:
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
             pickled_data = pickle.dumps(structure, 4)  # Protocol can't be incremented until cache is cleared
             tagger.measure('uncompressed_size', len(pickled_data))
+            self._set_local(key, pickled_data, tagger)
 
             # 1 = Fastest (slightly larger results)
             compressed_pickled_data = zlib.compress(pickled_data, 1)
@@ -259,6 +387,18 @@ class CourseStructureCache:
                 monitoring.set_custom_attribute('split_mongo_compressed_size', chunk_size_in_mbs)
                 log.info('Data caching (course structure) failed on chunk size: {} MB'.format(chunk_size_in_mbs))
 
+    def _set_local(self, key, pickled_data, tagger):
+        """
+        Store the `pickled_data` of a structure in the process-local cache, recording any evictions on `tagger`.
+        """
+        if not self.local_cache.enabled:
+            return
+
+        evicted = self.local_cache.set(key, pickled_data, len(pickled_data))
+        if evicted:
+            tagger.measure('local_cache_evictions', evicted)
+        tagger.measure('local_cache_size', self.local_cache.current_bytes)
+
 
 class MongoPersistenceBackend:
     """
@@ -39,6 +39,8 @@ class TestContentstore(unittest.TestCase):
     asset_deprecated = None
     ssck_deprecated = None
 
+    deduplicate_assets = False
+
     @classmethod
     def tearDownClass(cls):
         """
@@ -60,7 +62,7 @@ class TestContentstore(unittest.TestCase):
         """
         # since MongoModuleStore and MongoContentStore are basically assumed to be together, create this class
         # as well
-        self.contentstore = MongoContentStore(HOST, DB, port=PORT)  # lint-amnesty, pylint: disable=attribute-defined-outside-init
+        self.contentstore = MongoContentStore(HOST, DB, port=PORT, deduplicate_assets=self.deduplicate_assets)  # lint-amnesty, pylint: disable=attribute-defined-outside-init, line-too-long
         self.addCleanup(self.contentstore._drop_database)  # pylint: disable=protected-access
 
         AssetLocator.deprecated = deprecated
@@ -222,3 +224,106 @@ class TestContentstore(unittest.TestCase):
         # ensure it didn't remove any from other course
         __, count = self.contentstore.get_all_content_for_course(self.course2_key)
         assert count == len(self.course2_files)
+
+
+@ddt.ddt
+class TestDeduplicatedContentstore(TestContentstore):
+    """
+    Test the methods in contentstore.mongo with assets stored in shared blobs
+    """
+    deduplicate_assets = True
+
+    def count_blobs(self):
+        return self.contentstore.blob_files.count_documents({})
+
+    @ddt.data(True, False)
+    def test_shared_blob(self, deprecated):
+        """
+        Test that assets with the same data share one blob
+        """
+        self.set_up_assets(deprecated)
+        # picture1.jpg is in both courses.
+        assert self.count_blobs() == len(set(self.course1_files + self.course2_files))
+        assert self.contentstore.chunks.count_documents({}) == 0
+
+        course1_asset = self.contentstore.find(self.course1_key.make_asset_key('asset', 'picture1.jpg'))
+        course2_asset = self.contentstore.find(self.course2_key.make_asset_key('asset', 'picture1.jpg'))
+        assert course1_asset.data == course2_asset.data
+        assert course1_asset.content_digest == course2_asset.content_digest
+
+    @ddt.data(True, False)
+    def test_copy_assets_shares_blobs(self, deprecated):
+        """
+        Test that copying assets doesn't copy their data
+        """
+        self.set_up_assets(deprecated)
+        blob_count = self.count_blobs()
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        assert self.count_blobs() == blob_count
+
+        for filename in self.course1_files:
+            source = self.contentstore.find(self.course1_key.make_asset_key('asset', filename))
+            copied = self.contentstore.find(dest_course.make_asset_key('asset', filename), as_stream=True)
+            assert b''.join(copied.stream_data()) == source.data
+
+    @ddt.data(True, False)
+    def test_delete_assets_releases_blobs(self, deprecated):
+        """
+        Test that blobs are only deleted once no asset refers to them
+        """
+        self.set_up_assets(deprecated)
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        assert self.count_blobs() == len(self.course2_files)
+        asset_key = self.course2_key.make_asset_key('asset', 'picture1.jpg')
+        assert self.contentstore.find(asset_key).length > 0
+
+        self.contentstore.delete(asset_key)
+        assert self.count_blobs() == len(self.course2_files) - 1
+
+    def assert_refcounts(self):
+        """
+        Assert that the refcount of each blob is the number of assets which refer to it
+        """
+        for blob in self.contentstore.blob_files.find():
+            assert blob['refcount'] == self.contentstore.fs_files.count_documents({'blob_id': blob['_id']})
+
+    @ddt.data(True, False)
+    def test_blob_refcounts(self, deprecated):
+        """
+        Test that blobs count the assets which refer to them, and that a released blob isn't reused
+        """
+        self.set_up_assets(deprecated)
+        self.assert_refcounts()
+        self.contentstore.copy_all_course_assets(self.course1_key, CourseLocator('test', 'destination', 'copy'))
+        self.assert_refcounts()
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.assert_refcounts()
+
+        # A blob whose last asset is being deleted is not referred to anymore, even if it is still there.
+        blob = self.contentstore.blob_files.find_one()
+        self.contentstore.blob_files.update_one({'_id': blob['_id']}, {'$set': {'refcount': 0}})
+        assert self.contentstore._acquire_blob({'md5': blob['md5']}) is None  # pylint: disable=protected-access
+
+    def test_reference_to_blob_with_other_chunk_size(self):
+        """
+        Test that an asset referring to a blob reads it with the chunk size of the blob
+        """
+        self.set_up_assets(False)
+        data = b'0123456789' * 30000
+        self.contentstore.save(StaticContent(
+            self.course1_key.make_asset_key('asset', 'data.bin'), 'data.bin', 'application/octet-stream', data,
+        ))
+        # An asset stored before deduplication, with a chunk size other than the blob's.
+        legacy_key = self.course2_key.make_asset_key('asset', 'legacy.bin')
+        legacy_id, legacy_son = self.contentstore.asset_db_key(legacy_key)
+        self.contentstore.fs.put(
+            data, _id=legacy_id, filename=str(legacy_key), content_type='application/octet-stream',
+            displayname='legacy.bin', content_son=legacy_son, thumbnail_location=None, import_path=None,
+            locked=False, chunk_size=256 * 1024,
+        )
+
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course2_key, dest_course)
+        copied = self.contentstore.find(dest_course.make_asset_key('asset', 'legacy.bin'))
+        assert copied.data == data
@@ -15,6 +15,7 @@ import pytest
 import ddt
 from ccx_keys.locator import CCXBlockUsageLocator
 from django.core.cache import InvalidCacheBackendError, caches
+from django.test.utils import override_settings
 from opaque_keys.edx.locator import BlockUsageLocator, CourseKey, CourseLocator, LocalId
 from testfixtures import LogCapture
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -35,7 +36,7 @@ from xmodule.modulestore.exceptions import (
 )
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.split_mongo import BlockKey
-from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache, LocalStructureCache
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_HOST, MONGO_PORT_NUM
@@ -879,6 +880,31 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         # data chunk was less than 1MB so no logs were added.
         self.assertEqual(len(capture.records), 0)
 
+    @override_settings(COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES=1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_local_cache(self, mock_get_cache):
+        enabled_cache = caches['default']
+        mock_get_cache.return_value = enabled_cache
+        local_cache = CourseStructureCache().local_cache
+        local_cache.clear()
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # Clearing the shared cache shouldn't matter, since the structure is now held in-process
+        enabled_cache.clear()
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        assert cached_structure == not_cached_structure
+        assert local_cache.hits == 1
+        assert len(local_cache) == 1
+
+        # Each read gets a copy of its own, so changes made to one don't leak into the others
+        cached_structure['blocks'].clear()
+        with check_mongo_calls(0):
+            assert self._get_structure(self.new_course) == not_cached_structure
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -888,6 +914,49 @@ class TestCourseStructureCache(CacheIsolationMixin, SplitModuleTest):
         )
 
 
+class TestLocalStructureCache(unittest.TestCase):
+    """Tests for the process-local LRU in front of the CourseStructureCache"""
+
+    def test_disabled(self):
+        cache = LocalStructureCache(0)
+        assert not cache.enabled
+        cache.set('key', {'blocks': {}}, 10)
+        assert cache.get('key') is None
+
+    def test_lru_eviction_by_size(self):
+        cache = LocalStructureCache(100)
+        assert cache.set('a', 'structure a', 40) == 0
+        assert cache.set('b', 'structure b', 40) == 0
+
+        # Reading 'a' makes 'b' the least recently used entry
+        assert cache.get('a') == 'structure a'
+        assert cache.set('c', 'structure c', 40) == 1
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 'structure a'
+        assert cache.get('c') == 'structure c'
+        assert cache.current_bytes == 80
+        assert (cache.hits, cache.misses, cache.evictions) == (3, 1, 1)
+
+    def test_oversized_structure_not_cached(self):
+        cache = LocalStructureCache(100)
+        cache.set('a', 'structure a', 40)
+        assert cache.set('big', 'big structure', 101) == 0
+        assert cache.get('big') is None
+        assert cache.get('a') == 'structure a'
+
+    def test_replace_and_delete(self):
+        cache = LocalStructureCache(100)
+        cache.set('a', 'old', 60)
+        cache.set('a', 'new', 30)
+        assert cache.current_bytes == 30
+        assert cache.get('a') == 'new'
+
+        cache.delete('a')
+        assert cache.current_bytes == 0
+        assert len(cache) == 0
+
+
 class SplitModuleItemTests(SplitModuleTest):
     '''
     Item read tests including inheritance
@@ -5,10 +5,14 @@ Tests for XML importer.
 
 import importlib
 import os
+import shutil
+import tempfile
+import threading
 import unittest
 from uuid import uuid4
 from unittest import mock
 
+import ddt
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from path import Path as path
@@ -211,6 +215,7 @@ class UpdateLocationTest(ModuleStoreNoSettings):
             assert new_version.fields[field].is_set_on(new_version)  # pylint: disable=unsubscriptable-object
 
 
+@ddt.ddt
 class StaticContentImporterTest(unittest.TestCase):  # lint-amnesty, pylint: disable=missing-class-docstring
 
     def setUp(self):  # lint-amnesty, pylint: disable=super-method-not-called
@@ -246,6 +251,60 @@ class StaticContentImporterTest(unittest.TestCase):  # lint-amnesty, pylint: dis
                 'static/inner/file1.txt', base_dir=expected_base_dir
             )
 
+    @ddt.data(1, 4)
+    def test_import_static_content_directory_remap(self, max_workers):
+        self.static_content_importer.max_workers = max_workers
+        file_names = [f'file{index}.txt' for index in range(20)]
+        with mock.patch(
+            'xmodule.modulestore.xml_importer.os.walk',
+            return_value=[('static', None, file_names)]
+        ), mock.patch.object(
+            self.static_content_importer, 'import_static_file',
+            side_effect=lambda file_path, base_dir: (file_path, file_path.upper()),
+        ):
+            remap_dict = self.static_content_importer.import_static_content_directory('static')
+        assert remap_dict == {f'static/{name}': f'STATIC/{name.upper()}' for name in file_names}
+
+    @mock.patch('xmodule.modulestore.xml_importer.close_old_connections')
+    def test_import_static_content_directory_concurrently(self, mock_close_old_connections):
+        static_dir = path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, static_dir)
+        file_names = [f'file{index}.txt' for index in range(20)]
+        for name in file_names:
+            (static_dir / name).write_bytes(name.encode('utf-8'))
+        saving_threads = set()
+        self.mocked_content_store.generate_thumbnail.return_value = (None, None)
+        self.mocked_content_store.save.side_effect = lambda content: saving_threads.add(threading.get_ident())
+        self.static_content_importer.course_data_path = static_dir.parent
+        self.static_content_importer.max_workers = 4
+
+        remap_dict = self.static_content_importer.import_static_content_directory(static_dir.name)
+
+        assert sorted(remap_dict) == sorted(file_names)
+        assert self.mocked_content_store.save.call_count == len(file_names)
+        assert threading.get_ident() not in saving_threads
+        assert mock_close_old_connections.call_count == len(file_names)
+
+    @mock.patch('xmodule.modulestore.xml_importer.close_old_connections')
+    def test_import_static_content_directory_concurrently_fails(self, mock_close_old_connections):
+        self.static_content_importer.max_workers = 4
+        file_names = [f'file{index}.txt' for index in range(20)]
+
+        def import_static_file(file_path, base_dir):
+            if file_path == 'static/file10.txt':
+                raise OSError('Unable to read the file')
+            return file_path, file_path
+
+        with mock.patch(
+            'xmodule.modulestore.xml_importer.os.walk',
+            return_value=[('static', None, file_names)]
+        ), mock.patch.object(
+            self.static_content_importer, 'import_static_file', side_effect=import_static_file,
+        ):
+            with self.assertRaises(OSError):
+                self.static_content_importer.import_static_content_directory('static')
+        assert mock_close_old_connections.called
+
     def test_import_static_file(self):
         base_dir = path('/path/to/dir')
         full_file_path = os.path.join(base_dir, 'static/some_file.txt')
@@ -4,11 +4,11 @@ Methods for exporting course data to XML
 
 
 import logging
-import os
 from abc import abstractmethod
 from json import dumps
 
 import lxml.etree
+from fs.base import FS
 from fs.osfs import OSFS
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict, Scope
@@ -105,21 +105,26 @@ class ExportManager:
     """
     Manages XML exporting for courselike objects.
     """
-    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir):
+    def __init__(self, modulestore, contentstore, courselike_key, root_dir, target_dir, export_static_files=True):
         """
         Export all blocks from `modulestore` and content from `contentstore` as xml to `root_dir`.
 
         `modulestore`: A `ModuleStore` object that is the source of the blocks to export
         `contentstore`: A `ContentStore` object that is the source of the content to export, can be None
         `courselike_key`: The Locator of the block to export
-        `root_dir`: The directory to write the exported xml to
+        `root_dir`: The directory to write the exported xml to, or an `FS` to write it to
         `target_dir`: The name of the directory inside `root_dir` to write the content to
+        `export_static_files`: Whether to write the static files from `contentstore` to the static
+            directory. If False, only their policies are written, and the caller is expected to
+            export the files themselves (see `MongoContentStore.iter_export_for_course`). Must be
+            False if `root_dir` is an `FS`.
         """
         self.modulestore = modulestore
         self.contentstore = contentstore
         self.courselike_key = courselike_key
         self.root_dir = root_dir
         self.target_dir = str(target_dir)
+        self.export_static_files = export_static_files
 
     @abstractmethod
     def get_key(self):
@@ -155,7 +160,7 @@ class ExportManager:
         """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
+            fsm = self.root_dir if isinstance(self.root_dir, FS) else OSFS(self.root_dir)
             root = lxml.etree.Element('unknown')
 
             # export only the published content
@@ -173,7 +178,7 @@ class ExportManager:
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
+            root_courselike_dir = None if isinstance(self.root_dir, FS) else self.root_dir + '/' + self.target_dir
             self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
@@ -203,26 +208,21 @@ class CourseExportManager(ExportManager):
 
     def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
+        asset_dir = export_fs.makedirs(AssetMetadata.EXPORTED_ASSET_DIR, recreate=True)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file, encoding='utf-8')
 
         # export the static assets
         policies_dir = export_fs.makedir('policies', recreate=True)
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
-            )
+            export_static_assets(self.contentstore, self.courselike_key, root_courselike_dir, policies_dir,
+                                 self.export_static_files)
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
@@ -237,10 +237,8 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open('course_image.jpg', 'wb') as course_image_file:
+                    output_dir = export_fs.makedirs('static/images', recreate=True)
+                    with output_dir.open('course_image.jpg', 'wb') as course_image_file:
                         course_image_file.write(course_image.data)
 
         # export the static tabs
@@ -314,14 +312,11 @@ class LibraryExportManager(ExportManager):
         to ease in duck typing during import. This may be expanded as a useful feature eventually.
         """
         # export the static assets
-        export_fs.makedir('policies', recreate=True)
+        policies_dir = export_fs.makedir('policies', recreate=True)
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
-                self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
-            )
+            export_static_assets(self.contentstore, self.courselike_key, root_courselike_dir, policies_dir,
+                                 self.export_static_files)
 
     def post_process(self, root, export_fs):
         """
@@ -336,18 +331,41 @@ class LibraryExportManager(ExportManager):
         xml_file.close()
 
 
-def export_course_to_xml(modulestore, contentstore, course_key, root_dir, course_dir):
+def export_course_to_xml(modulestore, contentstore, course_key, root_dir, course_dir, export_static_files=True):
     """
     Thin wrapper for the Course Export Manager. See ExportManager for details.
     """
-    CourseExportManager(modulestore, contentstore, course_key, root_dir, course_dir).export()
+    CourseExportManager(
+        modulestore, contentstore, course_key, root_dir, course_dir, export_static_files=export_static_files,
+    ).export()
 
 
-def export_library_to_xml(modulestore, contentstore, library_key, root_dir, library_dir):
+def export_library_to_xml(modulestore, contentstore, library_key, root_dir, library_dir, export_static_files=True):
     """
     Thin wrapper for the Library Export Manager. See ExportManager for details.
     """
-    LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
+    LibraryExportManager(
+        modulestore, contentstore, library_key, root_dir, library_dir, export_static_files=export_static_files,
+    ).export()
+
+
+def export_static_assets(contentstore, courselike_key, root_courselike_dir, policies_dir, export_static_files=True):
+    """
+    Export the static assets of `courselike_key` to the static directory of `root_courselike_dir`, and
+    their policies to `policies_dir`.
+
+    If `export_static_files` is False, only the policies are exported.
+    """
+    if export_static_files:
+        contentstore.export_all_for_course(
+            courselike_key,
+            root_courselike_dir + '/static/',
+            root_courselike_dir + '/policies/assets.json',
+        )
+    else:
+        assets, __ = contentstore.get_all_content_for_course(courselike_key)
+        with policies_dir.open('assets.json', 'w') as assets_policy_file:
+            assets_policy_file.write(dumps(contentstore.get_export_policy(assets), sort_keys=True, indent=4))
 
 
 def adapt_references(subtree, destination_course_key, export_fs):
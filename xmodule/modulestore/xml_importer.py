@@ -26,10 +26,16 @@ import logging
 import mimetypes
 import os
 import re
+import time
 from abc import abstractmethod
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 
 import xblock
+from django.db import close_old_connections
 from django.utils.translation import gettext as _
+from edx_toggles.toggles import WaffleSwitch
 from lxml import etree
 from opaque_keys.edx.keys import UsageKey
 from opaque_keys.edx.locator import LibraryLocator
@@ -38,6 +44,8 @@ from xblock.core import XBlockMixin
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict, Scope
 from xblock.runtime import DictKeyValueStore, KvsFieldData
 
+from edx_django_utils.monitoring import set_custom_attribute
+
 from common.djangoapps.util.monitoring import monitor_import_failure
 from xmodule.assetstore import AssetMetadata
 from xmodule.contentstore.content import StaticContent
@@ -60,6 +68,24 @@ log = logging.getLogger(__name__)
 
 DEFAULT_STATIC_CONTENT_SUBDIR = 'static'
 
+# Number of threads that read, thumbnail and save static files into the contentstore during import,
+# when CONCURRENT_STATIC_CONTENT_IMPORT is enabled.
+DEFAULT_STATIC_CONTENT_IMPORT_WORKERS = 4
+
+# .. toggle_name: modulestore.concurrent_static_content_import
+# .. toggle_implementation: WaffleSwitch
+# .. toggle_default: False
+# .. toggle_description: When enabled, course imports read, thumbnail and save static files with
+#   DEFAULT_STATIC_CONTENT_IMPORT_WORKERS threads, and import them in the background while the asset
+#   metadata is imported. When disabled, static files are imported one at a time, as before.
+# .. toggle_use_cases: temporary
+# .. toggle_creation_date: 2026-10-18
+# .. toggle_target_removal_date: 2027-04-18
+CONCURRENT_STATIC_CONTENT_IMPORT = WaffleSwitch('modulestore.concurrent_static_content_import', __name__)
+
+# How often, in number of items, the progress of an import stage is logged.
+IMPORT_PROGRESS_LOG_INTERVAL = 500
+
 
 class CourseImportException(Exception):
     """
@@ -116,11 +142,56 @@ class LocationMixin(XBlockMixin):
         )
 
 
-class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docstring
-    def __init__(self, static_content_store, course_data_path, target_id):
+class ImportProgress:
+    """
+    Tracks the duration and the number of items of each stage of an import, and reports
+    them to the log and as custom monitoring attributes.
+    """
+
+    def __init__(self, target_id):
+        self.target_id = target_id
+        self.counts = Counter()
+        self.durations = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time the stage `name` of the import.
+        """
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.durations[name] = self.durations.get(name, 0) + time.perf_counter() - start
+            log.info(
+                'Course import %s: %s stage took %.2fs for %d items',
+                self.target_id, name, self.durations[name], self.counts[name],
+            )
+            set_custom_attribute(f'course_import.{name}.duration', round(self.durations[name], 3))
+            set_custom_attribute(f'course_import.{name}.count', self.counts[name])
+
+    def increment(self, name, count=1):
+        """
+        Count `count` items done in the stage `name`.
+        """
+        previous = self.counts[name]
+        self.counts[name] += count
+        if previous // IMPORT_PROGRESS_LOG_INTERVAL != self.counts[name] // IMPORT_PROGRESS_LOG_INTERVAL:
+            log.info('Course import %s: %s stage has done %d items', self.target_id, name, self.counts[name])
+
+
+class StaticContentImporter:
+    """
+    Imports the static files of a course into the contentstore.
+
+    Files are read, thumbnailed and saved by `max_workers` threads, with a bounded number
+    of files in flight so that only a few of them are held in memory at any time.
+    """
+    def __init__(self, static_content_store, course_data_path, target_id, max_workers=1):
         self.static_content_store = static_content_store
         self.target_id = target_id
         self.course_data_path = course_data_path
+        self.max_workers = max_workers
         try:
             with open(course_data_path / 'policies/assets.json') as f:
                 self.policy = json.load(f)
@@ -133,10 +204,52 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
         mimetypes.add_type('application/octet-stream', '.srt')
         self.mimetypes_list = list(mimetypes.types_map.values())
 
-    def import_static_content_directory(self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):  # lint-amnesty, pylint: disable=missing-function-docstring
+    def import_static_content_directory(self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):
+        """
+        Import all the files in `content_subdir`, returning a dict of their paths to their asset keys.
+        """
         remap_dict = {}
 
+        def collect(imported_file_attrs):
+            if imported_file_attrs:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+
         static_dir = self.course_data_path / content_subdir
+        file_paths = self._iter_static_files(static_dir, verbose)
+        if self.max_workers <= 1:
+            for file_path in file_paths:
+                collect(self.import_static_file(file_path, base_dir=static_dir))
+            return remap_dict
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = set()
+            for file_path in file_paths:
+                if len(pending) >= 2 * self.max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                pending.add(executor.submit(self._import_static_file_in_worker, file_path, base_dir=static_dir))
+            for future in wait(pending).done:
+                collect(future.result())
+
+        return remap_dict
+
+    def _import_static_file_in_worker(self, full_file_path, base_dir):
+        """
+        Import a static file from a worker thread, then close the thread's database
+        connections if they can't be reused, as they aren't closed at the end of a request.
+        """
+        try:
+            return self.import_static_file(full_file_path, base_dir=base_dir)
+        finally:
+            close_old_connections()
+
+    def _iter_static_files(self, static_dir, verbose):
+        """
+        Yield the paths of the files under `static_dir` which should be imported.
+        """
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
 
@@ -150,14 +263,7 @@ class StaticContentImporter:  # lint-amnesty, pylint: disable=missing-class-docs
                 if verbose:
                     log.debug('importing static content %s...', file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
-
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
-
-        return remap_dict
+                yield file_path
 
     def import_static_file(self, full_file_path, base_dir):  # lint-amnesty, pylint: disable=missing-function-docstring
         filename = os.path.basename(full_file_path)
@@ -254,6 +360,10 @@ class ImportManager:
         python_lib_filename: The filename of the courselike's python library. Course authors can optionally
             create this file to implement custom logic in their course.
 
+        static_content_workers: The number of threads that import static files. When more than one, static files
+            are imported in the background while the asset metadata is imported. Defaults to
+            DEFAULT_STATIC_CONTENT_IMPORT_WORKERS if CONCURRENT_STATIC_CONTENT_IMPORT is enabled, and to 1 otherwise.
+
         default_class, load_error_blocks: are arguments for constructing the XMLModuleStore (see its doc)
     """
     store_class = XMLModuleStore
@@ -267,6 +377,7 @@ class ImportManager:
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            static_content_workers=None,
     ):
         self.store = store
         self.user_id = user_id
@@ -282,15 +393,23 @@ class ImportManager:
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
-        self.xml_module_store = self.store_class(
-            data_dir,
-            default_class=default_class,
-            source_dirs=source_dirs,
-            load_error_blocks=load_error_blocks,
-            xblock_mixins=store.xblock_mixins,
-            xblock_select=store.xblock_select,
-            target_course_id=target_id,
-        )
+        if static_content_workers is None:
+            static_content_workers = (
+                DEFAULT_STATIC_CONTENT_IMPORT_WORKERS if CONCURRENT_STATIC_CONTENT_IMPORT.is_enabled() else 1
+            )
+        self.static_content_workers = static_content_workers
+        self.progress = ImportProgress(target_id)
+        with self.progress.stage('parse'):
+            self.xml_module_store = self.store_class(
+                data_dir,
+                default_class=default_class,
+                source_dirs=source_dirs,
+                load_error_blocks=load_error_blocks,
+                xblock_mixins=store.xblock_mixins,
+                xblock_select=store.xblock_select,
+                target_course_id=target_id,
+            )
+            self.progress.increment('parse', sum(len(blocks) for blocks in self.xml_module_store.modules.values()))
         self.logger, self.errors = make_error_tracker()
 
     def preflight(self):
@@ -315,15 +434,17 @@ class ImportManager:
         static_content_importer = StaticContentImporter(
             self.static_content_store,
             course_data_path=data_path,
-            target_id=dest_id
+            target_id=dest_id,
+            max_workers=self.static_content_workers,
         )
         if self.do_import_static:
             if self.verbose:
                 log.info(f'Course import {self.target_id}: Importing static content and python library')
             # first pass to find everything in the static content directory
-            static_content_importer.import_static_content_directory(
+            remap_dict = static_content_importer.import_static_content_directory(
                 content_subdir=self.static_content_subdir, verbose=self.verbose
             )
+            self.progress.increment('static', len(remap_dict))
         elif self.do_import_python_lib and self.python_lib_filename:
             if self.verbose:
                 log.info(
@@ -335,6 +456,7 @@ class ImportManager:
                 static_content_importer.import_static_file(
                     python_lib_full_path, base_dir=python_lib_dir_path
                 )
+                self.progress.increment('static')
         else:
             if self.verbose:
                 log.info(f'Course import {self.target_id}: Skipping import of static content and python library')
@@ -352,9 +474,27 @@ class ImportManager:
         if os.path.exists(data_path / simport):
             if self.verbose:
                 log.info(f'Course import {self.target_id}: Importing {simport} directory')
-            static_content_importer.import_static_content_directory(
+            remap_dict = static_content_importer.import_static_content_directory(
                 content_subdir=simport, verbose=self.verbose
             )
+            self.progress.increment('static', len(remap_dict))
+
+    def _timed_import_static(self, data_path, dest_id):
+        """
+        Import all static items into the content store, as the 'static' stage of the import.
+        """
+        with self.progress.stage('static'):
+            self.import_static(data_path, dest_id)
+
+    def _import_static_in_background(self, data_path, dest_id):
+        """
+        Import all static items into the content store from a background thread, then
+        close the thread's database connections if they can't be reused.
+        """
+        try:
+            self._timed_import_static(data_path, dest_id)
+        finally:
+            close_old_connections()
 
     def import_asset_metadata(self, data_dir, course_id):
         """
@@ -514,6 +654,7 @@ class ImportManager:
                             f'Course import {dest_id}: failed to import block location {child.location}'
                         )
                         raise BlockFailedToImport(child.display_name, child.location)  # pylint: disable=raise-missing-from
+                    self.progress.increment('blocks')
 
                     depth_first(child)
 
@@ -539,6 +680,7 @@ class ImportManager:
                 )
                 # pylint: disable=raise-missing-from
                 raise BlockFailedToImport(leftover.display_name, leftover.location)
+            self.progress.increment('blocks')
 
     def run_imports(self):
         """
@@ -556,21 +698,32 @@ class ImportManager:
                 # Retrieve the course itself.
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                if self.static_content_workers > 1:
+                    # Import all static pieces in the background while the asset metadata is imported.
+                    # They are waited for before any block is written, so that a failed static import
+                    # still stops the import before the blocks are changed.
+                    with ThreadPoolExecutor(max_workers=1) as static_executor:
+                        static_import = static_executor.submit(self._import_static_in_background, data_path, dest_id)
+                        # Import asset metadata stored in XML.
+                        self.import_asset_metadata(data_path, dest_id)
+                        static_import.result()
+                else:
+                    # Import all static pieces.
+                    self._timed_import_static(data_path, dest_id)
 
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                    # Import asset metadata stored in XML.
+                    self.import_asset_metadata(data_path, dest_id)
 
                 # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                with self.progress.stage('blocks'):
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
             # Drafts must be imported in a separate bulk operation from published items to import properly,
             # due to the recursive_build() above creating a draft item for each course block
             # and then publishing it.
-            with self.store.bulk_operations(dest_id):
+            with self.store.bulk_operations(dest_id), self.progress.stage('drafts'):
                 # Import all draft items into the courselike.
                 courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
 
@@ -687,7 +840,8 @@ class CourseImportManager(ImportManager):
                 data_path,
                 courselike_key,
                 dest_id,
-                courselike.runtime
+                courselike.runtime,
+                progress=self.progress,
             )
 
         # Importing the drafts potentially triggered a new structure version.
@@ -922,7 +1076,8 @@ def _import_course_draft(
         course_data_path,
         source_course_id,
         target_id,
-        mongo_runtime
+        mongo_runtime,
+        progress=None,
 ):
     """
     This method will import all the content inside of the 'drafts' folder, if content exists.
@@ -993,6 +1148,8 @@ def _import_course_draft(
             target_id,
             runtime=mongo_runtime,
         )
+        if progress is not None:
+            progress.increment('drafts')
         for child in block.get_children():
             _import_block(child)
 
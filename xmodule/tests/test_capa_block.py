@@ -1930,6 +1930,46 @@ class ProblemBlockTest(unittest.TestCase):  # lint-amnesty, pylint: disable=miss
             assert 0 <= block.seed < 1000
             i -= 1
 
+    @ddt.data(
+        (RANDOMIZATION.NEVER, [1]),
+        (RANDOMIZATION.PER_STUDENT, list(range(20))),
+        (RANDOMIZATION.ALWAYS, None),
+        (RANDOMIZATION.ONRESET, None),
+    )
+    @ddt.unpack
+    def test_get_possible_seeds(self, rerandomize, seeds):
+        block = CapaFactory.create(rerandomize=rerandomize)
+        assert block.get_possible_seeds() == seeds
+        if seeds is not None:
+            assert block.seed in seeds
+
+    @ddt.data(
+        (RANDOMIZATION.NEVER, 'a = random.randint(0, 10)', [1]),
+        (RANDOMIZATION.PER_STUDENT, 'a = random.randint(0, 10)', list(range(20))),
+        (RANDOMIZATION.ALWAYS, 'a = random.randint(0, 10)', []),
+        (RANDOMIZATION.PER_STUDENT, 'a = anonymous_student_id', []),
+    )
+    @ddt.unpack
+    @patch('xmodule.capa_block.SandboxService')
+    @patch('xmodule.capa.capa_problem.safe_exec')
+    def test_precompute_script_results(self, rerandomize, script, seeds, mock_safe_exec, mock_sandbox_service):
+        mock_sandbox_service.return_value.get_python_lib_zip.return_value = None
+        xml = textwrap.dedent(f"""
+            <problem>
+                <script type="loncapa/python">{script}</script>
+                <p>$a</p>
+            </problem>
+        """)
+        block = CapaFactory.create(rerandomize=rerandomize, xml=xml)
+        mock_safe_exec.reset_mock()
+        cache = Mock()
+
+        assert block.precompute_script_results(cache) == len(seeds)
+        assert [call.kwargs['random_seed'] for call in mock_safe_exec.call_args_list] == seeds
+        for call in mock_safe_exec.call_args_list:
+            assert call.kwargs['cache'] is cache
+            assert call.args[1]['anonymous_student_id'] is None
+
     @patch('xmodule.capa_block.log')
     @patch('xmodule.capa_block.Progress')
     def test_get_progress_error(self, mock_progress, mock_log):